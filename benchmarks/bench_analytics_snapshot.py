@@ -0,0 +1,108 @@
+"""
+Score analytics from the memory-mapped snapshot against re-querying and looping
+over dict rows the way the score pages did, plus the cost of keeping the
+snapshot current when one more submission lands. The score summary is
+timed against the three-column SQL aggregate it used to be, cold and after an
+unrelated raw-SQL write.
+
+Run from the project root:
+    python -m benchmarks.bench_analytics_snapshot [submissions] [questions]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_item_analysis import seed_assessment, time_ms
+from database.database_manager import DatabaseManager
+
+
+def dict_row_summary(db: DatabaseManager, assessment_id: int) -> dict:
+    """Baseline: fetch the scores as dicts, then average, maximum, median and a histogram in Python"""
+    with db.connection() as conn:
+        rows = conn.execute('''
+            SELECT u.full_name, COALESCE(s.score, s.total_score, 0) AS score, COALESCE(s.max_score, 0) AS max_score
+            FROM submissions s JOIN users u ON u.id = s.student_id
+            WHERE s.assessment_id = ?
+        ''', (assessment_id,)).fetchall()
+    scores = [{'student_name': r[0], 'score': r[1], 'max_score': r[2]} for r in rows]
+    percentages = sorted(s['score'] * 100 / s['max_score'] if s['max_score'] > 0 else 0 for s in scores)
+    histogram = [0] * 10
+    for p in percentages:
+        histogram[min(int(p // 10), 9)] += 1
+    return {'average': sum(percentages) / len(percentages), 'highest': percentages[-1],
+            'median': percentages[len(percentages) // 2], 'histogram': histogram}
+
+
+def sql_summary_baseline(db: DatabaseManager, assessment_id: int) -> dict:
+    """Baseline: the summary's original count/average/highest aggregate"""
+    with db.connection() as conn:
+        row = conn.execute('''
+            SELECT COUNT(*),
+                   AVG(CASE WHEN max_score > 0 THEN score * 100.0 / max_score ELSE 0 END),
+                   MAX(CASE WHEN max_score > 0 THEN score * 100.0 / max_score ELSE 0 END)
+            FROM submissions
+            WHERE assessment_id = ?
+        ''', (assessment_id,)).fetchone()
+    return {'total_students': row[0], 'average_percentage': row[1] or 0, 'highest_percentage': row[2] or 0}
+
+
+def question_means_from_rows(db: DatabaseManager, assessment_id: int) -> dict:
+    """Baseline: per-question mean points from freshly fetched answer rows"""
+    sums, submissions = {}, set()
+    for submission_id, question_id, points, _ in db.get_item_analysis_answers(assessment_id):
+        sums[question_id] = sums.get(question_id, 0) + points
+        submissions.add(submission_id)
+    return {q: total / len(submissions) for q, total in sums.items()}
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id = seed_assessment(db, submissions, questions)
+        print(f"{submissions} submissions x {questions} questions")
+
+        # Before anything builds a snapshot, then after a write the cache cannot attribute to a table
+        print(f"{'score summary, SQL baseline':<36}{time_ms(lambda: sql_summary_baseline(db, assessment_id)):>10.2f} ms")
+        start = time.perf_counter()
+        db.get_assessment_score_summary(assessment_id)
+        print(f"{'score summary, cold':<36}{(time.perf_counter() - start) * 1000:>10.2f} ms")
+        with db.transaction() as conn:
+            conn.execute("UPDATE users SET section = section WHERE id = 1")
+        start = time.perf_counter()
+        db.get_assessment_score_summary(assessment_id)
+        print(f"{'score summary, after raw write':<36}{(time.perf_counter() - start) * 1000:>10.2f} ms")
+        print(f"{'score summary, warm':<36}{time_ms(lambda: db.get_assessment_score_summary(assessment_id)):>10.2f} ms")
+
+        start = time.perf_counter()
+        db.get_analytics_snapshot(assessment_id)
+        print(f"{'snapshot build (once)':<36}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+        def from_snapshot():
+            snapshot = db.get_analytics_snapshot(assessment_id)
+            return snapshot.summary(), snapshot.histogram()
+
+        print(f"{'summary + histogram, dict rows':<36}{time_ms(lambda: dict_row_summary(db, assessment_id)):>10.1f} ms")
+        print(f"{'summary + histogram, snapshot':<36}{time_ms(from_snapshot):>10.2f} ms")
+        print(f"{'question means, answer rows':<36}{time_ms(lambda: question_means_from_rows(db, assessment_id), 1):>10.1f} ms")
+        print(f"{'question means, snapshot':<36}{time_ms(lambda: db.get_analytics_snapshot(assessment_id).question_means()):>10.2f} ms")
+
+        # One more student submits: appended, not rebuilt
+        question_ids = [q['id'] for q in db.get_questions(assessment_id)]
+        db.create_student_accounts([('L0001', 'Late Student', '1A', 'late_student', 'x', 'late@bench.test', 'q', 'x')])
+        with db.connection() as conn:
+            student_id = conn.execute("SELECT id FROM users WHERE username = 'late_student'").fetchone()[0]
+        db.submit_assessment(assessment_id, student_id, [{'question_id': q, 'answer_text': 'A'} for q in question_ids])
+        start = time.perf_counter()
+        db.get_analytics_snapshot(assessment_id)
+        print(f"{'one new submission, appended':<36}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        print(f"Snapshot store: {db.snapshots.get_stats()}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Auto-grading the short answers of a 300-student section: scoring every answer
+on its own against the batched run, where each distinct answer is scored once
+and everything is written in one transaction.
+
+Run from the project root:
+    python -m benchmarks.bench_auto_grade [submissions] [questions]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database.auto_grade import ShortAnswerGrader, auto_grade_assessment
+from database.database_manager import DatabaseManager
+
+KEYS = ["Mitochondria", "Photosynthesis", "Newton's second law", "Osmosis", "9.81", "Hydrogen bond",
+        "Carbon dioxide", "The water cycle", "1/2", "Natural selection"]
+WRONG = ["Nucleus", "I don't know", "Gravity", "Evaporation", "42", ""]
+
+
+def answer_variants(key: str):
+    """What students write for a key: exact, case and spacing, a typo, extra words, and wrong answers"""
+    typo = key[:len(key) // 2] + key[len(key) // 2 + 1:]
+    return [key, key.lower(), f"  {key.upper()} ", typo, f"the {key.lower()}.", f"it is {key.lower()} because"] + WRONG
+
+
+def seed_short_answers(db: DatabaseManager, submissions: int, questions: int) -> int:
+    admin = db.authenticate_user("admin", "admin123")
+    assessment_id = db.create_assessment("Short answer bench", "Benchmark", admin['id'], None, None, 60, 'published')
+    keys = [KEYS[q % len(KEYS)] for q in range(questions)]
+    rng = random.Random(3)
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO questions (assessment_id, question_text, question_type, points, correct_answer, order_index)
+            VALUES (?, ?, 'short_answer', 2, ?, ?)
+        ''', ((assessment_id, f"Question {q}", keys[q], q) for q in range(questions)))
+        conn.executemany('''
+            INSERT INTO users (username, password_hash, role, full_name, email, student_number, section,
+                               security_question, security_answer_hash)
+            VALUES (?, 'x', 'student', ?, ?, ?, '1A', 'What is your pet''s name?', 'x')
+        ''', ((f"sa_{n}", f"Student {n:04d}", f"sa_{n}@bench.test", f"SA{n:04d}") for n in range(submissions)))
+        conn.execute('''
+            INSERT INTO submissions (assessment_id, student_id, submitted_at, score, total_score, max_score, is_graded)
+            SELECT ?, id, CURRENT_TIMESTAMP, 0, 0, ?, 1 FROM users WHERE username LIKE 'sa_%'
+        ''', (assessment_id, 2 * questions))
+        submission_ids = [row[0] for row in conn.execute(
+            'SELECT id FROM submissions WHERE assessment_id = ?', (assessment_id,))]
+        question_ids = [row[0] for row in conn.execute(
+            'SELECT id FROM questions WHERE assessment_id = ? ORDER BY order_index', (assessment_id,))]
+        conn.executemany('''
+            INSERT INTO answers (submission_id, question_id, answer_text, is_correct, points_earned)
+            VALUES (?, ?, ?, 0, 0)
+        ''', ((submission_id, question_id, rng.choice(answer_variants(key)))
+              for submission_id in submission_ids for question_id, key in zip(question_ids, keys)))
+    return assessment_id
+
+
+def score_each(db: DatabaseManager, assessment_id: int) -> int:
+    """Baseline: the same rules, but every answer is scored from scratch"""
+    grader = ShortAnswerGrader(db.get_questions(assessment_id))
+    rows = db.get_short_answer_rows(assessment_id)
+    for row in rows:
+        grader.similarity(row[2], row[3])
+    return len(rows)
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id = seed_short_answers(db, submissions, questions)
+        print(f"{submissions} submissions x {questions} short-answer questions")
+
+        start = time.perf_counter()
+        score_each(db, assessment_id)
+        print(f"{'every answer scored':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        start = time.perf_counter()
+        auto_grade_assessment(db, assessment_id, dry_run=True)
+        print(f"{'batched, dry run':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        start = time.perf_counter()
+        report = auto_grade_assessment(db, assessment_id)
+        print(f"{'batched, applied':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        print(report.summary(max_rows=0).splitlines()[0])
+        print(report.summary(max_rows=0).splitlines()[1])
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-call latency of DatabaseManager reads with and without the connection pool.
+The query cache is turned off on both sides, so every call reaches SQLite.
+
+Run from the project root:
+    python -m benchmarks.bench_connection_pool [calls]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+
+
+class UnpooledDatabaseManager(DatabaseManager):
+    """The old behaviour: a brand-new sqlite3 connection for every call"""
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_path)
+
+
+def seed(db: DatabaseManager, assessments: int = 20, questions: int = 25):
+    admin = db.authenticate_user("admin", "admin123")
+    for a in range(assessments):
+        assessment_id = db.create_assessment(f"Assessment {a}", "Benchmark data", admin['id'],
+                                             None, None, 60, 'published')
+        for q in range(questions):
+            db.add_question(assessment_id, f"Question {q}", 'mcq', 1, 'A', '["a", "b", "c", "d"]', q)
+    return admin
+
+
+def time_calls(db: DatabaseManager, admin_id: int, calls: int):
+    """Average microseconds per call for a dashboard-like mix of reads"""
+    workload = [
+        lambda: db.get_assessments(admin_id, 'admin'),
+        lambda: db.get_questions(1),
+        lambda: db.get_assessment_by_id(1),
+        lambda: db.get_user_by_id(admin_id),
+        lambda: db.get_materials(),
+    ]
+    results = {}
+    for fn in workload:
+        fn()  # warm up
+    for index, fn in enumerate(workload):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        results[index] = (time.perf_counter() - start) / calls * 1e6
+    return results
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    labels = ['get_assessments(admin)', 'get_questions', 'get_assessment_by_id', 'get_user_by_id', 'get_materials']
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        pooled = DatabaseManager(db_path, cache_enabled=False)
+        pooled.initialize_database()
+        admin = seed(pooled)
+
+        unpooled = UnpooledDatabaseManager(db_path, cache_enabled=False)
+        before = time_calls(unpooled, admin['id'], calls)
+        after = time_calls(pooled, admin['id'], calls)
+        pooled.close()
+
+    print(f"{'call':<26}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for index, label in enumerate(labels):
+        print(f"{label:<26}{before[index]:>14.1f}{after[index]:>14.1f}{before[index] / after[index]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
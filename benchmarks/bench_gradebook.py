@@ -0,0 +1,90 @@
+"""
+Building a section gradebook: one aggregated query pivoted with NumPy against
+reading each assessment's submissions in turn (as opening StudentScoresListPage
+once per assessment does), and patching one changed grade against rebuilding.
+
+Run from the project root:
+    python -m benchmarks.bench_gradebook [students] [assessments]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+
+
+def seed_section(db: DatabaseManager, students: int, assessments: int) -> list:
+    """One section of ``students``; each assessment posted to it and taken by nine in ten students"""
+    admin = db.authenticate_user("admin", "admin123")
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO users (username, password_hash, role, full_name, email, student_number, section,
+                               security_question, security_answer_hash)
+            VALUES (?, 'x', 'student', ?, ?, ?, '1A', 'What is your pet''s name?', 'x')
+        ''', ((f"bench_{n}", f"Student {n:06d}", f"bench_{n}@bench.test", f"B{n:06d}") for n in range(students)))
+    assessment_ids = []
+    for a in range(assessments):
+        assessment_id = db.create_assessment(f"Quiz {a}", "Benchmark", admin['id'], None, None, 30, 'published')
+        post_id = db.create_post(f"Quiz {a}", "Benchmark", 'assessment', admin['id'], assessment_id)
+        db.assign_post_sections(post_id, ['1A'])
+        assessment_ids.append(assessment_id)
+    with db.transaction() as conn:
+        conn.execute('''
+            INSERT INTO submissions (assessment_id, student_id, submitted_at, score, total_score, max_score, is_graded)
+            SELECT a.id, u.id, CURRENT_TIMESTAMP, (u.id * a.id) % 21, (u.id * a.id) % 21, 20, 1
+            FROM users u, assessments a
+            WHERE u.username LIKE 'bench_%' AND (u.id + a.id) % 10 != 0
+        ''')
+    return assessment_ids
+
+
+def per_assessment_gradebook(db: DatabaseManager, assessment_ids: list) -> dict:
+    """Baseline: one submissions listing per assessment, merged into a dict of dicts"""
+    gradebook = {}
+    for assessment_id in assessment_ids:
+        for s in db.get_assessment_submissions(assessment_id):
+            gradebook.setdefault(s['student_id'], {})[assessment_id] = s['total_score']
+    return gradebook
+
+
+def time_ms(fn, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    assessments = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_ids = seed_section(db, students, assessments)
+        print(f"{students} students x {assessments} assessments")
+
+        def rebuild():
+            db.gradebooks.clear()
+            matrix = db.get_gradebook_matrix('1A')
+            return matrix.column_stats(), matrix.student_totals()
+
+        db.get_gradebook_matrix('1A')
+        print(f"{'per-assessment listings':<32}{time_ms(lambda: per_assessment_gradebook(db, assessment_ids)):>10.1f} ms")
+        print(f"{'matrix build + stats':<32}{time_ms(rebuild):>10.1f} ms")
+
+        with db.connection() as conn:
+            submission_id = conn.execute("SELECT id FROM submissions LIMIT 1").fetchone()[0]
+
+        def patch():
+            db.finalize_submission_grade(submission_id)
+            db.get_gradebook_matrix('1A')
+
+        print(f"{'grade change, patched':<32}{time_ms(patch):>10.1f} ms")
+        print(f"Gradebook cache: {db.gradebooks.get_stats()}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
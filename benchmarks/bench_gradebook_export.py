@@ -0,0 +1,91 @@
+"""
+Time and peak Python memory of exporting a large answer dump: the streamed
+export_assessment_answers versus building the sheet from get_submission_details
+for every submission first.
+
+Run from the project root:
+    python -m benchmarks.bench_gradebook_export [answers] [csv|xlsx]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from database.database_manager import DatabaseManager
+from database.gradebook_export import ANSWER_HEADER, export_assessment_answers, write_sheet
+
+QUESTIONS = 50
+
+
+def seed_answers(db: DatabaseManager, answers: int) -> int:
+    """One assessment with QUESTIONS questions, answered by answers // QUESTIONS students"""
+    admin = db.authenticate_user("admin", "admin123")
+    assessment_id = db.create_assessment("Final exam", "Benchmark", admin['id'], None, None, 120, 'published')
+    students = max(1, answers // QUESTIONS)
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO questions (assessment_id, question_text, question_type, points, correct_answer, options, order_index)
+            VALUES (?, ?, 'short_answer', 2, 'photosynthesis', NULL, ?)
+        ''', ((assessment_id, f"Question {q}: explain the process in your own words", q) for q in range(QUESTIONS)))
+        conn.executemany('''
+            INSERT INTO users (username, password_hash, role, full_name, email, student_number, section,
+                               security_question, security_answer_hash)
+            VALUES (?, 'x', 'student', ?, ?, ?, '1A', 'What is your pet''s name?', 'x')
+        ''', ((f"bench_{n}", f"Student {n:06d}", f"bench_{n}@bench.test", f"B{n:06d}") for n in range(students)))
+        conn.execute('''
+            INSERT INTO submissions (assessment_id, student_id, submitted_at, score, total_score, max_score, is_graded)
+            SELECT ?, id, CURRENT_TIMESTAMP, 0, 0, ?, 1 FROM users WHERE username LIKE 'bench_%'
+        ''', (assessment_id, QUESTIONS * 2))
+        conn.execute('''
+            INSERT INTO answers (submission_id, question_id, answer_text, is_correct, points_earned, feedback)
+            SELECT s.id, q.id, 'the plant turns light into chemical energy', q.id % 2, (q.id % 2) * 2, NULL
+            FROM submissions s JOIN questions q ON q.assessment_id = s.assessment_id
+            WHERE s.assessment_id = ?
+        ''', (assessment_id,))
+    return assessment_id
+
+
+def export_via_details(db: DatabaseManager, assessment_id: int, path: str) -> int:
+    """Baseline: load every submission's details into memory, then write the sheet"""
+    rows = []
+    for submission in db.get_assessment_submissions(assessment_id):
+        details = db.get_submission_details(submission['submission_id'])
+        for a in details['answers']:
+            rows.append((details['student_number'], details['student_name'], '', None, a['question_text'],
+                         a['question_type'], a['points'], a['correct_answer'], a['student_answer'],
+                         a['is_correct'], a['points_earned'], a['feedback']))
+    return write_sheet(path, "answers", ANSWER_HEADER, rows)
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    written = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<28}{written:>10}{elapsed:>10.2f}s{peak / 2**20:>12.1f} MiB")
+
+
+def main():
+    answers = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    extension = '.' + (sys.argv[2] if len(sys.argv) > 2 else 'csv')
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'), cache_enabled=False)
+        db.initialize_database()
+        start = time.perf_counter()
+        assessment_id = seed_answers(db, answers)
+        print(f"Seeded {answers} answers in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'export':<28}{'rows':>10}{'time':>11}{'peak memory':>13}")
+        measure("streamed", lambda: export_assessment_answers(
+            db, assessment_id, os.path.join(tmp, 'streamed' + extension)))
+        measure("get_submission_details", lambda: export_via_details(
+            db, assessment_id, os.path.join(tmp, 'details' + extension)))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Scoring 10k submissions three ways: the per-option loop the grading and
+results pages used (options JSON parsed again for every answer), the compiled
+AnswerKey one submission at a time (submit_assessment), and AnswerKey.score_batch
+over all of them as NumPy arrays (regrades). Runs in memory, no database.
+
+Run from the project root:
+    python -m benchmarks.bench_grading [submissions] [questions]
+"""
+
+import json
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd  # noqa: F401  loaded up front so score_batch's timing excludes the import
+
+from database.grading import AnswerKey
+
+OPTIONS = ["Mitochondria", "Nucleus", "Ribosome", "Golgi body"]
+
+
+def legacy_is_correct(student_answer, correct_answer, options) -> bool:
+    """Baseline: the loop from StudentSubmissionGradingPage.finalize_grade"""
+    if isinstance(options, str):
+        try:
+            options = json.loads(options)
+        except ValueError:
+            options = []
+    for idx, option in enumerate(options):
+        option_letter = chr(65 + idx)
+        is_selected = (student_answer == option_letter or student_answer == str(idx) or
+                       student_answer == option or student_answer == str(idx + 1))
+        is_option_correct = (correct_answer == option_letter or correct_answer == str(idx) or
+                             correct_answer == option or correct_answer == str(idx + 1))
+        if is_selected and is_option_correct:
+            return True
+    return False
+
+
+def make_exam(submissions: int, questions: int):
+    """MCQ questions keyed by letter; answers stored as option text, as the exam page submits them"""
+    rng = random.Random(7)
+    question_rows = [{'id': q + 1, 'question_type': 'mcq', 'points': 1, 'correct_answer': 'ABCD'[q % 4],
+                      'options': json.dumps(OPTIONS)} for q in range(questions)]
+    answers = [[{'question_id': q + 1, 'answer_text': rng.choice(OPTIONS)} for q in range(questions)]
+               for _ in range(submissions)]
+    return question_rows, answers
+
+
+def check_letter_options():
+    """A letter key names its option by position, even when option texts are letters themselves"""
+    answer_key = AnswerKey([{'id': 1, 'question_type': 'mcq', 'points': 1, 'correct_answer': 'B',
+                             'options': '["B", "A", "C", "D"]'},
+                            {'id': 2, 'question_type': 'mcq', 'points': 1, 'correct_answer': '2',
+                             'options': '["3", "1", "2"]'},
+                            {'id': 3, 'question_type': 'mcq', 'points': 1, 'correct_answer': 'Nucleus',
+                             'options': json.dumps(OPTIONS)}])
+    assert answer_key.key_codes == [1, 1, 1], answer_key.key_codes
+    # Answers are the option text the student picked
+    assert answer_key.grade(1, 'A') == (True, 1.0) and answer_key.grade(1, 'B') == (False, 0.0)
+    assert answer_key.grade(2, '1') == (True, 1.0) and answer_key.grade(3, 'nucleus') == (True, 1.0)
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    question_rows, answers = make_exam(submissions, questions)
+    by_id = {q['id']: q for q in question_rows}
+    print(f"{submissions} submissions x {questions} questions")
+
+    start = time.perf_counter()
+    legacy = [sum(by_id[a['question_id']]['points'] for a in submission
+                  if legacy_is_correct(a['answer_text'], by_id[a['question_id']]['correct_answer'],
+                                       by_id[a['question_id']]['options']))
+              for submission in answers]
+    print(f"{'per-option loop':<34}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+    start = time.perf_counter()
+    answer_key = AnswerKey(question_rows)
+    compiled = [answer_key.score(submission)[1] for submission in answers]
+    print(f"{'AnswerKey.score, per submission':<34}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+    # The batch input is what regrade reads out of SQLite: one row per answer
+    submission_idx = np.repeat(np.arange(submissions), questions)
+    question_idx = np.tile(np.arange(questions), submissions)
+    texts = np.array([a['answer_text'] for submission in answers for a in submission], dtype=object)
+    start = time.perf_counter()
+    _, _, scores, _ = AnswerKey(question_rows).score_batch(submission_idx, question_idx, texts, submissions)
+    print(f"{'AnswerKey.score_batch, all at once':<34}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+    assert legacy == compiled == scores.tolist(), "scoring paths disagree"
+    check_letter_options()
+
+
+if __name__ == "__main__":
+    main()
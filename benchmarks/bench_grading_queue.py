@@ -0,0 +1,105 @@
+"""
+Moving from one ungraded submission to the next. The baseline is the old
+round trip: finalize the grade, reload the student list to find the next
+ungraded row, then load that submission and its assessment from scratch.
+The grading queue (database/grading_queue.py) instead writes in the
+background and serves the next submission from its prefetch. Both spend
+``think`` ms "grading" each submission; only the switch between them is timed.
+
+Run from the project root:
+    python -m benchmarks.bench_grading_queue [submissions] [questions] [think_ms]
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_auto_grade import seed_short_answers
+from database.async_manager import AsyncDatabaseManager
+from database.database_manager import DatabaseManager
+from database.grading_queue import GradingQueue
+
+
+def grade(details):
+    """The grader's scores: one point for every answer"""
+    answers = details['answers']
+    for answer in answers:
+        answer['points_earned'] = 1
+    return len(answers), sum(answer['points'] for answer in answers), answers
+
+
+def reset_queue(db: DatabaseManager, assessment_id: int) -> None:
+    with db.transaction() as conn:
+        conn.execute('UPDATE submissions SET is_graded = 0 WHERE assessment_id = ?', (assessment_id,))
+    db.note_submissions_changed([row[0] for row in db.get_snapshot_submissions(assessment_id)])
+
+
+def round_trips(db: DatabaseManager, assessment_id: int, think: float):
+    """Baseline: synchronous save, student list reload, full page load"""
+    transitions = []
+    submission_id = None
+    while True:
+        start = time.perf_counter()
+        if submission_id is not None:
+            db.update_submission_grade(submission_id, *grade(details))
+        ungraded = [row for row in db.get_assessment_submissions(assessment_id) if not row['is_graded']]
+        if not ungraded:
+            break
+        submission_id = min(ungraded, key=lambda row: (row['submitted_at'], row['submission_id']))['submission_id']
+        db.get_assessment_by_id(assessment_id)
+        details = db.get_submission_details(submission_id)
+        transitions.append((time.perf_counter() - start) * 1000)
+        time.sleep(think)
+    # The first entry is opening the page, not a switch
+    return transitions[1:]
+
+
+async def queued(db: DatabaseManager, assessment_id: int, think: float):
+    queue = GradingQueue(db, assessment_id)
+    details = await queue.start()
+    transitions = []
+    while details:
+        await asyncio.sleep(think)
+        start = time.perf_counter()
+        details = await queue.save_and_next(*grade(details))
+        transitions.append((time.perf_counter() - start) * 1000)
+    await queue.drain()
+    return transitions, queue
+
+
+def report(label: str, transitions) -> None:
+    transitions = sorted(transitions)
+    p95 = transitions[int(len(transitions) * 0.95) - 1] if transitions else 0.0
+    print(f"{label:<28}{statistics.median(transitions):>9.1f} ms median{p95:>9.1f} ms p95")
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    think = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id = seed_short_answers(db, submissions, questions)
+        print(f"{submissions} ungraded submissions x {questions} questions, {think * 1000:.0f} ms per grade")
+
+        # update_submission_grade prints a debug line per save
+        with contextlib.redirect_stdout(io.StringIO()):
+            reset_queue(db, assessment_id)
+            baseline = round_trips(db, assessment_id, think)
+            reset_queue(db, assessment_id)
+            transitions, queue = asyncio.run(queued(db, assessment_id, think))
+        report("save, reload list, load", baseline)
+        report("grading queue, save & next", transitions)
+        print(f"{queue.saved} saved, {db.count_ungraded_submissions(assessment_id)} left ungraded")
+        AsyncDatabaseManager.shared(db).shutdown()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
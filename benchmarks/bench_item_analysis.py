@@ -0,0 +1,156 @@
+"""
+Item analysis of a large assessment: the NumPy answers matrix over the
+analytics snapshot against the same statistics accumulated answer by answer in
+Python, and a cached repeat. Some students skip questions or leave them blank,
+and the distractor table is checked against a Python recount that counts a
+skipped question as "No answer".
+
+Run from the project root:
+    python -m benchmarks.bench_item_analysis [submissions] [questions]
+"""
+
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+from database.item_analysis import BLANK, ItemAnalysis
+
+
+def seed_assessment(db: DatabaseManager, submissions: int, questions: int) -> int:
+    """One MCQ assessment; stronger students (higher ids) pick the key more often.
+
+    About one answer in 23 is missing (the question was skipped) and one in 29 is blank.
+    """
+    admin = db.authenticate_user("admin", "admin123")
+    assessment_id = db.create_assessment("Item bench", "Benchmark", admin['id'], None, None, 60, 'published')
+    options = json.dumps(["Mitochondria", "Nucleus", "Ribosome", "Golgi body"])
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO questions (assessment_id, question_text, question_type, points, correct_answer, options, order_index)
+            VALUES (?, ?, 'mcq', 1, 'A', ?, ?)
+        ''', ((assessment_id, f"Question {q}", options, q) for q in range(questions)))
+        conn.executemany('''
+            INSERT INTO users (username, password_hash, role, full_name, email, student_number, section,
+                               security_question, security_answer_hash)
+            VALUES (?, 'x', 'student', ?, ?, ?, '1A', 'What is your pet''s name?', 'x')
+        ''', ((f"bench_{n}", f"Student {n:06d}", f"bench_{n}@bench.test", f"B{n:06d}") for n in range(submissions)))
+        conn.execute('''
+            INSERT INTO submissions (assessment_id, student_id, submitted_at, score, total_score, max_score, is_graded)
+            SELECT ?, id, CURRENT_TIMESTAMP, 0, 0, ?, 1 FROM users WHERE username LIKE 'bench_%'
+        ''', (assessment_id, questions))
+        conn.execute('''
+            INSERT INTO answers (submission_id, question_id, answer_text, is_correct, points_earned)
+            SELECT s.id, q.id, CASE WHEN (s.id * 5 + q.id * 3) % 29 = 0 THEN ''
+                                    WHEN (s.id * 7 + q.id * 13) % 100 < s.student_id % 100 THEN 'A'
+                                    ELSE char(66 + (s.id + q.id) % 3) END, 0, 0
+            FROM submissions s JOIN questions q ON q.assessment_id = s.assessment_id
+            WHERE s.assessment_id = ? AND (s.id * 7 + q.id * 11) % 23 != 0
+        ''', (assessment_id,))
+        conn.execute("UPDATE answers SET is_correct = answer_text = 'A', points_earned = answer_text = 'A'")
+        conn.execute('''
+            UPDATE submissions SET score = (SELECT SUM(points_earned) FROM answers WHERE submission_id = submissions.id),
+                                   total_score = (SELECT SUM(points_earned) FROM answers WHERE submission_id = submissions.id)
+        ''')
+    return assessment_id
+
+
+def python_item_stats(rows) -> dict:
+    """Baseline: difficulty and point-biserial accumulated over answer rows in Python"""
+    totals = {}
+    for submission_id, _, earned, _ in rows:
+        totals[submission_id] = totals.get(submission_id, 0) + earned
+    n = len(totals)
+    mean_total = sum(totals.values()) / n
+    sd_total = math.sqrt(sum((t - mean_total) ** 2 for t in totals.values()) / n)
+    by_question = {}
+    for submission_id, question_id, earned, _ in rows:
+        correct, total_when_correct = by_question.get(question_id, (0, 0.0))
+        if earned:
+            by_question[question_id] = (correct + 1, total_when_correct + totals[submission_id])
+        else:
+            by_question[question_id] = (correct, total_when_correct)
+    stats = {}
+    for question_id, (correct, total_when_correct) in by_question.items():
+        p = correct / n
+        if 0 < p < 1 and sd_total:
+            mean_correct = total_when_correct / correct
+            r = (mean_correct - mean_total) / sd_total * math.sqrt(p / (1 - p))
+        else:
+            r = float('nan')
+        stats[question_id] = (p, r)
+    return stats
+
+
+def python_distractors(rows, submission_ids, question_ids) -> dict:
+    """Baseline distractor table: (question_id, choice) -> (count, mean total).
+
+    Every submission counts once per question; one with no answer row for it is "No answer".
+    """
+    totals = dict.fromkeys(submission_ids, 0.0)
+    picked = {}
+    for submission_id, question_id, earned, choice in rows:
+        totals[submission_id] += earned
+        picked[(submission_id, question_id)] = choice
+    sums = {}
+    for question_id in question_ids:
+        for submission_id, total in totals.items():
+            key = (question_id, picked.get((submission_id, question_id)) or BLANK)
+            count, score_sum = sums.get(key, (0, 0.0))
+            sums[key] = (count + 1, score_sum + total)
+    return {key: (count, score_sum / count) for key, (count, score_sum) in sums.items()}
+
+
+def check_distractors(analysis: ItemAnalysis, expected: dict) -> None:
+    """Exit with the first row that disagrees with the Python recount"""
+    table = analysis.distractors
+    actual = {(question_id, choice): (count, mean) for question_id, choice, count, mean
+              in zip(table['question_id'], table['choice'], table['count'], table['mean_score']) if count}
+    if set(actual) != set(expected):
+        raise SystemExit(f"Distractor rows differ: {sorted(set(actual) ^ set(expected))[:5]}")
+    for key, (count, mean) in expected.items():
+        if actual[key][0] != count or abs(actual[key][1] - mean) > 0.006:
+            raise SystemExit(f"Distractor row {key}: {actual[key]}, expected ({count}, {mean:.2f})")
+    print(f"distractor table matches the Python recount ({len(expected)} rows, skipped answers included)")
+
+
+def time_ms(fn, repeat: int = 3) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id = seed_assessment(db, submissions, questions)
+        print(f"{submissions} submissions x {questions} questions")
+
+        rows = db.get_item_analysis_answers(assessment_id)
+        question_rows = db.get_questions(assessment_id)
+
+        def uncached():
+            db.cache.clear()
+            return db.get_item_analysis(assessment_id)
+
+        print(f"{'query answer rows':<34}{time_ms(lambda: db.get_item_analysis_answers(assessment_id)):>10.1f} ms")
+        print(f"{'Python loop over fetched rows':<34}{time_ms(lambda: python_item_stats(rows)):>10.1f} ms")
+        print(f"{'analytics snapshot build':<34}{time_ms(lambda: db.get_analytics_snapshot(assessment_id), 1):>10.1f} ms")
+        snapshot = db.get_analytics_snapshot(assessment_id)
+        print(f"{'NumPy analysis of the snapshot':<34}{time_ms(lambda: ItemAnalysis.build(assessment_id, question_rows, snapshot)):>10.1f} ms")
+        print(f"{'get_item_analysis, uncached':<34}{time_ms(uncached):>10.1f} ms")
+        print(f"{'get_item_analysis, cached':<34}{time_ms(lambda: db.get_item_analysis(assessment_id)):>10.3f} ms")
+        check_distractors(db.get_item_analysis(assessment_id), python_distractors(
+            rows, [row[0] for row in db.get_snapshot_submissions(assessment_id)], [q['id'] for q in question_rows]))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
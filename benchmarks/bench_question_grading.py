@@ -0,0 +1,65 @@
+"""
+Grading one short-answer question for every student: opening each submission
+the way StudentSubmissionGradingPage does (get_assessment_by_id,
+get_submission_details, one update per answer and a finalize) against the
+question-major view (one get_question_answers query, then one
+save_question_grades transaction per page of answers).
+
+Run from the project root:
+    python -m benchmarks.bench_question_grading [submissions] [questions]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_auto_grade import seed_short_answers
+from database.database_manager import DatabaseManager
+
+# QuestionGradingPage.SAVE_BATCH (not imported: the page needs flet)
+SAVE_BATCH = 25
+
+
+def grade_each_submission(db: DatabaseManager, assessment_id: int, question_id: int) -> int:
+    """Baseline: open every submission, grade the one question, finalize"""
+    submission_ids = [row[0] for row in db.get_snapshot_submissions(assessment_id)]
+    for submission_id in submission_ids:
+        db.get_assessment_by_id(assessment_id)
+        details = db.get_submission_details(submission_id)
+        for answer in details['answers']:
+            if answer['question_id'] == question_id:
+                db.update_answer_grade(answer['answer_id'], 1.0, "checked")
+        db.finalize_submission_grade(submission_id)
+    return len(submission_ids)
+
+
+def grade_by_question(db: DatabaseManager, question_id: int) -> int:
+    answers = db.get_question_answers(question_id)
+    for start in range(0, len(answers), SAVE_BATCH):
+        db.save_question_grades([(2.0, "checked", answer['answer_id'])
+                                 for answer in answers[start:start + SAVE_BATCH]])
+    return len(answers)
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id = seed_short_answers(db, submissions, questions)
+        question_ids = [q['id'] for q in db.get_questions(assessment_id)]
+        print(f"{submissions} submissions x {questions} short-answer questions, grading one question")
+
+        start = time.perf_counter()
+        grade_each_submission(db, assessment_id, question_ids[2])
+        print(f"{'submission by submission':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        start = time.perf_counter()
+        grade_by_question(db, question_ids[3])
+        print(f"{'by question, batched saves':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
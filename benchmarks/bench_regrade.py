@@ -0,0 +1,70 @@
+"""
+Regrading an assessment after an answer-key fix: one bulk regrade against
+opening every submission and finalizing it the way StudentSubmissionGradingPage
+does (get_submission_details, grade in Python, update_submission_grade).
+
+Run from the project root:
+    python -m benchmarks.bench_regrade [submissions] [questions]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_item_analysis import seed_assessment
+from database.database_manager import DatabaseManager
+from database.grading import AnswerKey
+from database.regrade import regrade_assessment
+
+
+def set_key(db: DatabaseManager, question_id: int, correct_answer: str) -> None:
+    with db.transaction() as conn:
+        conn.execute("UPDATE questions SET correct_answer = ? WHERE id = ?", (correct_answer, question_id))
+
+
+def finalize_each(db: DatabaseManager, assessment_id: int) -> int:
+    """Baseline: one details read and one update_submission_grade per submission"""
+    submission_ids = [row[0] for row in db.get_snapshot_submissions(assessment_id)]
+    for submission_id in submission_ids:
+        details = db.get_submission_details(submission_id)
+        answer_key = AnswerKey.from_answers(details['answers'])
+        earned = possible = 0
+        updated = []
+        for answer in details['answers']:
+            _, points = answer_key.grade(answer['question_id'], answer['student_answer'])
+            earned += points
+            possible += answer['points']
+            updated.append({'answer_id': answer['answer_id'], 'points_earned': points, 'feedback': ''})
+        db.update_submission_grade(submission_id, earned, possible, updated)
+    return len(submission_ids)
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id = seed_assessment(db, submissions, questions)
+        first_question = db.get_questions(assessment_id)[0]['id']
+        print(f"{submissions} submissions x {questions} questions, key of Q1 corrected")
+
+        set_key(db, first_question, 'B')
+        start = time.perf_counter()
+        finalize_each(db, assessment_id)
+        print(f"{'finalize each submission':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+        set_key(db, first_question, 'C')
+        start = time.perf_counter()
+        report = regrade_assessment(db, assessment_id, dry_run=True)
+        print(f"{'bulk regrade, dry run':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        start = time.perf_counter()
+        report = regrade_assessment(db, assessment_id)
+        print(f"{'bulk regrade, applied':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        print(f"{report.answers_changed} answers and {report.submissions_updated} scores rewritten")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Time and peak memory of listing 100k submissions: the old fetchall()-then-dict
+getter versus record row factories, both as a list and streamed with fetchmany.
+
+Run from the project root:
+    python -m benchmarks.bench_row_records [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from database.database_manager import DatabaseManager
+
+
+def legacy_get_assessment_submissions(db: DatabaseManager, assessment_id: int):
+    """The previous implementation, kept here only as the benchmark baseline"""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT s.id, s.student_id, u.student_number, u.full_name, s.submitted_at,
+               s.is_graded, s.total_score, s.max_score
+        FROM submissions s
+        JOIN users u ON s.student_id = u.id
+        WHERE s.assessment_id = ?
+        ORDER BY u.full_name
+    ''', (assessment_id,))
+    results = cursor.fetchall()
+    conn.close()
+    submissions = []
+    for result in results:
+        submissions.append({
+            'submission_id': result[0],
+            'student_id': result[1],
+            'student_number': result[2],
+            'student_name': result[3],
+            'submitted_at': result[4],
+            'is_graded': bool(result[5]),
+            'total_score': result[6] or 0,
+            'max_score': result[7] or 0
+        })
+    return submissions
+
+
+def seed_submissions(db: DatabaseManager, rows: int) -> int:
+    """One assessment with ``rows`` students who all submitted it"""
+    admin = db.authenticate_user("admin", "admin123")
+    assessment_id = db.create_assessment("Big exam", "Benchmark", admin['id'], None, None, 60, 'published')
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO users (username, password_hash, role, full_name, email, student_number, section,
+                               security_question, security_answer_hash)
+            VALUES (?, 'x', 'student', ?, ?, ?, '1A', 'What is your pet''s name?', 'x')
+        ''', ((f"bench_{n}", f"Student {n:06d}", f"bench_{n}@bench.test", f"B{n:06d}") for n in range(rows)))
+        conn.execute('''
+            INSERT INTO submissions (assessment_id, student_id, submitted_at, score, total_score, max_score, is_graded)
+            SELECT ?, id, CURRENT_TIMESTAMP, id % 20, id % 20, 20, 1 FROM users WHERE username LIKE 'bench_%'
+        ''', (assessment_id,))
+    return assessment_id
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34}{elapsed:>10.0f}{peak / 1024 / 1024:>12.1f}")
+    return result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id = seed_submissions(db, rows)
+        print(f"{rows} submissions")
+        print(f"{'':<34}{'time (ms)':>10}{'peak (MiB)':>12}")
+
+        # Warm the page cache so every variant reads from memory
+        legacy_get_assessment_submissions(db, assessment_id)
+
+        legacy = measure("fetchall + dicts (before)", lambda: legacy_get_assessment_submissions(db, assessment_id))
+        records = measure("record row factory (list)", lambda: db.get_assessment_submissions(assessment_id))
+        total = measure("record row factory (streamed)",
+                        lambda: sum(row['total_score'] for row in db.iter_assessment_submissions(assessment_id)))
+
+        assert len(legacy) == len(records) == rows
+        assert legacy[0] == dict(records[0])
+        assert total == sum(row['total_score'] for row in legacy)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
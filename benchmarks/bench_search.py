@@ -0,0 +1,92 @@
+"""
+Latency of DatabaseManager.search over a large corpus, against the LIKE scan it
+replaces, for a rare word, a common word and a search-as-you-type prefix.
+
+Run from the project root:
+    python -m benchmarks.bench_search [documents]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+
+WORDS = ("algebra geometry calculus biology chemistry physics history literature grammar essay "
+         "quiz exam review homework project deadline lab report reading chapter lecture notes "
+         "worksheet practice group presentation rubric syllabus schedule midterm final").split()
+
+
+def seed_documents(db: DatabaseManager, documents: int) -> None:
+    """Split ``documents`` across announcements, posts and comments; the triggers index them"""
+    admin = db.authenticate_user("admin", "admin123")
+    rng = random.Random(7)
+
+    def text(n):
+        return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+    third = documents // 3
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO announcements (title, description, created_by, target_sections) VALUES (?, ?, ?, NULL)
+        ''', ((text(4), text(40), admin['id']) for _ in range(third)))
+        conn.executemany('''
+            INSERT INTO posts (title, description, post_type, created_by, file_path) VALUES (?, ?, ?, ?, '')
+        ''', ((text(4), text(40), rng.choice(('assessment', 'file')), admin['id']) for _ in range(third)))
+        # Targeting as the app writes it: one of four sections each, a few announcements for everyone
+        conn.execute('''
+            INSERT INTO announcement_sections (announcement_id, section)
+            SELECT id, CASE WHEN id % 10 = 0 THEN '*' ELSE (id % 4 + 1) || 'A' END FROM announcements
+        ''')
+        conn.execute("INSERT INTO post_sections (post_id, section) SELECT id, (id % 4 + 1) || 'A' FROM posts")
+        conn.executemany('''
+            INSERT INTO comments (post_id, user_id, content) VALUES (?, ?, ?)
+        ''', ((rng.randint(1, third), admin['id'], text(20)) for _ in range(documents - 2 * third)))
+        # One needle for the rare-word query
+        conn.execute("UPDATE announcements SET description = description || ' zeitgeist' WHERE id = 42")
+
+
+def like_search(db: DatabaseManager, term: str, limit: int = 20):
+    """The pre-index way to search: a LIKE scan of every text column"""
+    pattern = f"%{term}%"
+    with db.connection() as conn:
+        rows = []
+        for sql in ("SELECT id, title FROM announcements WHERE title LIKE ? OR description LIKE ?",
+                    "SELECT id, title FROM posts WHERE title LIKE ? OR description LIKE ?",
+                    "SELECT id, content FROM comments WHERE content LIKE ? OR content LIKE ?"):
+            rows += conn.execute(sql + " LIMIT ?", (pattern, pattern, limit)).fetchall()
+        return rows
+
+
+def time_ms(fn, repeat: int = 20) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        # Cache off: every call has to reach SQLite
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'), cache_enabled=False)
+        db.initialize_database()
+        start = time.perf_counter()
+        seed_documents(db, documents)
+        print(f"Indexed {documents} documents in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':<24}{'search() ms':>14}{'section ms':>14}{'LIKE ms':>12}")
+        for label, query in (('rare word', 'zeitgeist'), ('common word', 'algebra'),
+                             ('prefix', 'chem'), ('two words', 'lab report')):
+            fts = time_ms(lambda: db.search(query))
+            section = time_ms(lambda: db.search(query, section='1A'))
+            like = time_ms(lambda: like_search(db, query.split()[0]), repeat=3)
+            print(f"{label:<24}{fts:>14.2f}{section:>14.2f}{like:>12.2f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
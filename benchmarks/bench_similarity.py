@@ -0,0 +1,142 @@
+"""
+Finding copied short answers in a 300-student section with 20 short-answer
+questions: exact shingle similarity for every pair of answers to a question
+against the MinHash/LSH report (database/similarity.py), which only verifies
+the pairs that share an LSH band. Most students write their own answer, and
+about 3% hand in a lightly edited copy of someone else's. Signatures are computed
+when the answers are submitted, so that cost is reported on its own.
+
+Run from the project root:
+    python -m benchmarks.bench_similarity [students] [questions]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+from database.similarity import THRESHOLD, find_similar_answers, jaccard, shingles, signature
+
+SYLLABLES = "ba be bi bo da de di do ka ke ki ko la le li lo ma me mi mo na ne ni no ra re ri ro sa se si so".split()
+
+
+def vocabulary(rng: random.Random, size: int):
+    """Made-up words of one to four syllables"""
+    return [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(size)]
+
+
+def write_answer(rng: random.Random, topic, words) -> str:
+    """A student's own answer: some of the question's topic words among everyday ones"""
+    return ' '.join(rng.choice(topic) if rng.random() < 0.3 else rng.choice(words)
+                    for _ in range(rng.randint(12, 30)))
+
+
+def edit(rng: random.Random, text: str, words) -> str:
+    """A copy with a couple of words changed, dropped or added"""
+    copy = text.split()
+    for _ in range(rng.randint(0, 3)):
+        position = rng.randrange(len(copy))
+        action = rng.random()
+        if action < 0.4:
+            copy[position] = rng.choice(words)
+        elif action < 0.7 and len(copy) > 5:
+            del copy[position]
+        else:
+            copy.insert(position, rng.choice(words))
+    return ' '.join(copy)
+
+
+def seed_section(db: DatabaseManager, students: int, questions: int, copy_rate: float = 0.03):
+    """Create the assessment and submit every student's answers through submit_assessment"""
+    rng = random.Random(11)
+    words = vocabulary(rng, 1500)
+    admin = db.authenticate_user("admin", "admin123")
+    assessment_id = db.create_assessment("Similarity bench", "Benchmark", admin['id'], None, None, 60, 'published')
+    question_ids = [db.add_question(assessment_id, f"Explain {q}", 'short_answer', 5, None, None, q)
+                    for q in range(questions)]
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO users (username, password_hash, role, full_name, email, student_number, section,
+                               security_question, security_answer_hash)
+            VALUES (?, 'x', 'student', ?, ?, ?, '1A', 'What is your pet''s name?', 'x')
+        ''', ((f"sim_{n}", f"Student {n:04d}", f"sim_{n}@bench.test", f"SM{n:04d}") for n in range(students)))
+        student_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE username LIKE 'sim_%' ORDER BY id")]
+    # Per question, a few students copy (and lightly edit) someone else's answer
+    answers = {student_id: [] for student_id in student_ids}
+    for question_id in question_ids:
+        topic = rng.sample(words, 15)
+        originals = []
+        for student_id in student_ids:
+            if originals and rng.random() < copy_rate:
+                text = edit(rng, rng.choice(originals), words)
+            else:
+                text = write_answer(rng, topic, words)
+                originals.append(text)
+            answers[student_id].append({'question_id': question_id, 'answer_text': text})
+    start = time.perf_counter()
+    for student_id in student_ids:
+        db.submit_assessment(assessment_id, student_id, answers[student_id])
+    submit_ms = (time.perf_counter() - start) * 1000
+    return assessment_id, question_ids, submit_ms
+
+
+def all_pairs(db: DatabaseManager, assessment_id: int, threshold: float):
+    """Baseline: exact similarity of every pair of answers to each question"""
+    by_question = {}
+    for answer_id, question_id, _, _, _, answer_text, _ in db.get_answer_signatures(assessment_id):
+        by_question.setdefault(question_id, []).append((answer_id, shingles(answer_text)))
+    similar = set()
+    for answers in by_question.values():
+        for i in range(len(answers)):
+            for j in range(i + 1, len(answers)):
+                if jaccard(answers[i][1], answers[j][1]) >= threshold:
+                    similar.add((answers[i][0], answers[j][0]))
+    return similar
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        assessment_id, question_ids, submit_ms = seed_section(db, students, questions)
+        texts = [row[5] for row in db.get_answer_signatures(assessment_id)]
+        print(f"{students} students x {questions} short-answer questions ({len(texts)} answers)")
+
+        start = time.perf_counter()
+        for text in texts[:1000]:
+            signature(text)
+        per_answer = (time.perf_counter() - start) * 1000 / min(len(texts), 1000)
+        print(f"{'signature per answer':<32}{per_answer:>10.3f} ms  (submits took {submit_ms / students:.1f} ms each)")
+
+        start = time.perf_counter()
+        baseline = all_pairs(db, assessment_id, THRESHOLD)
+        print(f"{'every pair, exact':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        start = time.perf_counter()
+        report = find_similar_answers(db, assessment_id, include_key_matches=True)
+        print(f"{'MinHash/LSH report':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+        # Answers from before migration 10 have no signature; the report backfills them
+        with db.transaction() as conn:
+            conn.execute('UPDATE answers SET minhash = NULL')
+        generations = db.cache.snapshot(('answers',))
+        start = time.perf_counter()
+        find_similar_answers(db, assessment_id, include_key_matches=True)
+        print(f"{'report, signatures missing':<32}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+        if db.cache.snapshot(('answers',)) != generations:
+            raise SystemExit("saving backfilled signatures invalidated cached queries")
+
+        clustered = {answer.answer_id: (cluster.question_id, n) for n, cluster in enumerate(report.clusters)
+                     for answer in cluster.answers}
+        found = sum(1 for a, b in baseline if a in clustered and clustered[a] == clustered.get(b))
+        print(f"{len(baseline)} pairs at {THRESHOLD:.0%} or more, {found} of them in the same LSH cluster; "
+              f"{report.candidate_pairs} candidate pairs checked instead of "
+              f"{questions * students * (students - 1) // 2}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Per-submit latency (median) of DatabaseManager.submit_assessment for 10/100/500-question
+exams, comparing the old one-SELECT-and-INSERT-per-question loop with the batched version.
+
+Run from the project root:
+    python -m benchmarks.bench_submit_assessment [submits_per_size]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+
+
+def legacy_submit_assessment(db: DatabaseManager, assessment_id: int, student_id: int, answers):
+    """The previous implementation, kept here only as the benchmark baseline"""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT OR REPLACE INTO submissions (assessment_id, student_id, submitted_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+    ''', (assessment_id, student_id))
+    submission_id = cursor.lastrowid
+    total_score = 0
+    max_score = 0
+    for answer in answers:
+        cursor.execute('SELECT question_type, correct_answer, points FROM questions WHERE id = ?',
+                       (answer['question_id'],))
+        question_data = cursor.fetchone()
+        if question_data:
+            question_type, correct_answer, points = question_data
+            max_score += points
+            is_correct = question_type == 'mcq' and answer['answer_text'] == correct_answer
+            points_earned = points if is_correct else 0
+            total_score += points_earned
+            cursor.execute('''
+                INSERT INTO answers (submission_id, question_id, answer_text, is_correct, points_earned)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (submission_id, answer['question_id'], answer['answer_text'], is_correct, points_earned))
+    cursor.execute('UPDATE submissions SET total_score = ?, max_score = ?, is_graded = 1 WHERE id = ?',
+                   (total_score, max_score, submission_id))
+    conn.commit()
+    conn.close()
+    return submission_id
+
+
+def make_exam(db: DatabaseManager, admin_id: int, questions: int):
+    assessment_id = db.create_assessment(f"{questions}-question exam", "Benchmark", admin_id,
+                                         None, None, 60, 'published')
+    answers = []
+    for q in range(questions):
+        question_id = db.add_question(assessment_id, f"Q{q}", 'mcq' if q % 4 else 'short_answer', 1,
+                                      'A', '["a", "b", "c", "d"]', q)
+        answers.append({'question_id': question_id, 'answer_text': 'A' if q % 2 else 'B'})
+    return assessment_id, answers
+
+
+def make_students(db: DatabaseManager, count: int, prefix: str):
+    ids = []
+    for n in range(count):
+        username = f"{prefix}_{n}"
+        db.create_student_account(f"{prefix}-{n}", f"Student {n}", "1A", username, "pw",
+                                  f"{username}@bench.test", "What is your pet's name?", "rex")
+        ids.append(db.get_user_by_username_or_email(username)['id'])
+    return ids
+
+
+def time_submits(db, assessment_id, legacy_students, batched_students, answers):
+    """Median ms per submit of each version.
+
+    The two take turns, so both see the same database size, and take turns going
+    first: the second commit of a pair tends to pay for flushing the first one's
+    pages. The median keeps an occasional WAL checkpoint from deciding the result.
+    """
+    legacy, batched = [], []
+
+    def timed(submit, student_id):
+        start = time.perf_counter()
+        submit(db, assessment_id, student_id, answers)
+        return (time.perf_counter() - start) * 1000
+
+    def submit_batched(d, *args):
+        return d.submit_assessment(*args)
+
+    for pair, (legacy_student, batched_student) in enumerate(zip(legacy_students, batched_students)):
+        if pair % 2:
+            batched.append(timed(submit_batched, batched_student))
+            legacy.append(timed(legacy_submit_assessment, legacy_student))
+        else:
+            legacy.append(timed(legacy_submit_assessment, legacy_student))
+            batched.append(timed(submit_batched, batched_student))
+    return statistics.median(legacy), statistics.median(batched)
+
+
+def main():
+    submits = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    print(f"{'questions':>10}{'legacy (ms)':>14}{'batched (ms)':>14}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        admin_id = db.authenticate_user("admin", "admin123")['id']
+        for size in (10, 100, 500):
+            assessment_id, answers = make_exam(db, admin_id, size)
+            legacy_students = make_students(db, submits, f"legacy{size}")
+            batched_students = make_students(db, submits, f"batched{size}")
+            legacy, batched = time_submits(db, assessment_id, legacy_students, batched_students, answers)
+            print(f"{size:>10}{legacy:>14.2f}{batched:>14.2f}{legacy / batched:>9.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+End-of-exam burst: N students hit Submit at the same moment.
+
+Compares every thread calling DatabaseManager.submit_assessment directly with
+routing them through the group-commit SubmissionWriter, and reports throughput,
+p50/p99 acknowledgement latency and errors (e.g. ``database is locked``).
+
+Run from the project root:
+    python -m benchmarks.load_test_submissions [submitters] [questions]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_submit_assessment import make_exam, make_students
+from database.database_manager import DatabaseManager
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_burst(submit, student_ids, assessment_id, answers):
+    """Release every submitter at once and time each acknowledgement"""
+    barrier = threading.Barrier(len(student_ids) + 1)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def submitter(student_id):
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            submit(assessment_id, student_id, answers)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=submitter, args=(sid,)) for sid in student_ids]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def report(label, latencies, errors, elapsed):
+    throughput = len(latencies) / elapsed if elapsed else 0
+    print(f"{label:<14}{throughput:>12.0f}/s{percentile(latencies, 50):>12.1f}{percentile(latencies, 99):>12.1f}"
+          f"{max(latencies) if latencies else 0:>12.1f}{len(errors):>8}")
+
+
+def main():
+    submitters = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'load.db'))
+        db.initialize_database()
+        admin_id = db.authenticate_user("admin", "admin123")['id']
+
+        print(f"{submitters} simultaneous submitters, {questions} questions each")
+        print(f"{'mode':<14}{'throughput':>14}{'p50 (ms)':>12}{'p99 (ms)':>12}{'max (ms)':>12}{'errors':>8}")
+
+        assessment_id, answers = make_exam(db, admin_id, questions)
+        students = make_students(db, submitters, "direct")
+        report("direct", *run_burst(db.submit_assessment, students, assessment_id, answers))
+
+        assessment_id, answers = make_exam(db, admin_id, questions)
+        students = make_students(db, submitters, "group")
+        writer = db.submission_writer
+        report("group-commit", *run_burst(writer.submit_and_wait, students, assessment_id, answers))
+        stats = writer.get_stats()
+        print(f"group-commit batches: {stats['batches']}, largest batch: {stats['largest_batch']}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
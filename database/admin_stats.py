@@ -0,0 +1,392 @@
+"""
+Trigger-maintained admin dashboard KPIs.
+
+``stats_assignment_pairs`` holds one row per (admin, assessment, student) that an
+admin's assessment posts reach through ``post_sections``. ``refs`` counts the
+(post, section) paths behind the pair and ``submitted``/``submitted_at`` mirror
+the student's submission. Triggers on users, posts, post_sections, submissions
+and assessments keep the pairs current, and triggers on the pairs keep the
+per-admin counters in ``admin_stats`` current, so the dashboard read is a
+primary-key lookup plus an index range count for the last-24-hours window.
+
+Usage:
+    python -m database.admin_stats check [--db PATH]
+    python -m database.admin_stats rebuild [--db PATH]
+"""
+
+import argparse
+from typing import Dict
+
+COUNTER_FIELDS = ('total_students', 'active_assessments', 'total_targets', 'submitted_pairs')
+
+_ACTIVE_ASSESSMENT = "({t}.status IN ('published', 'active') AND {t}.is_active = 1)"
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS stats_assignment_pairs (
+        admin_id INTEGER NOT NULL,
+        assessment_id INTEGER NOT NULL,
+        student_id INTEGER NOT NULL,
+        refs INTEGER NOT NULL DEFAULT 0,
+        submitted INTEGER NOT NULL DEFAULT 0,
+        submitted_at TIMESTAMP,
+        PRIMARY KEY (admin_id, assessment_id, student_id)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_stats_pairs_student ON stats_assignment_pairs (student_id, assessment_id)',
+    'CREATE INDEX IF NOT EXISTS idx_stats_pairs_recent ON stats_assignment_pairs (admin_id, submitted_at)',
+    '''
+    CREATE TABLE IF NOT EXISTS stats_admin_students (
+        admin_id INTEGER NOT NULL,
+        student_id INTEGER NOT NULL,
+        pairs INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (admin_id, student_id)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS admin_stats (
+        admin_id INTEGER PRIMARY KEY,
+        total_students INTEGER NOT NULL DEFAULT 0,
+        active_assessments INTEGER NOT NULL DEFAULT 0,
+        total_targets INTEGER NOT NULL DEFAULT 0,
+        submitted_pairs INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+
+    # ---- Counters derived from the pair table ----
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_pairs_insert AFTER INSERT ON stats_assignment_pairs
+    BEGIN
+        INSERT OR IGNORE INTO admin_stats (admin_id) VALUES (NEW.admin_id);
+        UPDATE admin_stats
+        SET total_targets = total_targets + (NEW.refs > 0),
+            submitted_pairs = submitted_pairs + (NEW.refs > 0 AND NEW.submitted)
+        WHERE admin_id = NEW.admin_id;
+        INSERT INTO stats_admin_students (admin_id, student_id, pairs)
+        SELECT NEW.admin_id, NEW.student_id, 1 WHERE NEW.refs > 0
+        ON CONFLICT (admin_id, student_id) DO UPDATE SET pairs = pairs + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_pairs_update AFTER UPDATE ON stats_assignment_pairs
+    BEGIN
+        UPDATE admin_stats
+        SET total_targets = total_targets + (NEW.refs > 0) - (OLD.refs > 0),
+            submitted_pairs = submitted_pairs + (NEW.refs > 0 AND NEW.submitted) - (OLD.refs > 0 AND OLD.submitted)
+        WHERE admin_id = NEW.admin_id;
+        INSERT INTO stats_admin_students (admin_id, student_id, pairs)
+        SELECT NEW.admin_id, NEW.student_id, (NEW.refs > 0) - (OLD.refs > 0)
+        WHERE (NEW.refs > 0) != (OLD.refs > 0)
+        ON CONFLICT (admin_id, student_id) DO UPDATE SET pairs = pairs + excluded.pairs;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_students_insert AFTER INSERT ON stats_admin_students
+    BEGIN
+        UPDATE admin_stats SET total_students = total_students + (NEW.pairs > 0)
+        WHERE admin_id = NEW.admin_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_students_update AFTER UPDATE ON stats_admin_students
+    BEGIN
+        UPDATE admin_stats SET total_students = total_students + (NEW.pairs > 0) - (OLD.pairs > 0)
+        WHERE admin_id = NEW.admin_id;
+    END
+    ''',
+
+    # ---- Section assignment ----
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_post_sections_insert AFTER INSERT ON post_sections
+    BEGIN
+        INSERT INTO stats_assignment_pairs (admin_id, assessment_id, student_id, refs, submitted, submitted_at)
+        SELECT p.created_by, p.assessment_id, u.id, 1, s.id IS NOT NULL, s.submitted_at
+        FROM posts p
+        JOIN users u ON u.section = NEW.section AND u.role = 'student'
+        LEFT JOIN submissions s ON s.assessment_id = p.assessment_id AND s.student_id = u.id
+        WHERE p.id = NEW.post_id AND p.post_type = 'assessment' AND p.assessment_id IS NOT NULL
+        ON CONFLICT (admin_id, assessment_id, student_id) DO UPDATE SET refs = refs + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_post_sections_delete AFTER DELETE ON post_sections
+    BEGIN
+        UPDATE stats_assignment_pairs SET refs = refs - 1
+        WHERE (admin_id, assessment_id) IN (
+                SELECT created_by, assessment_id FROM posts
+                WHERE id = OLD.post_id AND post_type = 'assessment' AND assessment_id IS NOT NULL)
+          AND student_id IN (SELECT id FROM users WHERE section = OLD.section AND role = 'student');
+    END
+    ''',
+
+    # ---- Posts ----
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_posts_delete AFTER DELETE ON posts
+    WHEN OLD.post_type = 'assessment' AND OLD.assessment_id IS NOT NULL
+    BEGIN
+        UPDATE stats_assignment_pairs SET refs = refs - 1
+        WHERE admin_id = OLD.created_by AND assessment_id = OLD.assessment_id
+          AND student_id IN (
+                SELECT u.id FROM post_sections ps
+                JOIN users u ON u.section = ps.section AND u.role = 'student'
+                WHERE ps.post_id = OLD.id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_posts_update AFTER UPDATE OF post_type, assessment_id, created_by ON posts
+    BEGIN
+        UPDATE stats_assignment_pairs SET refs = refs - 1
+        WHERE OLD.post_type = 'assessment' AND OLD.assessment_id IS NOT NULL
+          AND admin_id = OLD.created_by AND assessment_id = OLD.assessment_id
+          AND student_id IN (
+                SELECT u.id FROM post_sections ps
+                JOIN users u ON u.section = ps.section AND u.role = 'student'
+                WHERE ps.post_id = OLD.id);
+        INSERT INTO stats_assignment_pairs (admin_id, assessment_id, student_id, refs, submitted, submitted_at)
+        SELECT NEW.created_by, NEW.assessment_id, u.id, 1, s.id IS NOT NULL, s.submitted_at
+        FROM post_sections ps
+        JOIN users u ON u.section = ps.section AND u.role = 'student'
+        LEFT JOIN submissions s ON s.assessment_id = NEW.assessment_id AND s.student_id = u.id
+        WHERE ps.post_id = NEW.id AND NEW.post_type = 'assessment' AND NEW.assessment_id IS NOT NULL
+        ON CONFLICT (admin_id, assessment_id, student_id) DO UPDATE SET refs = refs + 1;
+    END
+    ''',
+
+    # ---- Students joining, moving section or leaving ----
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_users_insert AFTER INSERT ON users
+    WHEN NEW.role = 'student' AND NEW.section IS NOT NULL
+    BEGIN
+        INSERT INTO stats_assignment_pairs (admin_id, assessment_id, student_id, refs, submitted, submitted_at)
+        SELECT p.created_by, p.assessment_id, NEW.id, COUNT(*), 0, NULL
+        FROM post_sections ps
+        JOIN posts p ON p.id = ps.post_id
+        WHERE ps.section = NEW.section AND p.post_type = 'assessment' AND p.assessment_id IS NOT NULL
+        GROUP BY p.created_by, p.assessment_id
+        ON CONFLICT (admin_id, assessment_id, student_id) DO UPDATE SET refs = refs + excluded.refs;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_users_update AFTER UPDATE OF section, role ON users
+    WHEN OLD.section IS NOT NEW.section OR OLD.role IS NOT NEW.role
+    BEGIN
+        UPDATE stats_assignment_pairs
+        SET refs = refs - (
+                SELECT COUNT(*) FROM post_sections ps
+                JOIN posts p ON p.id = ps.post_id
+                WHERE ps.section = OLD.section AND p.post_type = 'assessment'
+                  AND p.assessment_id = stats_assignment_pairs.assessment_id
+                  AND p.created_by = stats_assignment_pairs.admin_id)
+        WHERE student_id = OLD.id AND OLD.role = 'student';
+        INSERT INTO stats_assignment_pairs (admin_id, assessment_id, student_id, refs, submitted, submitted_at)
+        SELECT p.created_by, p.assessment_id, NEW.id, COUNT(*), MAX(s.id IS NOT NULL), MAX(s.submitted_at)
+        FROM post_sections ps
+        JOIN posts p ON p.id = ps.post_id
+        LEFT JOIN submissions s ON s.assessment_id = p.assessment_id AND s.student_id = NEW.id
+        WHERE ps.section = NEW.section AND NEW.role = 'student'
+          AND p.post_type = 'assessment' AND p.assessment_id IS NOT NULL
+        GROUP BY p.created_by, p.assessment_id
+        ON CONFLICT (admin_id, assessment_id, student_id) DO UPDATE SET refs = refs + excluded.refs;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_users_delete AFTER DELETE ON users
+    WHEN OLD.role = 'student'
+    BEGIN
+        UPDATE stats_assignment_pairs
+        SET refs = refs - (
+                SELECT COUNT(*) FROM post_sections ps
+                JOIN posts p ON p.id = ps.post_id
+                WHERE ps.section = OLD.section AND p.post_type = 'assessment'
+                  AND p.assessment_id = stats_assignment_pairs.assessment_id
+                  AND p.created_by = stats_assignment_pairs.admin_id)
+        WHERE student_id = OLD.id;
+    END
+    ''',
+
+    # ---- Submissions (INSERT OR REPLACE only fires the insert trigger) ----
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_submissions_insert AFTER INSERT ON submissions
+    BEGIN
+        UPDATE stats_assignment_pairs SET submitted = 1, submitted_at = NEW.submitted_at
+        WHERE student_id = NEW.student_id AND assessment_id = NEW.assessment_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_submissions_update AFTER UPDATE OF assessment_id, student_id, submitted_at ON submissions
+    BEGIN
+        UPDATE stats_assignment_pairs SET submitted = 0, submitted_at = NULL
+        WHERE student_id = OLD.student_id AND assessment_id = OLD.assessment_id;
+        UPDATE stats_assignment_pairs SET submitted = 1, submitted_at = NEW.submitted_at
+        WHERE student_id = NEW.student_id AND assessment_id = NEW.assessment_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_submissions_delete AFTER DELETE ON submissions
+    BEGIN
+        UPDATE stats_assignment_pairs SET submitted = 0, submitted_at = NULL
+        WHERE student_id = OLD.student_id AND assessment_id = OLD.assessment_id;
+    END
+    ''',
+
+    # ---- Active assessments ----
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_assessments_insert AFTER INSERT ON assessments
+    BEGIN
+        INSERT OR IGNORE INTO admin_stats (admin_id) VALUES (NEW.created_by);
+        UPDATE admin_stats SET active_assessments = active_assessments + {_ACTIVE_ASSESSMENT.format(t='NEW')}
+        WHERE admin_id = NEW.created_by;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_assessments_update AFTER UPDATE OF status, is_active, created_by ON assessments
+    BEGIN
+        UPDATE admin_stats SET active_assessments = active_assessments - {_ACTIVE_ASSESSMENT.format(t='OLD')}
+        WHERE admin_id = OLD.created_by;
+        INSERT OR IGNORE INTO admin_stats (admin_id) VALUES (NEW.created_by);
+        UPDATE admin_stats SET active_assessments = active_assessments + {_ACTIVE_ASSESSMENT.format(t='NEW')}
+        WHERE admin_id = NEW.created_by;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_assessments_delete AFTER DELETE ON assessments
+    BEGIN
+        UPDATE admin_stats SET active_assessments = active_assessments - {_ACTIVE_ASSESSMENT.format(t='OLD')}
+        WHERE admin_id = OLD.created_by;
+    END
+    ''',
+]
+
+# Pairs recomputed from the source tables, in the shape of stats_assignment_pairs
+_FRESH_PAIRS = '''
+    SELECT p.created_by, p.assessment_id, u.id, COUNT(*), MAX(s.id IS NOT NULL), MAX(s.submitted_at)
+    FROM posts p
+    JOIN post_sections ps ON ps.post_id = p.id
+    JOIN users u ON u.section = ps.section AND u.role = 'student'
+    LEFT JOIN submissions s ON s.assessment_id = p.assessment_id AND s.student_id = u.id
+    WHERE p.post_type = 'assessment' AND p.assessment_id IS NOT NULL
+    GROUP BY p.created_by, p.assessment_id, u.id
+'''
+
+
+def create_schema(cursor) -> None:
+    for statement in SCHEMA:
+        cursor.execute(statement)
+
+
+def read_admin_stats(cursor, admin_user_id: int) -> Dict:
+    """The dashboard KPIs for one admin: a primary-key lookup and an index range count"""
+    cursor.execute('''
+        SELECT total_students, active_assessments, total_targets, submitted_pairs
+        FROM admin_stats
+        WHERE admin_id = ?
+    ''', (admin_user_id,))
+    row = cursor.fetchone() or (0, 0, 0, 0)
+    cursor.execute('''
+        SELECT COUNT(*)
+        FROM stats_assignment_pairs
+        WHERE admin_id = ? AND submitted_at >= datetime('now', '-1 day') AND submitted = 1 AND refs > 0
+    ''', (admin_user_id,))
+    new_submissions = cursor.fetchone()[0] or 0
+    return dict(zip(COUNTER_FIELDS, row), new_submissions=new_submissions)
+
+
+def stored_counters(cursor) -> Dict[int, Dict[str, int]]:
+    cursor.execute(f"SELECT admin_id, {', '.join(COUNTER_FIELDS)} FROM admin_stats")
+    return {row[0]: dict(zip(COUNTER_FIELDS, row[1:])) for row in cursor.fetchall()}
+
+
+def fresh_counters(cursor) -> Dict[int, Dict[str, int]]:
+    """Recompute every admin's counters from the source tables without touching the stats tables"""
+    counters: Dict[int, Dict[str, int]] = {}
+    cursor.execute(f'''
+        WITH pairs (admin_id, assessment_id, student_id, refs, submitted, submitted_at) AS ({_FRESH_PAIRS})
+        SELECT admin_id, COUNT(DISTINCT student_id), COUNT(*), SUM(submitted)
+        FROM pairs
+        GROUP BY admin_id
+    ''')
+    for admin_id, students, targets, submitted in cursor.fetchall():
+        counters.setdefault(admin_id, dict.fromkeys(COUNTER_FIELDS, 0)).update(
+            total_students=students, total_targets=targets, submitted_pairs=submitted or 0)
+    cursor.execute(f'''
+        SELECT created_by, SUM({_ACTIVE_ASSESSMENT.format(t='a')})
+        FROM assessments a
+        GROUP BY created_by
+    ''')
+    for admin_id, active in cursor.fetchall():
+        counters.setdefault(admin_id, dict.fromkeys(COUNTER_FIELDS, 0))['active_assessments'] = active or 0
+    return counters
+
+
+def find_drift(cursor) -> Dict[int, Dict[str, tuple]]:
+    """{admin_id: {field: (stored, actual)}} for every counter that disagrees with the source tables"""
+    stored = stored_counters(cursor)
+    fresh = fresh_counters(cursor)
+    zero = dict.fromkeys(COUNTER_FIELDS, 0)
+    drift = {}
+    for admin_id in set(stored) | set(fresh):
+        have = stored.get(admin_id, zero)
+        want = fresh.get(admin_id, zero)
+        fields = {f: (have[f], want[f]) for f in COUNTER_FIELDS if have[f] != want[f]}
+        if fields:
+            drift[admin_id] = fields
+    return drift
+
+
+def rebuild(cursor) -> Dict[int, Dict[str, tuple]]:
+    """Recompute all stats tables from scratch and return the drift that was corrected"""
+    drift = find_drift(cursor)
+    cursor.execute("DELETE FROM stats_assignment_pairs")
+    cursor.execute("DELETE FROM stats_admin_students")
+    cursor.execute("DELETE FROM admin_stats")
+    cursor.execute(f'''
+        INSERT INTO admin_stats (admin_id, active_assessments)
+        SELECT created_by, SUM({_ACTIVE_ASSESSMENT.format(t='a')})
+        FROM assessments a
+        GROUP BY created_by
+    ''')
+    # The pair triggers fill stats_admin_students and the admin_stats counters
+    cursor.execute(f'''
+        INSERT INTO stats_assignment_pairs (admin_id, assessment_id, student_id, refs, submitted, submitted_at)
+        {_FRESH_PAIRS}
+    ''')
+    return drift
+
+
+def rebuild_stats(db) -> Dict[int, Dict[str, tuple]]:
+    with db.transaction() as conn:
+        return rebuild(conn.cursor())
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.admin_stats",
+                                     description="Check or rebuild the materialized admin dashboard stats")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        if args.command == "rebuild":
+            drift = rebuild_stats(db)
+        else:
+            with db.connection() as conn:
+                drift = find_drift(conn.cursor())
+
+        if not drift:
+            print("No drift: stored counters match the source tables.")
+        for admin_id, fields in sorted(drift.items()):
+            details = ", ".join(f"{f} {have} -> {want}" for f, (have, want) in fields.items())
+            print(f"admin {admin_id}: {details}")
+        if args.command == "rebuild":
+            print("Stats rebuilt.")
+        return 1 if drift and args.command == "check" else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
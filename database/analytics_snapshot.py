@@ -0,0 +1,335 @@
+"""
+Columnar, memory-mapped snapshot of an assessment's submissions and answers.
+
+Score pages used to loop over freshly fetched dict rows for averages and
+maxima. With a snapshot, each assessment is exported once into two
+append-only binary column files under ``<db dir>/analytics/<db name>/``:
+
+- ``submissions-<build>.bin``: one SUBMISSION_DTYPE record per submission, by id;
+- ``answers-<build>.bin``: one ANSWER_DTYPE record per answer, i.e.
+  (student_idx, question_idx, points_earned, choice_code). ``student_idx`` is the
+  submission's row and ``question_idx`` its column in ``meta.json``'s question ids.
+
+Readers get zero-copy ``np.memmap`` views sliced to the counts recorded in
+``meta.json``, and averages, percentiles and histograms are NumPy reductions
+over them. ``choice_code`` is the option index of a multiple-choice answer,
+or one of OTHER_CHOICE / BLANK_CHOICE / NOT_MCQ, as AnswerKey (database/grading.py) codes it.
+
+Keeping it current follows GradebookCache. New submissions are appended to
+the files. Regrades of submissions already in the snapshot are patched in
+place from ``DatabaseManager.submission_log``. Anything else rebuilds into a
+new ``<build>``: changed questions, a resubmission, or an unnoted write.
+Old builds are deleted once nothing maps them, since Windows cannot replace a
+mapped file. A snapshot found on disk from an earlier run is checked against
+an aggregate fingerprint of the tables before it is trusted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from database.grading import AnswerKey
+
+SUBMISSION_DTYPE = np.dtype([('submission_id', '<i8'), ('student_id', '<i8'), ('score', '<f8'),
+                             ('max_score', '<f8'), ('is_graded', 'u1')])
+ANSWER_DTYPE = np.dtype([('student_idx', '<i4'), ('question_idx', '<i4'), ('points_earned', '<f4'),
+                         ('choice_code', 'i1')])
+
+FORMAT_VERSION = 1
+TABLES = ('questions', 'submissions', 'answers')
+
+
+def questions_key(questions: Sequence[Dict]) -> str:
+    """Changes whenever a question is added, removed, reordered or re-keyed"""
+    parts = [(q['id'], q['question_type'], q['points'], q['correct_answer'], q['options']) for q in questions]
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class AnalyticsSnapshot:
+    """Read-only view of one assessment's snapshot files"""
+
+    def __init__(self, assessment_id: int, question_ids: np.ndarray, submissions: np.ndarray, answers: np.ndarray):
+        self.assessment_id = assessment_id
+        self.question_ids = question_ids
+        self.submissions = submissions
+        self.answers = answers
+
+    def percentages(self) -> np.ndarray:
+        """Each submission's score as a percentage of its maximum (0 when the maximum is 0)"""
+        score, max_score = self.submissions['score'], self.submissions['max_score']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(max_score > 0, score * 100.0 / max_score, 0.0)
+
+    def summary(self) -> Dict:
+        """Submission count, average/highest/lowest/median/quartile percentages and grading progress"""
+        percent = self.percentages()
+        graded = int(self.submissions['is_graded'].sum())
+        if not len(percent):
+            return {'total_students': 0, 'average_percentage': 0, 'highest_percentage': 0,
+                    'lowest_percentage': 0, 'median_percentage': 0, 'p25_percentage': 0, 'p75_percentage': 0,
+                    'graded': 0, 'pending': 0}
+        p25, median, p75 = np.percentile(percent, [25, 50, 75])
+        return {
+            'total_students': len(percent),
+            'average_percentage': float(percent.mean()),
+            'highest_percentage': float(percent.max()),
+            'lowest_percentage': float(percent.min()),
+            'median_percentage': float(median),
+            'p25_percentage': float(p25),
+            'p75_percentage': float(p75),
+            'graded': graded,
+            'pending': len(percent) - graded,
+        }
+
+    def histogram(self, bins: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Counts of submission percentages in ``bins`` equal bands over 0-100, and the band edges"""
+        return np.histogram(np.clip(self.percentages(), 0, 100), bins=bins, range=(0, 100))
+
+    def question_means(self) -> np.ndarray:
+        """Mean points earned per question over every submission (unanswered earns 0)"""
+        sums = np.bincount(self.answers['question_idx'], weights=self.answers['points_earned'],
+                           minlength=len(self.question_ids))
+        return sums / len(self.submissions) if len(self.submissions) else np.zeros(len(self.question_ids))
+
+    def student_totals(self) -> np.ndarray:
+        """Points earned per submission row, summed from its answers"""
+        return np.bincount(self.answers['student_idx'], weights=self.answers['points_earned'],
+                           minlength=len(self.submissions))
+
+
+class SnapshotStore:
+    """Keeps each assessment's snapshot files current and hands out AnalyticsSnapshot views"""
+
+    def __init__(self, db_manager, root: str = None):
+        self.db_manager = db_manager
+        if root is None:
+            db_path = os.path.abspath(db_manager.db_path)
+            root = os.path.join(os.path.dirname(db_path), 'analytics', os.path.splitext(os.path.basename(db_path))[0])
+        self.root = root
+        self._lock = threading.RLock()
+        # assessment_id -> (snapshot, meta, generations, submission_log position)
+        self._entries: Dict[int, Tuple[AnalyticsSnapshot, Dict, Tuple[int, ...], int]] = {}
+        self._stats = {'builds': 0, 'appends': 0, 'patches': 0, 'loads': 0, 'hits': 0}
+
+    def get(self, assessment_id: int) -> AnalyticsSnapshot:
+        """The assessment's snapshot, brought up to date first"""
+        db = self.db_manager
+        with self._lock:
+            generations = db.cache.snapshot(TABLES)
+            position = db.submission_log.position
+            entry = self._entries.get(assessment_id)
+            if entry is not None and db.cache.enabled:
+                snapshot, meta, built_generations, built_position = entry
+                if built_generations == generations:
+                    self._stats['hits'] += 1
+                    return snapshot
+                notes = db.submission_log.since(built_position)
+                # Only noted submissions writes since then: questions and the all-tables generation are unchanged,
+                # and each submissions bump has its note
+                if (notes is not None and built_generations[:2] == generations[:2]
+                        and len(notes) == generations[2] - built_generations[2]):
+                    meta = self._apply_notes(assessment_id, meta, {i for note in notes for i in note})
+                    if meta is not None:
+                        return self._remember(assessment_id, meta, generations, position)
+            meta = self._load_meta(assessment_id) if entry is None else entry[1]
+            meta = self._validated(assessment_id, meta)
+            if meta is None:
+                meta = self._build(assessment_id)
+            return self._remember(assessment_id, meta, generations, position)
+
+    def rebuild(self, assessment_id: int) -> AnalyticsSnapshot:
+        with self._lock:
+            generations = self.db_manager.cache.snapshot(TABLES)
+            position = self.db_manager.submission_log.position
+            return self._remember(assessment_id, self._build(assessment_id), generations, position)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, assessments=len(self._entries))
+
+    # ------------------------- Files -------------------------
+    def _directory(self, assessment_id: int) -> str:
+        return os.path.join(self.root, f"assessment_{assessment_id}")
+
+    def _path(self, assessment_id: int, meta: Dict, name: str) -> str:
+        return os.path.join(self._directory(assessment_id), f"{name}-{meta['build']}.bin")
+
+    def _load_meta(self, assessment_id: int) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self._directory(assessment_id), 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == FORMAT_VERSION else None
+
+    def _save_meta(self, assessment_id: int, meta: Dict) -> None:
+        path = os.path.join(self._directory(assessment_id), 'meta.json')
+        temp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temp, path)
+
+    def _map(self, assessment_id: int, meta: Dict, name: str, dtype: np.dtype, count: int,
+             mode: str = 'r') -> np.ndarray:
+        if not count:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._path(assessment_id, meta, name), dtype=dtype, mode=mode, shape=(count,))
+
+    def _write_at(self, assessment_id: int, meta: Dict, name: str, records: np.ndarray, offset: int) -> None:
+        # Bytes past the recorded count are leftovers of an interrupted append; they are overwritten
+        with open(self._path(assessment_id, meta, name), 'r+b' if offset else 'wb') as f:
+            f.seek(offset * records.dtype.itemsize)
+            f.write(records.tobytes())
+
+    def _remember(self, assessment_id: int, meta: Dict, generations: Tuple[int, ...],
+                  position: int) -> AnalyticsSnapshot:
+        snapshot = AnalyticsSnapshot(
+            assessment_id,
+            np.asarray(meta['question_ids'], dtype=np.int64),
+            self._map(assessment_id, meta, 'submissions', SUBMISSION_DTYPE, meta['submissions']),
+            self._map(assessment_id, meta, 'answers', ANSWER_DTYPE, meta['answers']),
+        )
+        self._entries[assessment_id] = (snapshot, meta, generations, position)
+        return snapshot
+
+    def _remove_old_builds(self, assessment_id: int, build: str) -> None:
+        directory = self._directory(assessment_id)
+        for name in os.listdir(directory):
+            if name.endswith('.bin') and not name.endswith(f"-{build}.bin"):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass  # still mapped by a reader (Windows); removed after a later build
+
+    # ------------------------- Building -------------------------
+    def _build(self, assessment_id: int) -> Dict:
+        """Export every submission and answer into a fresh build"""
+        db = self.db_manager
+        questions = db.get_questions(assessment_id)
+        os.makedirs(self._directory(assessment_id), exist_ok=True)
+        meta = {
+            'version': FORMAT_VERSION,
+            'assessment_id': assessment_id,
+            'build': uuid.uuid4().hex[:12],
+            'questions_key': questions_key(questions),
+            'question_ids': [q['id'] for q in questions],
+            'submissions': 0,
+            'answers': 0,
+            'watermark': 0,
+        }
+        meta = self._append(assessment_id, meta, questions)
+        self._remove_old_builds(assessment_id, meta['build'])
+        self._stats['builds'] += 1
+        return meta
+
+    def _append(self, assessment_id: int, meta: Dict, questions: Sequence[Dict] = None) -> Dict:
+        """Append submissions newer than the watermark and their answers; saves and returns the new meta"""
+        db = self.db_manager
+        questions = questions if questions is not None else db.get_questions(assessment_id)
+        submissions = db.get_snapshot_submissions(assessment_id, meta['watermark'])
+        answers = db.get_item_analysis_answers(assessment_id, meta['watermark'])
+        submission_records = np.array([tuple(row) for row in submissions], dtype=SUBMISSION_DTYPE)
+        answer_records = self._answer_records(AnswerKey(questions), meta, submission_records, answers,
+                                              meta['submissions'])
+
+        meta = dict(meta)
+        if len(submission_records) or not meta['submissions']:
+            self._write_at(assessment_id, meta, 'submissions', submission_records, meta['submissions'])
+        if len(answer_records) or not meta['answers']:
+            self._write_at(assessment_id, meta, 'answers', answer_records, meta['answers'])
+        meta['submissions'] += len(submission_records)
+        meta['answers'] += len(answer_records)
+        if len(submission_records):
+            meta['watermark'] = int(submission_records['submission_id'][-1])
+        meta.update(self._fingerprint_of(assessment_id, meta))
+        self._save_meta(assessment_id, meta)
+        return meta
+
+    def _answer_records(self, answer_key: AnswerKey, meta: Dict, submission_records: np.ndarray,
+                        answers: Sequence[Tuple], first_row: int) -> np.ndarray:
+        """ANSWER_DTYPE records of get_item_analysis_answers rows, grouped by submission row"""
+        if not len(answers) or not len(submission_records):
+            return np.zeros(0, dtype=ANSWER_DTYPE)
+        submission_ids = submission_records['submission_id']
+        answer_submissions = np.fromiter((row[0] for row in answers), np.int64, count=len(answers))
+        rows = np.searchsorted(submission_ids, answer_submissions)
+        columns = pd.Index(meta['question_ids']).get_indexer(
+            np.fromiter((row[1] for row in answers), np.int64, count=len(answers)))
+        # Answers to since-deleted questions, or to submissions that landed between the two queries, are left out
+        keep = (columns >= 0) & (rows < len(submission_ids))
+        keep[keep] = submission_ids[rows[keep]] == answer_submissions[keep]
+        records = np.empty(int(keep.sum()), dtype=ANSWER_DTYPE)
+        records['student_idx'] = rows[keep] + first_row
+        records['question_idx'] = columns[keep]
+        records['points_earned'] = np.fromiter((row[2] for row in answers), np.float64, count=len(answers))[keep]
+        texts = np.fromiter((row[3] for row in answers), object, count=len(answers))[keep]
+        records['choice_code'] = answer_key.choice_codes(columns[keep], texts)
+        # Each submission's answers stay contiguous, so a regrade can find and rewrite them in place
+        return records[np.argsort(records['student_idx'], kind='stable')]
+
+    def _apply_notes(self, assessment_id: int, meta: Dict, submission_ids) -> Optional[Dict]:
+        """Patch regraded submissions and append new ones; None when only a rebuild will do"""
+        db = self.db_manager
+        existing = [i for i in submission_ids if i <= meta['watermark']]
+        if existing:
+            submissions = self._map(assessment_id, meta, 'submissions', SUBMISSION_DTYPE, meta['submissions'], 'r+')
+            answers = self._map(assessment_id, meta, 'answers', ANSWER_DTYPE, meta['answers'], 'r+')
+            answer_key = AnswerKey(db.get_questions(assessment_id))
+            rows = db.get_snapshot_submission_rows(assessment_id, existing)
+            answer_rows = db.get_submission_answer_rows(existing)
+            for row in rows:
+                index = int(np.searchsorted(submissions['submission_id'], row[0]))
+                if index >= len(submissions) or submissions['submission_id'][index] != row[0]:
+                    return None
+                submissions[index] = tuple(row)
+                patched = self._answer_records(answer_key, meta, submissions[index:index + 1],
+                                               [a for a in answer_rows if a[0] == row[0]], index)
+                positions = np.flatnonzero(answers['student_idx'] == index)
+                if len(positions) != len(patched) or not np.array_equal(answers['question_idx'][positions],
+                                                                       patched['question_idx']):
+                    return None
+                answers[positions] = patched
+            for view in (submissions, answers):
+                if isinstance(view, np.memmap):
+                    view.flush()
+            self._stats['patches'] += 1
+        if any(i > meta['watermark'] for i in submission_ids):
+            self._stats['appends'] += 1
+        meta = self._append(assessment_id, meta)
+        # A resubmission deletes the old row; the counts only agree when nothing went missing
+        if meta['submissions'] != db.count_assessment_submissions(assessment_id):
+            return None
+        return meta
+
+    # ------------------------- Validation -------------------------
+    def _fingerprint_of(self, assessment_id: int, meta: Dict) -> Dict:
+        """Aggregates of the snapshot's own records, compared against SQL on the next run"""
+        submissions = self._map(assessment_id, meta, 'submissions', SUBMISSION_DTYPE, meta['submissions'])
+        answers = self._map(assessment_id, meta, 'answers', ANSWER_DTYPE, meta['answers'])
+        return {
+            'score_sum': float(submissions['score'].sum()),
+            'graded': int(submissions['is_graded'].sum()),
+            'points_sum': float(answers['points_earned'].astype(np.float64).sum()),
+        }
+
+    def _validated(self, assessment_id: int, meta: Optional[Dict]) -> Optional[Dict]:
+        """Meta of a snapshot that still matches the tables (after appending anything newer), else None"""
+        if meta is None:
+            return None
+        db = self.db_manager
+        if meta['questions_key'] != questions_key(db.get_questions(assessment_id)):
+            return None
+        count, score_sum, graded, answers, points_sum = db.get_snapshot_fingerprint(assessment_id, meta['watermark'])
+        if (count != meta['submissions'] or answers != meta['answers'] or graded != meta['graded']
+                or not np.isclose(score_sum, meta['score_sum'], atol=1e-3)
+                or not np.isclose(points_sum, meta['points_sum'], atol=1e-3)):
+            return None
+        self._stats['loads'] += 1
+        meta = self._append(assessment_id, meta)
+        return meta if meta['submissions'] == db.count_assessment_submissions(assessment_id) else None
@@ -0,0 +1,238 @@
+"""
+Per-assessment rollup behind the scores listing.
+
+``assessment_stats`` keeps one row per assessment with its question count, total
+points, submissions taken, graded count, and the sum and sum of squares of the
+scores. Triggers on assessments, questions and submissions keep it current on
+every write path (``add_question``, the create-assessment save, ``submit_assessment``
+and ``update_submission_grade``), so listing assessments with their averages and
+standard deviations never touches questions or submissions. Rows exist only for
+existing assessments: submissions and questions a deleted assessment left behind
+do not bring its row back.
+
+Usage:
+    python -m database.assessment_stats check [--db PATH]
+    python -m database.assessment_stats rebuild [--db PATH]
+"""
+
+import argparse
+import math
+import re
+from typing import Dict
+
+ROLLUP_FIELDS = ('question_count', 'total_points', 'taken', 'graded', 'score_sum', 'score_sq_sum')
+
+# Same score the scores pages display for a submission
+_SCORE = "COALESCE({t}.score, {t}.total_score, 0)"
+
+
+def _submission_delta(t: str, sign: str) -> str:
+    score = _SCORE.format(t=t)
+    return f'''
+        UPDATE assessment_stats
+        SET taken = taken {sign} 1,
+            graded = graded {sign} ({t}.is_graded = 1),
+            score_sum = score_sum {sign} {score},
+            score_sq_sum = score_sq_sum {sign} {score} * {score}
+        WHERE assessment_id = {t}.assessment_id;'''
+
+
+def _question_delta(t: str, sign: str) -> str:
+    return f'''
+        UPDATE assessment_stats
+        SET question_count = question_count {sign} 1,
+            total_points = total_points {sign} COALESCE({t}.points, 0)
+        WHERE assessment_id = {t}.assessment_id;'''
+
+
+def _ensure_row(t: str) -> str:
+    # Only for an assessment that still exists: a write to an orphaned submission or
+    # question must not bring back the row its assessment's delete removed. Without
+    # a row, the delta UPDATEs match nothing.
+    return (f"INSERT OR IGNORE INTO assessment_stats (assessment_id) "
+            f"SELECT id FROM assessments WHERE id = {t}.assessment_id;")
+
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS assessment_stats (
+        assessment_id INTEGER PRIMARY KEY,
+        question_count INTEGER NOT NULL DEFAULT 0,
+        total_points INTEGER NOT NULL DEFAULT 0,
+        taken INTEGER NOT NULL DEFAULT 0,
+        graded INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        score_sq_sum REAL NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_assessments_insert AFTER INSERT ON assessments
+    BEGIN
+        INSERT OR IGNORE INTO assessment_stats (assessment_id) VALUES (NEW.id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_assessments_delete AFTER DELETE ON assessments
+    BEGIN
+        DELETE FROM assessment_stats WHERE assessment_id = OLD.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_questions_insert AFTER INSERT ON questions
+    BEGIN
+        {_ensure_row('NEW')}
+        {_question_delta('NEW', '+')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_questions_delete AFTER DELETE ON questions
+    BEGIN
+        {_question_delta('OLD', '-')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_questions_update AFTER UPDATE OF points, assessment_id ON questions
+    BEGIN
+        {_question_delta('OLD', '-')}
+        {_ensure_row('NEW')}
+        {_question_delta('NEW', '+')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_submissions_insert AFTER INSERT ON submissions
+    BEGIN
+        {_ensure_row('NEW')}
+        {_submission_delta('NEW', '+')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_submissions_delete AFTER DELETE ON submissions
+    BEGIN
+        {_submission_delta('OLD', '-')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assessment_stats_submissions_update
+    AFTER UPDATE OF assessment_id, score, total_score, is_graded ON submissions
+    BEGIN
+        {_submission_delta('OLD', '-')}
+        {_ensure_row('NEW')}
+        {_submission_delta('NEW', '+')}
+    END
+    ''',
+]
+
+_FRESH_ROLLUP = f'''
+    SELECT a.id,
+           COALESCE(q.question_count, 0), COALESCE(q.total_points, 0),
+           COALESCE(s.taken, 0), COALESCE(s.graded, 0),
+           COALESCE(s.score_sum, 0), COALESCE(s.score_sq_sum, 0)
+    FROM assessments a
+    LEFT JOIN (
+        SELECT assessment_id, COUNT(*) AS question_count, SUM(COALESCE(points, 0)) AS total_points
+        FROM questions
+        GROUP BY assessment_id
+    ) q ON q.assessment_id = a.id
+    LEFT JOIN (
+        SELECT assessment_id, COUNT(*) AS taken, SUM(is_graded = 1) AS graded,
+               SUM({_SCORE.format(t='submissions')}) AS score_sum,
+               SUM({_SCORE.format(t='submissions')} * {_SCORE.format(t='submissions')}) AS score_sq_sum
+        FROM submissions
+        GROUP BY assessment_id
+    ) s ON s.assessment_id = a.id
+'''
+
+
+def create_schema(cursor) -> None:
+    for statement in SCHEMA:
+        cursor.execute(statement)
+
+
+def recreate_triggers(cursor) -> None:
+    """Replace the triggers of an existing schema with the current definitions"""
+    for statement in SCHEMA:
+        match = re.search(r'CREATE TRIGGER IF NOT EXISTS (\w+)', statement)
+        if match:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {match.group(1)}")
+    create_schema(cursor)
+
+
+def summarize(row: Dict) -> Dict:
+    """Add average_score and stddev_score (population) derived from the running sums"""
+    taken = row.get('students_taken') or 0
+    if taken:
+        mean = row['score_sum'] / taken
+        variance = max(0.0, row['score_sq_sum'] / taken - mean * mean)
+        row['average_score'] = round(mean, 2)
+        row['stddev_score'] = round(math.sqrt(variance), 2)
+    else:
+        row['average_score'] = None
+        row['stddev_score'] = None
+    return row
+
+
+def find_drift(cursor) -> Dict[int, Dict[str, tuple]]:
+    """{assessment_id: {field: (stored, actual)}} for every rollup value that disagrees with the source tables"""
+    cursor.execute(f"SELECT assessment_id, {', '.join(ROLLUP_FIELDS)} FROM assessment_stats")
+    stored = {row[0]: dict(zip(ROLLUP_FIELDS, row[1:])) for row in cursor.fetchall()}
+    cursor.execute(_FRESH_ROLLUP)
+    fresh = {row[0]: dict(zip(ROLLUP_FIELDS, row[1:])) for row in cursor.fetchall()}
+
+    zero = dict.fromkeys(ROLLUP_FIELDS, 0)
+    drift = {}
+    for assessment_id in set(stored) | set(fresh):
+        have = stored.get(assessment_id, zero)
+        want = fresh.get(assessment_id, zero)
+        # Running float sums pick up rounding noise; only real disagreements count
+        fields = {f: (have[f], want[f]) for f in ROLLUP_FIELDS
+                  if not math.isclose(have[f], want[f], rel_tol=1e-9, abs_tol=1e-6)}
+        if fields:
+            drift[assessment_id] = fields
+    return drift
+
+
+def rebuild(cursor) -> Dict[int, Dict[str, tuple]]:
+    """Recompute the rollup from scratch and return the drift that was corrected"""
+    drift = find_drift(cursor)
+    cursor.execute("DELETE FROM assessment_stats")
+    cursor.execute(f"INSERT INTO assessment_stats (assessment_id, {', '.join(ROLLUP_FIELDS)}) {_FRESH_ROLLUP}")
+    return drift
+
+
+def rebuild_stats(db) -> Dict[int, Dict[str, tuple]]:
+    with db.transaction() as conn:
+        return rebuild(conn.cursor())
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.assessment_stats",
+                                     description="Check or rebuild the per-assessment score rollup")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        if args.command == "rebuild":
+            drift = rebuild_stats(db)
+        else:
+            with db.connection() as conn:
+                drift = find_drift(conn.cursor())
+
+        if not drift:
+            print("No drift: the rollup matches the source tables.")
+        for assessment_id, fields in sorted(drift.items()):
+            details = ", ".join(f"{f} {have} -> {want}" for f, (have, want) in fields.items())
+            print(f"assessment {assessment_id}: {details}")
+        if args.command == "rebuild":
+            print("Rollup rebuilt.")
+        return 1 if drift and args.command == "check" else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
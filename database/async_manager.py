@@ -0,0 +1,189 @@
+"""
+Asyncio facade over DatabaseManager.
+
+Flet runs ``async def`` event handlers on its event loop, so a synchronous
+query made from one of them blocks the whole UI until SQLite answers.
+``AsyncDatabaseManager`` exposes every public DatabaseManager method as a
+coroutine that runs on a small, bounded pool of worker threads. The connection
+pool hands each thread its own persistent connection, so the workers never
+share a connection or a transaction with the UI thread or with each other.
+
+Pages start their loads through a ``PageRequests`` group, and
+``cancel_all()`` (called on every route change) cancels whatever the previous
+page still had in flight. A cancelled call that has not reached a worker
+never runs. One that is already running finishes in its thread, and its
+result is thrown away.
+
+    adb = AsyncDatabaseManager.shared(db_manager)
+    requests = adb.page_requests(page)
+
+    async def load():
+        data = await adb.gather(assessments=adb.get_assessments(),
+                                materials=adb.get_materials())
+        ...
+
+    requests.run(load)
+"""
+
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Union
+
+
+class PageRequests:
+    """Background loads started by one page, cancelled together when the user navigates away"""
+
+    def __init__(self, page, manager: 'AsyncDatabaseManager'):
+        self.page = page
+        self.manager = manager
+        self._futures: Set[Future] = set()
+        self._latest: Dict[str, Future] = {}
+        # Reentrant: cancelling a future runs its done callback (_forget) right away
+        self._lock = threading.RLock()
+
+    def run(self, handler: Callable[..., Awaitable], *args, key: Optional[str] = None) -> Future:
+        """Schedule ``handler(*args)`` on the page's event loop; safe to call from sync code.
+
+        With ``key``, a still-running earlier load under the same key is cancelled
+        first, so only the latest request (e.g. the last tab clicked) updates the page.
+        """
+        with self._lock:
+            if key is not None:
+                previous = self._latest.pop(key, None)
+                if previous is not None:
+                    previous.cancel()
+            future = self.page.run_task(self._report_errors, handler, *args)
+            self._futures.add(future)
+            if key is not None:
+                self._latest[key] = future
+        future.add_done_callback(self._forget)
+        return future
+
+    def handler(self, coro_fn: Callable[..., Awaitable], key: Optional[str] = None):
+        """Wrap an async event handler so it runs in this group (and is cancelled with it)"""
+        key = key or getattr(coro_fn, '__name__', None)
+
+        @functools.wraps(coro_fn)
+        def on_event(*args):
+            return self.run(coro_fn, *args, key=key)
+        return on_event
+
+    def cancel(self) -> int:
+        """Cancel every load still in flight; returns how many were cancelled"""
+        with self._lock:
+            futures = list(self._futures)
+            self._futures.clear()
+            self._latest.clear()
+        return sum(1 for future in futures if future.cancel())
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+            for key, latest in list(self._latest.items()):
+                if latest is future:
+                    del self._latest[key]
+
+    @staticmethod
+    async def _report_errors(handler, *args):
+        try:
+            return await handler(*args)
+        except (asyncio.CancelledError, CancelledError):
+            raise
+        except Exception as e:
+            print(f"Error in background load {getattr(handler, '__name__', handler)}: {e}")
+
+
+class AsyncDatabaseManager:
+    """Awaitable versions of DatabaseManager's public methods on a bounded thread pool"""
+
+    _shared: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_manager, max_workers: int = 4):
+        self.db_manager = db_manager
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker",
+                                            initializer=self._open_worker_connection)
+        self._groups: "weakref.WeakSet[PageRequests]" = weakref.WeakSet()
+        self._methods: Dict[str, Callable[..., Awaitable]] = {}
+        self._closed = False
+
+    @classmethod
+    def shared(cls, db_manager, max_workers: int = 4) -> 'AsyncDatabaseManager':
+        """The process-wide facade for ``db_manager``, created on first use"""
+        with cls._shared_lock:
+            manager = cls._shared.get(db_manager)
+            if manager is None or manager._closed:
+                manager = cls(db_manager, max_workers)
+                cls._shared[db_manager] = manager
+            return manager
+
+    def _open_worker_connection(self) -> None:
+        # Check out (and hand back) this worker's pooled connection up front,
+        # so the first query a page waits on does not also pay for opening it
+        self.db_manager.get_connection().close()
+
+    async def call(self, method: Union[str, Callable], *args, **kwargs) -> Any:
+        """Run ``db_manager.<method>(*args, **kwargs)`` (or any callable) on a worker thread"""
+        if self._closed:
+            raise RuntimeError("AsyncDatabaseManager has been shut down")
+        fn = getattr(self.db_manager, method) if isinstance(method, str) else method
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        # Only reached for names not defined here: wrap the DatabaseManager method
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+        target = getattr(self.db_manager, name)
+        if not callable(target):
+            raise AttributeError(f"'{type(self.db_manager).__name__}.{name}' is not a method")
+
+        @functools.wraps(target)
+        async def method(*args, **kwargs):
+            # Looked up on every call, so wrappers installed later (profiling) still apply
+            return await self.call(name, *args, **kwargs)
+        self._methods[name] = method
+        return method
+
+    def __dir__(self):
+        public = [name for name in dir(self.db_manager)
+                  if not name.startswith('_') and callable(getattr(type(self.db_manager), name, None))]
+        return sorted(set(super().__dir__()) | set(public))
+
+    @staticmethod
+    async def gather(return_exceptions: bool = False, **calls: Awaitable) -> Dict[str, Any]:
+        """Await several calls concurrently and return their results by name.
+
+        With ``return_exceptions`` a failed call leaves its exception in the
+        result instead of cancelling the rest.
+        """
+        names = list(calls)
+        results = await asyncio.gather(*calls.values(), return_exceptions=return_exceptions)
+        return dict(zip(names, results))
+
+    def page_requests(self, page) -> PageRequests:
+        """A new request group for a page; ``cancel_all()`` cancels it on navigation"""
+        group = PageRequests(page, self)
+        self._groups.add(group)
+        return group
+
+    def cancel_all(self) -> int:
+        """Cancel the in-flight loads of every page (call on route change)"""
+        return sum(group.cancel() for group in list(self._groups))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._closed = True
+        self.cancel_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,338 @@
+"""
+Auto-grading of short answers against their question's correct_answer.
+
+Short answers are stored with 0 points at submit time, and their submission
+starts out ungraded (in the grading queue). This stage proposes a score for
+every short answer of an assessment in one pass. Answers and keys are
+normalized first: the quotes and brackets older clients stored are
+stripped, case is folded, punctuation and articles (a, an, the) are dropped
+and spacing is collapsed. Then:
+
+- a normalized answer equal to the key matches;
+- when both the answer and the key are numbers ("1,200", "0.5", "1/2", "50%"),
+  they match within ``numeric_tolerance`` of the key and otherwise do not;
+- anything else gets a similarity between 0 and 1. It is the larger of the
+  word overlap (Dice coefficient of the two word sets) and the edit similarity
+  (1 - Levenshtein distance / length of the longer text).
+
+An answer whose similarity is at least ``accept_at`` gets full points, and
+one at or below ``reject_below`` gets none. Both are final (grade_source
+'auto'). Answers in between are pre-filled with the nearer of the two and
+marked 'review'. Their submission goes back to the grading queue
+(is_graded = 0) until a teacher finalizes it. A submission that is still
+ungraded also stays queued while it has short answers nobody has graded, e.g.
+to questions without a correct_answer. The confidence stored with a
+proposal is the similarity for a match and 1 - similarity otherwise.
+
+Each distinct (question, normalized answer) pair is scored once. Most answers
+in a section repeat, so a 300-student section takes well under a second.
+Answers a teacher graded are kept unless ``overwrite_manual``. Questions
+without a correct_answer are left for manual grading. Changes are written in
+one transaction; a dry run only reports them.
+
+Usage:
+    python -m database.auto_grade ASSESSMENT_ID [--questions ID [ID ...]] [--accept 0.85]
+        [--reject 0.4] [--tolerance 0.01] [--overwrite-manual] [--dry-run] [--db PATH]
+"""
+
+import argparse
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from database.grading import clean_answer
+
+ACCEPT_AT = 0.85
+REJECT_BELOW = 0.4
+NUMERIC_TOLERANCE = 0.01
+# Longer texts are compared by their words only; edit distance is quadratic in the length
+EDIT_DISTANCE_MAX_LENGTH = 120
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]+')
+_ARTICLES = frozenset(('a', 'an', 'the'))
+
+
+def normalize_text(text) -> str:
+    """Answer text as compared: cleaned, case-folded, without punctuation or articles, single-spaced"""
+    words = _PUNCTUATION_RE.sub(' ', clean_answer(text).casefold()).split()
+    return ' '.join(word for word in words if word not in _ARTICLES)
+
+
+def parse_number(text) -> Optional[float]:
+    """The number an answer spells ("1,200", "-3.5", "50%", "1/4"), or None"""
+    text = clean_answer(text).replace(',', '').replace(' ', '').rstrip('%')
+    # float() also takes words like "nan" and "infinity", which are answers, not numbers
+    if not any(c.isdigit() for c in text):
+        return None
+    numerator, slash, denominator = text.partition('/')
+    try:
+        return float(numerator) / float(denominator) if slash else float(text)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance: insertions, deletions and substitutions to turn ``a`` into ``b``"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def text_similarity(answer: str, key: str) -> float:
+    """Similarity of two normalized texts: the larger of word overlap and edit similarity"""
+    if answer == key:
+        return 1.0
+    if not answer or not key:
+        return 0.0
+    words, key_words = set(answer.split()), set(key.split())
+    similarity = 2 * len(words & key_words) / (len(words) + len(key_words))
+    longest = max(len(answer), len(key))
+    if longest <= EDIT_DISTANCE_MAX_LENGTH:
+        similarity = max(similarity, 1 - levenshtein(answer, key) / longest)
+    return similarity
+
+
+class ShortAnswerGrader:
+    """An assessment's short-answer keys with the thresholds; each distinct answer is scored once"""
+
+    def __init__(self, questions: Sequence[Dict], accept_at: float = ACCEPT_AT,
+                 reject_below: float = REJECT_BELOW, numeric_tolerance: float = NUMERIC_TOLERANCE):
+        if not 0 <= reject_below < accept_at <= 1:
+            raise ValueError(f"Thresholds must satisfy 0 <= reject ({reject_below}) < accept ({accept_at}) <= 1")
+        if numeric_tolerance < 0:
+            raise ValueError(f"Numeric tolerance must not be negative, got {numeric_tolerance}")
+        self.accept_at = accept_at
+        self.reject_below = reject_below
+        self.numeric_tolerance = numeric_tolerance
+        # question id -> (normalized key, key as a number or None, points)
+        self.keys: Dict[int, Tuple[str, Optional[float], float]] = {}
+        for q in questions:
+            key = normalize_text(q['correct_answer'])
+            if q['question_type'] == 'short_answer' and key:
+                self.keys[q['id']] = (key, parse_number(q['correct_answer']), float(q['points'] or 0))
+        self._proposals: Dict[Tuple[int, str], Tuple[float, bool, float, str]] = {}
+
+    def __contains__(self, question_id) -> bool:
+        return question_id in self.keys
+
+    @property
+    def distinct_answers(self) -> int:
+        """How many (question, normalized answer) pairs have been scored"""
+        return len(self._proposals)
+
+    def similarity(self, question_id: int, answer_text) -> float:
+        key, key_number, _ = self.keys[question_id]
+        if key_number is not None:
+            number = parse_number(answer_text)
+            if number is not None:
+                close = math.isclose(number, key_number, rel_tol=self.numeric_tolerance, abs_tol=1e-9)
+                return 1.0 if close else 0.0
+        return text_similarity(normalize_text(answer_text), key)
+
+    def propose(self, question_id: int, answer_text) -> Tuple[float, bool, float, str]:
+        """(points_earned, is_correct, confidence, grade_source) proposed for one answer"""
+        # Numbers are compared before punctuation is dropped ("1.5" is not "15")
+        numeric = self.keys[question_id][1] is not None
+        cache_key = (question_id, clean_answer(answer_text) if numeric else normalize_text(answer_text))
+        proposal = self._proposals.get(cache_key)
+        if proposal is None:
+            similarity = self.similarity(question_id, answer_text)
+            if similarity >= self.accept_at:
+                correct, source = True, 'auto'
+            elif similarity <= self.reject_below:
+                correct, source = False, 'auto'
+            else:
+                correct, source = similarity >= (self.accept_at + self.reject_below) / 2, 'review'
+            points = self.keys[question_id][2] if correct else 0.0
+            confidence = similarity if correct else 1 - similarity
+            proposal = self._proposals[cache_key] = (points, correct, round(confidence, 4), source)
+        return proposal
+
+
+@dataclass
+class QuestionSummary:
+    question_id: int
+    number: int          # position in the assessment, from 1
+    accepted: int = 0    # full points, final
+    rejected: int = 0    # no points, final
+    review: int = 0      # proposal waiting for a teacher
+
+
+@dataclass
+class ReviewItem:
+    submission_id: int
+    student_number: str
+    student_name: str
+    question_number: int
+    answer_text: str
+    points: float
+    confidence: float
+
+
+@dataclass
+class AutoGradeReport:
+    assessment_id: int
+    dry_run: bool = True
+    answers_checked: int = 0
+    distinct_answers: int = 0
+    answers_changed: int = 0
+    manual_kept: int = 0
+    no_key: int = 0
+    submissions_queued: int = 0
+    submissions_updated: int = 0
+    questions: List[QuestionSummary] = field(default_factory=list)
+    review: List[ReviewItem] = field(default_factory=list)
+
+    @property
+    def accepted(self) -> int:
+        return sum(q.accepted for q in self.questions)
+
+    @property
+    def rejected(self) -> int:
+        return sum(q.rejected for q in self.questions)
+
+    def summary(self, max_rows: int = 20) -> str:
+        action = "would change" if self.dry_run else "changed"
+        lines = [f"{self.answers_checked} short answers ({self.distinct_answers} distinct) auto-graded: "
+                 f"{self.accepted} correct, {self.rejected} wrong, {len(self.review)} for review; "
+                 f"{self.answers_changed} answers {action}",
+                 f"{self.submissions_queued} submissions left in the grading queue"]
+        if self.manual_kept:
+            lines.append(f"{self.manual_kept} manually graded answers kept")
+        if self.no_key:
+            lines.append(f"{self.no_key} answers to questions without a correct answer left for manual grading")
+        for question in self.questions:
+            lines.append(f"  Q{question.number}: {question.accepted} correct, {question.rejected} wrong, "
+                         f"{question.review} for review")
+        for item in self.review[:max_rows]:
+            lines.append(f"  {item.student_number} {item.student_name} Q{item.question_number}: "
+                         f"{item.answer_text!r} -> {item.points:g} ({item.confidence:.0%} confident)")
+        if len(self.review) > max_rows:
+            lines.append(f"  ... {len(self.review) - max_rows} more")
+        return '\n'.join(lines)
+
+
+def auto_grade_assessment(db, assessment_id: int, question_ids: Optional[Iterable[int]] = None,
+                          accept_at: float = ACCEPT_AT, reject_below: float = REJECT_BELOW,
+                          numeric_tolerance: float = NUMERIC_TOLERANCE, overwrite_manual: bool = False,
+                          dry_run: bool = False) -> AutoGradeReport:
+    """Auto-grade the short answers to ``question_ids`` (default: all) and, unless ``dry_run``, save them.
+
+    Raises ValueError for an unknown assessment, a question that is not one of
+    its short-answer questions, or thresholds out of order.
+    """
+    if not db.get_assessment_by_id(assessment_id):
+        raise ValueError(f"Assessment {assessment_id} does not exist")
+    questions = db.get_questions(assessment_id)
+    grader = ShortAnswerGrader(questions, accept_at, reject_below, numeric_tolerance)
+    numbers = {q['id']: number for number, q in enumerate(questions, start=1)}
+    short_answer_ids = [q['id'] for q in questions if q['question_type'] == 'short_answer']
+    selected = set(short_answer_ids) if question_ids is None else set(question_ids)
+    unknown = selected - set(short_answer_ids)
+    if unknown:
+        raise ValueError(f"Question(s) {', '.join(map(str, sorted(unknown)))} are not short-answer "
+                         f"questions of assessment {assessment_id}")
+    report = AutoGradeReport(assessment_id, dry_run=dry_run)
+    report.questions = [QuestionSummary(qid, numbers[qid]) for qid in short_answer_ids
+                        if qid in selected and qid in grader]
+    tallies = {summary.question_id: summary for summary in report.questions}
+
+    submissions = {row[0]: row for row in db.get_regrade_submissions(assessment_id)}
+    answer_grades = []
+    deltas: Dict[int, float] = defaultdict(float)
+    considered, queued = set(), set()
+    rows = db.get_short_answer_rows(assessment_id)
+    for answer_id, submission_id, question_id, answer_text, earned, source, confidence in rows:
+        if submission_id not in submissions or question_id not in numbers:
+            continue
+        if question_id not in tallies:
+            if question_id in selected:
+                report.no_key += 1
+        elif source == 'manual' and not overwrite_manual:
+            report.manual_kept += 1
+        else:
+            proposal = grader.propose(question_id, answer_text)
+            points, correct, _, _ = proposal
+            report.answers_checked += 1
+            considered.add(submission_id)
+            tally = tallies[question_id]
+            if proposal[3] == 'review':
+                tally.review += 1
+                student_number, student_name = submissions[submission_id][1:3]
+                report.review.append(ReviewItem(submission_id, student_number, student_name, numbers[question_id],
+                                                answer_text or '', points, proposal[2]))
+            elif correct:
+                tally.accepted += 1
+            else:
+                tally.rejected += 1
+            if (points, proposal[2], proposal[3]) != (earned, confidence, source):
+                answer_grades.append(proposal + (answer_id,))
+                deltas[submission_id] += points - earned
+            source = proposal[3]
+        # Proposals from an earlier run on other questions keep their submission queued too,
+        # and so do ungraded answers in a submission nobody has finalized
+        if source == 'review' or (source is None and not submissions[submission_id][5]):
+            queued.add(submission_id)
+            considered.add(submission_id)
+    report.distinct_answers = grader.distinct_answers
+    report.answers_changed = len(answer_grades)
+    report.submissions_queued = len(queued)
+    report.review.sort(key=lambda item: (item.student_name or '', item.question_number))
+
+    submission_scores = []
+    for submission_id in sorted(considered):
+        score = submissions[submission_id][3] + deltas[submission_id]
+        is_graded = submission_id not in queued
+        if abs(deltas[submission_id]) > 1e-9 or is_graded != bool(submissions[submission_id][5]):
+            submission_scores.append((score, score, is_graded, submission_id))
+    if not dry_run and (answer_grades or submission_scores):
+        db.apply_auto_grades(answer_grades, submission_scores, sorted(considered))
+        report.submissions_updated = len(submission_scores)
+    return report
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.auto_grade",
+                                     description="Auto-grade the short answers of an assessment")
+    parser.add_argument("assessment_id", type=int)
+    parser.add_argument("--questions", type=int, nargs="+", default=None, metavar="ID",
+                        help="Only grade these short-answer question ids")
+    parser.add_argument("--accept", type=float, default=ACCEPT_AT,
+                        help="Similarity at or above which an answer gets full points")
+    parser.add_argument("--reject", type=float, default=REJECT_BELOW,
+                        help="Similarity at or below which an answer gets none")
+    parser.add_argument("--tolerance", type=float, default=NUMERIC_TOLERANCE,
+                        help="Relative tolerance for numeric answers")
+    parser.add_argument("--overwrite-manual", action="store_true", help="Also regrade answers a teacher graded")
+    parser.add_argument("--dry-run", action="store_true", help="Report the proposals without saving them")
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    parser.add_argument("--max-rows", type=int, default=50, help="How many answers for review to print")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        report = auto_grade_assessment(db, args.assessment_id, args.questions, accept_at=args.accept,
+                                       reject_below=args.reject, numeric_tolerance=args.tolerance,
+                                       overwrite_manual=args.overwrite_manual, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"Auto-grading failed: {e}")
+        return 2
+    finally:
+        db.close()
+    print(report.summary(args.max_rows))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+
+class PooledConnection:
+    """Thin wrapper around a pooled sqlite3 connection.
+
+    Behaves like a regular ``sqlite3.Connection`` except that ``close()`` hands the
+    connection back to its pool instead of tearing it down. Any transaction left
+    open at that point is rolled back, which matches what closing a plain
+    connection without committing used to do.
+    """
+
+    def __init__(self, pool: 'ConnectionPool', raw: sqlite3.Connection, slot=None):
+        self._pool = pool
+        self._raw = raw
+        self._slot = slot
+        self._released = False
+        self._changes = raw.total_changes
+
+    def __getattr__(self, name):
+        if self._released:
+            raise sqlite3.ProgrammingError("Cannot operate on a released pooled connection.")
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        # Attributes such as row_factory belong on the real connection
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._raw, name, value)
+
+    def __enter__(self):
+        return self._raw.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._raw.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        return self._raw
+
+    def _live(self) -> sqlite3.Connection:
+        if self._released:
+            raise sqlite3.ProgrammingError("Cannot operate on a released pooled connection.")
+        return self._raw
+
+    def cursor(self, *args):
+        raw = self._live()
+        cursor = raw.cursor(*args)
+        profiler = self._pool.profiler
+        return cursor if profiler is None else profiler.wrap_cursor(cursor, raw)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        profiler = self._pool.profiler
+        if profiler is None:
+            self._live().commit()
+        else:
+            start = time.perf_counter()
+            try:
+                self._live().commit()
+            finally:
+                profiler.record_statement("COMMIT", (), (time.perf_counter() - start) * 1000.0)
+        self._report_changes()
+
+    def _report_changes(self):
+        # total_changes is a cheap counter of rows written on this connection (triggers included)
+        changes = self._raw.total_changes
+        if changes != self._changes:
+            self._changes = changes
+            self._pool.notify_changes()
+
+    def close(self):
+        """Return the connection to the pool (idempotent)"""
+        if not self._released:
+            self._released = True
+            try:
+                # Catches writes committed by other means (cursor.execute("COMMIT"), raw.commit())
+                self._report_changes()
+            except sqlite3.Error:
+                pass
+            self._pool.release(self._raw, self._slot)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Thread-aware pool of configured SQLite connections.
+
+    Every thread keeps one persistent connection for its outermost checkout, so the
+    common "open, query, close" pattern costs a dictionary lookup instead of a fresh
+    ``sqlite3.connect``. Nested checkouts on the same thread (a method calling
+    another method while still holding its connection) are served from a shared
+    overflow list so they never share a transaction with the caller.
+    """
+
+    def __init__(self, db_path: str, busy_timeout_ms: int = 5000, cached_statements: int = 256,
+                 max_overflow_idle: int = 4, journal_mode: str = 'WAL', synchronous: str = 'NORMAL',
+                 foreign_keys: bool = False):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.max_overflow_idle = max_overflow_idle
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        # Off by default: comments.post_id also stores announcement ids and
+        # submissions are replaced with INSERT OR REPLACE, neither of which the
+        # declared foreign keys allow.
+        self.foreign_keys = foreign_keys
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._overflow: List[sqlite3.Connection] = []
+        self._all: List[sqlite3.Connection] = []
+        self._stats = {'created': 0, 'checkouts': 0, 'overflow_checkouts': 0}
+        self._trace_callback = None
+        self._change_listener: Optional[Callable[[], None]] = None
+        # QueryProfiler whose cursors checked-out connections hand out (None: plain cursors)
+        self.profiler = None
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        if self.journal_mode and self.db_path != ':memory:':
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        if self.synchronous:
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA foreign_keys={'ON' if self.foreign_keys else 'OFF'}")
+        if self._trace_callback is not None:
+            conn.set_trace_callback(self._trace_callback)
+        with self._lock:
+            self._all.append(conn)
+            self._stats['created'] += 1
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Check out a connection; call ``close()`` on it (or use ``connection()``) when done"""
+        slot = self._local
+        with self._lock:
+            self._stats['checkouts'] += 1
+        if not getattr(slot, 'in_use', False):
+            raw = getattr(slot, 'conn', None)
+            if raw is None:
+                raw = self._create_connection()
+                slot.conn = raw
+            slot.in_use = True
+            return PooledConnection(self, raw, slot)
+
+        with self._lock:
+            self._stats['overflow_checkouts'] += 1
+            raw = self._overflow.pop() if self._overflow else None
+        if raw is None:
+            raw = self._create_connection()
+        return PooledConnection(self, raw, None)
+
+    def release(self, raw: sqlite3.Connection, slot=None) -> None:
+        """Give a connection back, discarding any uncommitted work"""
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+            raw.row_factory = None
+        except sqlite3.Error:
+            self._discard(raw)
+            if slot is not None:
+                slot.conn = None
+                slot.in_use = False
+            return
+
+        if slot is not None:
+            slot.in_use = False
+            return
+
+        with self._lock:
+            if len(self._overflow) < self.max_overflow_idle:
+                self._overflow.append(raw)
+                return
+        self._discard(raw)
+
+    def _discard(self, raw: sqlite3.Connection) -> None:
+        with self._lock:
+            if raw in self._all:
+                self._all.remove(raw)
+        try:
+            raw.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Context-managed checkout: ``with pool.connection() as conn: ...``"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self, immediate: bool = True):
+        """Run the block in one transaction, committing on success and rolling back on error.
+
+        ``immediate`` takes the write lock up front (``BEGIN IMMEDIATE``) so the
+        block cannot fail half-way through with ``database is locked``.
+        """
+        conn = self.acquire()
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+        finally:
+            conn.close()
+
+    def set_trace_callback(self, callback) -> None:
+        """Install (or clear with None) an SQL trace callback on every pooled connection"""
+        with self._lock:
+            self._trace_callback = callback
+            connections = list(self._all)
+        for raw in connections:
+            raw.set_trace_callback(callback)
+
+    def set_profiler(self, profiler) -> None:
+        """Time every statement run through checked-out connections (None turns it off)"""
+        self.profiler = profiler
+
+    def set_change_listener(self, listener: Optional[Callable[[], None]]) -> None:
+        """Call ``listener()`` after a checked-out connection has written rows, on commit and on release"""
+        self._change_listener = listener
+
+    def notify_changes(self) -> None:
+        listener = self._change_listener
+        if listener is not None:
+            listener()
+
+    def close_all(self) -> None:
+        """Close every connection owned by the pool (used at shutdown and in benchmarks)"""
+        with self._lock:
+            connections = list(self._all)
+            self._all.clear()
+            self._overflow.clear()
+        for raw in connections:
+            try:
+                raw.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open_connections'] = len(self._all)
+            stats['idle_overflow'] = len(self._overflow)
+        return stats
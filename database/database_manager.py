@@ -1,13 +1,31 @@
-import sqlite3
 import hashlib
+import ast
+import json
 from datetime import datetime
 import os
 import sys
+import threading
 from typing import Optional, Dict, List, Tuple
 from pathlib import Path
+from database import admin_stats, assessment_stats, search_index, similarity
+from database.connection_pool import ConnectionPool
+from database.grading import AnswerKey
+from database.pagination import (DEFAULT_PAGE_SIZE, Cursor, ResultPage, SortKey, contains_pattern,
+                                 fetch_page, resolve_sort)
+from database.records import (AnnouncementRecord, AnswerExportRecord, AssessmentRecord, FileSubmissionRecord, MaterialRecord,
+                              PostRecord, PublishedAssessmentRecord, QuestionAnswerRecord, QuestionRecord, ScoreListingRecord,
+                              SearchResultRecord, StudentAssessmentRecord, SubmissionAnswerRecord, SubmissionListingRecord,
+                              UserListingRecord, iter_records)
+from database.migrations import apply_migrations, get_schema_version, latest_version
+from database.profile import DEFAULT_SLOW_MS, QueryProfiler
+from database.query_cache import ChangeLog, QueryCache, cached, invalidates
+from database.submission_writer import SubmissionWriter
+
+# announcement_sections row for announcements that target every section
+ALL_SECTIONS = '*'
 
 class DatabaseManager:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, cache_enabled: bool = True):
         if db_path is None:
             # Store database in user's AppData folder for persistence
             if sys.platform == 'win32':
@@ -21,341 +39,80 @@ class DatabaseManager:
             self.db_path = os.path.join(db_dir, 'assessment_system.db')
         else:
             self.db_path = db_path
+        self.pool = ConnectionPool(self.db_path)
+        self.cache = QueryCache(enabled=cache_enabled)
+        self.pool.set_change_listener(self.cache.on_changes)
+        self._submission_writer = None
+        self._writer_lock = threading.Lock()
+        self.profiler = None
+        # Submission ids of each declared submissions write, for the caches below to patch from
+        self.submission_log = ChangeLog()
+        # Section gradebook matrices (database/gradebook.py), created on first use
+        self.gradebooks = None
+        # Per-assessment analytics snapshots (database/analytics_snapshot.py), created on first use
+        self.snapshots = None
+        # assessment id -> (question rows, AnswerKey compiled from them, stamp they were read under)
+        # for submit_assessment; see load_answer_key
+        self._answer_keys: Dict[int, Tuple] = {}
+
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
-    
-    def initialize_database(self):
-        """Initialize the database with all required tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check if we need to migrate the database schema
-        self.migrate_database(cursor)
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL CHECK(role IN ('admin', 'student')),
-                full_name TEXT NOT NULL,
-                email TEXT UNIQUE,
-                admin_id_number TEXT UNIQUE,
-                student_number TEXT UNIQUE,
-                section TEXT,
-                security_question TEXT NOT NULL,
-                security_answer_hash TEXT NOT NULL,
-                profile_photo TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Posts table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                post_type TEXT NOT NULL CHECK(post_type IN ('assessment', 'file')),
-                created_by INTEGER NOT NULL,
-                assessment_id INTEGER,
-                file_path TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (created_by) REFERENCES users (id),
-                FOREIGN KEY (assessment_id) REFERENCES assessments (id)
-            )
-        ''')
+        """Check out a pooled connection; ``close()`` returns it to the pool"""
+        return self.pool.acquire()
 
-        # Post sections (assignment) table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS post_sections (
-                post_id INTEGER NOT NULL,
-                section TEXT NOT NULL,
-                PRIMARY KEY (post_id, section),
-                FOREIGN KEY (post_id) REFERENCES posts (id)
-            )
-        ''')
+    def connection(self):
+        """Context manager around get_connection(): ``with db.connection() as conn:``"""
+        return self.pool.connection()
 
-        # Comments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS comments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                content TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                post_type TEXT DEFAULT 'post',
-                parent_comment_id INTEGER DEFAULT NULL,
-                FOREIGN KEY (post_id) REFERENCES posts (id),
-                FOREIGN KEY (user_id) REFERENCES users (id),
-                FOREIGN KEY (parent_comment_id) REFERENCES comments (id)
-            )
-        ''')
-        
-        # Add missing columns to existing comments table if they don't exist
-        try:
-            cursor.execute('ALTER TABLE comments ADD COLUMN post_type TEXT DEFAULT "post"')
-        except:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute('ALTER TABLE comments ADD COLUMN parent_comment_id INTEGER DEFAULT NULL')
-        except:
-            pass  # Column already exists
+    def transaction(self, immediate: bool = True):
+        """Context manager that commits on success and rolls back on error"""
+        return self.pool.transaction(immediate)
 
-        # File submissions table (for student turn-ins on file posts)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS file_submissions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_id INTEGER NOT NULL,
-                student_id INTEGER NOT NULL,
-                file_path TEXT NOT NULL,
-                submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (post_id) REFERENCES posts (id),
-                FOREIGN KEY (student_id) REFERENCES users (id)
-            )
-        ''')
+    def set_cache_enabled(self, enabled: bool) -> None:
+        """Turn the read-through query cache on or off (turning it off also empties it)"""
+        self.cache.enabled = enabled
+        if not enabled:
+            self.cache.clear()
 
-        # Assessments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS assessments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                created_by INTEGER NOT NULL,
-                start_time TIMESTAMP,
-                end_time TIMESTAMP,
-                duration_minutes INTEGER NOT NULL,
-                status TEXT DEFAULT 'draft' CHECK(status IN ('draft', 'published', 'active', 'closed')),
-                enforce_per_question_time BOOLEAN DEFAULT 0,
-                per_question_duration_seconds INTEGER,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (created_by) REFERENCES users (id)
-            )
-        ''')
-        
-        # Questions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                assessment_id INTEGER NOT NULL,
-                question_text TEXT NOT NULL,
-                question_type TEXT NOT NULL CHECK(question_type IN ('mcq', 'short_answer')),
-                points INTEGER DEFAULT 1,
-                correct_answer TEXT,
-                options TEXT, -- JSON string for MCQ options
-                order_index INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (assessment_id) REFERENCES assessments (id)
-            )
-        ''')
-        
-        # Submissions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS submissions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                assessment_id INTEGER NOT NULL,
-                student_id INTEGER NOT NULL,
-                submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_graded BOOLEAN DEFAULT 0,
-                total_score REAL DEFAULT 0,
-                max_score REAL DEFAULT 0,
-                FOREIGN KEY (assessment_id) REFERENCES assessments (id),
-                FOREIGN KEY (student_id) REFERENCES users (id),
-                UNIQUE(assessment_id, student_id)
-            )
-        ''')
-        
-        # Answers table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS answers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                submission_id INTEGER NOT NULL,
-                question_id INTEGER NOT NULL,
-                answer_text TEXT,
-                is_correct BOOLEAN,
-                points_earned REAL DEFAULT 0,
-                feedback TEXT,
-                FOREIGN KEY (submission_id) REFERENCES submissions (id),
-                FOREIGN KEY (question_id) REFERENCES questions (id)
-            )
-        ''')
-        
-        # Security questions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS security_questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                question_text TEXT UNIQUE NOT NULL
-            )
-        ''')
-        
-        # Answer responses table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS answer_responses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                submission_id INTEGER NOT NULL,
-                question_id INTEGER NOT NULL,
-                answer_text TEXT,
-                selected_option TEXT,
-                is_correct BOOLEAN,
-                points_earned REAL DEFAULT 0,
-                feedback TEXT,
-                FOREIGN KEY (submission_id) REFERENCES submissions (id),
-                FOREIGN KEY (question_id) REFERENCES questions (id)
-            )
-        ''')
-        
-        # Announcements table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS announcements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                created_by INTEGER NOT NULL,
-                target_sections TEXT,  -- JSON array of sections, NULL for all students
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (created_by) REFERENCES users (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        
-        # Initialize security questions
-        self.initialize_security_questions()
-        
-        # Create default admin user if not exists
-        self.create_default_admin()
+    def get_cache_stats(self) -> Dict:
+        return self.cache.get_stats()
+
+    def enable_profiling(self, session_path: str = None, slow_ms: float = DEFAULT_SLOW_MS) -> QueryProfiler:
+        """Time every method and statement, logging queries slower than ``slow_ms`` (see database/profile.py)"""
+        if self.profiler is None:
+            self.profiler = QueryProfiler(session_path, slow_ms, db_path=self.db_path)
+            self.profiler.attach(self)
+            self.pool.set_profiler(self.profiler)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        if self.profiler is not None:
+            self.pool.set_profiler(None)
+            self.profiler.detach(self)
+            self.profiler.close()
+            self.profiler = None
+
+    def get_profile_report(self, sort: str = 'total', limit: int = 20) -> str:
+        """Hot-path tables for the running profiling session ('' when profiling is off)"""
+        return self.profiler.report(sort, limit) if self.profiler is not None else ''
+
+    def close(self):
+        """Stop the submission writer and close every pooled connection"""
+        if self._submission_writer is not None:
+            self._submission_writer.stop()
+            self._submission_writer = None
+        self.disable_profiling()
+        self.pool.close_all()
     
-    def migrate_database(self, cursor):
-        """Migrate existing database to new schema"""
-        try:
-            # Check if new columns exist
-            cursor.execute("PRAGMA table_info(users)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            # Add new columns if they don't exist
-            if 'admin_id_number' not in columns:
-                cursor.execute('ALTER TABLE users ADD COLUMN admin_id_number TEXT UNIQUE')
-            
-            if 'student_number' not in columns:
-                cursor.execute('ALTER TABLE users ADD COLUMN student_number TEXT UNIQUE')
-            
-            if 'section' not in columns:
-                cursor.execute('ALTER TABLE users ADD COLUMN section TEXT')
-            
-            if 'security_question' not in columns:
-                cursor.execute('ALTER TABLE users ADD COLUMN security_question TEXT NOT NULL DEFAULT "What is your favorite teacher\'s name?"')
-            
-            if 'security_answer_hash' not in columns:
-                cursor.execute('ALTER TABLE users ADD COLUMN security_answer_hash TEXT NOT NULL DEFAULT "default_hash"')
-            
-            if 'profile_photo' not in columns:
-                cursor.execute('ALTER TABLE users ADD COLUMN profile_photo TEXT')
-            
-            # Update existing users with default security question and answer
-            cursor.execute('''
-                UPDATE users 
-                SET security_question = "What is your favorite teacher's name?",
-                    security_answer_hash = ?
-                WHERE security_answer_hash = "default_hash"
-            ''', (self.hash_password("default"),))
-            
-            # Check if assessments table needs status column
-            cursor.execute("PRAGMA table_info(assessments)")
-            assessment_columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'status' not in assessment_columns:
-                cursor.execute('ALTER TABLE assessments ADD COLUMN status TEXT DEFAULT "draft" CHECK(status IN ("draft", "published", "active", "closed"))')
-                # Update existing assessments to have published status if they're active
-                cursor.execute('UPDATE assessments SET status = "published" WHERE is_active = 1')
-            else:
-                # Ensure existing assessments have proper status values
-                cursor.execute('UPDATE assessments SET status = "published" WHERE status IS NULL AND is_active = 1')
-                cursor.execute('UPDATE assessments SET status = "draft" WHERE status IS NULL AND is_active = 0')
-                cursor.execute('UPDATE assessments SET status = "draft" WHERE status = ""')
-
-            # Add per-question timing columns if not exist
-            if 'enforce_per_question_time' not in assessment_columns:
-                cursor.execute('ALTER TABLE assessments ADD COLUMN enforce_per_question_time BOOLEAN DEFAULT 0')
-            if 'per_question_duration_seconds' not in assessment_columns:
-                cursor.execute('ALTER TABLE assessments ADD COLUMN per_question_duration_seconds INTEGER')
-            
-            # Check if submissions table needs additional columns
-            cursor.execute("PRAGMA table_info(submissions)")
-            submission_columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'score' not in submission_columns:
-                cursor.execute('ALTER TABLE submissions ADD COLUMN score REAL DEFAULT 0')
-            if 'total_questions' not in submission_columns:
-                cursor.execute('ALTER TABLE submissions ADD COLUMN total_questions INTEGER DEFAULT 0')
-
-            # Ensure new tables exist (idempotent)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS posts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    post_type TEXT NOT NULL CHECK(post_type IN ('assessment', 'file')),
-                    created_by INTEGER NOT NULL,
-                    assessment_id INTEGER,
-                    file_path TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (created_by) REFERENCES users (id),
-                    FOREIGN KEY (assessment_id) REFERENCES assessments (id)
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS post_sections (
-                    post_id INTEGER NOT NULL,
-                    section TEXT NOT NULL,
-                    PRIMARY KEY (post_id, section),
-                    FOREIGN KEY (post_id) REFERENCES posts (id)
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS comments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    post_id INTEGER NOT NULL,
-                    user_id INTEGER NOT NULL,
-                    content TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    post_type TEXT DEFAULT 'post',
-                    parent_comment_id INTEGER DEFAULT NULL,
-                    FOREIGN KEY (post_id) REFERENCES posts (id),
-                    FOREIGN KEY (user_id) REFERENCES users (id),
-                    FOREIGN KEY (parent_comment_id) REFERENCES comments (id)
-                )
-            ''')
-            
-            # Add missing columns to existing comments table if they don't exist
-            try:
-                cursor.execute('ALTER TABLE comments ADD COLUMN post_type TEXT DEFAULT "post"')
-            except:
-                pass  # Column already exists
-            
-            try:
-                cursor.execute('ALTER TABLE comments ADD COLUMN parent_comment_id INTEGER DEFAULT NULL')
-            except:
-                pass  # Column already exists
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS file_submissions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    post_id INTEGER NOT NULL,
-                    student_id INTEGER NOT NULL,
-                    file_path TEXT NOT NULL,
-                    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (post_id) REFERENCES posts (id),
-                    FOREIGN KEY (student_id) REFERENCES users (id)
-                )
-            ''')
-            
-        except Exception as e:
-            print(f"Migration error: {e}")
+    def initialize_database(self):
+        """Bring the schema up to date.
+
+        When ``PRAGMA user_version`` is already current this is a single pragma
+        read; otherwise the pending numbered migrations run in one transaction.
+        """
+        with self.connection() as conn:
+            if get_schema_version(conn) >= latest_version():
+                return
+        apply_migrations(self)
 
     def fix_assessment_status_values(self) -> None:
         """Ensure assessments have a valid non-empty status string. Safe no-op if already valid."""
@@ -372,59 +129,40 @@ class DatabaseManager:
             except Exception:
                 pass
     
-    def initialize_security_questions(self):
-        """Initialize predefined security questions"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        security_questions = [
-            "What is your favorite teacher's name?",
-            "What is your pet's name?",
-            "What is the name of your first school?",
-            "What is your favorite subject?",
-            "What is your mother's maiden name?"
-        ]
-        
-        for question in security_questions:
-            cursor.execute('''
-                INSERT OR IGNORE INTO security_questions (question_text)
-                VALUES (?)
-            ''', (question,))
-        
-        conn.commit()
-        conn.close()
-    
-    def create_default_admin(self):
-        """Create a default admin user if none exists"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
-        admin_count = cursor.fetchone()[0]
-        
-        if admin_count == 0:
-            # Create default admin user
-            password_hash = self.hash_password("admin123")
-            security_answer_hash = self.hash_password("admin")
-            cursor.execute('''
-                INSERT INTO users (username, password_hash, role, full_name, email, admin_id_number, security_question, security_answer_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', ("admin", password_hash, "admin", "System Administrator", "admin@system.com", "ADMIN001", "What is your favorite teacher's name?", security_answer_hash))
-            
-            # Create a sample student
-            student_password = self.hash_password("student123")
-            student_security_answer_hash = self.hash_password("student")
-            cursor.execute('''
-                INSERT INTO users (username, password_hash, role, full_name, email, student_number, section, security_question, security_answer_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', ("student", student_password, "student", "Test Student", "student@test.com", "STU001", "1A", "What is your favorite teacher's name?", student_security_answer_hash))
-        
-        conn.commit()
-        conn.close()
-    
     def hash_password(self, password: str) -> str:
         """Hash a password using SHA-256"""
         return hashlib.sha256(password.encode()).hexdigest()
+
+    @staticmethod
+    def parse_target_sections(target_sections) -> List[str]:
+        """Turn announcements.target_sections text ('["1A"]' or "['1A', '2B']") into a list of sections"""
+        if not target_sections:
+            return []
+        if isinstance(target_sections, (list, tuple)):
+            values = target_sections
+        else:
+            try:
+                values = json.loads(target_sections)
+            except (TypeError, ValueError):
+                try:
+                    values = ast.literal_eval(target_sections)
+                except (ValueError, SyntaxError):
+                    values = target_sections.split(',')
+            if isinstance(values, str):
+                values = [values]
+        sections = []
+        for value in values:
+            section = str(value).strip().strip('"\'[] ')
+            if section and section not in sections:
+                sections.append(section)
+        return sections
+
+    def write_announcement_sections(self, cursor, announcement_id: int, target_sections) -> None:
+        """Replace an announcement's rows in announcement_sections; no sections means everyone"""
+        sections = self.parse_target_sections(target_sections) or [ALL_SECTIONS]
+        cursor.execute('DELETE FROM announcement_sections WHERE announcement_id = ?', (announcement_id,))
+        cursor.executemany('INSERT INTO announcement_sections (announcement_id, section) VALUES (?, ?)',
+                           [(announcement_id, section) for section in sections])
     
     def get_security_questions(self) -> List[str]:
         """Get all available security questions"""
@@ -437,6 +175,7 @@ class DatabaseManager:
         
         return [result[0] for result in results]
     
+    @invalidates('users')
     def create_admin_account(self, admin_id_number: str, name: str, username: str, 
                            password: str, email: str, security_question: str, 
                            security_answer: str, profile_photo: str = None) -> bool:
@@ -471,6 +210,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('users')
     def create_student_account(self, student_number: str, name: str, section: str, 
                              username: str, password: str, email: str, 
                              security_question: str, security_answer: str, profile_photo: str = None) -> bool:
@@ -504,7 +244,36 @@ class DatabaseManager:
             return False
         finally:
             conn.close()
-    
+
+    def get_account_identifiers(self) -> Dict[str, set]:
+        """Every username, email and student number in use, for checking a roster in bulk"""
+        identifiers = {'username': set(), 'email': set(), 'student_number': set()}
+        with self.connection() as conn:
+            for username, email, student_number in conn.execute(
+                    'SELECT username, email, student_number FROM users'):
+                identifiers['username'].add(username)
+                if email:
+                    identifiers['email'].add(email)
+                if student_number:
+                    identifiers['student_number'].add(student_number)
+        return identifiers
+
+    @invalidates('users')
+    def create_student_accounts(self, accounts: List[Tuple]) -> int:
+        """Create many students in one transaction (see database/roster_import.py).
+
+        Each row is (student_number, full_name, section, username, password_hash,
+        email, security_question, security_answer_hash), already hashed. A clash
+        with an existing account rolls back the whole batch and raises
+        sqlite3.IntegrityError.
+        """
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO users (student_number, full_name, section, username, password_hash, email, role, security_question, security_answer_hash)
+                VALUES (?, ?, ?, ?, ?, ?, 'student', ?, ?)
+            ''', accounts)
+        return len(accounts)
+
     def get_user_by_username_or_email(self, identifier: str) -> Optional[Dict]:
         """Get user by username or email"""
         conn = self.get_connection()
@@ -564,6 +333,7 @@ class DatabaseManager:
             return stored_hash == provided_hash
         return False
     
+    @invalidates('users')
     def update_password(self, user_id: int, new_password: str) -> bool:
         """Update user password"""
         conn = self.get_connection()
@@ -612,6 +382,7 @@ class DatabaseManager:
             }
         return None
     
+    @invalidates('assessments')
     def create_assessment(self, title: str, description: str, created_by: int, 
                          start_time: str, end_time: str, duration_minutes: int, status: str = 'draft',
                          enforce_per_question_time: int = 0, per_question_duration_seconds: Optional[int] = None) -> int:
@@ -630,6 +401,7 @@ class DatabaseManager:
         
         return assessment_id
     
+    @invalidates('questions')
     def add_question(self, assessment_id: int, question_text: str, question_type: str,
                     points: int, correct_answer: str, options: str = None, order_index: int = 0) -> int:
         """Add a question to an assessment and return its ID"""
@@ -647,12 +419,14 @@ class DatabaseManager:
         
         return question_id
     
+    @cached('assessments', 'users', 'submissions')
     def get_assessments(self, user_id: int = None, role: str = None) -> List[Dict]:
         """Get assessments based on user role and ID"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         if role == 'admin':
+            cursor.row_factory = AssessmentRecord.row_factory
             cursor.execute('''
                 SELECT a.id, a.title, a.description, a.created_by, a.start_time, a.end_time, 
                        a.duration_minutes, a.status, a.is_active, a.created_at, u.full_name as creator_name
@@ -661,6 +435,7 @@ class DatabaseManager:
                 ORDER BY a.created_at DESC
             ''')
         else:  # student
+            cursor.row_factory = StudentAssessmentRecord.row_factory
             cursor.execute('''
                 SELECT a.id, a.title, a.description, a.created_by, a.start_time, a.end_time, 
                        a.duration_minutes, a.status, a.is_active, a.created_at, u.full_name as creator_name,
@@ -672,47 +447,16 @@ class DatabaseManager:
                 ORDER BY a.created_at DESC
             ''', (user_id,))
         
-        results = cursor.fetchall()
+        assessments = cursor.fetchall()
         conn.close()
-        
-        assessments = []
-        for result in results:
-            if role == 'admin':
-                assessments.append({
-                    'id': result[0],
-                    'title': result[1],
-                    'description': result[2],
-                    'created_by': result[3],
-                    'start_time': result[4],
-                    'end_time': result[5],
-                    'duration_minutes': result[6],
-                    'status': result[7],  # Now correctly mapped to status column
-                    'is_active': result[8],
-                    'created_at': result[9],
-                    'creator_name': result[10]
-                })
-            else:
-                assessments.append({
-                    'id': result[0],
-                    'title': result[1],
-                    'description': result[2],
-                    'created_by': result[3],
-                    'start_time': result[4],
-                    'end_time': result[5],
-                    'duration_minutes': result[6],
-                    'status': result[7],
-                    'is_active': result[8],
-                    'created_at': result[9],
-                    'creator_name': result[10],
-                    'is_submitted': result[11]
-                })
-        
         return assessments
     
+    @cached('questions')
     def get_questions(self, assessment_id: int) -> List[Dict]:
         """Get all questions for an assessment"""
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = QuestionRecord.row_factory
         
         cursor.execute('''
             SELECT id, question_text, question_type, points, correct_answer, options, order_index
@@ -721,23 +465,11 @@ class DatabaseManager:
             ORDER BY order_index
         ''', (assessment_id,))
         
-        results = cursor.fetchall()
+        questions = cursor.fetchall()
         conn.close()
-        
-        questions = []
-        for result in results:
-            questions.append({
-                'id': result[0],
-                'question_text': result[1],
-                'question_type': result[2],
-                'points': result[3],
-                'correct_answer': result[4],
-                'options': result[5],
-                'order_index': result[6]
-            })
-        
         return questions
 
+    @cached('assessments', 'users')
     def get_assessment_by_id(self, assessment_id: int) -> Optional[Dict]:
         """Get a single assessment by ID."""
         conn = self.get_connection()
@@ -767,6 +499,7 @@ class DatabaseManager:
             'creator_name': row[10],
         }
 
+    @invalidates('assessments')
     def update_assessment(self, assessment_id: int, *, title: str, description: str,
                           start_time: Optional[str], end_time: Optional[str],
                           duration_minutes: int, status: str) -> None:
@@ -781,70 +514,92 @@ class DatabaseManager:
         conn.commit()
         conn.close()
     
+    @invalidates('submissions', 'answers')
     def submit_assessment(self, assessment_id: int, student_id: int, answers: List[Dict]) -> int:
-        """Submit an assessment and return submission ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Create submission record
+        """Submit an assessment and return submission ID.
+
+        The answer key is loaded with one query and graded in memory, then the
+        submission and all of its answer rows are written in one short
+        BEGIN IMMEDIATE transaction.
+        """
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            answer_key = self.load_answer_key(cursor, assessment_id)
+            submission_id = self.write_submission(cursor, assessment_id, student_id, answers, answer_key)
+            self.note_submissions_changed([submission_id])
+            return submission_id
+
+    def load_answer_key(self, cursor, assessment_id: int) -> AnswerKey:
+        """One assessment's questions compiled for scoring (see database/grading.py).
+
+        The key is reused without reading the rows while nothing can have changed
+        them: no write to questions through this process's cache (declared, or
+        undeclared raw SQL, which bumps every table) and no commit by another
+        connection, which PRAGMA data_version reports. Otherwise the rows are read
+        inside the caller's transaction, and only compiled again when they differ
+        from the last compile for the assessment.
+        """
+        stamp = (self.cache.snapshot(('questions',)), id(cursor.connection),
+                 cursor.execute('PRAGMA data_version').fetchone()[0])
+        compiled = self._answer_keys.get(assessment_id)
+        if compiled is not None and compiled[2] == stamp:
+            return compiled[1]
         cursor.execute('''
-            INSERT OR REPLACE INTO submissions (assessment_id, student_id, submitted_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        ''', (assessment_id, student_id))
-        
-        submission_id = cursor.lastrowid
-        
-        # Insert answers
-        total_score = 0
-        max_score = 0
-        
-        for answer in answers:
-            question_id = answer['question_id']
-            answer_text = answer['answer_text']
-            
-            # Get question details
-            cursor.execute('''
-                SELECT question_type, correct_answer, points
-                FROM questions
-                WHERE id = ?
-            ''', (question_id,))
-            
-            question_data = cursor.fetchone()
-            if question_data:
-                question_type, correct_answer, points = question_data
-                max_score += points
-                
-                # Check if answer is correct
-                is_correct = False
-                points_earned = 0
-                
-                if question_type == 'mcq' and answer_text == correct_answer:
-                    is_correct = True
-                    points_earned = points
-                elif question_type == 'short_answer':
-                    # For short answers, we'll mark as needing manual review
-                    points_earned = 0
-                
-                total_score += points_earned
-                
-                cursor.execute('''
-                    INSERT INTO answers (submission_id, question_id, answer_text, is_correct, points_earned)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (submission_id, question_id, answer_text, is_correct, points_earned))
+            SELECT id, question_type, correct_answer, points, options
+            FROM questions
+            WHERE assessment_id = ?
+        ''', (assessment_id,))
+        rows = cursor.fetchall()
+        answer_key = compiled[1] if compiled is not None and compiled[0] == rows else AnswerKey.from_rows(rows)
+        self._answer_keys[assessment_id] = (rows, answer_key, stamp)
+        return answer_key
+
+    def write_submission(self, cursor, assessment_id: int, student_id: int, answers: List[Dict],
+                         answer_key: AnswerKey) -> int:
+        """Grade answers against a loaded key and write them; the caller owns the transaction"""
+        # Short answers are stored with 0 points and left for manual review, so a
+        # submission with any of them starts out ungraded, in the grading queue
+        answer_rows, total_score, max_score = answer_key.score(answers)
+        is_graded = answer_key.hand_graded.isdisjoint([row[0] for row in answer_rows])
+        # Short answers get their MinHash signature now, so similarity reports need not compute it
+        answer_rows = [row + (similarity.signature(row[1]) if row[0] in answer_key.hand_graded else None,)
+                       for row in answer_rows]
+        
+        # A resubmission replaces the previous row; drop its answers with it. The row is
+        # deleted explicitly because REPLACE skips the delete triggers behind the stats rollups.
+        previous = cursor.execute('''
+            SELECT id FROM submissions WHERE assessment_id = ? AND student_id = ?
+        ''', (assessment_id, student_id)).fetchone()
+        if previous is not None:
+            cursor.execute('DELETE FROM answers WHERE submission_id = ?', previous)
+            cursor.execute('DELETE FROM submissions WHERE id = ?', previous)
         
-        # Update submission with total score
         cursor.execute('''
-            UPDATE submissions
-            SET total_score = ?, max_score = ?, is_graded = 1
-            WHERE id = ?
-        ''', (total_score, max_score, submission_id))
+            INSERT INTO submissions (assessment_id, student_id, submitted_at, score, total_score, max_score, is_graded)
+            VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?, ?)
+        ''', (assessment_id, student_id, total_score, total_score, max_score, is_graded))
+        submission_id = cursor.lastrowid
         
-        conn.commit()
-        conn.close()
+        cursor.executemany('''
+            INSERT INTO answers (submission_id, question_id, answer_text, is_correct, points_earned, minhash)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(submission_id,) + row for row in answer_rows])
         
         return submission_id
 
+    @property
+    def submission_writer(self) -> 'SubmissionWriter':
+        """Shared group-commit writer for exam submissions, started on first use"""
+        if self._submission_writer is None:
+            with self._writer_lock:
+                if self._submission_writer is None:
+                    writer = SubmissionWriter(self)
+                    writer.start()
+                    self._submission_writer = writer
+        return self._submission_writer
+
     # ------------------------- Posts API -------------------------
+    @invalidates('posts')
     def create_post(self, title: str, description: str, post_type: str, created_by: int,
                     assessment_id: Optional[int] = None, file_path: Optional[str] = None) -> int:
         """Create a new post (assessment or file) and return its ID"""
@@ -859,6 +614,7 @@ class DatabaseManager:
         conn.close()
         return post_id
 
+    @cached('users')
     def get_available_sections(self) -> List[str]:
         """Get list of available sections from users table"""
         conn = self.get_connection()
@@ -873,6 +629,7 @@ class DatabaseManager:
             return ["1A", "2A", "3A", "4A", "1B", "2B", "3B", "4B"]
         return sections
 
+    @invalidates('post_sections')
     def assign_post_sections(self, post_id: int, sections: List[str]) -> None:
         """Assign a post to one or more sections"""
         conn = self.get_connection()
@@ -884,6 +641,7 @@ class DatabaseManager:
         conn.commit()
         conn.close()
 
+    @cached('users', 'posts', 'post_sections')
     def get_posts_for_student_section(self, student_id: int) -> List[Dict]:
         """Return posts assigned to the student's section, newest first"""
         conn = self.get_connection()
@@ -895,6 +653,7 @@ class DatabaseManager:
         if not student_section:
             conn.close()
             return []
+        cursor.row_factory = PostRecord.row_factory
         cursor.execute('''
             SELECT p.id, p.title, p.description, p.post_type, p.created_by, p.assessment_id, p.file_path, p.created_at,
                    u.full_name as author_name
@@ -903,103 +662,53 @@ class DatabaseManager:
             JOIN users u ON u.id = p.created_by
             ORDER BY p.created_at DESC
         ''', (student_section,))
-        results = cursor.fetchall()
+        posts = cursor.fetchall()
         conn.close()
-        posts: List[Dict] = []
-        for r in results:
-            posts.append({
-                'id': r[0],
-                'title': r[1],
-                'description': r[2],
-                'post_type': r[3],
-                'created_by': r[4],
-                'assessment_id': r[5],
-                'file_path': r[6],
-                'created_at': r[7],
-                'author_name': r[8]
-            })
         return posts
 
     # ------------------------- Admin Stats -------------------------
+    @cached('users', 'posts', 'post_sections', 'submissions', 'assessments')
     def get_admin_dashboard_stats(self, admin_user_id: int) -> Dict:
         """Compute admin dashboard KPIs for a specific admin (only their assessments/posts):
         - total_students: students assigned to any of this admin's assessment posts
         - active_assessments: this admin's published/active assessments
         - completion_rate: percent of assigned student-assessment pairs submitted for this admin
         - new_submissions: distinct submissions for this admin in the last 24 hours
+
+        The counters are maintained by triggers (see database/admin_stats.py), so this
+        is a primary-key lookup plus an index range count for the 24-hour window.
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            # Total assigned students (students who have at least one assessment assigned via this admin's posts)
-            cursor.execute(
-                '''
-                SELECT COUNT(DISTINCT u.id)
-                FROM users u
-                JOIN post_sections ps ON ps.section = u.section
-                JOIN posts p ON p.id = ps.post_id AND p.post_type = 'assessment' AND p.assessment_id IS NOT NULL AND p.created_by = ?
-                WHERE u.role = 'student'
-                '''
-            , (admin_user_id,))
-            total_students = cursor.fetchone()[0] or 0
-
-            # Active / published assessments
-            cursor.execute("SELECT COUNT(*) FROM assessments WHERE status IN ('published','active') AND is_active = 1 AND created_by = ?", (admin_user_id,))
-            active_assessments = cursor.fetchone()[0] or 0
-
-            # New submissions in last 24 hours (distinct student-assessment pairs)
-            # Only count if the submission is from a student and the assessment was assigned to that student's section via posts
-            cursor.execute(
-                '''
-                SELECT COUNT(DISTINCT (s.assessment_id || '-' || s.student_id))
-                FROM submissions s
-                JOIN users u ON u.id = s.student_id AND u.role = 'student'
-                JOIN posts p ON p.assessment_id = s.assessment_id AND p.post_type = 'assessment' AND p.created_by = ?
-                JOIN post_sections ps ON ps.post_id = p.id
-                WHERE u.section = ps.section
-                  AND s.submitted_at >= datetime('now','-1 day')
-                '''
-            , (admin_user_id,))
-            new_submissions = cursor.fetchone()[0] or 0
-
-            # Total targets = number of student-assessment pairs assigned via posts/post_sections
-            cursor.execute(
-                '''
-                SELECT COUNT(DISTINCT (p.assessment_id || '-' || u.id))
-                FROM posts p
-                JOIN post_sections ps ON ps.post_id = p.id
-                JOIN users u ON u.section = ps.section AND u.role = 'student'
-                WHERE p.post_type = 'assessment' AND p.assessment_id IS NOT NULL AND p.created_by = ?
-                '''
-            , (admin_user_id,))
-            total_targets = cursor.fetchone()[0] or 0
-
-            # Submissions count as distinct student-assessment pairs for this admin only
-            cursor.execute(
-                '''
-                SELECT COUNT(DISTINCT (s.assessment_id || '-' || s.student_id))
-                FROM submissions s
-                JOIN posts p ON p.assessment_id = s.assessment_id AND p.post_type = 'assessment' AND p.created_by = ?
-                JOIN post_sections ps ON ps.post_id = p.id
-                JOIN users u ON u.id = s.student_id AND u.section = ps.section
-                '''
-            , (admin_user_id,))
-            submitted_pairs = cursor.fetchone()[0] or 0
+        with self.connection() as conn:
+            stats = admin_stats.read_admin_stats(conn.cursor(), admin_user_id)
 
-            completion_rate = 0
-            if total_targets > 0:
-                completion_rate = int(round((submitted_pairs / total_targets) * 100))
+        completion_rate = 0
+        if stats['total_targets'] > 0:
+            completion_rate = int(round((stats['submitted_pairs'] / stats['total_targets']) * 100))
 
-            return {
-                'total_students': total_students,
-                'active_assessments': active_assessments,
-                'completion_rate': completion_rate,
-                'new_submissions': new_submissions,
-            }
-        finally:
-            conn.close()
+        return {
+            'total_students': stats['total_students'],
+            'active_assessments': stats['active_assessments'],
+            'completion_rate': completion_rate,
+            'new_submissions': stats['new_submissions'],
+        }
+
+    def rebuild_stats(self) -> Dict:
+        """Recompute the materialized stats tables from scratch.
+
+        Returns {'admin_stats': {admin_id: drift}, 'assessment_stats': {assessment_id: drift}},
+        where each drift maps field -> (stored, actual).
+        """
+        drift = {
+            'admin_stats': admin_stats.rebuild_stats(self),
+            'assessment_stats': assessment_stats.rebuild_stats(self),
+        }
+        for table, rows in drift.items():
+            if rows:
+                print(f"{table} drift corrected for {len(rows)} row(s): {rows}")
+        return drift
 
     # ------------------------- Comments API -------------------------
+    @invalidates('comments')
     def add_comment(self, post_id: int, user_id: int, content: str) -> int:
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -1041,44 +750,14 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            # First, check if the new columns exist
-            cursor.execute("PRAGMA table_info(comments)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            has_post_type = 'post_type' in columns
-            has_parent_comment = 'parent_comment_id' in columns
-            
-            # Build query based on available columns
-            if has_post_type and has_parent_comment:
-                query = '''
-                    SELECT c.id, c.content, c.created_at, u.full_name as user_name, u.id as user_id,
-                           u.profile_photo, c.parent_comment_id
-                    FROM comments c
-                    JOIN users u ON c.user_id = u.id
-                    WHERE c.post_id = ? AND c.post_type = 'announcement'
-                    ORDER BY c.created_at ASC
-                '''
-            elif has_parent_comment:
-                query = '''
-                    SELECT c.id, c.content, c.created_at, u.full_name as user_name, u.id as user_id,
-                           u.profile_photo, c.parent_comment_id
-                    FROM comments c
-                    JOIN users u ON c.user_id = u.id
-                    WHERE c.post_id = ?
-                    ORDER BY c.created_at ASC
-                '''
-            else:
-                # Fallback for old schema
-                query = '''
-                    SELECT c.id, c.content, c.created_at, u.full_name as user_name, u.id as user_id,
-                           u.profile_photo, NULL as parent_comment_id
-                    FROM comments c
-                    JOIN users u ON c.user_id = u.id
-                    WHERE c.post_id = ?
-                    ORDER BY c.created_at ASC
-                '''
-            
-            cursor.execute(query, (announcement_id,))
+            cursor.execute('''
+                SELECT c.id, c.content, c.created_at, u.full_name as user_name, u.id as user_id,
+                       u.profile_photo, c.parent_comment_id
+                FROM comments c
+                JOIN users u ON c.user_id = u.id
+                WHERE c.post_id = ? AND c.post_type = 'announcement'
+                ORDER BY c.created_at ASC
+            ''', (announcement_id,))
             
             comments = []
             for row in cursor.fetchall():
@@ -1089,7 +768,7 @@ class DatabaseManager:
                     'user_name': row[3],
                     'user_id': row[4],
                     'profile_photo': row[5],
-                    'parent_comment_id': row[6] if len(row) > 6 else None
+                    'parent_comment_id': row[6]
                 })
             
             return comments
@@ -1100,36 +779,17 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('comments')
     def add_announcement_comment(self, announcement_id: int, user_id: int, content: str, parent_comment_id: int = None) -> int:
         """Add comment for an announcement with optional reply support"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
-            # Check if the new columns exist
-            cursor.execute("PRAGMA table_info(comments)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            has_post_type = 'post_type' in columns
-            has_parent_comment = 'parent_comment_id' in columns
-            
-            # Build insert query based on available columns
-            if has_post_type and has_parent_comment:
-                cursor.execute('''
-                    INSERT INTO comments (post_id, post_type, user_id, content, parent_comment_id, created_at)
-                    VALUES (?, 'announcement', ?, ?, ?, datetime('now'))
-                ''', (announcement_id, user_id, content, parent_comment_id))
-            elif has_parent_comment:
-                cursor.execute('''
-                    INSERT INTO comments (post_id, user_id, content, parent_comment_id, created_at)
-                    VALUES (?, ?, ?, ?, datetime('now'))
-                ''', (announcement_id, user_id, content, parent_comment_id))
-            else:
-                # Fallback for old schema
-                cursor.execute('''
-                    INSERT INTO comments (post_id, user_id, content, created_at)
-                    VALUES (?, ?, ?, datetime('now'))
-                ''', (announcement_id, user_id, content))
+            cursor.execute('''
+                INSERT INTO comments (post_id, post_type, user_id, content, parent_comment_id, created_at)
+                VALUES (?, 'announcement', ?, ?, ?, datetime('now'))
+            ''', (announcement_id, user_id, content, parent_comment_id))
             
             comment_id = cursor.lastrowid
             conn.commit()
@@ -1142,6 +802,7 @@ class DatabaseManager:
             conn.close()
 
     # ------------------------- File submissions API -------------------------
+    @invalidates('file_submissions')
     def create_file_submission(self, post_id: int, student_id: int, file_path: str) -> int:
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -1178,21 +839,24 @@ class DatabaseManager:
         ]
 
     # ------------------------- Scoring/Grading API -------------------------
+    @cached('assessments', 'questions', 'submissions')
     def get_published_assessments_with_stats(self) -> List[Dict]:
-        """Get all published assessments with student submission statistics"""
+        """Get all published assessments with student submission statistics.
+
+        Counts and score sums come from the assessment_stats rollup, so each
+        assessment costs one primary-key join however many submissions it has.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
             SELECT a.id, a.title, a.description, a.created_at, a.start_time, a.end_time,
-                   COUNT(DISTINCT q.id) as total_questions,
-                   COALESCE(SUM(q.points), 0) as total_points,
-                   COUNT(DISTINCT s.student_id) as students_taken
+                   COALESCE(st.question_count, 0), COALESCE(st.total_points, 0),
+                   COALESCE(st.taken, 0), COALESCE(st.graded, 0),
+                   COALESCE(st.score_sum, 0), COALESCE(st.score_sq_sum, 0)
             FROM assessments a
-            LEFT JOIN questions q ON a.id = q.assessment_id
-            LEFT JOIN submissions s ON a.id = s.assessment_id
+            LEFT JOIN assessment_stats st ON st.assessment_id = a.id
             WHERE a.status IN ('published', 'done')
-            GROUP BY a.id, a.title, a.description, a.created_at, a.start_time, a.end_time
             ORDER BY a.created_at DESC
         ''')
         
@@ -1201,7 +865,7 @@ class DatabaseManager:
         
         assessments = []
         for result in results:
-            assessments.append({
+            assessments.append(assessment_stats.summarize({
                 'id': result[0],
                 'title': result[1],
                 'description': result[2],
@@ -1210,42 +874,32 @@ class DatabaseManager:
                 'end_time': result[5],
                 'total_questions': result[6],
                 'total_points': result[7],
-                'students_taken': result[8]
-            })
+                'students_taken': result[8],
+                'graded_count': result[9],
+                'score_sum': result[10],
+                'score_sq_sum': result[11],
+            }))
         
         return assessments
 
     def get_assessment_submissions(self, assessment_id: int) -> List[Dict]:
         """Get all student submissions for a specific assessment"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT s.id, s.student_id, u.student_number, u.full_name, s.submitted_at,
-                   s.is_graded, s.total_score, s.max_score
-            FROM submissions s
-            JOIN users u ON s.student_id = u.id
-            WHERE s.assessment_id = ?
-            ORDER BY u.full_name
-        ''', (assessment_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        submissions = []
-        for result in results:
-            submissions.append({
-                'submission_id': result[0],
-                'student_id': result[1],
-                'student_number': result[2],
-                'student_name': result[3],
-                'submitted_at': result[4],
-                'is_graded': bool(result[5]),
-                'total_score': result[6] or 0,
-                'max_score': result[7] or 0
-            })
-        
-        return submissions
+        return list(self.iter_assessment_submissions(assessment_id))
+
+    def iter_assessment_submissions(self, assessment_id: int, batch_size: int = 500):
+        """Stream an assessment's submissions in fetchmany batches; the connection is held until exhausted"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = SubmissionListingRecord.row_factory
+            cursor.execute('''
+                SELECT s.id, s.student_id, u.student_number, u.full_name, s.submitted_at,
+                       s.is_graded, COALESCE(s.total_score, 0), COALESCE(s.max_score, 0)
+                FROM submissions s
+                JOIN users u ON s.student_id = u.id
+                WHERE s.assessment_id = ?
+                ORDER BY u.full_name
+            ''', (assessment_id,))
+            yield from iter_records(cursor, batch_size)
 
     def get_student_submission(self, student_id: int, assessment_id: int) -> Dict:
         """Get student's submission for a specific assessment"""
@@ -1297,35 +951,20 @@ class DatabaseManager:
             return None
         
         # Get all answers with question details
+        cursor.row_factory = SubmissionAnswerRecord.row_factory
         cursor.execute('''
             SELECT a.id, a.question_id, q.question_text, q.question_type, q.points,
                    q.correct_answer, q.options, a.answer_text, a.is_correct,
-                   a.points_earned, a.feedback
+                   COALESCE(a.points_earned, 0), a.feedback, a.grade_source, a.auto_confidence
             FROM answers a
             JOIN questions q ON a.question_id = q.id
             WHERE a.submission_id = ?
             ORDER BY q.order_index
         ''', (submission_id,))
         
-        answers_results = cursor.fetchall()
+        answers = cursor.fetchall()
         conn.close()
         
-        answers = []
-        for answer_result in answers_results:
-            answers.append({
-                'answer_id': answer_result[0],
-                'question_id': answer_result[1],
-                'question_text': answer_result[2],
-                'question_type': answer_result[3],
-                'points': answer_result[4],
-                'correct_answer': answer_result[5],
-                'options': answer_result[6],
-                'student_answer': answer_result[7],
-                'is_correct': bool(answer_result[8]) if answer_result[8] is not None else None,
-                'points_earned': answer_result[9] or 0,
-                'feedback': answer_result[10]
-            })
-        
         return {
             'submission_id': submission_result[0],
             'assessment_id': submission_result[1],
@@ -1340,6 +979,7 @@ class DatabaseManager:
             'answers': answers
         }
 
+    @invalidates('submissions', 'answers')
     def update_answer_grade(self, answer_id: int, points_earned: float, feedback: str = None) -> bool:
         """Update the grade and feedback for a specific answer"""
         conn = self.get_connection()
@@ -1348,11 +988,14 @@ class DatabaseManager:
         try:
             cursor.execute('''
                 UPDATE answers 
-                SET points_earned = ?, feedback = ?, is_correct = ?
+                SET points_earned = ?, feedback = ?, is_correct = ?, grade_source = 'manual'
                 WHERE id = ?
             ''', (points_earned, feedback, points_earned > 0, answer_id))
+            row = cursor.execute('SELECT submission_id FROM answers WHERE id = ?', (answer_id,)).fetchone()
             
             conn.commit()
+            # Declared and noted as a submissions write too, so every answers change is in submission_log
+            self.note_submissions_changed([row[0]] if row else [])
             return True
         except Exception as e:
             print(f"Error updating answer grade: {e}")
@@ -1360,6 +1003,7 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @invalidates('submissions', 'answers')
     def update_submission_grade(self, submission_id: int, total_earned_score: float, total_possible_score: float, updated_answers: list) -> bool:
         """Update submission grade with individual answer scores"""
         conn = self.get_connection()
@@ -1379,21 +1023,21 @@ class DatabaseManager:
                     # Update by answer ID if available
                     cursor.execute('''
                         UPDATE answers 
-                        SET points_earned = ?, feedback = ?
+                        SET points_earned = ?, feedback = ?, grade_source = 'manual'
                         WHERE id = ?
                     ''', (points_earned, feedback, answer_id))
                 elif question_id:
                     # Update by question ID and submission ID
                     cursor.execute('''
                         UPDATE answers 
-                        SET points_earned = ?, feedback = ?
+                        SET points_earned = ?, feedback = ?, grade_source = 'manual'
                         WHERE submission_id = ? AND question_id = ?
                     ''', (points_earned, feedback, submission_id, question_id))
                 else:
                     # Fallback: update by position (assuming answers are in order)
                     cursor.execute('''
                         UPDATE answers 
-                        SET points_earned = ?, feedback = ?
+                        SET points_earned = ?, feedback = ?, grade_source = 'manual'
                         WHERE submission_id = ? AND id IN (
                             SELECT id FROM answers 
                             WHERE submission_id = ? 
@@ -1410,6 +1054,7 @@ class DatabaseManager:
             ''', (total_earned_score, total_earned_score, total_possible_score, submission_id))
             
             conn.commit()
+            self.note_submissions_changed([submission_id])
             # Get the number of rows affected
             rows_affected = cursor.rowcount
             print(f"DEBUG: Updated submission {submission_id} with score {total_earned_score}/{total_possible_score}")
@@ -1422,6 +1067,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('submissions')
     def finalize_submission_grade(self, submission_id: int) -> bool:
         """Calculate final score and mark submission as graded"""
         conn = self.get_connection()
@@ -1440,11 +1086,12 @@ class DatabaseManager:
             # Update submission
             cursor.execute('''
                 UPDATE submissions 
-                SET total_score = ?, is_graded = 1
+                SET score = ?, total_score = ?, is_graded = 1
                 WHERE id = ?
-            ''', (total_score, submission_id))
+            ''', (total_score, total_score, submission_id))
             
             conn.commit()
+            self.note_submissions_changed([submission_id])
             return True
         except Exception as e:
             print(f"Error finalizing grade: {e}")
@@ -1532,6 +1179,7 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @invalidates('users')
     def update_user_profile(self, user_id: int, full_name: str = None, email: str = None, 
                            admin_id_number: str = None, student_number: str = None, 
                            section: str = None, security_question: str = None, 
@@ -1597,6 +1245,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('users')
     def update_user_password(self, user_id: int, new_password: str) -> bool:
         """Update user password"""
         conn = self.get_connection()
@@ -1650,6 +1299,7 @@ class DatabaseManager:
         """Get student information by ID (alias for get_user_by_id)"""
         return self.get_user_by_id(student_id)
     
+    @cached('post_sections', 'posts')
     def get_post_sections(self, assessment_id: int) -> List[str]:
         """Get sections assigned to a published assessment"""
         conn = self.get_connection()
@@ -1712,11 +1362,12 @@ class DatabaseManager:
             cursor.execute("""
                 SELECT a.id, a.title, a.description, a.created_at, a.created_by, a.is_active,
                        u.full_name as creator_name
-                FROM announcements a
+                FROM announcement_sections s
+                JOIN announcements a ON a.id = s.announcement_id
                 LEFT JOIN users u ON a.created_by = u.id
-                WHERE a.target_sections IS NULL OR a.target_sections LIKE ?
+                WHERE s.section IN (?, ?)
                 ORDER BY a.created_at DESC
-            """, (f'%"{section}"%',))
+            """, (section, ALL_SECTIONS))
             
             rows = cursor.fetchall()
             announcements = []
@@ -1798,6 +1449,7 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @cached('announcements', 'users')
     def get_announcements(self, user_id: int = None) -> List[Dict]:
         """Get all announcements"""
         print("Getting announcements from database...")
@@ -1885,6 +1537,44 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @cached('announcements', 'announcement_sections', 'users')
+    def get_active_announcements_for_section(self, section: str) -> List[Dict]:
+        """Active announcements a student in ``section`` should see (theirs plus the all-sections ones)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                SELECT a.id, a.title, a.description, a.created_by, a.is_active, a.created_at,
+                       u.full_name as creator_name, a.target_sections
+                FROM announcement_sections s
+                JOIN announcements a ON a.id = s.announcement_id
+                LEFT JOIN users u ON a.created_by = u.id
+                WHERE s.section IN (?, ?) AND a.is_active = 1
+                ORDER BY a.created_at DESC
+            ''', (section or ALL_SECTIONS, ALL_SECTIONS))
+            
+            announcements = []
+            for result in cursor.fetchall():
+                announcements.append({
+                    'id': result[0],
+                    'title': result[1],
+                    'content': result[2] or '',
+                    'created_by': result[3],
+                    'is_active': result[4],
+                    'created_at': result[5],
+                    'creator_name': result[6] or 'Unknown',
+                    'target_sections': result[7]
+                })
+            return announcements
+            
+        except Exception as e:
+            print(f"Error getting active announcements for section {section}: {e}")
+            return []
+        finally:
+            conn.close()
+    
+    @invalidates('announcements')
     def toggle_announcement_status(self, announcement_id: int) -> bool:
         """Toggle the active status of an announcement"""
         conn = self.get_connection()
@@ -1919,6 +1609,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('announcements', 'announcement_sections')
     def delete_announcement(self, announcement_id: int) -> bool:
         """Delete an announcement"""
         conn = self.get_connection()
@@ -1928,6 +1619,7 @@ class DatabaseManager:
             cursor.execute('DELETE FROM announcements WHERE id = ?', (announcement_id,))
             
             if cursor.rowcount > 0:
+                cursor.execute('DELETE FROM announcement_sections WHERE announcement_id = ?', (announcement_id,))
                 conn.commit()
                 print(f"Deleted announcement with ID {announcement_id}")
                 return True
@@ -1941,6 +1633,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('announcements', 'announcement_sections')
     def update_announcement(self, announcement_id: int, title: str, content: str, target_sections: str = None) -> bool:
         """Update an existing announcement"""
         conn = self.get_connection()
@@ -1954,6 +1647,7 @@ class DatabaseManager:
             ''', (title, content, target_sections, announcement_id))
             
             if cursor.rowcount > 0:
+                self.write_announcement_sections(cursor, announcement_id, target_sections)
                 conn.commit()
                 print(f"Updated announcement with ID {announcement_id}")
                 return True
@@ -1967,6 +1661,7 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @invalidates('announcements', 'announcement_sections')
     def create_announcement(self, title: str, content: str, created_by: int, target_sections: str = None) -> bool:
         """Create a new announcement"""
         conn = self.get_connection()
@@ -1979,6 +1674,7 @@ class DatabaseManager:
             ''', (title, content, created_by, target_sections))
             
             announcement_id = cursor.lastrowid
+            self.write_announcement_sections(cursor, announcement_id, target_sections)
             conn.commit()
             print(f"Created announcement with ID: {announcement_id}")
             return True
@@ -2121,6 +1817,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('posts', 'post_sections')
     def create_material(self, title: str, description: str, file_path: str, created_by: int, target_sections: str = None) -> bool:
         """Create a new material upload record"""
         conn = self.get_connection()
@@ -2157,12 +1854,14 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @cached('posts', 'users')
     def get_materials(self) -> List[Dict]:
         """Get all uploaded materials"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
+            cursor.row_factory = MaterialRecord.row_factory
             cursor.execute('''
                 SELECT p.id, p.title, p.description, p.file_path, p.created_at, u.full_name as creator_name
                 FROM posts p
@@ -2170,19 +1869,7 @@ class DatabaseManager:
                 WHERE p.post_type = 'file'
                 ORDER BY p.created_at DESC
             ''')
-            
-            materials = []
-            for row in cursor.fetchall():
-                materials.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'file_path': row[3],
-                    'created_at': row[4],
-                    'creator_name': row[5]
-                })
-            
-            return materials
+            return cursor.fetchall()
             
         except Exception as e:
             print(f"Error getting materials: {e}")
@@ -2190,6 +1877,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('posts', 'post_sections')
     def delete_material(self, material_id: int) -> bool:
         """Delete a material and its associated file"""
         conn = self.get_connection()
@@ -2229,6 +1917,7 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @invalidates('posts')
     def update_material(self, material_id: int, title: str, description: str = None) -> bool:
         """Update material title and description"""
         conn = self.get_connection()
@@ -2250,3 +1939,692 @@ class DatabaseManager:
             return False
         finally:
             conn.close()
+
+    # ------------------------- Paginated listings -------------------------
+    # Keyset-paginated variants of the full-table getters above. Each takes
+    # ``after`` (the previous page's ``next_cursor``) and ``limit``, filters and
+    # sorts in SQL, and returns a ResultPage. Every sort maps to an index, so a
+    # page costs O(limit) however many rows have accumulated.
+
+    SUBMISSION_SORTS = {
+        'score': SortKey('COALESCE(s.score, s.total_score, 0)', 's.id', True, 'score', 'submission_id'),
+        'submitted': SortKey('s.submitted_at', 's.id', True, 'submitted_at', 'submission_id'),
+        'name': SortKey('u.full_name', 'u.id', False, 'full_name', 'user_id'),
+    }
+
+    @cached('submissions', 'users')
+    def page_assessment_submissions(self, assessment_id: int, after: Cursor = None,
+                                    limit: int = DEFAULT_PAGE_SIZE, sort: str = 'score',
+                                    search: str = None) -> ResultPage:
+        """One page of an assessment's submissions, optionally filtered by student name or number"""
+        order = resolve_sort(self.SUBMISSION_SORTS, sort)
+        where = ['s.assessment_id = ?']
+        params = [assessment_id]
+        if search:
+            where.append("(u.full_name LIKE ? ESCAPE '\\' OR u.student_number LIKE ? ESCAPE '\\')")
+            params += [contains_pattern(search)] * 2
+        if sort == 'name':
+            # Walk students in name order and probe UNIQUE(assessment_id, student_id)
+            source = "FROM users u JOIN submissions s ON s.student_id = u.id"
+            where.insert(0, "u.role = 'student'")
+        else:
+            source = "FROM submissions s JOIN users u ON u.id = s.student_id"
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = ScoreListingRecord.row_factory
+            return fetch_page(cursor, f'''
+                SELECT s.id, u.id, u.full_name, COALESCE(u.student_number, 'N/A'), COALESCE(u.section, 'N/A'),
+                       COALESCE(s.score, s.total_score, 0), COALESCE(s.max_score, 0), s.submitted_at, s.is_graded
+                {source}
+            ''', order, where=where, params=params, after=after, limit=limit)
+
+    def get_assessment_score_summary(self, assessment_id: int) -> Dict:
+        """Submission count, average and highest percentage for an assessment, aggregated in SQL.
+
+        Kept off the analytics snapshot: after an unnoted write, validating the snapshot re-aggregates
+        every answer, while this reads only the assessment's submissions."""
+        with self.connection() as conn:
+            row = conn.execute('''
+                SELECT COUNT(*),
+                       AVG(CASE WHEN max_score > 0 THEN COALESCE(score, total_score, 0) * 100.0 / max_score ELSE 0 END),
+                       MAX(CASE WHEN max_score > 0 THEN COALESCE(score, total_score, 0) * 100.0 / max_score ELSE 0 END)
+                FROM submissions
+                WHERE assessment_id = ?
+            ''', (assessment_id,)).fetchone()
+        return {'total_students': row[0], 'average_percentage': row[1] or 0, 'highest_percentage': row[2] or 0}
+
+    PUBLISHED_SORTS = {
+        'newest first': SortKey('a.created_at', 'a.id', True, 'created_at', 'id'),
+        'oldest first': SortKey('a.created_at', 'a.id', False, 'created_at', 'id'),
+        'most students': SortKey('st.taken', 'st.assessment_id', True, 'students_taken', 'id'),
+        'least students': SortKey('st.taken', 'st.assessment_id', False, 'students_taken', 'id'),
+    }
+
+    @cached('assessments', 'questions', 'submissions')
+    def page_published_assessments_with_stats(self, after: Cursor = None, limit: int = DEFAULT_PAGE_SIZE,
+                                              sort: str = 'newest first', search: str = None) -> ResultPage:
+        """One page of get_published_assessments_with_stats, sorted and title-filtered in SQL"""
+        order = resolve_sort(self.PUBLISHED_SORTS, sort)
+        where = ["a.status IN ('published', 'done')"]
+        params = []
+        if search:
+            where.append("a.title LIKE ? ESCAPE '\\'")
+            params.append(contains_pattern(search))
+        if order.column.startswith('st.'):
+            source = "FROM assessment_stats st JOIN assessments a ON a.id = st.assessment_id"
+        else:
+            source = "FROM assessments a LEFT JOIN assessment_stats st ON st.assessment_id = a.id"
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = PublishedAssessmentRecord.row_factory
+            page = fetch_page(cursor, f'''
+                SELECT a.id, a.title, a.description, a.created_at, a.start_time, a.end_time,
+                       COALESCE(st.question_count, 0), COALESCE(st.total_points, 0),
+                       COALESCE(st.taken, 0), COALESCE(st.graded, 0),
+                       COALESCE(st.score_sum, 0), COALESCE(st.score_sq_sum, 0)
+                {source}
+            ''', order, where=where, params=params, after=after, limit=limit)
+        for row in page.items:
+            assessment_stats.summarize(row)
+        return page
+
+    @cached('assessments', 'users')
+    def page_assessments(self, after: Cursor = None, limit: int = DEFAULT_PAGE_SIZE,
+                         search: str = None, status: str = None) -> ResultPage:
+        """One page of every assessment, newest first (the admin listing)"""
+        where, params = [], []
+        if status:
+            where.append("a.status = ?")
+            params.append(status)
+        if search:
+            where.append("a.title LIKE ? ESCAPE '\\'")
+            params.append(contains_pattern(search))
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = AssessmentRecord.row_factory
+            return fetch_page(cursor, '''
+                SELECT a.id, a.title, a.description, a.created_by, a.start_time, a.end_time,
+                       a.duration_minutes, a.status, a.is_active, a.created_at, u.full_name as creator_name
+                FROM assessments a
+                JOIN users u ON a.created_by = u.id
+            ''', SortKey('a.created_at', 'a.id', True, 'created_at', 'id'),
+                where=where, params=params, after=after, limit=limit)
+
+    @cached('announcements', 'users')
+    def page_announcements(self, after: Cursor = None, limit: int = DEFAULT_PAGE_SIZE,
+                           search: str = None, active_only: bool = False) -> ResultPage:
+        """One page of announcements, newest first, in get_announcements' shape"""
+        where, params = [], []
+        if active_only:
+            where.append("a.is_active = 1")
+        if search:
+            where.append("(a.title LIKE ? ESCAPE '\\' OR a.description LIKE ? ESCAPE '\\')")
+            params += [contains_pattern(search)] * 2
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = AnnouncementRecord.row_factory
+            return fetch_page(cursor, '''
+                SELECT a.id, a.title, COALESCE(a.description, ''), a.created_by, a.is_active, a.created_at,
+                       COALESCE(u.full_name, 'Unknown'), NULL
+                FROM announcements a
+                LEFT JOIN users u ON a.created_by = u.id
+            ''', SortKey('a.created_at', 'a.id', True, 'created_at', 'id'),
+                where=where, params=params, after=after, limit=limit)
+
+    @cached('posts', 'users')
+    def page_materials(self, after: Cursor = None, limit: int = DEFAULT_PAGE_SIZE,
+                       search: str = None) -> ResultPage:
+        """One page of uploaded materials, newest first"""
+        where, params = ["p.post_type = 'file'"], []
+        if search:
+            where.append("p.title LIKE ? ESCAPE '\\'")
+            params.append(contains_pattern(search))
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = MaterialRecord.row_factory
+            return fetch_page(cursor, '''
+                SELECT p.id, p.title, p.description, p.file_path, p.created_at, u.full_name as creator_name
+                FROM posts p
+                JOIN users u ON p.created_by = u.id
+            ''', SortKey('p.created_at', 'p.id', True, 'created_at', 'id'),
+                where=where, params=params, after=after, limit=limit)
+
+    def page_file_submissions(self, post_id: int, after: Cursor = None,
+                              limit: int = DEFAULT_PAGE_SIZE) -> ResultPage:
+        """One page of a post's file submissions, newest first"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = FileSubmissionRecord.row_factory
+            return fetch_page(cursor, '''
+                SELECT fs.id, fs.post_id, fs.student_id, u.full_name, fs.file_path, fs.submitted_at
+                FROM file_submissions fs
+                JOIN users u ON u.id = fs.student_id
+            ''', SortKey('fs.submitted_at', 'fs.id', True, 'submitted_at', 'id'),
+                where=['fs.post_id = ?'], params=[post_id], after=after, limit=limit)
+
+    def page_users(self, after: Cursor = None, limit: int = DEFAULT_PAGE_SIZE, role: str = 'student',
+                   search: str = None) -> ResultPage:
+        """One page of users with ``role``, by name (the paginated replacement for list_all_users)"""
+        where, params = ['role = ?'], [role]
+        if search:
+            where.append("(full_name LIKE ? ESCAPE '\\' OR username LIKE ? ESCAPE '\\' "
+                         "OR student_number LIKE ? ESCAPE '\\')")
+            params += [contains_pattern(search)] * 3
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = UserListingRecord.row_factory
+            return fetch_page(cursor, '''
+                SELECT id, username, email, role, full_name, student_number, section
+                FROM users
+            ''', SortKey('full_name', 'id', False, 'full_name', 'id'),
+                where=where, params=params, after=after, limit=limit)
+
+    # ------------------------- Search -------------------------
+    SEARCH_SCOPES = ('announcements', 'assessments', 'materials', 'questions', 'comments')
+
+    # posts_fts scopes by post_type; 'posts' ranks both kinds in one pass over the index
+    _POST_SCOPES = {'assessments': ('assessment',), 'materials': ('file',), 'posts': ('assessment', 'file')}
+
+    # bm25 costs about a microsecond per matching document, so a word found in
+    # tens of thousands of rows is ranked among its newest matches only
+    SEARCH_RANK_WINDOW = 1000
+
+    # What a student in section ? may open; materials without sections are for everyone
+    _POST_VISIBLE = ('(EXISTS (SELECT 1 FROM post_sections ps WHERE ps.post_id = {p}.id AND ps.section = ?) '
+                     "OR ({p}.post_type = 'file' AND NOT EXISTS (SELECT 1 FROM post_sections ps "
+                     'WHERE ps.post_id = {p}.id)))')
+    _ANNOUNCEMENT_VISIBLE = ('({a}.is_active = 1 AND EXISTS (SELECT 1 FROM announcement_sections s '
+                             'WHERE s.announcement_id = {a}.id AND s.section IN (?, ?)))')
+
+    def _search_sql(self, scope: str, section: Optional[str]) -> Tuple[str, str, str, list]:
+        """(fts table, result columns, FROM ... WHERE, params after the MATCH) for one scope"""
+        if scope == 'announcements':
+            columns = '''
+                'announcements', a.id, a.title, {snippet}, a.created_at, NULL, NULL, announcements_fts.rank
+            '''
+            source = '''
+                FROM announcements_fts
+                JOIN announcements a ON a.id = announcements_fts.rowid
+                WHERE announcements_fts MATCH ?
+            '''
+            if section is None:
+                return 'announcements_fts', columns, source, []
+            return ('announcements_fts', columns, source + ' AND ' + self._ANNOUNCEMENT_VISIBLE.format(a='a'),
+                    [section, ALL_SECTIONS])
+        if scope in self._POST_SCOPES:
+            post_types = self._POST_SCOPES[scope]
+            columns = '''
+                CASE p.post_type WHEN 'file' THEN 'materials' ELSE 'assessments' END,
+                p.id, p.title, {snippet}, p.created_at, p.post_type, p.assessment_id, posts_fts.rank
+            '''
+            source = f'''
+                FROM posts_fts
+                JOIN posts p ON p.id = posts_fts.rowid
+                WHERE posts_fts MATCH ? AND p.post_type IN ({', '.join('?' * len(post_types))})
+            '''
+            if section is None:
+                return 'posts_fts', columns, source, list(post_types)
+            return ('posts_fts', columns, source + ' AND ' + self._POST_VISIBLE.format(p='p'),
+                    list(post_types) + [section])
+        if scope == 'questions':
+            columns = '''
+                'questions', q.id, a.title, {snippet}, q.created_at, 'assessment', q.assessment_id,
+                questions_fts.rank
+            '''
+            source = '''
+                FROM questions_fts
+                JOIN questions q ON q.id = questions_fts.rowid
+                JOIN assessments a ON a.id = q.assessment_id
+                WHERE questions_fts MATCH ?
+            '''
+            return 'questions_fts', columns, source, []
+        if scope == 'comments':
+            columns = '''
+                'comments', c.id, COALESCE(an.title, p.title), {snippet}, c.created_at,
+                COALESCE(c.post_type, 'post'), c.post_id, comments_fts.rank
+            '''
+            source = '''
+                FROM comments_fts
+                JOIN comments c ON c.id = comments_fts.rowid
+                LEFT JOIN announcements an ON c.post_type = 'announcement' AND an.id = c.post_id
+                LEFT JOIN posts p ON COALESCE(c.post_type, 'post') != 'announcement' AND p.id = c.post_id
+                WHERE comments_fts MATCH ?
+            '''
+            if section is None:
+                return 'comments_fts', columns, source, []
+            visible = (f"((an.id IS NOT NULL AND {self._ANNOUNCEMENT_VISIBLE.format(a='an')}) "
+                       f"OR (p.id IS NOT NULL AND {self._POST_VISIBLE.format(p='p')}))")
+            return 'comments_fts', columns, source + ' AND ' + visible, [section, ALL_SECTIONS, section]
+        raise ValueError(f"Unknown search scope '{scope}'; expected one of {list(self.SEARCH_SCOPES)}")
+
+    @cached('announcements', 'announcement_sections', 'posts', 'post_sections', 'questions', 'comments',
+            'assessments')
+    def search(self, query: str, scopes: Tuple[str, ...] = None, section: str = None,
+               limit: int = 20) -> List[Dict]:
+        """Full-text search over ``scopes``, best match first, each hit with a highlighted snippet.
+
+        ``section`` restricts the results to what a student in that section can
+        see, and never includes questions. Leave it None for admins.
+        """
+        expression = search_index.match_query(query)
+        if expression is None:
+            return []
+        scopes = [scope for scope in (self.SEARCH_SCOPES if scopes is None else scopes)
+                  if not (section is not None and scope == 'questions')]
+        if 'assessments' in scopes and 'materials' in scopes:
+            scopes = [scope for scope in scopes if scope != 'materials']
+            scopes[scopes.index('assessments')] = 'posts'
+        results = []
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            for scope in scopes:
+                fts, columns, source, params = self._search_sql(scope, section)
+                # Rowid of the oldest match inside the rank window (None: the window holds every match)
+                cursor.row_factory = None
+                cursor.execute(f"SELECT {fts}.rowid {source} ORDER BY {fts}.rowid DESC LIMIT 1 OFFSET ?",
+                               [expression] + params + [self.SEARCH_RANK_WINDOW - 1])
+                oldest = cursor.fetchone()
+                window, window_params = (f" AND {fts}.rowid >= ?", [oldest[0]]) if oldest else ('', [])
+
+                snippet = f"snippet({fts}, -1, ?, ?, '…', 12)"
+                cursor.row_factory = SearchResultRecord.row_factory
+                cursor.execute(f"SELECT {columns.format(snippet=snippet)} {source}{window} ORDER BY rank LIMIT ?",
+                               [search_index.HIGHLIGHT_START, search_index.HIGHLIGHT_END, expression]
+                               + params + window_params + [limit])
+                results.extend(cursor.fetchall())
+        # bm25 is negative; lower is a better match
+        results.sort(key=lambda r: r['rank'])
+        return results[:limit]
+
+    # ------------------------- Exports -------------------------
+    def iter_assessment_answers(self, assessment_id: int, batch_size: int = 500):
+        """Stream every answer to an assessment, student by student in question order.
+
+        get_submission_details for all of the assessment's submissions at once, in
+        fetchmany batches; the connection is held until the iterator is exhausted.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = AnswerExportRecord.row_factory
+            cursor.execute('''
+                SELECT s.id, u.student_number, u.full_name, u.section, q.order_index, q.question_text,
+                       q.question_type, q.points, q.correct_answer, a.answer_text, a.is_correct,
+                       COALESCE(a.points_earned, 0), a.feedback
+                FROM submissions s
+                JOIN users u ON u.id = s.student_id
+                JOIN answers a ON a.submission_id = s.id
+                JOIN questions q ON q.id = a.question_id
+                WHERE s.assessment_id = ?
+                ORDER BY u.full_name, s.id, q.order_index
+            ''', (assessment_id,))
+            yield from iter_records(cursor, batch_size)
+
+    def count_assessment_answers(self, assessment_id: int) -> int:
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT COUNT(*)
+                FROM submissions s
+                JOIN answers a ON a.submission_id = s.id
+                WHERE s.assessment_id = ?
+            ''', (assessment_id,)).fetchone()[0]
+
+    def get_section_gradebook_assessments(self, section: str) -> List[Dict]:
+        """Published assessments posted to ``section``, oldest first: the columns of its gradebook"""
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT a.id, a.title, COALESCE(st.total_points, 0)
+                FROM assessments a
+                LEFT JOIN assessment_stats st ON st.assessment_id = a.id
+                WHERE a.status IN ('published', 'done')
+                  AND a.id IN (SELECT p.assessment_id FROM post_sections ps
+                               JOIN posts p ON p.id = ps.post_id
+                               WHERE ps.section = ?)
+                ORDER BY a.created_at, a.id
+            ''', (section,)).fetchall()
+        return [{'id': r[0], 'title': r[1], 'total_points': r[2]} for r in rows]
+
+    def iter_section_gradebook(self, section: str, assessment_ids: List[int], batch_size: int = 500):
+        """Stream one dict per student in ``section``, by name, with their submissions to ``assessment_ids``.
+
+        ``scores`` maps assessment id to (score, max_score, is_graded); assessments
+        the student has not taken are absent.
+        """
+        placeholders = ', '.join('?' * len(assessment_ids))
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT u.id, u.student_number, u.full_name, s.assessment_id,
+                       COALESCE(s.score, s.total_score, 0), COALESCE(s.max_score, 0), s.is_graded
+                FROM users u
+                LEFT JOIN submissions s ON s.student_id = u.id AND s.assessment_id IN ({placeholders})
+                WHERE u.section = ? AND u.role = 'student'
+                ORDER BY u.full_name, u.id
+            ''', list(assessment_ids) + [section])
+            student = None
+            for row in iter_records(cursor, batch_size):
+                if student is None or student['student_id'] != row[0]:
+                    if student is not None:
+                        yield student
+                    student = {'student_id': row[0], 'student_number': row[1], 'student_name': row[2],
+                               'scores': {}}
+                if row[3] is not None:
+                    student['scores'][row[3]] = (row[4], row[5], bool(row[6]))
+            if student is not None:
+                yield student
+
+    # ------------------------- Gradebook -------------------------
+    def get_gradebook_matrix(self, section: str):
+        """Students x assessments GradebookMatrix for ``section`` (see database/gradebook.py)"""
+        if self.gradebooks is None:
+            from database.gradebook import GradebookCache
+            self.gradebooks = GradebookCache(self)
+        return self.gradebooks.get(section)
+
+    def note_submissions_changed(self, submission_ids: List[int]) -> None:
+        """Called once by every declared submissions write, so derived caches patch just those rows"""
+        self.submission_log.note(submission_ids)
+
+    def get_section_students(self, section: str) -> List[Tuple]:
+        """(id, student_number, full_name) of every student in ``section``, by name"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT id, student_number, full_name
+                FROM users
+                WHERE section = ? AND role = 'student'
+                ORDER BY full_name, id
+            ''', (section,)).fetchall()
+
+    def get_section_gradebook_cells(self, section: str) -> List[Tuple]:
+        """Every submission by a student in ``section`` to an assessment posted to it.
+
+        Numeric rows only, (student_id, assessment_id, score, max_score, is_graded),
+        ready for ``numpy.array``.
+        """
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT s.student_id, s.assessment_id, COALESCE(s.score, s.total_score, 0), COALESCE(s.max_score, 0),
+                       COALESCE(s.is_graded, 0)
+                FROM submissions s
+                JOIN users u ON u.id = s.student_id
+                WHERE s.assessment_id IN (
+                        SELECT p.assessment_id FROM post_sections ps
+                        JOIN posts p ON p.id = ps.post_id
+                        JOIN assessments a ON a.id = p.assessment_id
+                        WHERE ps.section = ? AND a.status IN ('published', 'done'))
+                  AND u.section = ? AND u.role = 'student'
+            ''', (section, section)).fetchall()
+
+    def get_submission_cells(self, submission_ids: List[int]) -> List[Tuple]:
+        """(student_id, assessment_id, score, max_score, is_graded) of each existing submission"""
+        if not submission_ids:
+            return []
+        with self.connection() as conn:
+            return conn.execute(f'''
+                SELECT student_id, assessment_id, COALESCE(score, total_score, 0), COALESCE(max_score, 0),
+                       COALESCE(is_graded, 0)
+                FROM submissions
+                WHERE id IN ({', '.join('?' * len(submission_ids))})
+            ''', list(submission_ids)).fetchall()
+
+    # ------------------------- Item analysis -------------------------
+    @cached('questions', 'submissions', 'answers')
+    def get_item_analysis(self, assessment_id: int):
+        """ItemAnalysis of an assessment's questions (see database/item_analysis.py); treat it as read-only"""
+        from database.item_analysis import ItemAnalysis
+        return ItemAnalysis.build(assessment_id, self.get_questions(assessment_id),
+                                  self.get_analytics_snapshot(assessment_id))
+
+    def get_item_analysis_answers(self, assessment_id: int, after_submission_id: int = 0) -> List[Tuple]:
+        """(submission_id, question_id, points_earned, choice) of every answer to the assessment.
+
+        ``choice`` is the answer text for multiple-choice questions and NULL otherwise,
+        so long short answers are not copied out of SQLite. ``after_submission_id``
+        limits it to newer submissions.
+        """
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT a.submission_id, a.question_id, COALESCE(a.points_earned, 0),
+                       CASE WHEN q.question_type = 'mcq' THEN a.answer_text END
+                FROM submissions s
+                JOIN answers a ON a.submission_id = s.id
+                JOIN questions q ON q.id = a.question_id
+                WHERE s.assessment_id = ? AND s.id > ?
+            ''', (assessment_id, after_submission_id)).fetchall()
+
+    # ------------------------- Analytics snapshot -------------------------
+    def get_analytics_snapshot(self, assessment_id: int):
+        """Memory-mapped AnalyticsSnapshot of an assessment (see database/analytics_snapshot.py)"""
+        if self.snapshots is None:
+            from database.analytics_snapshot import SnapshotStore
+            self.snapshots = SnapshotStore(self)
+        return self.snapshots.get(assessment_id)
+
+    def get_snapshot_submissions(self, assessment_id: int, after_submission_id: int = 0) -> List[Tuple]:
+        """(id, student_id, score, max_score, is_graded) of the assessment's submissions newer than the id, by id"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT id, student_id, COALESCE(score, total_score, 0), COALESCE(max_score, 0),
+                       COALESCE(is_graded, 0)
+                FROM submissions
+                WHERE assessment_id = ? AND id > ?
+                ORDER BY id
+            ''', (assessment_id, after_submission_id)).fetchall()
+
+    def get_snapshot_submission_rows(self, assessment_id: int, submission_ids: List[int]) -> List[Tuple]:
+        """get_snapshot_submissions rows of just ``submission_ids`` (those still in the assessment)"""
+        if not submission_ids:
+            return []
+        with self.connection() as conn:
+            return conn.execute(f'''
+                SELECT id, student_id, COALESCE(score, total_score, 0), COALESCE(max_score, 0),
+                       COALESCE(is_graded, 0)
+                FROM submissions
+                WHERE id IN ({', '.join('?' * len(submission_ids))}) AND assessment_id = ?
+                ORDER BY id
+            ''', [*submission_ids, assessment_id]).fetchall()
+
+    def get_submission_answer_rows(self, submission_ids: List[int]) -> List[Tuple]:
+        """get_item_analysis_answers rows of just ``submission_ids``"""
+        if not submission_ids:
+            return []
+        with self.connection() as conn:
+            return conn.execute(f'''
+                SELECT a.submission_id, a.question_id, COALESCE(a.points_earned, 0),
+                       CASE WHEN q.question_type = 'mcq' THEN a.answer_text END
+                FROM answers a
+                JOIN questions q ON q.id = a.question_id
+                WHERE a.submission_id IN ({', '.join('?' * len(submission_ids))})
+            ''', list(submission_ids)).fetchall()
+
+    def count_assessment_submissions(self, assessment_id: int) -> int:
+        with self.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM submissions WHERE assessment_id = ?',
+                                (assessment_id,)).fetchone()[0]
+
+    def get_snapshot_fingerprint(self, assessment_id: int, through_submission_id: int) -> Tuple:
+        """(submissions, score sum, graded, answers, points sum) up to a submission id, aggregated in SQL"""
+        with self.connection() as conn:
+            count, score_sum, graded = conn.execute('''
+                SELECT COUNT(*), TOTAL(COALESCE(score, total_score, 0)), TOTAL(COALESCE(is_graded, 0))
+                FROM submissions
+                WHERE assessment_id = ? AND id <= ?
+            ''', (assessment_id, through_submission_id)).fetchone()
+            answers, points_sum = conn.execute('''
+                SELECT COUNT(a.id), TOTAL(a.points_earned)
+                FROM submissions s
+                JOIN answers a ON a.submission_id = s.id
+                JOIN questions q ON q.id = a.question_id
+                WHERE s.assessment_id = ? AND s.id <= ?
+            ''', (assessment_id, through_submission_id)).fetchone()
+        return count, score_sum, int(graded), answers, points_sum
+
+    # ------------------------- Regrade -------------------------
+    def get_regrade_answers(self, assessment_id: int) -> List[Tuple]:
+        """(answer_id, submission_id, question_id, answer_text, is_correct, points_earned) of every answer"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT a.id, a.submission_id, a.question_id, a.answer_text, COALESCE(a.is_correct, 0),
+                       COALESCE(a.points_earned, 0)
+                FROM submissions s
+                JOIN answers a ON a.submission_id = s.id
+                WHERE s.assessment_id = ?
+            ''', (assessment_id,)).fetchall()
+
+    def get_regrade_submissions(self, assessment_id: int) -> List[Tuple]:
+        """(id, student_number, full_name, score, max_score, is_graded) of every submission to the assessment"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT s.id, u.student_number, u.full_name, COALESCE(s.score, s.total_score, 0),
+                       COALESCE(s.max_score, 0), COALESCE(s.is_graded, 0)
+                FROM submissions s
+                JOIN users u ON u.id = s.student_id
+                WHERE s.assessment_id = ?
+                ORDER BY u.full_name, s.id
+            ''', (assessment_id,)).fetchall()
+
+    @invalidates('submissions', 'answers')
+    def apply_regrade(self, answer_grades: List[Tuple], submission_scores: List[Tuple],
+                      submission_ids: List[int]) -> None:
+        """Write a regrade (see database/regrade.py) in one transaction.
+
+        ``answer_grades`` are (points_earned, is_correct, answer_id) and
+        ``submission_scores`` are (score, total_score, max_score, submission_id);
+        ``submission_ids`` are every submission either of them touches.
+        """
+        with self.transaction() as conn:
+            conn.executemany('UPDATE answers SET points_earned = ?, is_correct = ? WHERE id = ?', answer_grades)
+            conn.executemany('UPDATE submissions SET score = ?, total_score = ?, max_score = ? WHERE id = ?',
+                             submission_scores)
+        self.note_submissions_changed(submission_ids)
+
+    # ------------------------- Short-answer auto-grading -------------------------
+    def get_short_answer_rows(self, assessment_id: int) -> List[Tuple]:
+        """(answer_id, submission_id, question_id, answer_text, points_earned, grade_source, auto_confidence)
+        of every short answer to the assessment"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT a.id, a.submission_id, a.question_id, a.answer_text, COALESCE(a.points_earned, 0),
+                       a.grade_source, a.auto_confidence
+                FROM submissions s
+                JOIN answers a ON a.submission_id = s.id
+                JOIN questions q ON q.id = a.question_id
+                WHERE s.assessment_id = ? AND q.question_type = 'short_answer'
+            ''', (assessment_id,)).fetchall()
+
+    @invalidates('submissions', 'answers')
+    def apply_auto_grades(self, answer_grades: List[Tuple], submission_scores: List[Tuple],
+                          submission_ids: List[int]) -> None:
+        """Write a short-answer auto-grading run (see database/auto_grade.py) in one transaction.
+
+        ``answer_grades`` are (points_earned, is_correct, auto_confidence,
+        grade_source, answer_id) and ``submission_scores`` are (score,
+        total_score, is_graded, submission_id); ``submission_ids`` are every
+        submission either of them touches.
+        """
+        with self.transaction() as conn:
+            conn.executemany('''
+                UPDATE answers SET points_earned = ?, is_correct = ?, auto_confidence = ?, grade_source = ?
+                WHERE id = ?
+            ''', answer_grades)
+            conn.executemany('UPDATE submissions SET score = ?, total_score = ?, is_graded = ? WHERE id = ?',
+                             submission_scores)
+        self.note_submissions_changed(submission_ids)
+
+    # ------------------------- Grade by question -------------------------
+    def get_question_answers(self, question_id: int) -> List[Dict]:
+        """Every submission's answer to one question with its student and current total, by student name"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = QuestionAnswerRecord.row_factory
+            return cursor.execute('''
+                SELECT a.id, a.submission_id, u.student_number, u.full_name, a.answer_text,
+                       COALESCE(a.points_earned, 0), a.feedback, a.grade_source, a.auto_confidence,
+                       COALESCE(s.score, s.total_score, 0), COALESCE(s.max_score, 0), s.is_graded
+                FROM answers a
+                JOIN submissions s ON s.id = a.submission_id
+                JOIN users u ON u.id = s.student_id
+                WHERE a.question_id = ?
+                ORDER BY u.full_name, s.id
+            ''', (question_id,)).fetchall()
+
+    @invalidates('submissions', 'answers')
+    def save_question_grades(self, grades: List[Tuple]) -> List[Tuple]:
+        """Save a page of (points_earned, feedback, answer_id) grades in one transaction.
+
+        The submissions they belong to get their totals recomputed from their
+        answers in one UPDATE. A submission stays ungraded while it still has
+        an auto-grading proposal waiting for review or, if it was ungraded, a
+        short answer nobody has graded yet. Returns (submission_id, score,
+        is_graded) for each of them.
+        """
+        if not grades:
+            return []
+        answer_ids = [answer_id for _, _, answer_id in grades]
+        with self.transaction() as conn:
+            conn.executemany('''
+                UPDATE answers SET points_earned = ?, is_correct = ? > 0, feedback = ?, grade_source = 'manual'
+                WHERE id = ?
+            ''', [(points, points, feedback, answer_id) for points, feedback, answer_id in grades])
+            submission_ids = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT submission_id FROM answers WHERE id IN ({','.join('?' * len(answer_ids))})",
+                answer_ids)]
+            placeholders = ','.join('?' * len(submission_ids))
+            conn.execute(f'''
+                UPDATE submissions
+                SET score = (SELECT COALESCE(SUM(a.points_earned), 0) FROM answers a
+                             WHERE a.submission_id = submissions.id),
+                    total_score = (SELECT COALESCE(SUM(a.points_earned), 0) FROM answers a
+                                   WHERE a.submission_id = submissions.id),
+                    is_graded = NOT EXISTS (SELECT 1 FROM answers a JOIN questions q ON q.id = a.question_id
+                                            WHERE a.submission_id = submissions.id
+                                              AND q.question_type = 'short_answer'
+                                              AND (a.grade_source = 'review' OR (a.grade_source IS NULL
+                                                   AND NOT COALESCE(submissions.is_graded, 0))))
+                WHERE id IN ({placeholders})
+            ''', submission_ids)
+            totals = conn.execute(f"SELECT id, score, is_graded FROM submissions WHERE id IN ({placeholders})",
+                                  submission_ids).fetchall()
+        self.note_submissions_changed(submission_ids)
+        return totals
+
+    # ------------------------- Short-answer similarity -------------------------
+    def get_answer_signatures(self, assessment_id: int) -> List[Tuple]:
+        """(answer_id, question_id, submission_id, student_number, full_name, answer_text, minhash)
+        of every short answer to the assessment"""
+        with self.connection() as conn:
+            return conn.execute('''
+                SELECT a.id, a.question_id, s.id, u.student_number, u.full_name, a.answer_text, a.minhash
+                FROM submissions s
+                JOIN answers a ON a.submission_id = s.id
+                JOIN questions q ON q.id = a.question_id
+                JOIN users u ON u.id = s.student_id
+                WHERE s.assessment_id = ? AND q.question_type = 'short_answer'
+            ''', (assessment_id,)).fetchall()
+
+    def save_answer_signatures(self, signatures: List[Tuple]) -> None:
+        """Store (minhash, answer_id) signatures computed after the fact (see database/similarity.py)"""
+        # No cached result reads answers.minhash, so this write invalidates nothing
+        with self.cache.declared_writes(), self.transaction() as conn:
+            conn.executemany('UPDATE answers SET minhash = ? WHERE id = ?', signatures)
+
+    # ------------------------- Grading queue -------------------------
+    GRADING_QUEUE_ORDER = SortKey('s.submitted_at', 's.id', False, 'submitted_at', 'submission_id')
+
+    def page_grading_queue(self, assessment_id: int, after: Cursor = None,
+                           limit: int = DEFAULT_PAGE_SIZE) -> ResultPage:
+        """The assessment's ungraded submissions, oldest first, from idx_submissions_grading_queue"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = ScoreListingRecord.row_factory
+            return fetch_page(cursor, '''
+                SELECT s.id, u.id, u.full_name, COALESCE(u.student_number, 'N/A'), COALESCE(u.section, 'N/A'),
+                       COALESCE(s.score, s.total_score, 0), COALESCE(s.max_score, 0), s.submitted_at, s.is_graded
+                FROM submissions s JOIN users u ON u.id = s.student_id
+            ''', self.GRADING_QUEUE_ORDER, where=['s.assessment_id = ?', 's.is_graded = 0'],
+                params=[assessment_id], after=after, limit=limit)
+
+    def count_ungraded_submissions(self, assessment_id: int) -> int:
+        """How many of the assessment's submissions are still in the grading queue"""
+        with self.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM submissions WHERE assessment_id = ? AND is_graded = 0',
+                                (assessment_id,)).fetchone()[0]
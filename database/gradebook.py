@@ -0,0 +1,189 @@
+"""
+Students x assessments gradebook for a section, held as NumPy arrays.
+
+One query returns every submission by the section's students to the
+assessments posted to it (post_sections), as plain numeric rows. Those rows are
+pivoted into ``scores`` / ``max_scores`` / ``graded`` matrices with a single
+fancy-indexed assignment. Column and row statistics are then NumPy reductions
+over the whole matrix. NaN marks a missing submission: an assessment the
+student was assigned through post_sections but has no ``submissions`` row for.
+
+GradebookCache keeps one matrix per section. When a grade changes through
+DatabaseManager, the write notes its submission ids. The next read re-reads
+just those rows and patches their cells in place. Any change it cannot
+account for rebuilds the matrix: a structural change (students, assessments,
+section targeting) or a submissions write that did not note its ids.
+"""
+
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# A rebuild is needed when any of these change; 'submissions' changes can be patched
+STRUCTURE_TABLES = ('users', 'assessments', 'posts', 'post_sections')
+
+
+@dataclass
+class GradebookMatrix:
+    section: str
+    students: pd.DataFrame      # index student_id: student_number, student_name (by name)
+    assessments: pd.DataFrame   # index assessment_id: title, total_points (oldest first)
+    scores: np.ndarray          # students x assessments, NaN where nothing was submitted
+    max_scores: np.ndarray
+    graded: np.ndarray          # bool; False for missing cells
+
+    @classmethod
+    def build(cls, section: str, assessments: Sequence[Dict], students: Sequence[Tuple],
+              cells: Sequence[Tuple]) -> 'GradebookMatrix':
+        """Pivot get_section_gradebook_cells rows into the matrix.
+
+        ``students`` are get_section_students rows and ``assessments`` are
+        get_section_gradebook_assessments rows; they become the row and column indexes.
+        """
+        columns = pd.DataFrame.from_records(list(assessments), columns=['id', 'title', 'total_points'])
+        columns = columns.set_index('id')
+        students = pd.DataFrame.from_records(list(students), columns=['student_id', 'student_number',
+                                                                      'student_name'])
+        students = students.set_index('student_id')
+
+        shape = (len(students), len(columns))
+        scores = np.full(shape, np.nan)
+        max_scores = np.full(shape, np.nan)
+        graded = np.zeros(shape, dtype=bool)
+        if cells:
+            values = np.array(cells, dtype=float)
+            rows = students.index.get_indexer(values[:, 0].astype(np.int64))
+            cols = columns.index.get_indexer(values[:, 1].astype(np.int64))
+            scores[rows, cols] = values[:, 2]
+            max_scores[rows, cols] = values[:, 3]
+            graded[rows, cols] = values[:, 4] != 0
+        return cls(section, students, columns, scores, max_scores, graded)
+
+    @property
+    def missing(self) -> np.ndarray:
+        """Boolean matrix of assigned assessments with no submission"""
+        return np.isnan(self.scores)
+
+    def percentages(self) -> np.ndarray:
+        """Score percentages; NaN where missing, 0 where the maximum is 0"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percent = self.scores * 100.0 / self.max_scores
+        return np.where(self.max_scores > 0, percent, np.where(self.missing, np.nan, 0.0))
+
+    def column_stats(self) -> pd.DataFrame:
+        """Per-assessment submitted/missing/pending counts and percentage mean, median, std, min, max"""
+        percent = self.percentages()
+        missing = self.missing
+        with warnings.catch_warnings():
+            # All-NaN columns (nobody submitted yet) reduce to NaN without the warning
+            warnings.simplefilter('ignore', RuntimeWarning)
+            stats = {
+                'submitted': (~missing).sum(axis=0),
+                'missing': missing.sum(axis=0),
+                'pending': (~missing & ~self.graded).sum(axis=0),
+                'mean': np.nanmean(percent, axis=0),
+                'median': np.nanmedian(percent, axis=0),
+                'std': np.nanstd(percent, axis=0),
+                'min': np.nanmin(percent, axis=0),
+                'max': np.nanmax(percent, axis=0),
+            }
+        return pd.DataFrame(stats, index=self.assessments.index).round(2)
+
+    def student_totals(self) -> pd.DataFrame:
+        """Per-student total, max and percentage over what they submitted, plus their missing count"""
+        total = np.nansum(self.scores, axis=1)
+        possible = np.nansum(self.max_scores, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentage = np.where(possible > 0, total * 100.0 / possible, 0.0)
+        return pd.DataFrame({
+            'total': total,
+            'max_score': possible,
+            'percentage': np.round(percentage, 2),
+            'missing': self.missing.sum(axis=1),
+        }, index=self.students.index)
+
+    def missing_submissions(self) -> pd.DataFrame:
+        """One row per (student, assessment) with no submission"""
+        rows, cols = np.nonzero(self.missing)
+        return pd.DataFrame({
+            'student_id': self.students.index[rows],
+            'student_name': self.students['student_name'].to_numpy()[rows],
+            'assessment_id': self.assessments.index[cols],
+            'title': self.assessments['title'].to_numpy()[cols],
+        })
+
+    def patch(self, cells: Iterable[Tuple]) -> int:
+        """Apply (student_id, assessment_id, score, max_score, is_graded) rows; returns cells changed"""
+        changed = 0
+        for student_id, assessment_id, score, max_score, is_graded in cells:
+            row = self.students.index.get_indexer([student_id])[0]
+            col = self.assessments.index.get_indexer([assessment_id])[0]
+            if row < 0 or col < 0:
+                continue
+            self.scores[row, col] = score
+            self.max_scores[row, col] = max_score
+            self.graded[row, col] = bool(is_graded)
+            changed += 1
+        return changed
+
+
+class GradebookCache:
+    """One GradebookMatrix per section, patched from noted grade writes instead of rebuilt"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._lock = threading.RLock()
+        # section -> (matrix, structure generations, submissions generation, submission_log position)
+        self._entries: Dict[str, Tuple[GradebookMatrix, Tuple[int, ...], int, int]] = {}
+        self._stats = {'builds': 0, 'patches': 0, 'hits': 0}
+
+    def _generations(self) -> Tuple[Tuple[int, ...], int]:
+        snapshot = self.db_manager.cache.snapshot(STRUCTURE_TABLES + ('submissions',))
+        return snapshot[:-1], snapshot[-1]
+
+    def get(self, section: str) -> GradebookMatrix:
+        """The section's matrix; cached matrices are patched in place, so treat it as read-only"""
+        if not self.db_manager.cache.enabled:
+            db = self.db_manager
+            return GradebookMatrix.build(section, db.get_section_gradebook_assessments(section),
+                                         db.get_section_students(section), db.get_section_gradebook_cells(section))
+        with self._lock:
+            structure, submissions = self._generations()
+            entry = self._entries.get(section)
+            if entry is not None and entry[1] == structure:
+                matrix, _, built_submissions, position = entry
+                if built_submissions == submissions:
+                    self._stats['hits'] += 1
+                    return matrix
+                notes = self.db_manager.submission_log.since(position)
+                # Every submissions bump since the build must be a noted write; otherwise rebuild
+                if notes is not None and len(notes) == submissions - built_submissions:
+                    ids = sorted({i for note in notes for i in note})
+                    matrix.patch(self.db_manager.get_submission_cells(ids))
+                    self._entries[section] = (matrix, structure, submissions, position + len(notes))
+                    self._stats['patches'] += 1
+                    return matrix
+            return self._build(section)
+
+    def _build(self, section: str) -> GradebookMatrix:
+        # Generations are read before the data, so a write that lands meanwhile is seen as newer
+        structure, submissions = self._generations()
+        position = self.db_manager.submission_log.position
+        db = self.db_manager
+        matrix = GradebookMatrix.build(section, db.get_section_gradebook_assessments(section),
+                                       db.get_section_students(section), db.get_section_gradebook_cells(section))
+        self._entries[section] = (matrix, structure, submissions, position)
+        self._stats['builds'] += 1
+        return matrix
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, sections=len(self._entries))
@@ -0,0 +1,233 @@
+"""
+Streaming gradebook exports to CSV or XLSX.
+
+Three kinds of sheet:
+    scores      one row per submission to an assessment (get_assessment_submissions)
+    answers     one row per answer to an assessment (get_submission_details, for every submission)
+    gradebook   one row per student in a section, one score column per assessment posted to it
+
+Rows are written one at a time as they come out of SQLite in fetchmany
+batches. XLSX goes through openpyxl's write-only workbook and CSV through the
+csv module, so memory stays flat even for a million-answer dump. The file
+is built next to its destination and renamed into place only when complete,
+keeping the permissions of the file it replaces (or the umask's for a new one).
+
+Usage:
+    python -m database.gradebook_export scores ASSESSMENT_ID OUT.xlsx [--db PATH]
+    python -m database.gradebook_export answers ASSESSMENT_ID OUT.csv [--db PATH]
+    python -m database.gradebook_export gradebook SECTION OUT.xlsx [--db PATH]
+"""
+
+import argparse
+import csv
+import os
+import re
+import stat
+import tempfile
+from typing import Callable, Iterable, Optional, Sequence
+
+FORMATS = ('.xlsx', '.csv')
+PROGRESS_EVERY = 500  # rows between progress callbacks
+
+# progress(rows_written, total_rows or None)
+Progress = Optional[Callable[[int, Optional[int]], None]]
+
+SCORE_HEADER = ('Student No.', 'Name', 'Submitted', 'Status', 'Score', 'Max Score', 'Percentage')
+ANSWER_HEADER = ('Student No.', 'Name', 'Section', 'Question', 'Question Text', 'Type', 'Points',
+                 'Correct Answer', 'Answer', 'Correct', 'Points Earned', 'Feedback')
+
+# Spreadsheet apps run cells starting with these as formulas; student answers are untrusted text
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _percentage(score, max_score):
+    return round(score * 100.0 / max_score, 2) if max_score else 0
+
+
+def _current_umask() -> int:
+    # os.umask can only be read by setting it; done once at import, before export threads start
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _current_umask()
+
+
+def _file_mode(path: str) -> int:
+    """Mode for the finished export: the replaced file's, or what open() would have given a new file"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def export_file_name(*parts: str, extension: str = '.xlsx') -> str:
+    """A safe default file name from e.g. an assessment title and the sheet kind"""
+    name = ' '.join(str(part) for part in parts if part)
+    return re.sub(r'[\\/:*?"<>|\x00-\x1f]+', '_', name).strip(' .') + extension
+
+
+class _CsvSheet:
+    def __init__(self, path: str, title: str):
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file)
+
+    def append(self, values: Sequence) -> None:
+        self._writer.writerow(values)
+
+    def save(self) -> None:
+        self._file.close()
+
+    def discard(self) -> None:
+        self._file.close()
+
+
+class _XlsxSheet:
+    def __init__(self, path: str, title: str):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(re.sub(r'[\[\]:*?/\\]', ' ', title)[:31] or 'Sheet')
+
+    def append(self, values: Sequence) -> None:
+        self._sheet.append(values)
+
+    def save(self) -> None:
+        self._workbook.save(self._path)
+
+    def discard(self) -> None:
+        pass
+
+
+def write_sheet(path: str, title: str, header: Sequence, rows: Iterable[Sequence],
+                total: Optional[int] = None, progress: Progress = None) -> int:
+    """Write ``header`` and ``rows`` to ``path`` (.xlsx or .csv); returns the number of data rows"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot export to '{path}': use .xlsx or .csv")
+    sheet_class = _XlsxSheet if extension == '.xlsx' else _CsvSheet
+    fd, partial = tempfile.mkstemp(suffix=extension, prefix='.export-', dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+
+    written = 0
+    sheet = None
+    try:
+        sheet = sheet_class(partial, title)
+        sheet.append(header)
+        for row in rows:
+            sheet.append([_cell(value) for value in row])
+            written += 1
+            if progress and written % PROGRESS_EVERY == 0:
+                progress(written, total)
+        sheet.save()
+        # mkstemp creates the file readable by its owner only
+        os.chmod(partial, _file_mode(path))
+        os.replace(partial, path)
+    except BaseException:
+        if sheet is not None:
+            sheet.discard()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    if progress:
+        progress(written, written)
+    return written
+
+
+def _get_assessment(db, assessment_id: int):
+    assessment = db.get_assessment_by_id(assessment_id)
+    if not assessment:
+        raise ValueError(f"Assessment {assessment_id} does not exist")
+    return assessment
+
+
+def export_assessment_scores(db, assessment_id: int, path: str, progress: Progress = None) -> int:
+    """One row per submission: student, status, score and percentage"""
+    assessment = _get_assessment(db, assessment_id)
+    total = db.get_assessment_score_summary(assessment_id)['total_students']
+    rows = ((s['student_number'], s['student_name'], s['submitted_at'],
+             'Graded' if s['is_graded'] else 'Pending', s['total_score'], s['max_score'],
+             _percentage(s['total_score'], s['max_score']))
+            for s in db.iter_assessment_submissions(assessment_id))
+    return write_sheet(path, assessment['title'], SCORE_HEADER, rows, total, progress)
+
+
+def export_assessment_answers(db, assessment_id: int, path: str, progress: Progress = None) -> int:
+    """One row per answer: what each student answered to each question and how it was graded"""
+    assessment = _get_assessment(db, assessment_id)
+    total = db.count_assessment_answers(assessment_id)
+    rows = ((a['student_number'], a['student_name'], a['section'],
+             a['order_index'] + 1 if a['order_index'] is not None else None,
+             a['question_text'], a['question_type'], a['points'], a['correct_answer'], a['student_answer'],
+             '' if a['is_correct'] is None else ('Yes' if a['is_correct'] else 'No'),
+             a['points_earned'], a['feedback'])
+            for a in db.iter_assessment_answers(assessment_id))
+    return write_sheet(path, f"{assessment['title']} answers", ANSWER_HEADER, rows, total, progress)
+
+
+def export_section_gradebook(db, section: str, path: str, progress: Progress = None) -> int:
+    """One row per student in ``section``, a score column per assessment posted to it, then the totals"""
+    assessments = db.get_section_gradebook_assessments(section)
+    header = (['Student No.', 'Name']
+              + [f"{a['title']} (/{a['total_points']})" for a in assessments]
+              + ['Total', 'Max Score', 'Percentage'])
+    ids = [a['id'] for a in assessments]
+
+    def rows():
+        for student in db.iter_section_gradebook(section, ids):
+            scores = student['scores']
+            taken = [scores[i] for i in ids if i in scores]
+            total_score = sum(score for score, _, _ in taken)
+            max_score = sum(max_score for _, max_score, _ in taken)
+            yield ([student['student_number'], student['student_name']]
+                   + [scores[i][0] if i in scores else '' for i in ids]
+                   + [total_score, max_score, _percentage(total_score, max_score)])
+
+    return write_sheet(path, f"Gradebook {section}", header, rows(), None, progress)
+
+
+EXPORTS = {
+    'scores': export_assessment_scores,
+    'answers': export_assessment_answers,
+    'gradebook': export_section_gradebook,
+}
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.gradebook_export",
+                                     description="Export scores, answers or a section gradebook to XLSX/CSV")
+    parser.add_argument("kind", choices=sorted(EXPORTS))
+    parser.add_argument("key", help="Assessment id (scores, answers) or section (gradebook)")
+    parser.add_argument("output", help="Destination .xlsx or .csv file")
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    args = parser.parse_args(argv)
+
+    if args.kind != 'gradebook' and not args.key.isdigit():
+        parser.error(f"{args.kind} needs an assessment id, not '{args.key}'")
+    key = args.key if args.kind == 'gradebook' else int(args.key)
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        written = EXPORTS[args.kind](db, key, args.output,
+                                     progress=lambda done, total: print(f"\r{done} rows", end='', flush=True))
+    except (OSError, ValueError) as e:
+        print(f"Export failed: {e}")
+        return 1
+    finally:
+        db.close()
+    print(f"\rExported {written} rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
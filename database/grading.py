@@ -0,0 +1,291 @@
+"""
+The one scoring implementation for multiple-choice answers.
+
+An assessment's questions are compiled once into an AnswerKey. For every
+multiple-choice question it holds the points, the key's option index and a
+lookup from each accepted spelling of an option to that index:
+
+- the option text, ignoring case and runs of spaces;
+- its letter (A, B, ...);
+- its number from 1.
+
+When an answer's spellings collide, text wins over letter and letter over
+number: the exam stores the option text a student picked. The key itself is
+stored as a letter, so correct_answer is read the other way round: letter,
+then number, then option text.
+Answers are cleaned of the quotes and brackets older clients stored around
+them before they are looked up. The resulting ``choice code`` is the option
+index, or OTHER_CHOICE (matches no option), BLANK_CHOICE (no answer) or
+NOT_MCQ. An answer is correct when its code is the key's code.
+
+``AnswerKey.score`` grades one submission with plain dict lookups; it is what
+submit_assessment and the group-commit writer run. ``AnswerKey.score_batch``
+grades many submissions at once as NumPy array operations: each distinct
+(question, answer text) pair is looked up once, and everything after that is
+indexing, comparison and ``np.bincount``. The grading, results, analytics and
+regrade code all go through the same key, so an answer is never right on one
+page and wrong on another.
+
+Short answers are left for manual grading (0 points) unless the key is compiled
+with ``short_answers=True``. In that case a short answer to a question with a
+correct_answer is scored like a one-option question: it is correct when its
+text matches, ignoring case and spacing.
+"""
+
+import json
+import re
+import string
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# choice codes other than an option index
+OTHER_CHOICE = -1   # a multiple-choice answer matching none of the options
+BLANK_CHOICE = -2   # a multiple-choice question answered with nothing
+NOT_MCQ = -3
+
+_SPACES = re.compile(r'\s+')
+
+
+def parse_options(options) -> List[str]:
+    """MCQ options from questions.options: a JSON list, or comma separated in older rows"""
+    if not options:
+        return []
+    if isinstance(options, (list, tuple)):
+        parsed = list(options)
+    else:
+        try:
+            parsed = json.loads(options)
+        except (TypeError, ValueError):
+            parsed = str(options).split(',')
+    if not isinstance(parsed, list):
+        parsed = [parsed]
+    return [str(option).strip() for option in parsed if str(option).strip()]
+
+
+def clean_answer(answer_text) -> str:
+    """Answer text without surrounding whitespace, quotes or the ["..."] wrapping some clients stored"""
+    if answer_text is None:
+        return ''
+    text = str(answer_text).strip()
+    if text.startswith(('["', "['")):
+        text = text[2:]
+    if text.endswith(('"]', "']")):
+        text = text[:-2]
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'':
+        text = text[1:-1]
+    elif text.endswith(('"', "'")):
+        # A wrapping cut short, e.g. '["Nucleus"'
+        text = text[:-1]
+    return text.strip()
+
+
+def normalize(answer_text) -> str:
+    """The form answers and options are compared in: cleaned, single-spaced, case-folded"""
+    return _SPACES.sub(' ', clean_answer(answer_text)).casefold()
+
+
+def option_lookup(options: Sequence[str]) -> Dict[str, int]:
+    """Every accepted spelling of each option -> its index"""
+    lookup = {}
+    for index in range(len(options)):
+        lookup[str(index + 1)] = index
+    for index, letter in enumerate(string.ascii_lowercase[:len(options)]):
+        lookup[letter] = index
+    for index, option in enumerate(options):
+        lookup[normalize(option)] = index
+    return lookup
+
+
+def key_index(correct_answer, options: Sequence[str]) -> Optional[int]:
+    """Option index a question's correct_answer names, trying its letter, number, then option text"""
+    key = normalize(correct_answer)
+    if not key:
+        return None
+    letters = string.ascii_lowercase[:len(options)]
+    if len(key) == 1 and key in letters:
+        return letters.index(key)
+    numbers = [str(index + 1) for index in range(len(options))]
+    if key in numbers:
+        return numbers.index(key)
+    return next((index for index, option in enumerate(options) if normalize(option) == key), None)
+
+
+def choice_index(answer_text, options: Sequence[str]) -> Optional[int]:
+    """Option index an answer refers to; None if it names none of them"""
+    text = normalize(answer_text)
+    return option_lookup(options).get(text) if text else None
+
+
+class AnswerKey:
+    """An assessment's questions compiled for scoring; build once per assessment and reuse"""
+
+    def __init__(self, questions: Sequence[Dict], short_answers: bool = False):
+        """``questions`` are get_questions rows (id, question_type, points, correct_answer, options)"""
+        self.question_ids = [q['id'] for q in questions]
+        self.columns = {question_id: i for i, question_id in enumerate(self.question_ids)}
+        self.points = [float(q['points'] or 0) for q in questions]
+        self.options = []
+        self.lookups: List[Optional[Dict[str, int]]] = []
+        # Exact spellings as stored (option text, upper-case letter) -> code, skipping normalize()
+        self._exact: List[Dict[str, int]] = []
+        self.key_codes = []
+        for q in questions:
+            if q['question_type'] == 'mcq':
+                options = parse_options(q['options'])
+                # Without options the key itself is the only accepted answer
+                lookup = option_lookup(options) if options else {normalize(q['correct_answer']): 0}
+            elif short_answers and normalize(q['correct_answer']):
+                options = []
+                lookup = {normalize(q['correct_answer']): 0}
+            else:
+                self.options.append([])
+                self.lookups.append(None)
+                self._exact.append({})
+                self.key_codes.append(NOT_MCQ)
+                continue
+            normalized_key = normalize(q['correct_answer'])
+            key = key_index(q['correct_answer'], options) if options else lookup.get(normalized_key or None)
+            self.options.append(options)
+            self.lookups.append(lookup)
+            exact = {}
+            # An upper-case letter normalizes to itself in lower case
+            for letter in string.ascii_uppercase[:len(options)]:
+                exact[letter] = lookup.get(letter.lower(), OTHER_CHOICE)
+            for form in options:
+                normalized = normalize(form)
+                if normalized:
+                    exact[form] = lookup.get(normalized, OTHER_CHOICE)
+            if isinstance(q['correct_answer'], str) and normalized_key:
+                exact[q['correct_answer']] = lookup.get(normalized_key, OTHER_CHOICE)
+            self._exact.append(exact)
+            # A key naming no option makes every answer wrong rather than every blank right
+            self.key_codes.append(OTHER_CHOICE if key is None else key)
+        # Questions the key does not score, graded by hand (short answers without a key)
+        self.hand_graded = frozenset(question_id for question_id, lookup in zip(self.question_ids, self.lookups)
+                                     if lookup is None)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple], short_answers: bool = False) -> 'AnswerKey':
+        """Key of (id, question_type, correct_answer, points, options) question rows"""
+        return cls([{'id': row[0], 'question_type': row[1], 'correct_answer': row[2], 'points': row[3],
+                     'options': row[4]} for row in rows], short_answers)
+
+    @classmethod
+    def from_answers(cls, answers: Iterable[Dict], short_answers: bool = False) -> 'AnswerKey':
+        """Key of get_submission_details answers, which carry their question's fields"""
+        return cls([{'id': a['question_id'], 'question_type': a.get('question_type', 'mcq'),
+                     'points': a.get('points', 1), 'correct_answer': a.get('correct_answer'),
+                     'options': a.get('options')} for a in answers], short_answers)
+
+    def __contains__(self, question_id) -> bool:
+        return question_id in self.columns
+
+    def is_graded(self, question_id) -> bool:
+        """True when the key scores this question; short answers are otherwise graded by hand"""
+        column = self.columns.get(question_id)
+        return column is not None and self.lookups[column] is not None
+
+    def choice_code(self, question_id, answer_text) -> int:
+        column = self.columns.get(question_id)
+        if column is None or self.lookups[column] is None:
+            return NOT_MCQ
+        return self._code(column, answer_text)
+
+    def _code(self, column: int, answer_text) -> int:
+        code = self._exact[column].get(answer_text)
+        if code is not None:
+            return code
+        text = normalize(answer_text)
+        if not text:
+            return BLANK_CHOICE
+        return self.lookups[column].get(text, OTHER_CHOICE)
+
+    def key_code(self, question_id) -> int:
+        column = self.columns.get(question_id)
+        return NOT_MCQ if column is None else self.key_codes[column]
+
+    def grade(self, question_id, answer_text) -> Tuple[bool, float]:
+        """(is_correct, points_earned) of one answer; (False, 0) for a question graded by hand"""
+        column = self.columns.get(question_id)
+        if column is None or self.lookups[column] is None:
+            return False, 0.0
+        key = self.key_codes[column]
+        correct = key >= 0 and self._code(column, answer_text) == key
+        return correct, self.points[column] if correct else 0.0
+
+    def score(self, answers: Iterable[Dict]) -> Tuple[List[Tuple], float, float]:
+        """Grade one submission's {'question_id', 'answer_text'} answers.
+
+        Returns (question_id, answer_text, is_correct, points_earned) rows for
+        the answers to questions in the key, the score and the max score.
+        """
+        rows = []
+        total = max_score = 0.0
+        columns, points, key_codes, exact = self.columns, self.points, self.key_codes, self._exact
+        # grade() inlined: this runs for every answer of every submit
+        for answer in answers:
+            question_id = answer['question_id']
+            column = columns.get(question_id)
+            if column is None:
+                continue
+            answer_text = answer['answer_text']
+            max_score += points[column]
+            key = key_codes[column]
+            if key < 0:
+                rows.append((question_id, answer_text, False, 0.0))
+                continue
+            code = exact[column].get(answer_text)
+            if code is None:
+                code = self._code(column, answer_text)
+            if code == key:
+                total += points[column]
+                rows.append((question_id, answer_text, True, points[column]))
+            else:
+                rows.append((question_id, answer_text, False, 0.0))
+        return rows, total, max_score
+
+    # ------------------------- Batches -------------------------
+    def choice_codes(self, question_idx, texts):
+        """Choice code of each answer from its column in the key and its text, as an int8 array"""
+        import numpy as np
+        import pandas as pd
+
+        question_idx = np.asarray(question_idx, dtype=np.int64)
+        texts = np.asarray(texts, dtype=object)
+        codes = np.full(len(question_idx), NOT_MCQ, dtype=np.int8)
+        graded = np.array([lookup is not None for lookup in self.lookups], dtype=bool)
+        scored = graded[question_idx] if len(question_idx) else np.zeros(0, dtype=bool)
+        if not scored.any():
+            return codes
+        text_codes, uniques = pd.factorize(texts[scored])
+        # Look each distinct (question, text) pair up once, then broadcast back to the answers
+        stride = len(uniques) + 1
+        inverse, pairs = pd.factorize(question_idx[scored] * stride + text_codes + 1)
+        pair_codes = np.empty(len(pairs), dtype=np.int8)
+        for i, pair in enumerate(pairs.tolist()):
+            column, text_code = divmod(pair, stride)
+            pair_codes[i] = self._code(column, uniques[text_code - 1] if text_code else None)
+        codes[scored] = pair_codes[inverse]
+        return codes
+
+    def score_batch(self, submission_idx, question_idx, texts, submissions: Optional[int] = None):
+        """Grade the answers of many submissions at once.
+
+        Answer i belongs to submission row ``submission_idx[i]`` and key column
+        ``question_idx[i]``. Returns (is_correct, points_earned) per answer and
+        (score, max_score) per submission row, all NumPy arrays. Questions graded
+        by hand come back as not correct with 0 points.
+        """
+        import numpy as np
+
+        submission_idx = np.asarray(submission_idx, dtype=np.int64)
+        question_idx = np.asarray(question_idx, dtype=np.int64)
+        if submissions is None:
+            submissions = int(submission_idx.max()) + 1 if len(submission_idx) else 0
+        points = np.array(self.points, dtype=float)
+        key_codes = np.array(self.key_codes, dtype=np.int8)
+        codes = self.choice_codes(question_idx, texts)
+        correct = (codes >= 0) & (codes == key_codes[question_idx])
+        earned = np.where(correct, points[question_idx], 0.0)
+        scores = np.bincount(submission_idx, weights=earned, minlength=submissions)
+        max_scores = np.bincount(submission_idx, weights=points[question_idx], minlength=submissions)
+        return correct, earned, scores, max_scores
@@ -0,0 +1,199 @@
+"""
+The grading queue: an assessment's ungraded submissions, one after another.
+
+Submissions with short answers are ungraded (is_graded = 0) until a teacher
+finalizes them. The queue takes them oldest first from the partial index
+idx_submissions_grading_queue (migration 9), a few entries per seek, and
+continues after the last one it took, so submissions that arrive while
+grading are picked up at the end.
+
+While one submission is being graded, the details of the next ``prefetch``
+are loaded on AsyncDatabaseManager's worker threads. Moving on is then a
+lookup of an already finished load rather than a query. ``save_and_next``
+hands the grade to a worker and returns the next submission without waiting
+for the write. Writes are not tied to a page's requests, so navigating away
+does not cancel them; ``drain()`` waits for the ones still running. A grade
+that fails to save puts its submission back at the end of the queue.
+
+    queue = GradingQueue(db_manager, assessment_id)
+    details = await queue.start()
+    while details:
+        ...
+        details = await queue.save_and_next(score, max_score, answers)
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from database.async_manager import AsyncDatabaseManager
+from database.pagination import Cursor
+
+PREFETCH = 3
+
+
+class GradingQueue:
+    """Ungraded submissions of one assessment, oldest first, with the next few preloaded"""
+
+    def __init__(self, db_manager, assessment_id: int, prefetch: int = PREFETCH,
+                 async_db: Optional[AsyncDatabaseManager] = None,
+                 on_save_failed: Optional[Callable[[Dict], None]] = None):
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        self.db_manager = db_manager
+        self.async_db = async_db or AsyncDatabaseManager.shared(db_manager)
+        self.assessment_id = assessment_id
+        self.prefetch = prefetch
+        self.on_save_failed = on_save_failed
+        self.assessment: Optional[Dict] = None
+        self.current = None  # ScoreListingRecord of the submission being graded
+        self.remaining = 0  # ungraded submissions, the current one included
+        self.saved = 0
+        self.failed = 0
+        self.last_transition_ms: Optional[float] = None
+        self._upcoming = deque()  # entries after the current one, in queue order
+        self._after: Optional[Cursor] = None  # (submitted_at, id) of the last entry taken from the index
+        self._details: Dict[int, asyncio.Future] = {}  # submission_id -> get_submission_details load
+        self._taken = set()  # ids already in the queue, current, or saved
+        self._saves = set()
+        self._fill_lock: Optional[asyncio.Lock] = None
+        self._started_at: Optional[float] = None
+
+    # ------------------------- Moving through the queue -------------------------
+    async def start(self, submission_id: Optional[int] = None) -> Optional[Dict]:
+        """Open ``submission_id`` (or the oldest ungraded one); returns its details, or None when empty"""
+        self.close()
+        self._upcoming.clear()
+        self._taken.clear()
+        self._after = None
+        self._fill_lock = asyncio.Lock()
+        self._started_at = time.monotonic()
+        loaded = await self.async_db.gather(
+            assessment=self.async_db.get_assessment_by_id(self.assessment_id),
+            remaining=self.async_db.count_ungraded_submissions(self.assessment_id))
+        self.assessment = loaded['assessment']
+        self.remaining = loaded['remaining']
+        if submission_id is None:
+            return await self.next()
+        self._taken.add(submission_id)
+        self.current = None
+        details = await self.async_db.get_submission_details(submission_id)
+        if details:
+            self.current = {'submission_id': submission_id, 'full_name': details.get('student_name')}
+        await self._fill()
+        return details
+
+    async def next(self) -> Optional[Dict]:
+        """Move on to the next submission without saving the current one; None when the queue is empty"""
+        started = time.perf_counter()
+        if not self._upcoming:
+            await self._fill()
+        details = None
+        while self._upcoming and not details:
+            self.current = self._upcoming.popleft()
+            details = await self._load(self.current['submission_id'])
+        if not details:
+            self.current = None
+            return None
+        self.last_transition_ms = (time.perf_counter() - started) * 1000
+        asyncio.ensure_future(self._prefetch())
+        return details
+
+    async def save_and_next(self, total_earned_score: float, total_possible_score: float,
+                            updated_answers: List[Dict]) -> Optional[Dict]:
+        """Queue the current submission's grade for writing and return the next submission's details"""
+        if self.current is not None:
+            entry = self.current
+            save = asyncio.ensure_future(self._save(entry, total_earned_score, total_possible_score,
+                                                    updated_answers))
+            self._saves.add(save)
+            save.add_done_callback(self._saves.discard)
+        return await self.next()
+
+    async def drain(self) -> None:
+        """Wait for every grade still being written"""
+        if self._saves:
+            await asyncio.gather(*list(self._saves), return_exceptions=True)
+
+    def close(self) -> None:
+        """Drop the prefetched loads; grades still being written are left to finish"""
+        for load in self._details.values():
+            load.cancel()
+        self._details.clear()
+
+    # ------------------------- Progress -------------------------
+    @property
+    def pending_saves(self) -> int:
+        return len(self._saves)
+
+    def throughput(self) -> float:
+        """Submissions saved per hour since the queue was started"""
+        if self._started_at is None or not self.saved:
+            return 0.0
+        hours = (time.monotonic() - self._started_at) / 3600
+        return self.saved / hours if hours > 0 else 0.0
+
+    def status(self) -> str:
+        """One line for the page: what is left, the pace, and how long the last switch took"""
+        parts = [f"{self.remaining} left", f"{self.saved} graded", f"{self.throughput():.0f}/hour"]
+        if self.last_transition_ms is not None:
+            parts.append(f"next in {self.last_transition_ms:.0f} ms")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        return " · ".join(parts)
+
+    # ------------------------- Internals -------------------------
+    async def _fill(self) -> None:
+        """Keep ``prefetch`` entries queued after the current one, each with its details loading"""
+        async with self._fill_lock:
+            while len(self._upcoming) < self.prefetch:
+                page = await self.async_db.page_grading_queue(self.assessment_id, after=self._after,
+                                                              limit=self.prefetch * 2)
+                for entry in page.items:
+                    self._after = Cursor(entry['submitted_at'], entry['submission_id'])
+                    if entry['submission_id'] not in self._taken:
+                        self._taken.add(entry['submission_id'])
+                        self._upcoming.append(entry)
+                if not page.has_more:
+                    break
+            for entry in list(self._upcoming)[:self.prefetch]:
+                submission_id = entry['submission_id']
+                if submission_id not in self._details:
+                    self._details[submission_id] = asyncio.ensure_future(
+                        self.async_db.get_submission_details(submission_id))
+
+    async def _prefetch(self) -> None:
+        """Top the queue back up in the background while the grader works"""
+        try:
+            await self._fill()
+        except Exception as e:
+            print(f"Error prefetching the grading queue: {e}")
+
+    async def _load(self, submission_id: int) -> Optional[Dict]:
+        load = self._details.pop(submission_id, None)
+        try:
+            if load is not None:
+                return await load
+            return await self.async_db.get_submission_details(submission_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error loading submission {submission_id} for grading: {e}")
+            return None
+
+    async def _save(self, entry, total_earned_score, total_possible_score, updated_answers) -> None:
+        try:
+            saved = await self.async_db.update_submission_grade(entry['submission_id'], total_earned_score,
+                                                                total_possible_score, updated_answers)
+        except Exception as e:
+            print(f"Error saving grade for submission {entry['submission_id']}: {e}")
+            saved = False
+        if saved:
+            self.saved += 1
+            self.remaining = max(0, self.remaining - 1)
+            return
+        self.failed += 1
+        self._upcoming.append(entry)
+        if self.on_save_failed:
+            self.on_save_failed(entry)
@@ -0,0 +1,148 @@
+"""
+Item analysis of an assessment: difficulty, discrimination and distractors per question.
+
+The assessment's AnalyticsSnapshot (database/analytics_snapshot.py) holds every
+answer as (student_idx, question_idx, points_earned, choice_code). Its points
+are scattered into a submissions x questions matrix in one fancy-indexed
+assignment, and each statistic is a NumPy reduction over it:
+
+- difficulty: the mean share of the question's points earned, i.e. the
+  proportion correct for all-or-nothing questions. An unanswered question
+  earns nothing.
+- discrimination: the point-biserial correlation of the item score with the
+  submission total (Pearson's r, which is point-biserial for 0/1 items).
+- distractors: for multiple-choice questions, how many submissions picked each
+  option and their mean total, grouped on (question, choice_code) with
+  ``np.unique`` / ``np.bincount``.
+
+DatabaseManager.get_item_analysis caches the result per assessment. The cache
+drops it when questions, submissions or answers are written, which includes
+submit_assessment and update_submission_grade.
+"""
+
+import string
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from database.grading import BLANK_CHOICE, OTHER_CHOICE, AnswerKey
+
+# Below this an item barely separates strong from weak submissions
+LOW_DISCRIMINATION = 0.2
+# Outside this difficulty range an item tells little about anyone
+DIFFICULTY_RANGE = (0.2, 0.9)
+
+OTHER = "Other"
+BLANK = "No answer"
+
+
+@dataclass
+class ItemAnalysis:
+    assessment_id: int
+    submissions: int
+    items: pd.DataFrame         # index question_id: number, question_text, question_type, points, answered,
+                                # difficulty, discrimination
+    distractors: pd.DataFrame   # question_id, choice, option, is_key, count, share, mean_score
+
+    @classmethod
+    def build(cls, assessment_id: int, questions: Sequence[Dict], snapshot) -> 'ItemAnalysis':
+        """Analyse an AnalyticsSnapshot (database/analytics_snapshot.py).
+
+        ``questions`` are get_questions rows; the snapshot's question columns follow them.
+        """
+        by_id = {q['id']: q for q in questions}
+        questions = [by_id[i] for i in snapshot.question_ids.tolist() if i in by_id]
+        question_ids = pd.Index([q['id'] for q in questions])
+        points = np.array([q['points'] or 0 for q in questions], dtype=float)
+        answers = snapshot.answers
+        submissions = len(snapshot.submissions)
+        rows, cols = answers['student_idx'], answers['question_idx']
+        earned = np.zeros((submissions, len(question_ids)))
+        earned[rows, cols] = answers['points_earned']
+        answered = np.bincount(cols, minlength=len(question_ids))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.where(points > 0, earned / points, 0.0)
+            difficulty = scores.mean(axis=0) if submissions else np.full(len(question_ids), np.nan)
+            totals = earned.sum(axis=1)
+            item_dev = scores - scores.mean(axis=0)
+            total_dev = totals - totals.mean()
+            denominator = np.sqrt((item_dev ** 2).sum(axis=0) * (total_dev ** 2).sum())
+            # An item everyone scored the same on (or a test with no spread) has no correlation
+            discrimination = np.where(denominator > 0, item_dev.T @ total_dev / denominator, np.nan)
+
+        items = pd.DataFrame({
+            'number': np.arange(1, len(question_ids) + 1),
+            'question_text': [q['question_text'] for q in questions],
+            'question_type': [q['question_type'] for q in questions],
+            'points': points,
+            'answered': answered,
+            'difficulty': np.round(difficulty, 3),
+            'discrimination': np.round(discrimination, 3),
+        }, index=question_ids.rename('question_id'))
+        distractors = cls._distractors(questions, AnswerKey(questions), submissions, cols, answers['choice_code'],
+                                       totals[rows], float(totals.sum()))
+        return cls(assessment_id, submissions, items, distractors)
+
+    @staticmethod
+    def _distractors(questions: Sequence[Dict], answer_key: AnswerKey, submissions: int, cols: np.ndarray,
+                     codes: np.ndarray, totals: np.ndarray, total_sum: float) -> pd.DataFrame:
+        """Option counts per MCQ question from each answer's column, choice_code and submission total.
+
+        ``total_sum`` is the sum of every submission's total, including those with no answer rows.
+        """
+        # Answer counts and total sums per (question, choice_code) in one bincount each
+        keys = cols.astype(np.int64) * 256 + (codes.astype(np.int64) + 128)
+        pairs, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(pairs))
+        score_sums = np.bincount(inverse, weights=totals, minlength=len(pairs))
+        grouped: Dict[int, Dict[int, Tuple[int, float]]] = {}
+        for pair, count, score_sum in zip(pairs.tolist(), counts.tolist(), score_sums.tolist()):
+            col, code = divmod(pair, 256)
+            grouped.setdefault(col, {})[code - 128] = (count, score_sum)
+
+        rows = []
+        for col, question in enumerate(questions):
+            if question['question_type'] != 'mcq':
+                continue
+            options = answer_key.options[col]
+            key = answer_key.key_codes[col]
+            by_code = grouped.get(col, {})
+            answered = sum(count for count, _ in by_code.values())
+            answered_sum = sum(score_sum for _, score_sum in by_code.values())
+            blank_count, blank_sum = by_code.get(BLANK_CHOICE, (0, 0.0))
+            # Submissions without an answer row for the question left it blank too; their
+            # totals are whatever the submissions with a row do not account for
+            missing = max(0, submissions - answered)
+            missing_sum = total_sum - answered_sum if missing else 0.0
+            choices = [(string.ascii_uppercase[i], option, i == key) + by_code.get(i, (0, 0.0))
+                       for i, option in enumerate(options)]
+            choices.append((OTHER, '', False) + by_code.get(OTHER_CHOICE, (0, 0.0)))
+            choices.append((BLANK, '', False, blank_count + missing, blank_sum + missing_sum))
+            for index, (label, option, is_key, count, score_sum) in enumerate(choices):
+                if index >= len(options) and not count:
+                    continue
+                rows.append({
+                    'question_id': question['id'],
+                    'choice': label,
+                    'option': option,
+                    'is_key': is_key,
+                    'count': count,
+                    'share': round(count / submissions, 3) if submissions else 0.0,
+                    'mean_score': round(score_sum / count, 2) if count else None,
+                })
+        return pd.DataFrame(rows, columns=['question_id', 'choice', 'option', 'is_key', 'count', 'share',
+                                           'mean_score'])
+
+    def flagged(self) -> pd.Series:
+        """True for items worth reviewing: too easy, too hard, or weakly/negatively discriminating"""
+        low, high = DIFFICULTY_RANGE
+        difficulty = self.items['difficulty']
+        discrimination = self.items['discrimination']
+        return (difficulty < low) | (difficulty > high) | (discrimination < LOW_DISCRIMINATION)
+
+    def choices(self, question_id: int) -> pd.DataFrame:
+        """Distractor rows of one question"""
+        return self.distractors[self.distractors['question_id'] == question_id]
@@ -0,0 +1,475 @@
+"""
+Numbered schema migrations keyed on ``PRAGMA user_version``.
+
+Each migration is a function registered with ``@migration(version, description)``
+that receives a cursor and the DatabaseManager. Pending migrations run in order
+inside one ``BEGIN IMMEDIATE`` transaction and bump ``user_version`` at the end,
+so a crash half-way leaves the database on its previous version. When the
+database is already current, startup costs a single pragma read.
+
+Usage:
+    python -m database.migrations status [--db PATH]
+    python -m database.migrations upgrade [--db PATH]
+"""
+
+import argparse
+import sqlite3
+from typing import Callable, List, Tuple
+
+from database import admin_stats, assessment_stats, search_index
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = []
+
+
+def migration(version: int, description: str):
+    """Register a migration function for the given schema version"""
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(current_version: int) -> List[Tuple[int, str, Callable]]:
+    return [m for m in MIGRATIONS if m[0] > current_version]
+
+
+def apply_migrations(db) -> List[int]:
+    """Run every pending migration in one transaction and return the versions applied"""
+    with db.transaction() as conn:
+        # Re-read under the write lock in case another process migrated first
+        current = get_schema_version(conn)
+        pending = pending_migrations(current)
+        cursor = conn.cursor()
+        for version, description, fn in pending:
+            print(f"Applying migration {version}: {description}")
+            fn(cursor, db)
+        if pending:
+            cursor.execute(f"PRAGMA user_version = {int(pending[-1][0])}")
+    return [m[0] for m in pending]
+
+
+def _columns(cursor, table: str) -> set:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {column[1] for column in cursor.fetchall()}
+
+
+def _add_missing_columns(cursor, table: str, columns: List[Tuple[str, str]]) -> List[str]:
+    existing = _columns(cursor, table)
+    added = []
+    for name, definition in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            added.append(name)
+    return added
+
+
+# ------------------------- Migrations -------------------------
+
+@migration(1, "Baseline schema, legacy column upgrades, seed data")
+def _baseline(cursor, db):
+    """Create every table and bring databases from before versioning up to the same shape"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL CHECK(role IN ('admin', 'student')),
+            full_name TEXT NOT NULL,
+            email TEXT UNIQUE,
+            admin_id_number TEXT UNIQUE,
+            student_number TEXT UNIQUE,
+            section TEXT,
+            security_question TEXT NOT NULL,
+            security_answer_hash TEXT NOT NULL,
+            profile_photo TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            post_type TEXT NOT NULL CHECK(post_type IN ('assessment', 'file')),
+            created_by INTEGER NOT NULL,
+            assessment_id INTEGER,
+            file_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (created_by) REFERENCES users (id),
+            FOREIGN KEY (assessment_id) REFERENCES assessments (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS post_sections (
+            post_id INTEGER NOT NULL,
+            section TEXT NOT NULL,
+            PRIMARY KEY (post_id, section),
+            FOREIGN KEY (post_id) REFERENCES posts (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            post_type TEXT DEFAULT 'post',
+            parent_comment_id INTEGER DEFAULT NULL,
+            FOREIGN KEY (post_id) REFERENCES posts (id),
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (parent_comment_id) REFERENCES comments (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS file_submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER NOT NULL,
+            student_id INTEGER NOT NULL,
+            file_path TEXT NOT NULL,
+            submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (post_id) REFERENCES posts (id),
+            FOREIGN KEY (student_id) REFERENCES users (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS assessments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            created_by INTEGER NOT NULL,
+            start_time TIMESTAMP,
+            end_time TIMESTAMP,
+            duration_minutes INTEGER NOT NULL,
+            status TEXT DEFAULT 'draft' CHECK(status IN ('draft', 'published', 'active', 'closed')),
+            enforce_per_question_time BOOLEAN DEFAULT 0,
+            per_question_duration_seconds INTEGER,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (created_by) REFERENCES users (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            assessment_id INTEGER NOT NULL,
+            question_text TEXT NOT NULL,
+            question_type TEXT NOT NULL CHECK(question_type IN ('mcq', 'short_answer')),
+            points INTEGER DEFAULT 1,
+            correct_answer TEXT,
+            options TEXT, -- JSON string for MCQ options
+            order_index INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (assessment_id) REFERENCES assessments (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            assessment_id INTEGER NOT NULL,
+            student_id INTEGER NOT NULL,
+            submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_graded BOOLEAN DEFAULT 0,
+            total_score REAL DEFAULT 0,
+            max_score REAL DEFAULT 0,
+            score REAL DEFAULT 0,
+            total_questions INTEGER DEFAULT 0,
+            FOREIGN KEY (assessment_id) REFERENCES assessments (id),
+            FOREIGN KEY (student_id) REFERENCES users (id),
+            UNIQUE(assessment_id, student_id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            submission_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer_text TEXT,
+            is_correct BOOLEAN,
+            points_earned REAL DEFAULT 0,
+            feedback TEXT,
+            FOREIGN KEY (submission_id) REFERENCES submissions (id),
+            FOREIGN KEY (question_id) REFERENCES questions (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS security_questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            question_text TEXT UNIQUE NOT NULL
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS answer_responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            submission_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer_text TEXT,
+            selected_option TEXT,
+            is_correct BOOLEAN,
+            points_earned REAL DEFAULT 0,
+            feedback TEXT,
+            FOREIGN KEY (submission_id) REFERENCES submissions (id),
+            FOREIGN KEY (question_id) REFERENCES questions (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS announcements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            created_by INTEGER NOT NULL,
+            target_sections TEXT,  -- JSON array of sections, NULL for all students
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (created_by) REFERENCES users (id)
+        )
+    ''')
+
+    # Tables created by older releases may predate some columns. SQLite cannot
+    # ADD COLUMN with a UNIQUE constraint, so those are added as plain columns.
+    added_user_columns = _add_missing_columns(cursor, 'users', [
+        ('admin_id_number', 'TEXT'),
+        ('student_number', 'TEXT'),
+        ('section', 'TEXT'),
+        ('security_question', 'TEXT NOT NULL DEFAULT "What is your favorite teacher\'s name?"'),
+        ('security_answer_hash', 'TEXT NOT NULL DEFAULT "default_hash"'),
+        ('profile_photo', 'TEXT'),
+    ])
+    if 'security_answer_hash' in added_user_columns:
+        cursor.execute('''
+            UPDATE users
+            SET security_question = "What is your favorite teacher's name?",
+                security_answer_hash = ?
+            WHERE security_answer_hash = "default_hash"
+        ''', (db.hash_password("default"),))
+
+    added_assessment_columns = _add_missing_columns(cursor, 'assessments', [
+        ('status', 'TEXT DEFAULT "draft" CHECK(status IN ("draft", "published", "active", "closed"))'),
+        ('enforce_per_question_time', 'BOOLEAN DEFAULT 0'),
+        ('per_question_duration_seconds', 'INTEGER'),
+    ])
+    if 'status' in added_assessment_columns:
+        cursor.execute('UPDATE assessments SET status = "published" WHERE is_active = 1')
+    cursor.execute('UPDATE assessments SET status = "published" WHERE status IS NULL AND is_active = 1')
+    cursor.execute('UPDATE assessments SET status = "draft" WHERE status IS NULL AND is_active = 0')
+    cursor.execute('UPDATE assessments SET status = "draft" WHERE status = ""')
+
+    _add_missing_columns(cursor, 'submissions', [
+        ('score', 'REAL DEFAULT 0'),
+        ('total_questions', 'INTEGER DEFAULT 0'),
+    ])
+    _add_missing_columns(cursor, 'comments', [
+        ('post_type', 'TEXT DEFAULT "post"'),
+        ('parent_comment_id', 'INTEGER DEFAULT NULL'),
+    ])
+
+    # Predefined security questions
+    cursor.executemany('''
+        INSERT OR IGNORE INTO security_questions (question_text)
+        VALUES (?)
+    ''', [
+        ("What is your favorite teacher's name?",),
+        ("What is your pet's name?",),
+        ("What is the name of your first school?",),
+        ("What is your favorite subject?",),
+        ("What is your mother's maiden name?",),
+    ])
+
+    # Default admin and sample student on an empty database
+    cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute('''
+            INSERT INTO users (username, password_hash, role, full_name, email, admin_id_number, security_question, security_answer_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', ("admin", db.hash_password("admin123"), "admin", "System Administrator", "admin@system.com",
+              "ADMIN001", "What is your favorite teacher's name?", db.hash_password("admin")))
+        cursor.execute('''
+            INSERT INTO users (username, password_hash, role, full_name, email, student_number, section, security_question, security_answer_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', ("student", db.hash_password("student123"), "student", "Test Student", "student@test.com",
+              "STU001", "1A", "What is your favorite teacher's name?", db.hash_password("student")))
+
+
+@migration(2, "Secondary indexes for hot query paths")
+def _hot_path_indexes(cursor, db):
+    """Indexes behind the submission, grading, class feed and dashboard queries"""
+    for statement in HOT_PATH_INDEXES:
+        cursor.execute(statement)
+
+
+HOT_PATH_INDEXES = [
+    # submissions(assessment_id, ...) is already covered by UNIQUE(assessment_id, student_id)
+    'CREATE INDEX IF NOT EXISTS idx_submissions_student ON submissions (student_id, submitted_at)',
+    'CREATE INDEX IF NOT EXISTS idx_submissions_submitted_at ON submissions (submitted_at)',
+    'CREATE INDEX IF NOT EXISTS idx_answers_submission ON answers (submission_id, question_id)',
+    'CREATE INDEX IF NOT EXISTS idx_answers_question ON answers (question_id)',
+    'CREATE INDEX IF NOT EXISTS idx_questions_assessment_order ON questions (assessment_id, order_index)',
+    'CREATE INDEX IF NOT EXISTS idx_post_sections_section ON post_sections (section, post_id)',
+    'CREATE INDEX IF NOT EXISTS idx_comments_post ON comments (post_id, post_type, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_file_submissions_post ON file_submissions (post_id, submitted_at)',
+    'CREATE INDEX IF NOT EXISTS idx_posts_assessment ON posts (assessment_id)',
+    'CREATE INDEX IF NOT EXISTS idx_posts_type_created ON posts (post_type, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_posts_created_by ON posts (created_by, post_type)',
+    'CREATE INDEX IF NOT EXISTS idx_users_section_role ON users (section, role)',
+    'CREATE INDEX IF NOT EXISTS idx_assessments_created_by ON assessments (created_by, status)',
+]
+
+
+
+@migration(3, "Trigger-maintained admin dashboard stats")
+def _admin_stats(cursor, db):
+    """Summary tables and triggers behind get_admin_dashboard_stats, populated from current data"""
+    admin_stats.create_schema(cursor)
+    admin_stats.rebuild(cursor)
+
+
+@migration(4, "Per-assessment score rollup")
+def _assessment_stats(cursor, db):
+    """assessment_stats and its triggers, populated from current data"""
+    assessment_stats.create_schema(cursor)
+    assessment_stats.rebuild(cursor)
+
+
+@migration(5, "announcement_sections join table for section targeting")
+def _announcement_sections(cursor, db):
+    """Move announcement targeting out of the target_sections text into an indexed join table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS announcement_sections (
+            announcement_id INTEGER NOT NULL,
+            section TEXT NOT NULL,
+            PRIMARY KEY (announcement_id, section)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_announcement_sections_section '
+                   'ON announcement_sections (section, announcement_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_announcements_active_created '
+                   'ON announcements (is_active, created_at)')
+
+    # Backfill from the legacy strings; NULL/empty targeting means every section
+    cursor.execute("SELECT id, target_sections FROM announcements")
+    for announcement_id, target_sections in cursor.fetchall():
+        db.write_announcement_sections(cursor, announcement_id, target_sections)
+
+@migration(6, "Indexes behind the keyset-paginated listings")
+def _pagination_indexes(cursor, db):
+    """One index per (filter, sort key) the page_* listings ORDER BY; the rowid breaks ties"""
+    for statement in PAGINATION_INDEXES:
+        cursor.execute(statement)
+
+
+PAGINATION_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_submissions_assessment_score ON submissions (assessment_id, score)',
+    'CREATE INDEX IF NOT EXISTS idx_submissions_assessment_submitted ON submissions (assessment_id, submitted_at)',
+    'CREATE INDEX IF NOT EXISTS idx_users_role_name ON users (role, full_name)',
+    'CREATE INDEX IF NOT EXISTS idx_assessments_created ON assessments (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_assessment_stats_taken ON assessment_stats (taken)',
+    'CREATE INDEX IF NOT EXISTS idx_announcements_created ON announcements (created_at)',
+]
+
+@migration(7, "FTS5 full-text search index")
+def _search_index(cursor, db):
+    """External-content FTS5 tables and their sync triggers, populated from current data"""
+    search_index.create_schema(cursor)
+    search_index.rebuild(cursor)
+
+
+@migration(8, "Short-answer auto-grading columns on answers")
+def _auto_grading(cursor, db):
+    """grade_source: NULL (scored at submit), 'auto', 'review' (auto proposal awaiting a teacher) or 'manual'"""
+    _add_missing_columns(cursor, 'answers', [
+        ('grade_source', 'TEXT'),
+        ('auto_confidence', 'REAL'),
+    ])
+
+
+@migration(9, "Partial index behind the grading queue")
+def _grading_queue_index(cursor, db):
+    """Ungraded submissions only, oldest first per assessment: the next one to grade is one seek"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_grading_queue '
+                   'ON submissions (assessment_id, submitted_at) WHERE is_graded = 0')
+
+
+@migration(10, "MinHash signatures of short answers")
+def _answer_signatures(cursor, db):
+    """minhash: see database/similarity.py; NULL until computed, b'' for answers too short to compare"""
+    _add_missing_columns(cursor, 'answers', [('minhash', 'BLOB')])
+
+
+@migration(11, "Stop recreating stats rows for deleted assessments")
+def _assessment_stats_orphans(cursor, db):
+    """Triggers that only create rows for existing assessments; the rebuild drops rows already recreated"""
+    assessment_stats.recreate_triggers(cursor)
+    assessment_stats.rebuild(cursor)
+
+
+@migration(12, "Index the scores listing on the score it shows")
+def _listing_score_index(cursor, db):
+    """The score sort reads COALESCE(score, total_score, 0), as assessment_stats does. An index on that
+    expression replaces the one on the bare column, whose order put rows with only a total_score last"""
+    cursor.execute('DROP INDEX IF EXISTS idx_submissions_assessment_score')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_assessment_listing_score '
+                   'ON submissions (assessment_id, COALESCE(score, total_score, 0))')
+
+
+# ------------------------- CLI -------------------------
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.migrations",
+                                     description="Show or apply EduTrack schema migrations")
+    parser.add_argument("command", nargs="?", default="status", choices=["status", "upgrade"])
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        with db.connection() as conn:
+            current = get_schema_version(conn)
+        print(f"Database:        {db.db_path}")
+        print(f"Current version: {current}")
+        print(f"Latest version:  {latest_version()}")
+
+        pending = pending_migrations(current)
+        if not pending:
+            print("Schema is up to date.")
+            return 0
+
+        print("Pending migrations:")
+        for version, description, _ in pending:
+            print(f"  {version:>4}  {description}")
+
+        if args.command == "upgrade":
+            applied = apply_migrations(db)
+            print(f"Applied {len(applied)} migration(s); now at version {latest_version()}.")
+        return 0
+    except sqlite3.Error as e:
+        print(f"Migration error: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
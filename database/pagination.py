@@ -0,0 +1,85 @@
+"""
+Keyset pagination for the large listings.
+
+A page is fetched with ``ORDER BY sort_key, id LIMIT n`` and continues from
+the last row's ``(sort_key, id)``. It does not use ``OFFSET``, so page 200
+costs the same as page 1 as long as an index serves the ORDER BY. The id
+breaks ties, so rows that share a sort key are neither skipped nor repeated.
+
+Sort columns should be NOT NULL in practice. A row whose sort key is NULL
+sorts before every cursor, so it shows up on the first page only.
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page: that row's sort key and id"""
+    sort_key: Any
+    id: int
+
+
+class SortKey(NamedTuple):
+    """An indexed ORDER BY: SQL expressions plus the result keys holding their values"""
+    column: str
+    id_column: str
+    descending: bool
+    field: str
+    id_field: str
+
+
+@dataclass
+class ResultPage:
+    items: List
+    next_cursor: Optional[Cursor] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    def copy(self) -> 'ResultPage':
+        return ResultPage([item.copy() if hasattr(item, 'copy') else item for item in self.items],
+                          self.next_cursor)
+
+
+def resolve_sort(sorts: dict, sort: str) -> SortKey:
+    try:
+        return sorts[sort]
+    except KeyError:
+        raise ValueError(f"Unknown sort '{sort}'; expected one of {sorted(sorts)}") from None
+
+
+def contains_pattern(term: str) -> str:
+    """LIKE pattern matching ``term`` anywhere (use with ``ESCAPE '\\'``)"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def fetch_page(cursor, select_sql: str, sort: SortKey, *, where: Sequence[str] = (),
+               params: Sequence = (), after: Optional[Cursor] = None,
+               limit: int = DEFAULT_PAGE_SIZE) -> ResultPage:
+    """Run ``select_sql`` (no WHERE/ORDER BY/LIMIT) for one page after ``after``"""
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    clauses = list(where)
+    args = list(params)
+    if after is not None:
+        clauses.append(f"({sort.column}, {sort.id_column}) {'<' if sort.descending else '>'} (?, ?)")
+        args.extend(after)
+    direction = 'DESC' if sort.descending else 'ASC'
+    sql = select_sql
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {sort.column} {direction}, {sort.id_column} {direction} LIMIT ?"
+    args.append(limit + 1)
+
+    cursor.execute(sql, args)
+    rows = cursor.fetchall()
+    if len(rows) <= limit:
+        return ResultPage(rows)
+    rows = rows[:limit]
+    last = rows[-1]
+    return ResultPage(rows, Cursor(last[sort.field], last[sort.id_field]))
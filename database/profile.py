@@ -0,0 +1,446 @@
+"""
+Opt-in query profiler and slow-query log for DatabaseManager.
+
+``db.enable_profiling(session_path, slow_ms)`` instruments one DatabaseManager:
+
+* every public method records its call count and latency (inclusive of the
+  methods it calls), and the statements it runs are attributed to it;
+* every statement run through a pooled connection records its latency
+  (execute plus fetches), the rows fetched from it and its lock-wait time;
+* a statement slower than ``slow_ms`` is printed and logged with its query
+  plan and its parameters redacted to their types and lengths.
+
+Lock wait is the time spent in statements that wait for SQLite's write lock:
+``BEGIN IMMEDIATE``/``EXCLUSIVE``, ``COMMIT``, and any statement that failed
+with "database is locked".
+
+With a ``session_path`` every event is also appended to that file as one JSON
+object per line, and the report command ranks the hot paths of a recorded
+session. Set ``EDUTRACK_PROFILE=<path>`` (and optionally ``EDUTRACK_SLOW_MS``)
+to record one from the app.
+
+Usage:
+    python -m database.profile report SESSION [--sort total|p95|calls|max] [--limit N]
+"""
+
+import argparse
+import functools
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_SLOW_MS = 100.0
+
+# Statement text outside any DatabaseManager method: pages running SQL through db.connection()
+DIRECT = '<direct>'
+
+# Plumbing that does not need its own row in the report
+UNPROFILED_METHODS = {
+    'get_connection', 'connection', 'transaction', 'close', 'enable_profiling', 'disable_profiling',
+    'set_cache_enabled', 'get_cache_stats', 'get_profile_report',
+}
+
+_LOCK_STATEMENTS = ('BEGIN IMMEDIATE', 'BEGIN EXCLUSIVE', 'COMMIT', 'END')
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+_WHITESPACE_RE = re.compile(r'\s+')
+_PLACEHOLDER_LIST_RE = re.compile(r'\?(?:\s*,\s*\?)+')
+
+
+def normalize_sql(sql: str) -> str:
+    """One-line statement text; variable-length ``IN (?, ?, ...)`` lists group together"""
+    return _PLACEHOLDER_LIST_RE.sub('?, ...', _WHITESPACE_RE.sub(' ', sql).strip())
+
+
+def _redact_value(value) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f'<blob:{len(value)}>'
+    if isinstance(value, str):
+        return f'<str:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def redact(parameters):
+    """Bound parameters with every value replaced by its type (and length for text and blobs)"""
+    if isinstance(parameters, dict):
+        return {name: _redact_value(value) for name, value in parameters.items()}
+    try:
+        return [_redact_value(value) for value in parameters]
+    except TypeError:
+        return []
+
+
+class HotPathStats:
+    """Call count, latency distribution, rows and lock wait for one method or statement"""
+
+    MAX_SAMPLES = 2048
+
+    __slots__ = ('calls', 'total_ms', 'max_ms', 'rows', 'lock_ms', 'errors', 'statements', '_samples')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.lock_ms = 0.0
+        self.errors = 0
+        self.statements = 0
+        self._samples: List[float] = []
+
+    def add(self, ms: float, rows: int = 0, lock_ms: float = 0.0, error: bool = False) -> None:
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += rows
+        self.lock_ms += lock_ms
+        self.errors += bool(error)
+        # Reservoir sample: percentiles stay representative in bounded memory
+        if len(self._samples) < self.MAX_SAMPLES:
+            self._samples.append(ms)
+        else:
+            slot = random.randrange(self.calls)
+            if slot < self.MAX_SAMPLES:
+                self._samples[slot] = ms
+
+    def percentile(self, p: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class ProfiledCursor:
+    """sqlite3.Cursor stand-in that times each statement and counts the rows fetched from it.
+
+    A statement is recorded once its rows are exhausted, or when the cursor runs
+    the next statement, is closed or is garbage collected.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor, profiler: 'QueryProfiler', conn: sqlite3.Connection):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_profiler', profiler)
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_pending', None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # row_factory, arraysize, ... belong on the real cursor
+        setattr(self._cursor, name, value)
+
+    def _run(self, method, sql, parameters, many=False):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            method(sql, parameters)
+        except sqlite3.Error as e:
+            self._profiler.record_statement(sql, parameters, (time.perf_counter() - start) * 1000.0,
+                                            error=e, conn=self._conn, many=many)
+            raise
+        object.__setattr__(self, '_pending', [sql, parameters, (time.perf_counter() - start) * 1000.0, 0, many])
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(self._cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        result = self._run(self._cursor.executemany, sql, seq_of_parameters, many=True)
+        self._finish()
+        return result
+
+    def executescript(self, script):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            self._cursor.executescript(script)
+        finally:
+            self._profiler.record_statement(script, (), (time.perf_counter() - start) * 1000.0,
+                                            conn=self._conn, many=True)
+        return self
+
+    def _fetched(self, start: float, rows: int, exhausted: bool) -> None:
+        pending = self._pending
+        if pending is not None:
+            pending[2] += (time.perf_counter() - start) * 1000.0
+            pending[3] += rows
+            if exhausted:
+                self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self._cursor.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            object.__setattr__(self, '_pending', None)
+            sql, parameters, ms, rows, many = pending
+            self._profiler.record_statement(sql, parameters, ms, rows=rows, conn=self._conn, many=many)
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class QueryProfiler:
+    """Per-method and per-statement timings for one DatabaseManager, plus the slow-query log"""
+
+    # Kept in memory for report(); the session file has every one
+    MAX_SLOW_QUERIES = 500
+
+    def __init__(self, session_path: Optional[str] = None, slow_ms: float = DEFAULT_SLOW_MS,
+                 db_path: Optional[str] = None):
+        self.session_path = session_path
+        self.slow_ms = slow_ms
+        self.methods: Dict[str, HotPathStats] = {}
+        self.statements: Dict[Tuple[str, str], HotPathStats] = {}
+        self.slow_queries: List[Dict] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wrapped: List[str] = []
+        self._file = open(session_path, 'a', encoding='utf-8') if session_path else None
+        self._write({'type': 'session', 'started': time.time(), 'db_path': db_path, 'slow_ms': slow_ms})
+
+    # --- instrumentation ---
+    def attach(self, db) -> None:
+        """Wrap every public method of ``db`` (on the instance, so detach() restores the class methods)"""
+        for name in dir(type(db)):
+            if name.startswith('_') or name in UNPROFILED_METHODS:
+                continue
+            if not callable(getattr(type(db), name, None)) or isinstance(getattr(type(db), name), type):
+                continue
+            setattr(db, name, self._wrap(name, getattr(db, name)))
+            self._wrapped.append(name)
+
+    def detach(self, db) -> None:
+        for name in self._wrapped:
+            db.__dict__.pop(name, None)
+        self._wrapped = []
+
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            stack = self._method_stack()
+            stack.append(name)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - start) * 1000.0
+                stack.pop()
+                self.record_method(name, ms)
+        return profiled
+
+    def _method_stack(self) -> List[str]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_method(self) -> str:
+        stack = self._method_stack()
+        return stack[-1] if stack else DIRECT
+
+    def wrap_cursor(self, cursor: sqlite3.Cursor, conn: sqlite3.Connection) -> ProfiledCursor:
+        return ProfiledCursor(cursor, self, conn)
+
+    # --- recording ---
+    def record_method(self, name: str, ms: float) -> None:
+        with self._lock:
+            self.methods.setdefault(name, HotPathStats()).add(ms)
+        self._write({'type': 'method', 'method': name, 'ms': round(ms, 4)})
+
+    def record_statement(self, sql: str, parameters, ms: float, rows: int = 0, error: Exception = None,
+                         conn: sqlite3.Connection = None, many: bool = False) -> None:
+        method = self.current_method()
+        text = normalize_sql(sql)
+        head = text[:15].upper()
+        locked = error is not None and 'locked' in str(error).lower()
+        lock_ms = ms if locked or head.startswith(_LOCK_STATEMENTS) else 0.0
+        with self._lock:
+            self.statements.setdefault((method, text), HotPathStats()).add(ms, rows, lock_ms, error is not None)
+            # The method's own call is recorded when it returns, after its statements
+            stats = self.methods.setdefault(method, HotPathStats())
+            stats.statements += 1
+            stats.rows += rows
+            stats.lock_ms += lock_ms
+        self._write({'type': 'statement', 'method': method, 'sql': text, 'ms': round(ms, 4), 'rows': rows,
+                     'lock_ms': round(lock_ms, 4), 'error': str(error) if error is not None else None})
+        if ms >= self.slow_ms:
+            self._log_slow(method, text, sql, parameters, ms, rows, conn, many)
+
+    def _log_slow(self, method, text, sql, parameters, ms, rows, conn, many) -> None:
+        plan = []
+        if conn is not None and not many and text[:7].upper().startswith(_EXPLAINABLE):
+            try:
+                plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, parameters)]
+            except (sqlite3.Error, ValueError):
+                pass
+        entry = {'type': 'slow', 'method': method, 'sql': text, 'ms': round(ms, 4), 'rows': rows,
+                 'params': [] if many else redact(parameters), 'plan': plan}
+        with self._lock:
+            if len(self.slow_queries) < self.MAX_SLOW_QUERIES:
+                self.slow_queries.append(entry)
+        print(f"SLOW QUERY {ms:.1f} ms in {method}: {text[:200]} params={entry['params']}")
+        for line in plan:
+            print(f"    plan: {line}")
+        self._write(entry)
+
+    def _write(self, event: Dict) -> None:
+        if self._file is None:
+            return
+        event.setdefault('ts', round(time.time(), 6))
+        line = json.dumps(event, default=str) + '\n'
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def report(self, sort: str = 'total', limit: int = 20) -> str:
+        with self._lock:
+            return format_report(dict(self.methods), dict(self.statements), list(self.slow_queries),
+                                 sort=sort, limit=limit)
+
+
+# ------------------------- Report -------------------------
+_SORT_KEYS = {
+    'total': lambda s: s.total_ms,
+    'p95': lambda s: s.percentile(95),
+    'calls': lambda s: s.calls,
+    'max': lambda s: s.max_ms,
+}
+
+
+def load_session(lines: Iterable[str]):
+    """(method stats, statement stats, slow queries, session header) from a recorded session file"""
+    methods: Dict[str, HotPathStats] = {}
+    statements: Dict[Tuple[str, str], HotPathStats] = {}
+    slow: List[Dict] = []
+    header: Dict = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        kind = event.get('type')
+        if kind == 'method':
+            methods.setdefault(event['method'], HotPathStats()).add(event['ms'])
+        elif kind == 'statement':
+            rows, lock_ms = event.get('rows', 0), event.get('lock_ms', 0.0)
+            statements.setdefault((event['method'], event['sql']), HotPathStats()).add(
+                event['ms'], rows, lock_ms, bool(event.get('error')))
+            stats = methods.setdefault(event['method'], HotPathStats())
+            stats.statements += 1
+            stats.rows += rows
+            stats.lock_ms += lock_ms
+        elif kind == 'slow':
+            slow.append(event)
+        elif kind == 'session' and not header:
+            header = event
+    return methods, statements, slow, header
+
+
+def _table(title: str, rows: List[Tuple[str, HotPathStats]], extra: str, limit: int, width: int) -> List[str]:
+    lines = [title,
+             f"{'':<{width}}{'calls':>8}{'total ms':>11}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+             f"{'max':>9}{extra:>8}{'rows':>9}{'lock ms':>9}"]
+    for label, stats in rows[:limit]:
+        label = label if len(label) <= width - 2 else label[:width - 5] + '...'
+        count = stats.statements if extra.strip() == 'stmts' else stats.errors
+        lines.append(f"{label:<{width}}{stats.calls:>8}{stats.total_ms:>11.1f}{stats.mean_ms:>9.2f}"
+                     f"{stats.percentile(50):>9.2f}{stats.percentile(95):>9.2f}{stats.percentile(99):>9.2f}"
+                     f"{stats.max_ms:>9.1f}{count:>8}{stats.rows:>9}{stats.lock_ms:>9.1f}")
+    if len(rows) > limit:
+        lines.append(f"... {len(rows) - limit} more")
+    return lines
+
+
+def format_report(methods: Dict[str, HotPathStats], statements: Dict[Tuple[str, str], HotPathStats],
+                  slow: List[Dict], sort: str = 'total', limit: int = 20) -> str:
+    """Hot-path tables ranked by ``sort``, followed by the slowest logged queries"""
+    key = _SORT_KEYS[sort]
+    ranked_methods = sorted(methods.items(), key=lambda item: key(item[1]), reverse=True)
+    ranked_statements = sorted(((f"{method}: {sql}", stats) for (method, sql), stats in statements.items()),
+                               key=lambda item: key(item[1]), reverse=True)
+    lines = _table(f"Methods by {sort} (inclusive of nested calls)", ranked_methods, 'stmts', limit, 40)
+    lines.append('')
+    lines += _table(f"Statements by {sort}", ranked_statements, 'errors', limit, 72)
+    lines.append('')
+    lines.append(f"Slow queries: {len(slow)}")
+    for entry in sorted(slow, key=lambda e: e['ms'], reverse=True)[:limit]:
+        lines.append(f"{entry['ms']:>9.1f} ms  {entry['method']}: {entry['sql'][:160]}")
+        lines.append(f"{'':>14}params={entry.get('params')} rows={entry.get('rows', 0)}")
+        for step in entry.get('plan') or []:
+            lines.append(f"{'':>14}plan: {step}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database.profile",
+                                     description="Rank the hot paths of a recorded profiling session")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    report = subcommands.add_parser("report", help="Print the hot-path tables for a session file")
+    report.add_argument("session", help="Session file written by DatabaseManager.enable_profiling")
+    report.add_argument("--sort", choices=sorted(_SORT_KEYS), default='total')
+    report.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with open(args.session, encoding='utf-8') as session:
+        methods, statements, slow, header = load_session(session)
+    if header:
+        started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(header.get('started', 0)))
+        print(f"Session started {started} on {header.get('db_path')} (slow >= {header.get('slow_ms')} ms)")
+    print(format_report(methods, statements, slow, sort=args.sort, limit=args.limit))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
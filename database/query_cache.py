@@ -0,0 +1,204 @@
+"""
+Read-through cache for DatabaseManager getters.
+
+Results are kept in an LRU bounded by entry count and age, keyed by method name
+and arguments. Every cached method declares the tables it reads (``@cached``),
+and every DatabaseManager write method declares the tables it writes
+(``@invalidates``), which bumps those tables' generation counters. An entry is
+only served while the generations it was read under are still current.
+
+Writes the cache was not told about, such as raw SQL run by a page through
+``db.transaction()``, are still caught. The connection pool reports any
+connection whose ``total_changes`` moved, and outside a declared write that
+bumps every table. The TTL bounds staleness for what neither can see: writes
+from another process, and time-based queries such as "last 24 hours".
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database.pagination import ResultPage
+from database.records import Record
+
+ALL_TABLES = '*'
+
+_MISSING = object()
+
+
+class QueryCache:
+    """Thread-safe LRU + TTL cache with per-table generation invalidation"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 60.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'invalidated': 0}
+
+    def snapshot(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        """Current generations of ``tables`` (plus the all-tables generation)"""
+        with self._lock:
+            generations = self._generations
+            return (generations.get(ALL_TABLES, 0),) + tuple(generations.get(t, 0) for t in tables)
+
+    def get(self, key):
+        """Return the cached value for ``key`` or the module's ``_MISSING`` sentinel"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return _MISSING
+            value, tables, snapshot, expires_at = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return _MISSING
+            generations = self._generations
+            current = (generations.get(ALL_TABLES, 0),) + tuple(generations.get(t, 0) for t in tables)
+            if current != snapshot:
+                del self._entries[key]
+                self._stats['invalidated'] += 1
+                self._stats['misses'] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key, value, tables: Tuple[str, ...], snapshot: Tuple[int, ...]) -> None:
+        """Store a value read under ``snapshot``; it is never served if a write committed meanwhile"""
+        with self._lock:
+            self._entries[key] = (value, tables, snapshot, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def bump(self, tables: Iterable[str]) -> None:
+        """Invalidate everything read from ``tables`` (``'*'`` means every table)"""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    @contextmanager
+    def declared_writes(self, *tables: str):
+        """Writes made inside the block invalidate only ``tables``, bumped when the block exits"""
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            self.bump(tables)
+
+    def on_changes(self) -> None:
+        """Connection-pool hook: rows were written; unless declared, assume any table changed"""
+        if not getattr(self._local, 'depth', 0):
+            self.bump((ALL_TABLES,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['enabled'] = self.enabled
+        return stats
+
+
+
+class ChangeLog:
+    """Ids touched by each declared write of one table, in order.
+
+    Caches derived from that table remember the position they were built at. If
+    every generation bump since then has a matching note, they can patch just
+    those ids instead of rebuilding.
+    """
+
+    # Oldest notes are dropped past this; a cache that still needed them rebuilds
+    MAX_NOTES = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._notes: List[Tuple[int, ...]] = []
+        self._start = 0
+
+    def note(self, ids: Iterable[int]) -> None:
+        """Called once per declared write, with the ids it touched"""
+        with self._lock:
+            self._notes.append(tuple(ids))
+            if len(self._notes) > self.MAX_NOTES:
+                dropped = len(self._notes) // 2
+                del self._notes[:dropped]
+                self._start += dropped
+
+    @property
+    def position(self) -> int:
+        with self._lock:
+            return self._start + len(self._notes)
+
+    def since(self, position: int) -> Optional[List[Tuple[int, ...]]]:
+        """Notes made after ``position``; None if some were already dropped"""
+        with self._lock:
+            if position < self._start:
+                return None
+            return self._notes[position - self._start:]
+
+def _clone(value):
+    """Copy a cached result row by row; cached getters return flat rows of immutable scalars"""
+    if isinstance(value, list):
+        return [item.copy() if isinstance(item, (dict, Record)) else item for item in value]
+    if isinstance(value, (dict, Record, ResultPage)):
+        return value.copy()
+    return value
+
+
+def cached(*tables: str):
+    """Cache a DatabaseManager getter that reads ``tables``.
+
+    Callers get their own copy, so pages that sort or annotate a result cannot
+    change what the next caller sees. Calls with unhashable arguments bypass
+    the cache.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            if not cache.enabled:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                value = cache.get(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            if value is _MISSING:
+                snapshot = cache.snapshot(tables)
+                value = method(self, *args, **kwargs)
+                cache.put(key, value, tables, snapshot)
+            return _clone(value)
+        wrapper.cached_tables = tables
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables: str):
+    """Mark a DatabaseManager write method; its commits invalidate only reads of ``tables``"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.cache.declared_writes(*tables):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,261 @@
+"""
+EXPLAIN QUERY PLAN regression check for DatabaseManager.
+
+Seeds a throwaway database, calls every DatabaseManager query method while
+tracing the SQL it executes, and runs ``EXPLAIN QUERY PLAN`` on each statement.
+The check fails when a statement falls back to a full ``SCAN`` of one of the
+hot tables, which is what happens when an index from the migrations is missing
+or a query stops matching it.
+
+Usage:
+    python -m database.query_plans [--verbose]
+"""
+
+import argparse
+import inspect
+import os
+import re
+import sqlite3
+import tempfile
+from typing import Dict, List, Tuple
+
+from database.database_manager import DatabaseManager
+
+# Tables that grow with every term's data; a full scan of any of these is a failure
+HOT_TABLES = {
+    'submissions', 'answers', 'questions', 'post_sections', 'comments',
+    'file_submissions', 'posts', 'announcement_sections',
+}
+
+# Methods that intentionally read a whole table or are debug-only helpers
+UNCHECKED_METHODS = {
+    'list_all_users', 'debug_assessments_table', 'debug_user_data',
+    'fix_assessment_status_values', 'get_questions_by_assessment_id',
+}
+
+_TABLE_ALIAS_RE = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_SQL_KEYWORDS = {'ON', 'WHERE', 'JOIN', 'LEFT', 'INNER', 'GROUP', 'ORDER', 'SET', 'LIMIT', 'VALUES', 'USING'}
+
+
+def seed_database(db: DatabaseManager, sections: int = 4, students_per_section: int = 30,
+                  assessments: int = 12, questions: int = 10) -> Dict:
+    """Fill a fresh database with enough rows for the planner to prefer indexes"""
+    admin = db.authenticate_user("admin", "admin123")
+    section_names = [f"{n}A" for n in range(1, sections + 1)]
+    student_ids = []
+    for s, section in enumerate(section_names):
+        for n in range(students_per_section):
+            username = f"stu_{s}_{n}"
+            db.create_student_account(f"S{s:02d}{n:04d}", f"Student {s}-{n}", section, username,
+                                      "pw", f"{username}@school.test", "What is your pet's name?", "rex")
+            student_ids.append(db.get_user_by_username_or_email(username)['id'])
+
+    assessment_ids = []
+    for a in range(assessments):
+        assessment_id = db.create_assessment(f"Quiz {a}", "Seeded", admin['id'], None, None, 30, 'published')
+        question_ids = [db.add_question(assessment_id, f"Q{q}", 'mcq' if q % 3 else 'short_answer', 2,
+                                        'A', '["a", "b", "c", "d"]', q)
+                        for q in range(questions)]
+        post_id = db.create_post(f"Quiz {a}", "Seeded", 'assessment', admin['id'], assessment_id)
+        db.assign_post_sections(post_id, [section_names[a % sections]])
+        for student_id in student_ids[:: max(1, len(student_ids) // 40)]:
+            db.submit_assessment(assessment_id, student_id,
+                                 [{'question_id': qid, 'answer_text': 'A'} for qid in question_ids])
+        db.add_comment(post_id, admin['id'], "Seeded comment")
+        assessment_ids.append(assessment_id)
+
+    db.create_material("Notes", "Seeded", "/tmp/notes.pdf", admin['id'], str(section_names[:2]))
+    material_id = db.get_materials()[0]['id']
+    db.create_file_submission(material_id, student_ids[0], "/tmp/answer.pdf")
+    db.create_announcement("Welcome", "Seeded", admin['id'], '["1A"]')
+    with db.connection() as conn:
+        conn.execute("ANALYZE")
+        conn.commit()
+        submission_id = conn.execute("SELECT id FROM submissions LIMIT 1").fetchone()[0]
+        announcement_id = conn.execute("SELECT id FROM announcements LIMIT 1").fetchone()[0]
+
+    return {
+        'admin_id': admin['id'],
+        'student_id': student_ids[0],
+        'section': section_names[0],
+        'assessment_id': assessment_ids[0],
+        'submission_id': submission_id,
+        'material_id': material_id,
+        'announcement_id': announcement_id,
+        'post_id': material_id,
+    }
+
+
+def query_catalog(ids: Dict) -> List[Tuple[str, tuple, dict]]:
+    """Every DatabaseManager method worth checking, with arguments valid for the seeded data"""
+    return [
+        ('get_security_questions', (), {}),
+        ('get_user_by_username_or_email', ('admin',), {}),
+        ('verify_security_answer', (ids['student_id'], 'rex'), {}),
+        ('authenticate_user', ('admin', 'admin123'), {}),
+        ('get_user_by_id', (ids['student_id'],), {}),
+        ('get_student_by_id', (ids['student_id'],), {}),
+        ('create_admin_account', ('ADM-X', 'Extra Admin', 'extra_admin', 'pw', 'extra@school.test',
+                                  "What is your pet's name?", 'rex'), {}),
+        ('create_student_account', ('S-X', 'Extra Student', '1A', 'extra_student', 'pw', 'extra_s@school.test',
+                                    "What is your pet's name?", 'rex'), {}),
+        ('get_assessments', (ids['admin_id'], 'admin'), {}),
+        ('get_assessments', (ids['student_id'], 'student'), {}),
+        ('get_questions', (ids['assessment_id'],), {}),
+        ('get_assessment_by_id', (ids['assessment_id'],), {}),
+        ('get_available_sections', (), {}),
+        ('get_posts_for_student_section', (ids['student_id'],), {}),
+        ('get_admin_dashboard_stats', (ids['admin_id'],), {}),
+        ('get_comments', (ids['post_id'],), {}),
+        ('get_announcement_comments', (ids['announcement_id'],), {}),
+        ('get_file_submissions', (ids['material_id'],), {}),
+        ('get_published_assessments_with_stats', (), {}),
+        ('get_assessment_submissions', (ids['assessment_id'],), {}),
+        ('iter_assessment_submissions', (ids['assessment_id'],), {}),
+        ('get_student_submission', (ids['student_id'], ids['assessment_id']), {}),
+        ('get_submission_details', (ids['submission_id'],), {}),
+        ('finalize_submission_grade', (ids['submission_id'],), {}),
+        ('get_post_sections', (ids['assessment_id'],), {}),
+        ('get_posts_by_section', (ids['section'],), {}),
+        ('get_announcements_by_section', (ids['section'],), {}),
+        ('get_assessments_by_section', (ids['section'],), {}),
+        ('get_announcements', (), {}),
+        ('get_active_announcements', (), {}),
+        ('get_active_announcements_for_section', (ids['section'],), {}),
+        ('get_assessment_results', (ids['assessment_id'], ids['student_id']), {}),
+        ('get_student_answers', (ids['assessment_id'], ids['student_id']), {}),
+        ('get_student_answers_with_grades', (ids['assessment_id'], ids['student_id']), {}),
+        ('get_materials', (), {}),
+        ('page_assessment_submissions', (ids['assessment_id'],), {'limit': 5}),
+        ('page_assessment_submissions', (ids['assessment_id'],), {'limit': 5, 'sort': 'name', 'search': 'Student'}),
+        ('page_assessment_submissions', (ids['assessment_id'],), {'limit': 5, 'sort': 'submitted'}),
+        ('page_published_assessments_with_stats', (), {'limit': 5}),
+        ('page_published_assessments_with_stats', (), {'limit': 5, 'sort': 'most students', 'search': 'Quiz'}),
+        ('page_assessments', (), {'limit': 5}),
+        ('page_announcements', (), {'limit': 5}),
+        ('page_materials', (), {'limit': 5}),
+        ('page_file_submissions', (ids['material_id'],), {'limit': 5}),
+        ('page_users', (), {'limit': 5}),
+        ('iter_assessment_answers', (ids['assessment_id'],), {}),
+        ('count_assessment_answers', (ids['assessment_id'],), {}),
+        ('get_section_gradebook_assessments', (ids['section'],), {}),
+        ('iter_section_gradebook', (ids['section'], [ids['assessment_id']]), {}),
+        ('get_section_students', (ids['section'],), {}),
+        ('get_section_gradebook_cells', (ids['section'],), {}),
+        ('get_submission_cells', ([ids['submission_id']],), {}),
+        ('get_item_analysis_answers', (ids['assessment_id'],), {}),
+        ('get_snapshot_submissions', (ids['assessment_id'],), {}),
+        ('get_snapshot_submission_rows', (ids['assessment_id'], [ids['submission_id']]), {}),
+        ('get_submission_answer_rows', ([ids['submission_id']],), {}),
+        ('count_assessment_submissions', (ids['assessment_id'],), {}),
+        ('get_assessment_score_summary', (ids['assessment_id'],), {}),
+        ('get_snapshot_fingerprint', (ids['assessment_id'], ids['submission_id']), {}),
+        ('get_regrade_answers', (ids['assessment_id'],), {}),
+        ('get_regrade_submissions', (ids['assessment_id'],), {}),
+        ('apply_regrade', ([], [(1, 1, 10, ids['submission_id'])], [ids['submission_id']]), {}),
+        ('get_short_answer_rows', (ids['assessment_id'],), {}),
+        ('get_question_answers', (1,), {}),
+        ('save_question_grades', ([(1, 'ok', 1)],), {}),
+        ('page_grading_queue', (ids['assessment_id'],), {'limit': 3}),
+        ('page_grading_queue', (ids['assessment_id'],), {'limit': 3, 'after': ('2000-01-01 00:00:00', 1)}),
+        ('count_ungraded_submissions', (ids['assessment_id'],), {}),
+        ('get_answer_signatures', (ids['assessment_id'],), {}),
+        ('save_answer_signatures', ([(b'', 1)],), {}),
+        ('apply_auto_grades', ([(1, True, 0.9, 'auto', 1)], [(1, 1, 1, ids['submission_id'])],
+                               [ids['submission_id']]), {}),
+        ('search', ('quiz seeded',), {}),
+        ('search', ('seeded',), {'section': ids['section']}),
+        ('update_material', (ids['material_id'], 'Notes v2', 'Updated'), {}),
+        ('update_answer_grade', (1, 1.0, 'ok'), {}),
+        ('update_submission_grade', (ids['submission_id'], 2.0, 20.0,
+                                     [{'question_id': 1, 'points_earned': 2, 'feedback': ''}]), {}),
+        ('update_user_profile', (ids['student_id'],), {'full_name': 'Renamed Student'}),
+        ('update_user_password', (ids['student_id'], 'pw2'), {}),
+        ('toggle_announcement_status', (ids['announcement_id'],), {}),
+        ('update_announcement', (ids['announcement_id'], 'Welcome!', 'Seeded', '["1A"]'), {}),
+        ('submit_assessment', (ids['assessment_id'], ids['student_id'], [{'question_id': 1, 'answer_text': 'A'}]), {}),
+    ]
+
+
+def _alias_map(sql: str) -> Dict[str, str]:
+    aliases = {}
+    for table, alias in _TABLE_ALIAS_RE.findall(sql):
+        aliases[table.lower()] = table.lower()
+        if alias and alias.upper() not in _SQL_KEYWORDS:
+            aliases[alias.lower()] = table.lower()
+    return aliases
+
+
+def full_scans(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """Plan lines that fully scan a hot table (an index-only SCAN counts as a scan too)"""
+    aliases = _alias_map(sql)
+    problems = []
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+        detail = row[-1]
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if match and aliases.get(match.group(1).lower(), match.group(1).lower()) in HOT_TABLES:
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans(verbose: bool = False) -> List[Tuple[str, str, List[str]]]:
+    """Run the catalog against a seeded database and return (method, sql, scans) failures"""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Cache off: every catalog call must reach SQLite to be traced
+        db = DatabaseManager(os.path.join(tmp, 'plans.db'), cache_enabled=False)
+        db.initialize_database()
+        ids = seed_database(db)
+        catalog = query_catalog(ids)
+
+        public_methods = {name for name in dir(DatabaseManager)
+                          if not name.startswith('_') and callable(getattr(DatabaseManager, name))}
+        covered = {name for name, _, _ in catalog}
+        unchecked = sorted(public_methods - covered - UNCHECKED_METHODS)
+
+        for method, args, kwargs in catalog:
+            statements: List[str] = []
+            db.pool.set_trace_callback(statements.append)
+            try:
+                result = getattr(db, method)(*args, **kwargs)
+                if inspect.isgenerator(result):
+                    # Streaming methods only run their SQL as they are consumed
+                    for _ in result:
+                        pass
+            finally:
+                db.pool.set_trace_callback(None)
+            with db.connection() as conn:
+                for sql in statements:
+                    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+                    if head not in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH'):
+                        continue
+                    scans = full_scans(conn, sql)
+                    if verbose:
+                        print(f"{method}: {' '.join(sql.split())[:100]}")
+                    if scans:
+                        failures.append((method, ' '.join(sql.split()), scans))
+        db.close()
+
+    if unchecked and verbose:
+        print("Not exercised by the catalog: " + ", ".join(unchecked))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database.query_plans",
+                                     description="Fail if a DatabaseManager query fully scans a hot table")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    failures = check_query_plans(args.verbose)
+    if not failures:
+        print("OK: no hot query falls back to a full SCAN")
+        return 0
+    for method, sql, scans in failures:
+        print(f"FAIL {method}: {'; '.join(scans)}")
+        print(f"     {sql[:200]}")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+"""
+Typed row records for DatabaseManager getters.
+
+Each query shape gets one ``__slots__`` dataclass, generated once at import time
+by ``record_type``. Used as a cursor ``row_factory``, it builds the record
+straight from the sqlite3 row. There is no intermediate ``fetchall()`` list of
+tuples and no per-row dict. Records are also dict-compatible (``row['title']``,
+``row.get(...)``, ``dict(row)``, ``**row``), so pages that treated rows as dicts
+keep working. Keys that are not columns, set by pages that annotate rows, go
+into a small side dict that is only created when needed.
+"""
+
+from collections.abc import MutableMapping
+from dataclasses import make_dataclass
+from operator import attrgetter
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+
+class Record(MutableMapping):
+    """Dict-compatible base for generated row classes"""
+
+    __slots__ = ('_extra',)
+    _fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+    _values: Callable = staticmethod(lambda record: ())
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            return getattr(self, key)
+        extra = getattr(self, '_extra', None)
+        if extra is not None and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+            return
+        extra = getattr(self, '_extra', None)
+        if extra is None:
+            extra = self._extra = {}
+        extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            raise TypeError(f"Cannot remove column '{key}' from a {type(self).__name__}")
+        extra = getattr(self, '_extra', None)
+        if extra is None or key not in extra:
+            raise KeyError(key)
+        del extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        extra = getattr(self, '_extra', None)
+        if extra:
+            yield from extra
+
+    def __len__(self) -> int:
+        extra = getattr(self, '_extra', None)
+        return len(self._fields) + (len(extra) if extra else 0)
+
+    def __contains__(self, key) -> bool:
+        if key in self._field_set:
+            return True
+        extra = getattr(self, '_extra', None)
+        return bool(extra) and key in extra
+
+    def copy(self) -> 'Record':
+        clone = type(self)(*self._values(self))
+        extra = getattr(self, '_extra', None)
+        if extra:
+            clone._extra = dict(extra)
+        return clone
+
+    def to_dict(self) -> Dict:
+        result = {name: getattr(self, name) for name in self._fields}
+        extra = getattr(self, '_extra', None)
+        if extra:
+            result.update(extra)
+        return result
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+_RESERVED = set(dir(Record))
+_RECORD_TYPES: Dict[Tuple, type] = {}
+
+
+def record_type(name: str, fields: Sequence[str],
+                converters: Optional[Dict[str, Callable]] = None) -> type:
+    """Return the (cached) record class for a query shape.
+
+    ``fields`` are the dict keys in SELECT-column order. ``converters`` maps a
+    field to a function applied to its raw value, e.g. ``bool`` for 0/1 flags.
+    The class's ``row_factory`` can be assigned to ``cursor.row_factory``.
+    """
+    fields = tuple(fields)
+    key = (name, fields, tuple(sorted((converters or {}).items(), key=lambda item: item[0])))
+    cls = _RECORD_TYPES.get(key)
+    if cls is not None:
+        return cls
+
+    clashes = _RESERVED.intersection(fields)
+    if clashes:
+        raise ValueError(f"{name}: column names {sorted(clashes)} clash with mapping methods")
+
+    cls = make_dataclass(name, fields, bases=(Record,), slots=True, eq=False, repr=False)
+    cls._fields = fields
+    cls._field_set = frozenset(fields)
+    getter = attrgetter(*fields)
+    cls._values = staticmethod(getter if len(fields) > 1 else (lambda record: (getter(record),)))
+    cls.__module__ = __name__
+
+    if converters:
+        plan = [(fields.index(field), fn) for field, fn in converters.items()]
+
+        def row_factory(cursor, row, _cls=cls, _plan=plan):
+            values = list(row)
+            for index, fn in _plan:
+                values[index] = fn(values[index])
+            return _cls(*values)
+    else:
+        def row_factory(cursor, row, _cls=cls):
+            return _cls(*row)
+
+    cls.row_factory = staticmethod(row_factory)
+    _RECORD_TYPES[key] = cls
+    return cls
+
+
+def optional_bool(value):
+    return bool(value) if value is not None else None
+
+
+def iter_records(cursor, batch_size: int = 500) -> Iterator:
+    """Yield rows from an executed cursor in ``fetchmany`` batches"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+# ------------------------- Query shapes -------------------------
+
+_ASSESSMENT_FIELDS = ('id', 'title', 'description', 'created_by', 'start_time', 'end_time',
+                      'duration_minutes', 'status', 'is_active', 'created_at', 'creator_name')
+
+AssessmentRecord = record_type('AssessmentRecord', _ASSESSMENT_FIELDS)
+
+StudentAssessmentRecord = record_type('StudentAssessmentRecord', _ASSESSMENT_FIELDS + ('is_submitted',))
+
+QuestionRecord = record_type('QuestionRecord', (
+    'id', 'question_text', 'question_type', 'points', 'correct_answer', 'options', 'order_index'))
+
+PostRecord = record_type('PostRecord', (
+    'id', 'title', 'description', 'post_type', 'created_by', 'assessment_id', 'file_path',
+    'created_at', 'author_name'))
+
+MaterialRecord = record_type('MaterialRecord', (
+    'id', 'title', 'description', 'file_path', 'created_at', 'creator_name'))
+
+SubmissionListingRecord = record_type('SubmissionListingRecord', (
+    'submission_id', 'student_id', 'student_number', 'student_name', 'submitted_at',
+    'is_graded', 'total_score', 'max_score'), converters={'is_graded': bool})
+
+SubmissionAnswerRecord = record_type('SubmissionAnswerRecord', (
+    'answer_id', 'question_id', 'question_text', 'question_type', 'points', 'correct_answer',
+    'options', 'student_answer', 'is_correct', 'points_earned', 'feedback', 'grade_source',
+    'auto_confidence'), converters={'is_correct': optional_bool})
+
+QuestionAnswerRecord = record_type('QuestionAnswerRecord', (
+    'answer_id', 'submission_id', 'student_number', 'student_name', 'answer_text', 'points_earned', 'feedback',
+    'grade_source', 'auto_confidence', 'score', 'max_score', 'is_graded'), converters={'is_graded': bool})
+
+ScoreListingRecord = record_type('ScoreListingRecord', (
+    'submission_id', 'user_id', 'full_name', 'student_number', 'section', 'score', 'max_score',
+    'submitted_at', 'is_graded'), converters={'is_graded': bool})
+
+PublishedAssessmentRecord = record_type('PublishedAssessmentRecord', (
+    'id', 'title', 'description', 'created_at', 'start_time', 'end_time', 'total_questions',
+    'total_points', 'students_taken', 'graded_count', 'score_sum', 'score_sq_sum'))
+
+AnnouncementRecord = record_type('AnnouncementRecord', (
+    'id', 'title', 'content', 'created_by', 'is_active', 'created_at', 'creator_name', 'target_sections'))
+
+FileSubmissionRecord = record_type('FileSubmissionRecord', (
+    'id', 'post_id', 'student_id', 'student_name', 'file_path', 'submitted_at'))
+
+UserListingRecord = record_type('UserListingRecord', (
+    'id', 'username', 'email', 'role', 'full_name', 'student_number', 'section'))
+
+SearchResultRecord = record_type('SearchResultRecord', (
+    'scope', 'id', 'title', 'snippet', 'created_at', 'parent_type', 'parent_id', 'rank'))
+
+AnswerExportRecord = record_type('AnswerExportRecord', (
+    'submission_id', 'student_number', 'student_name', 'section', 'order_index', 'question_text',
+    'question_type', 'points', 'correct_answer', 'student_answer', 'is_correct', 'points_earned',
+    'feedback'), converters={'is_correct': optional_bool})
@@ -0,0 +1,191 @@
+"""
+Bulk regrade of an assessment after its answer key changed.
+
+Every answer to the assessment is read with one query. Answers to the
+questions being regraded are scored again in one batch with the assessment's
+AnswerKey (database/grading.py), the same rules submitting uses. Each
+submission's score and max score are then recomputed from all of its answers.
+Only rows whose values change are written, as two ``executemany`` UPDATEs in
+a single transaction, so a regrade lands completely or not at all. The report lists every submission whose score moved, and how
+many answers each question gained or lost.
+
+Short answers were graded by hand, so they are kept as they are. With
+``overwrite_manual`` they are scored again too, against the question's
+correct_answer (case and spacing ignored); short answers to questions without
+one are still kept. A dry run computes the same report without writing.
+
+Usage:
+    python -m database.regrade ASSESSMENT_ID [--questions ID [ID ...]] [--overwrite-manual]
+        [--dry-run] [--db PATH]
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from database.grading import AnswerKey
+
+
+@dataclass
+class SubmissionDiff:
+    submission_id: int
+    student_number: str
+    student_name: str
+    score_before: float
+    score_after: float
+    max_before: float
+    max_after: float
+    answers_changed: int
+
+
+@dataclass
+class QuestionDiff:
+    question_id: int
+    number: int      # position in the assessment, from 1
+    gained: int      # answers that are now correct
+    lost: int        # answers that no longer are
+
+
+@dataclass
+class RegradeReport:
+    assessment_id: int
+    dry_run: bool = True
+    questions_regraded: int = 0
+    submissions: int = 0
+    answers_checked: int = 0
+    answers_changed: int = 0
+    manual_kept: int = 0
+    submissions_updated: int = 0
+    changes: List[SubmissionDiff] = field(default_factory=list)
+    questions: List[QuestionDiff] = field(default_factory=list)
+
+    def summary(self, max_rows: int = 20) -> str:
+        action = "would change" if self.dry_run else "changed"
+        lines = [f"{self.submissions} submissions, {self.answers_checked} answers to "
+                 f"{self.questions_regraded} questions regraded: {self.answers_changed} answers and "
+                 f"{len(self.changes)} scores {action}"]
+        if self.manual_kept:
+            lines.append(f"{self.manual_kept} manually graded short answers kept")
+        for question in self.questions:
+            if question.gained or question.lost:
+                lines.append(f"  Q{question.number}: +{question.gained} correct, -{question.lost} correct")
+        for change in self.changes[:max_rows]:
+            lines.append(f"  {change.student_number} {change.student_name}: "
+                         f"{change.score_before:g}/{change.max_before:g} -> "
+                         f"{change.score_after:g}/{change.max_after:g}")
+        if len(self.changes) > max_rows:
+            lines.append(f"  ... {len(self.changes) - max_rows} more")
+        return '\n'.join(lines)
+
+
+def regrade_assessment(db, assessment_id: int, question_ids: Optional[Iterable[int]] = None,
+                       overwrite_manual: bool = False, dry_run: bool = False) -> RegradeReport:
+    """Regrade ``question_ids`` (default: all) of an assessment and, unless ``dry_run``, save the result.
+
+    Raises ValueError for an unknown assessment or a question that is not part of it.
+    """
+    if not db.get_assessment_by_id(assessment_id):
+        raise ValueError(f"Assessment {assessment_id} does not exist")
+    questions = db.get_questions(assessment_id)
+    answer_key = AnswerKey(questions, short_answers=overwrite_manual)
+    selected = set(answer_key.question_ids) if question_ids is None else set(question_ids)
+    unknown = selected - set(answer_key.question_ids)
+    if unknown:
+        raise ValueError(f"Question(s) {', '.join(map(str, sorted(unknown)))} are not in assessment {assessment_id}")
+    report = RegradeReport(assessment_id, dry_run=dry_run, questions_regraded=len(selected))
+
+    submissions = db.get_regrade_submissions(assessment_id)
+    answers = db.get_regrade_answers(assessment_id)
+    count = len(answers)
+    answer_ids = np.fromiter((row[0] for row in answers), np.int64, count=count)
+    rows = pd.Index([row[0] for row in submissions]).get_indexer(
+        np.fromiter((row[1] for row in answers), np.int64, count=count))
+    columns = pd.Index(answer_key.question_ids).get_indexer(
+        np.fromiter((row[2] for row in answers), np.int64, count=count))
+    texts = np.fromiter((row[3] for row in answers), object, count=count)
+    was_correct = np.fromiter((bool(row[4]) for row in answers), bool, count=count)
+    earned = np.fromiter((row[5] for row in answers), np.float64, count=count)
+    # Answers to since-deleted questions count for nothing, as in get_submission_details
+    keep = (rows >= 0) & (columns >= 0)
+    answer_ids, rows, columns, texts, was_correct, earned = (
+        a[keep] for a in (answer_ids, rows, columns, texts, was_correct, earned))
+
+    in_selection = np.isin(columns, [answer_key.columns[qid] for qid in selected])
+    graded = np.array([answer_key.is_graded(qid) for qid in answer_key.question_ids], dtype=bool)
+    regraded = in_selection & graded[columns]
+    report.manual_kept = int((in_selection & ~regraded).sum())
+    report.answers_checked = int(regraded.sum())
+
+    correct, new_earned, _, _ = answer_key.score_batch(rows[regraded], columns[regraded], texts[regraded],
+                                                       len(submissions))
+    is_correct = was_correct.copy()
+    is_correct[regraded] = correct
+    points_earned = earned.copy()
+    points_earned[regraded] = new_earned
+    changed = regraded & ((points_earned != earned) | (is_correct != was_correct))
+    report.answers_changed = int(changed.sum())
+
+    points = np.array(answer_key.points, dtype=float)
+    scores = np.bincount(rows, weights=points_earned, minlength=len(submissions))
+    max_scores = np.bincount(rows, weights=points[columns], minlength=len(submissions))
+    answers_changed = np.bincount(rows[changed], minlength=len(submissions))
+    gained = np.bincount(columns[changed & is_correct & ~was_correct], minlength=len(points))
+    lost = np.bincount(columns[changed & ~is_correct & was_correct], minlength=len(points))
+    report.questions = [QuestionDiff(qid, column + 1, int(gained[column]), int(lost[column]))
+                        for column, qid in enumerate(answer_key.question_ids) if qid in selected]
+
+    before = np.array([row[3] for row in submissions], dtype=float)
+    max_before = np.array([row[4] for row in submissions], dtype=float)
+    report.submissions = len(submissions)
+    moved = np.flatnonzero((np.abs(scores - before) > 1e-6) | (np.abs(max_scores - max_before) > 1e-6))
+    for row in moved.tolist():
+        submission_id, student_number, student_name = submissions[row][:3]
+        report.changes.append(SubmissionDiff(submission_id, student_number, student_name, float(before[row]),
+                                             float(scores[row]), float(max_before[row]), float(max_scores[row]),
+                                             int(answers_changed[row])))
+
+    if not dry_run and (report.answers_changed or report.changes):
+        answer_grades = list(zip(points_earned[changed].tolist(), is_correct[changed].tolist(),
+                                 answer_ids[changed].tolist()))
+        submission_scores = [(change.score_after, change.score_after, change.max_after, change.submission_id)
+                             for change in report.changes]
+        touched = set(np.flatnonzero(answers_changed).tolist()) | set(moved.tolist())
+        db.apply_regrade(answer_grades, submission_scores, sorted(submissions[row][0] for row in touched))
+        report.submissions_updated = len(submission_scores)
+    return report
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.regrade",
+                                     description="Regrade every submission of an assessment against its current key")
+    parser.add_argument("assessment_id", type=int)
+    parser.add_argument("--questions", type=int, nargs="+", default=None, metavar="ID",
+                        help="Only regrade these question ids")
+    parser.add_argument("--overwrite-manual", action="store_true",
+                        help="Also rescore short answers against their correct answer")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without saving them")
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    parser.add_argument("--max-rows", type=int, default=50, help="How many changed scores to print")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        report = regrade_assessment(db, args.assessment_id, args.questions,
+                                    overwrite_manual=args.overwrite_manual, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"Regrade failed: {e}")
+        return 2
+    finally:
+        db.close()
+    print(report.summary(args.max_rows))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
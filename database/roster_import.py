@@ -0,0 +1,276 @@
+"""
+Bulk student roster import from CSV or XLSX.
+
+The file is read in chunks: pandas for CSV, and openpyxl's read-only mode for
+XLSX, so a large intake never sits in memory as one workbook. Each chunk is
+validated with column-wise checks. A row is rejected when its username, email
+or student number is already taken, either in the database or earlier in the
+file. Every remaining account is then created with one ``executemany`` in a
+single transaction, so the import lands completely or not at all. A dry run does
+everything except that insert and returns the same report.
+
+Columns (header names are case-insensitive; spaces and dashes read as underscores):
+    student_number, section, username, email         required
+    full_name, or first_name + last_name (+ middle_name)
+    password, security_question, security_answer     required unless a default is given
+
+Usage:
+    python -m database.roster_import ROSTER.csv|ROSTER.xlsx [--dry-run] [--db PATH]
+        [--default-password PW] [--default-security-question Q] [--default-security-answer A]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+CHUNK_ROWS = 1000
+MIN_PASSWORD_LENGTH = 6  # same rule as the registration form
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+REQUIRED_COLUMNS = ('student_number', 'full_name', 'section', 'username', 'email',
+                    'password', 'security_question', 'security_answer')
+UNIQUE_COLUMNS = ('username', 'email', 'student_number')
+DEFAULTABLE_COLUMNS = ('password', 'security_question', 'security_answer')
+
+COLUMN_ALIASES = {
+    'student_no': 'student_number', 'student_id': 'student_number', 'id_number': 'student_number',
+    'name': 'full_name', 'student_name': 'full_name', 'e_mail': 'email', 'email_address': 'email',
+    'first': 'first_name', 'given_name': 'first_name', 'middle': 'middle_name',
+    'last': 'last_name', 'surname': 'last_name', 'family_name': 'last_name',
+}
+
+@dataclass
+class RowError:
+    row: int  # spreadsheet row number; the header is row 1
+    field: str
+    message: str
+
+
+@dataclass
+class ImportReport:
+    total_rows: int = 0
+    valid_rows: int = 0
+    created: int = 0
+    dry_run: bool = True
+    errors: List[RowError] = field(default_factory=list)
+
+    @property
+    def rejected_rows(self) -> int:
+        return len({error.row for error in self.errors if error.row})
+
+    def summary(self, max_errors: int = 20) -> str:
+        action = "would be created" if self.dry_run else "created"
+        count = self.valid_rows if self.dry_run else self.created
+        lines = [f"{self.total_rows} rows read: {count} students {action}, {self.rejected_rows} rows rejected"]
+        for error in self.errors[:max_errors]:
+            where = f"row {error.row}" if error.row else "file"
+            lines.append(f"  {where}: {error.field + ' ' if error.field else ''}{error.message}")
+        if len(self.errors) > max_errors:
+            lines.append(f"  ... {len(self.errors) - max_errors} more")
+        return '\n'.join(lines)
+
+
+def _column_name(header) -> str:
+    name = re.sub(r'[\s\-]+', '_', str(header).strip().lower())
+    return COLUMN_ALIASES.get(name, name)
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Excel stores 2024001 as 2024001.0
+        return str(int(value))
+    return str(value)
+
+
+def _read_xlsx(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [_cell_text(value) for value in header]
+        batch = []
+        for values in rows:
+            batch.append([_cell_text(value) for value in values[:len(columns)]])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def read_roster(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """The roster as DataFrames of up to ``chunk_rows`` rows, every cell as text"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        yield from _read_xlsx(path, chunk_rows)
+    elif extension in ('.csv', '.txt'):
+        with pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows,
+                         encoding='utf-8-sig', skip_blank_lines=True) as reader:
+            yield from reader
+    else:
+        raise ValueError(f"Unsupported roster file '{path}': use .csv or .xlsx")
+
+
+def _prepare(chunk: pd.DataFrame, first_row: int, defaults: Dict[str, str]) -> pd.DataFrame:
+    """Normalized text columns plus ``_row``; raises ValueError when a required column is missing"""
+    chunk = chunk.fillna('')
+    chunk.columns = [_column_name(column) for column in chunk.columns]
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    for column in chunk.columns:
+        chunk[column] = chunk[column].astype(str).str.strip()
+
+    if 'full_name' not in chunk.columns and {'first_name', 'last_name'} <= set(chunk.columns):
+        middle = chunk['middle_name'] if 'middle_name' in chunk.columns else ''
+        chunk['full_name'] = (chunk['first_name'] + ' ' + middle + ' ' + chunk['last_name']) \
+            .str.replace(r'\s+', ' ', regex=True).str.strip()
+    for column in DEFAULTABLE_COLUMNS:
+        default = defaults.get(column)
+        if default:
+            if column not in chunk.columns:
+                chunk[column] = default
+            else:
+                chunk[column] = chunk[column].mask(chunk[column] == '', default)
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Roster is missing column(s): {', '.join(missing)}")
+    chunk = chunk[list(REQUIRED_COLUMNS)].copy()
+    chunk['_row'] = range(first_row, first_row + len(chunk))
+    # Rows left completely empty by spreadsheets are not students
+    return chunk[(chunk[list(REQUIRED_COLUMNS)] != '').any(axis=1)]
+
+
+def _validate(chunk: pd.DataFrame, existing: Dict[str, Set[str]], seen: Dict[str, Set[str]],
+              errors: List[RowError]) -> pd.Series:
+    """Boolean mask of the rows that passed every check; failures are appended to ``errors``"""
+    invalid = pd.Series(False, index=chunk.index)
+
+    def reject(mask: pd.Series, column: str, message: str) -> None:
+        nonlocal invalid
+        if mask.any():
+            errors.extend(RowError(int(row), column, message) for row in chunk.loc[mask, '_row'])
+            invalid |= mask
+
+    for column in REQUIRED_COLUMNS:
+        reject(chunk[column] == '', column, "is required")
+    present = chunk['password'] != ''
+    reject(present & (chunk['password'].str.len() < MIN_PASSWORD_LENGTH), 'password',
+           f"must be at least {MIN_PASSWORD_LENGTH} characters")
+    present = chunk['email'] != ''
+    reject(present & ~chunk['email'].str.match(EMAIL_PATTERN), 'email', "is not a valid email address")
+
+    for column in UNIQUE_COLUMNS:
+        values = chunk[column]
+        reject((values != '') & values.isin(existing[column]), column, "already exists")
+
+    # A value is taken only by a row that is imported, so a row rejected for any other
+    # reason does not make a later row with the same value a repeat
+    candidates = chunk[~invalid]
+    clashes = pd.Series(False, index=candidates.index)
+    for column in UNIQUE_COLUMNS:
+        values = candidates[column]
+        clashes |= values.isin(seen[column]) | values.duplicated(keep=False)
+    for column in UNIQUE_COLUMNS:
+        # Rows sharing no value with another row or an earlier chunk are imported as they are
+        seen[column].update(candidates.loc[~clashes, column])
+    # The rest, in file order: each is imported unless an earlier imported row took one of its values
+    repeated = {column: [] for column in UNIQUE_COLUMNS}
+    for index, row in candidates[clashes].iterrows():
+        taken = [column for column in UNIQUE_COLUMNS if row[column] in seen[column]]
+        for column in taken:
+            repeated[column].append(index)
+        if not taken:
+            for column in UNIQUE_COLUMNS:
+                seen[column].add(row[column])
+    for column in UNIQUE_COLUMNS:
+        reject(pd.Series(chunk.index.isin(repeated[column]), index=chunk.index), column, "is repeated in the file")
+    return ~invalid
+
+
+def import_roster(db, path: str, dry_run: bool = False, defaults: Optional[Dict[str, str]] = None,
+                  chunk_rows: int = CHUNK_ROWS) -> ImportReport:
+    """Validate ``path`` and, unless ``dry_run``, create its valid students in one transaction.
+
+    Raises ValueError for an unreadable file or a missing column; per-row
+    problems are returned in the report instead.
+    """
+    defaults = {key: value for key, value in (defaults or {}).items() if value}
+    report = ImportReport(dry_run=dry_run)
+    existing = db.get_account_identifiers()
+    seen: Dict[str, Set[str]] = {column: set() for column in UNIQUE_COLUMNS}
+    accounts: List[Tuple] = []
+
+    first_row = 2
+    for chunk in read_roster(path, chunk_rows):
+        rows_in_chunk = len(chunk)
+        chunk = _prepare(chunk, first_row, defaults)
+        first_row += rows_in_chunk
+        report.total_rows += len(chunk)
+
+        valid = chunk[_validate(chunk, existing, seen, report.errors)]
+        if valid.empty:
+            continue
+        # SHA-256 costs microseconds per value; registration hashes the lower-cased answer
+        password_hashes = valid['password'].map(db.hash_password)
+        answer_hashes = valid['security_answer'].str.lower().map(db.hash_password)
+        accounts.extend(zip(valid['student_number'], valid['full_name'], valid['section'], valid['username'],
+                            password_hashes, valid['email'], valid['security_question'], answer_hashes))
+
+    report.valid_rows = len(accounts)
+    report.errors.sort(key=lambda error: error.row)
+    if dry_run or not accounts:
+        return report
+    try:
+        report.created = db.create_student_accounts(accounts)
+    except sqlite3.IntegrityError as e:
+        # Someone registered a clashing account after the check; nothing was written
+        report.errors.append(RowError(0, '', f"import rolled back, no students were created: {e}"))
+    return report
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.roster_import",
+                                     description="Create student accounts in bulk from a CSV or XLSX roster")
+    parser.add_argument("roster", help="Path to the .csv or .xlsx roster")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without creating accounts")
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    parser.add_argument("--default-password", default=None)
+    parser.add_argument("--default-security-question", default=None)
+    parser.add_argument("--default-security-answer", default=None)
+    parser.add_argument("--max-errors", type=int, default=50, help="How many row errors to print")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        report = import_roster(db, args.roster, dry_run=args.dry_run, defaults={
+            'password': args.default_password,
+            'security_question': args.default_security_question,
+            'security_answer': args.default_security_answer,
+        })
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+        return 2
+    finally:
+        db.close()
+    print(report.summary(args.max_errors))
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+"""
+FTS5 full-text index behind DatabaseManager.search.
+
+Each searchable table has an external-content FTS5 table next to it: the text
+lives only once, in the source table, and the FTS table stores just the inverted
+index. Triggers on the source tables keep the index current on every write path,
+so pages never maintain it by hand. Matching uses the unicode61 tokenizer with
+diacritics folded, and prefix indexes keep search-as-you-type queries
+("alge" -> "algebra") off the slow path.
+
+Usage:
+    python -m database.search_index check [--db PATH]
+    python -m database.search_index rebuild [--db PATH]
+"""
+
+import argparse
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+# source table -> (fts table, indexed columns, bm25 column weights)
+INDEXES = {
+    'announcements': ('announcements_fts', ('title', 'description'), (10.0, 1.0)),
+    'posts': ('posts_fts', ('title', 'description'), (10.0, 1.0)),
+    'questions': ('questions_fts', ('question_text',), (1.0,)),
+    'comments': ('comments_fts', ('content',), (1.0,)),
+}
+
+TOKENIZE = 'unicode61 remove_diacritics 2'
+
+# Wrap the matched words in a snippet; split_highlights() turns them into spans
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _row(t: str, columns) -> str:
+    return ', '.join(f'{t}.{column}' for column in columns)
+
+
+def _schema(table: str, fts: str, columns, weights) -> List[str]:
+    column_list = ', '.join(columns)
+    insert = f"INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.id, {_row('NEW', columns)});"
+    # External content: a delete must pass the exact values that were indexed
+    delete = (f"INSERT INTO {fts} ({fts}, rowid, {column_list}) "
+              f"VALUES ('delete', OLD.id, {_row('OLD', columns)});")
+    return [
+        f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {column_list}, content='{table}', content_rowid='id',
+            tokenize='{TOKENIZE}', prefix='2 3'
+        )
+        ''',
+        # Default ORDER BY rank: bm25 with titles weighted over bodies
+        f"INSERT INTO {fts} ({fts}, rank) VALUES ('rank', 'bm25({', '.join(map(str, weights))})')",
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            {insert}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            {delete}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {column_list} ON {table}
+        BEGIN
+            {delete}
+            {insert}
+        END
+        ''',
+    ]
+
+
+SCHEMA = [statement
+          for table, (fts, columns, weights) in INDEXES.items()
+          for statement in _schema(table, fts, columns, weights)]
+
+
+def create_schema(cursor) -> None:
+    for statement in SCHEMA:
+        cursor.execute(statement)
+
+
+def rebuild(cursor) -> None:
+    """Re-read every source table into its index"""
+    for fts, _, _ in INDEXES.values():
+        cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def find_drift(cursor) -> Dict[str, str]:
+    """{fts table: error} for every index that no longer matches its source table"""
+    drift = {}
+    for fts, _, _ in INDEXES.values():
+        try:
+            # rank = 1 also compares the index against the external content table
+            cursor.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('integrity-check', 1)")
+        except sqlite3.DatabaseError as e:
+            drift[fts] = str(e)
+    return drift
+
+
+def match_query(text: str) -> Optional[str]:
+    """FTS5 MATCH expression for free text typed into a search box, or None if it has no words.
+
+    Every word must appear (implicit AND) and matches as a prefix, so partial
+    words work while typing. Words are quoted, so FTS5 operators and punctuation
+    in the input are matched literally instead of being parsed as query syntax.
+    """
+    terms = _TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def split_highlights(snippet: str) -> List[Tuple[str, bool]]:
+    """[(text, is_match), ...] for a snippet returned by DatabaseManager.search"""
+    parts = []
+    for i, chunk in enumerate(re.split(f'[{HIGHLIGHT_START}{HIGHLIGHT_END}]', snippet or '')):
+        if chunk:
+            parts.append((chunk, i % 2 == 1))
+    return parts
+
+
+def rebuild_index(db) -> None:
+    with db.transaction() as conn:
+        rebuild(conn.cursor())
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.search_index",
+                                     description="Check or rebuild the full-text search index")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        if args.command == "rebuild":
+            rebuild_index(db)
+            print("Search index rebuilt.")
+            return 0
+        with db.connection() as conn:
+            drift = find_drift(conn.cursor())
+        if not drift:
+            print("No drift: the search index matches the source tables.")
+        for fts, error in sorted(drift.items()):
+            print(f"{fts}: {error}")
+        return 1 if drift else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+"""
+Near-duplicate short answers across a section: MinHash signatures and LSH.
+
+Every short answer long enough to be worth comparing (``MIN_CHARS`` after
+normalization, the same normalization as auto-grading) gets a MinHash
+signature when it is submitted. The signature is stored in answers.minhash
+(migration 10). Each answer is cut into overlapping ``SHINGLE``-character
+shingles, and each shingle is hashed once. The hash picks one of
+``NUM_PERM`` bins, and each bin keeps the smallest hash that falls into it
+(one-permutation hashing). A bin no shingle fell into copies the value of
+another bin, picked by a probe sequence that is the same for every answer
+(optimal densification). Two signatures then agree in a position with
+probability equal to the Jaccard similarity of the two shingle sets, as with
+NUM_PERM separate permutations, but for one hash per shingle instead of
+NUM_PERM. Answers too short to compare store an empty signature, so they are
+not looked at again.
+
+A report reads an assessment's signatures with one query, filling in any
+that are missing (answers from before migration 10) and saving them. Then,
+per question:
+
+- answers with the same signature (the same text, give or take case,
+  spacing and punctuation) are grouped first, so each is looked at once;
+- LSH banding: the signature is split into ``BANDS`` bands of ``ROWS``
+  values, and answers that share a whole band land in the same bucket. Only
+  answers sharing a bucket become candidate pairs, so the work grows with the
+  number of answers rather than its square. A pair at Jaccard s shares at
+  least one band with probability 1 - (1 - s^ROWS)^BANDS. With 16 bands of
+  4 that is 89% at 0.6, 99% at 0.7 and 6% at 0.25, the overlap unrelated
+  answers to the same question tend to have;
+- every candidate pair is verified with the exact Jaccard similarity of its
+  shingle sets, and pairs at ``threshold`` or above are joined into clusters.
+
+Answers close to the question's correct_answer are expected to look alike,
+so they are left out of the clusters unless ``include_key_matches``.
+
+Usage:
+    python -m database.similarity ASSESSMENT_ID [--questions ID [ID ...]] [--threshold 0.6]
+        [--include-key-matches] [--db PATH]
+"""
+
+import argparse
+import random
+import struct
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from database.auto_grade import normalize_text
+
+SHINGLE = 4
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MIN_CHARS = 20
+THRESHOLD = 0.6
+
+# Fixed seed: signatures are stored, so the probe sequences must never change
+_rng = random.Random(1299709)
+_PROBES = [[_rng.randrange(NUM_PERM) for _ in range(4 * NUM_PERM)] for _ in range(NUM_PERM)]
+_SIGNATURE = struct.Struct(f'<{NUM_PERM}I')
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+_BIN_SHIFT = 64 - (NUM_PERM - 1).bit_length()  # NUM_PERM is a power of two
+_BAND_BYTES = ROWS * 4
+
+
+def shingles(text) -> FrozenSet[str]:
+    """The overlapping SHINGLE-character pieces of the normalized answer"""
+    return _shingles(normalize_text(text))
+
+
+def _shingles(normalized: str) -> FrozenSet[str]:
+    if len(normalized) <= SHINGLE:
+        return frozenset((normalized,)) if normalized else frozenset()
+    return frozenset(normalized[i:i + SHINGLE] for i in range(len(normalized) - SHINGLE + 1))
+
+
+def signature(text) -> bytes:
+    """MinHash signature of an answer, or b'' when it is shorter than MIN_CHARS"""
+    normalized = normalize_text(text)
+    if len(normalized) < MIN_CHARS:
+        return b''
+    bins = [None] * NUM_PERM
+    for shingle in _shingles(normalized):
+        # CRC-32 spread over 64 bits by Fibonacci hashing: the top bits pick the bin
+        h = (zlib.crc32(shingle.encode('utf-8')) * _GOLDEN) & _MASK64
+        position, value = h >> _BIN_SHIFT, (h >> 26) & 0xFFFFFFFF
+        if bins[position] is None or value < bins[position]:
+            bins[position] = value
+    hashed = bins[:]
+    for position in range(NUM_PERM):
+        if hashed[position] is None:
+            # Every answer probes in the same order, and only bins a shingle fell into,
+            # so equal shingle sets still fill equal bins
+            source = next((probe for probe in _PROBES[position] if hashed[probe] is not None),
+                          next(i for i, value in enumerate(hashed) if value is not None))
+            bins[position] = hashed[source]
+    return _SIGNATURE.pack(*bins)
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    if not first or not second:
+        return 0.0
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+def candidate_pairs(signatures: Dict) -> set:
+    """Keys of ``signatures`` that share at least one LSH band, as (smaller, larger) pairs"""
+    pairs = set()
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        start = band * _BAND_BYTES
+        for key, sig in signatures.items():
+            buckets[sig[start:start + _BAND_BYTES]].append(key)
+        for members in buckets.values():
+            if len(members) > 1:
+                members.sort()
+                pairs.update((members[i], members[j]) for i in range(len(members))
+                             for j in range(i + 1, len(members)))
+    return pairs
+
+
+@dataclass
+class SimilarAnswer:
+    answer_id: int
+    submission_id: int
+    student_number: str
+    student_name: str
+    answer_text: str
+
+
+@dataclass
+class SimilarityCluster:
+    question_id: int
+    question_number: int
+    similarity: float  # highest verified similarity between two answers of the cluster
+    answers: List[SimilarAnswer] = field(default_factory=list)
+
+
+@dataclass
+class SimilarityReport:
+    assessment_id: int
+    threshold: float = THRESHOLD
+    answers_checked: int = 0
+    too_short: int = 0
+    key_matches: int = 0
+    signatures_computed: int = 0
+    candidate_pairs: int = 0
+    similar_pairs: int = 0
+    clusters: List[SimilarityCluster] = field(default_factory=list)
+
+    def by_answer(self) -> Dict[int, Tuple[int, SimilarityCluster]]:
+        """answer_id -> (cluster number within its question, cluster)"""
+        result = {}
+        numbers = defaultdict(int)
+        for cluster in self.clusters:
+            numbers[cluster.question_id] += 1
+            for answer in cluster.answers:
+                result[answer.answer_id] = (numbers[cluster.question_id], cluster)
+        return result
+
+    def summary(self, max_rows: int = 20) -> str:
+        flagged = sum(len(cluster.answers) for cluster in self.clusters)
+        lines = [f"{self.answers_checked} short answers compared ({self.too_short} too short, "
+                 f"{self.key_matches} close to the correct answer): {len(self.clusters)} clusters of "
+                 f"similar answers covering {flagged} answers",
+                 f"{self.candidate_pairs} candidate pairs from LSH, {self.similar_pairs} at "
+                 f"{self.threshold:.0%} similarity or more; {self.signatures_computed} signatures computed"]
+        for cluster in self.clusters[:max_rows]:
+            lines.append(f"  Q{cluster.question_number}: {len(cluster.answers)} answers, up to "
+                         f"{cluster.similarity:.0%} alike")
+            for answer in cluster.answers:
+                lines.append(f"    {answer.student_number} {answer.student_name}: {answer.answer_text[:70]!r}")
+        if len(self.clusters) > max_rows:
+            lines.append(f"  ... {len(self.clusters) - max_rows} more clusters")
+        return '\n'.join(lines)
+
+
+def find_similar_answers(db, assessment_id: int, question_ids: Optional[Iterable[int]] = None,
+                         threshold: float = THRESHOLD, include_key_matches: bool = False) -> SimilarityReport:
+    """Cluster near-duplicate short answers to ``question_ids`` (default: all), most alike first.
+
+    Raises ValueError for an unknown assessment, a question that is not one of
+    its short-answer questions, or a threshold outside (0, 1].
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"Threshold must be in (0, 1], got {threshold}")
+    if not db.get_assessment_by_id(assessment_id):
+        raise ValueError(f"Assessment {assessment_id} does not exist")
+    questions = db.get_questions(assessment_id)
+    numbers = {q['id']: number for number, q in enumerate(questions, start=1)}
+    keys = {q['id']: shingles(q['correct_answer']) for q in questions
+            if q['question_type'] == 'short_answer' and normalize_text(q['correct_answer'])}
+    short_answer_ids = {q['id'] for q in questions if q['question_type'] == 'short_answer'}
+    selected = short_answer_ids if question_ids is None else set(question_ids)
+    unknown = selected - short_answer_ids
+    if unknown:
+        raise ValueError(f"Question(s) {', '.join(map(str, sorted(unknown)))} are not short-answer "
+                         f"questions of assessment {assessment_id}")
+
+    report = SimilarityReport(assessment_id, threshold)
+    missing = []
+    # question_id -> signature -> answers with that signature
+    texts: Dict[int, Dict[bytes, List[SimilarAnswer]]] = defaultdict(lambda: defaultdict(list))
+    for answer_id, question_id, submission_id, student_number, student_name, answer_text, minhash \
+            in db.get_answer_signatures(assessment_id):
+        if question_id not in selected:
+            continue
+        report.answers_checked += 1
+        if minhash is None:
+            minhash = signature(answer_text)
+            missing.append((minhash, answer_id))
+        if not minhash:
+            report.too_short += 1
+            continue
+        texts[question_id][minhash].append(SimilarAnswer(answer_id, submission_id, student_number, student_name,
+                                                         answer_text))
+    if missing:
+        db.save_answer_signatures(missing)
+        report.signatures_computed = len(missing)
+
+    for question_id in sorted(texts, key=numbers.get):
+        key = None if include_key_matches else keys.get(question_id)
+        report.clusters.extend(_cluster(question_id, numbers[question_id], texts[question_id], key, threshold,
+                                        report))
+    report.clusters.sort(key=lambda c: (-c.similarity, c.question_number, -len(c.answers)))
+    return report
+
+
+def _cluster(question_id, number, by_signature, key, threshold, report) -> List[SimilarityCluster]:
+    """Verify one question's LSH candidates and union the similar answers into clusters"""
+    order = sorted(by_signature)
+    groups = [by_signature[sig] for sig in order]
+    pairs = candidate_pairs(dict(enumerate(order)))
+    report.candidate_pairs += len(pairs)
+    # Only texts that can end up in a cluster are shingled: copies and members of a candidate pair
+    involved = {i for pair in pairs for i in pair}
+    involved.update(i for i, answers in enumerate(groups) if len(answers) > 1)
+    shingle_sets = {i: shingles(groups[i][0].answer_text) for i in involved}
+    if key:
+        for i in sorted(involved):
+            if jaccard(shingle_sets[i], key) >= threshold:
+                involved.discard(i)
+                report.key_matches += len(groups[i])
+    parent = {i: i for i in involved}
+    best = {i: 1.0 if len(groups[i]) > 1 else 0.0 for i in involved}  # identical copies
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        if i not in involved or j not in involved:
+            continue
+        similarity = jaccard(shingle_sets[i], shingle_sets[j])
+        if similarity < threshold:
+            continue
+        report.similar_pairs += 1
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[root_j] = root_i
+            best[root_i] = max(best[root_i], best[root_j])
+        best[root_i] = max(best[root_i], similarity)
+
+    clusters = defaultdict(list)
+    for i in involved:
+        clusters[find(i)].extend(groups[i])
+    return [SimilarityCluster(question_id, number, best[root],
+                              sorted(answers, key=lambda a: (a.student_name or '', a.submission_id)))
+            for root, answers in clusters.items() if len(answers) > 1]
+
+
+def main(argv=None):
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog="python -m database.similarity",
+                                     description="Find clusters of near-duplicate short answers")
+    parser.add_argument("assessment_id", type=int)
+    parser.add_argument("--questions", type=int, nargs="+", default=None, metavar="ID",
+                        help="Only compare answers to these short-answer question ids")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Shingle (Jaccard) similarity at or above which two answers are flagged")
+    parser.add_argument("--include-key-matches", action="store_true",
+                        help="Also flag answers close to the question's correct answer")
+    parser.add_argument("--db", dest="db_path", default=None, help="Path to the SQLite database")
+    parser.add_argument("--max-rows", type=int, default=20, help="How many clusters to print")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        db.initialize_database()
+        report = find_similar_answers(db, args.assessment_id, args.questions, threshold=args.threshold,
+                                      include_key_matches=args.include_key_matches)
+    except ValueError as e:
+        print(f"Similarity check failed: {e}")
+        return 2
+    finally:
+        db.close()
+    print(report.summary(args.max_rows))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
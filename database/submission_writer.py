@@ -0,0 +1,149 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+
+class _PendingSubmission:
+    __slots__ = ('assessment_id', 'student_id', 'answers', 'future')
+
+    def __init__(self, assessment_id: int, student_id: int, answers: List[Dict]):
+        self.assessment_id = assessment_id
+        self.student_id = student_id
+        self.answers = answers
+        self.future: Future = Future()
+
+
+class SubmissionWriter:
+    """Single-writer queue that group-commits exam submissions.
+
+    When a timed assessment ends every student submits within the same second.
+    Instead of each caller fighting for SQLite's write lock, submissions are
+    queued and one writer thread commits them in batches: a batch closes when it
+    holds ``max_batch`` submissions or ``max_delay_ms`` has passed since its
+    first item arrived. Each caller gets a Future that resolves to the
+    submission id once the transaction containing it has committed.
+    """
+
+    def __init__(self, db_manager, max_batch: int = 64, max_delay_ms: float = 20.0):
+        self.db_manager = db_manager
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self._queue: "queue.Queue[Optional[_PendingSubmission]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {'submissions': 0, 'batches': 0, 'failures': 0, 'largest_batch': 0}
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush whatever is queued, then stop the writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, assessment_id: int, student_id: int, answers: List[Dict]) -> Future:
+        """Queue a submission; the returned Future resolves to its submission id once durable"""
+        if self._thread is None or not self._thread.is_alive():
+            raise RuntimeError("SubmissionWriter is not running")
+        item = _PendingSubmission(assessment_id, student_id, answers)
+        self._queue.put(item)
+        return item.future
+
+    def submit_and_wait(self, assessment_id: int, student_id: int, answers: List[Dict],
+                        timeout: Optional[float] = 30.0) -> int:
+        return self.submit(assessment_id, student_id, answers).result(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.perf_counter() + self.max_delay_ms / 1000.0
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        # Past the deadline: only take what is already waiting
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+        # Drain anything that raced in behind the stop marker
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                leftovers.append(item)
+        if leftovers:
+            self._flush(leftovers)
+
+    def _flush(self, batch: List[_PendingSubmission]) -> None:
+        try:
+            submission_ids = self._write_batch(batch)
+        except sqlite3.Error as e:
+            # One bad submission must not fail its neighbours: retry one by one
+            print(f"Group commit of {len(batch)} submissions failed ({e}); retrying individually")
+            for item in batch:
+                try:
+                    submission_id = self._write_batch([item])[0]
+                except Exception as item_error:
+                    self._record(1, failed=True)
+                    item.future.set_exception(item_error)
+                else:
+                    item.future.set_result(submission_id)
+            return
+        except Exception as e:
+            self._record(len(batch), failed=True)
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        for item, submission_id in zip(batch, submission_ids):
+            item.future.set_result(submission_id)
+
+    def _write_batch(self, batch: List[_PendingSubmission]) -> List[int]:
+        db = self.db_manager
+        answer_keys = {}
+        submission_ids = []
+        with db.cache.declared_writes('submissions', 'answers'), db.transaction() as conn:
+            cursor = conn.cursor()
+            for item in batch:
+                if item.assessment_id not in answer_keys:
+                    answer_keys[item.assessment_id] = db.load_answer_key(cursor, item.assessment_id)
+                submission_ids.append(db.write_submission(cursor, item.assessment_id, item.student_id,
+                                                          item.answers, answer_keys[item.assessment_id]))
+            db.note_submissions_changed(submission_ids)
+        self._record(len(batch))
+        return submission_ids
+
+    def _record(self, count: int, failed: bool = False) -> None:
+        with self._stats_lock:
+            if failed:
+                self._stats['failures'] += count
+                return
+            self._stats['submissions'] += count
+            self._stats['batches'] += 1
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], count)
@@ -16,6 +16,7 @@ from pages.scores_page import ScoresPage
 from pages.student_scores_list_page import StudentScoresListPage
 from pages.student_submission_grading_page import StudentSubmissionGradingPage
 from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
 import os
 
 def main(page: ft.Page):
@@ -43,10 +44,16 @@ def main(page: ft.Page):
     page.view_pop_animation = None
     
     db_manager = DatabaseManager()
+    # Opt-in profiling: EDUTRACK_PROFILE=session.jsonl, then python -m database.profile report session.jsonl
+    if os.getenv('EDUTRACK_PROFILE'):
+        db_manager.enable_profiling(os.getenv('EDUTRACK_PROFILE'), float(os.getenv('EDUTRACK_SLOW_MS', '100')))
     db_manager.initialize_database()
+    async_db = AsyncDatabaseManager.shared(db_manager)
     
     # Set up routing
     def route_change(route):
+        # Loads the previous page started in the background are stale now
+        async_db.cancel_all()
         # Clear views only if we're actually changing routes
         page.views.clear()
         
@@ -2,20 +2,32 @@ import flet as ft
 from datetime import datetime, timedelta
 import json
 from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
 from pages.assessment_management import AssessmentManagementPage
 from pages.create_assessment import CreateAssessmentPage
 from pages.scores_page import ScoresPage
+from pages.global_search import GlobalSearch
+from pages.roster_import_dialog import RosterImportDialog
 
 class AdminDashboard:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
         self.user_data = page.data
         self.assessments = []
+        # Stats arrive in the background; the cards show placeholders until then
+        self.stats_loading = True
+        self.total_students = 0
+        self.active_assessments = 0
+        self.completion_rate = 0
+        self.new_submissions = 0
         self.current_view = "dashboard"
         self.selected_assessment = None
         self.sections = ["1A", "1B", "2A", "2B", "3A", "3B", "4A", "4B"]
         self.post_dialog = None
+        self.roster_import = None
         # Initialize announcement text field properly
         self.announcement_text = ft.TextField(
             label="What would you like to announce?",
@@ -33,11 +45,16 @@ class AdminDashboard:
         
         # Initialize embedded page instances to preserve state
         self.scores_page = None
+        self._embedded_scores_page = None
+        
+        # Admins search everything, questions included
+        self.global_search = GlobalSearch(
+            page, db_manager, on_open=self.open_search_result,
+            hint_text="Search announcements, materials, assessments, questions, comments..."
+        )
         
         # Initialize UI components
         self.init_ui()
-        self.load_assessments()
-        self.load_dashboard_stats()
     
     def init_ui(self):
         """Initialize UI components"""
@@ -354,20 +371,61 @@ class AdminDashboard:
         """Load dashboard statistics"""
         # Pull live stats from DB
         try:
-            admin_id = self.user_data['id'] if isinstance(self.user_data, dict) and 'id' in self.user_data else None
-            stats = self.db_manager.get_admin_dashboard_stats(admin_id) if admin_id is not None else {
-                'total_students': 0, 'active_assessments': 0, 'completion_rate': 0, 'new_submissions': 0
-            }
-            self.total_students = stats.get('total_students', 0)
-            self.active_assessments = stats.get('active_assessments', 0)
-            self.completion_rate = stats.get('completion_rate', 0)
-            self.new_submissions = stats.get('new_submissions', 0)
+            admin_id = self.get_admin_id()
+            stats = self.db_manager.get_admin_dashboard_stats(admin_id) if admin_id is not None else {}
         except Exception:
+            stats = None
+        self.set_dashboard_stats(stats)
+
+    def get_admin_id(self):
+        return self.user_data['id'] if isinstance(self.user_data, dict) and 'id' in self.user_data else None
+
+    def set_dashboard_stats(self, stats):
+        """Store loaded statistics; None means the stats query failed"""
+        self.stats_loading = False
+        if stats is None:
             # Fallback to previous behavior if stats query fails
             self.total_students = 0
             self.active_assessments = len([a for a in self.assessments if a.get('is_active', True)])
             self.completion_rate = 0
             self.new_submissions = 0
+            return
+        self.total_students = stats.get('total_students', 0)
+        self.active_assessments = stats.get('active_assessments', 0)
+        self.completion_rate = stats.get('completion_rate', 0)
+        self.new_submissions = stats.get('new_submissions', 0)
+
+    def refresh_dashboard(self):
+        """Reload assessments and statistics in the background"""
+        self.requests.run(self._load_dashboard_data, key='dashboard')
+
+    async def _load_dashboard_data(self):
+        """Fetch assessments and statistics concurrently, then redraw if still on the dashboard"""
+        adb = self.async_db
+        admin_id = self.get_admin_id()
+        calls = {'assessments': adb.get_assessments(role='admin')}
+        if admin_id is not None:
+            calls['stats'] = adb.get_admin_dashboard_stats(admin_id)
+        results = await adb.gather(return_exceptions=True, **calls)
+        assessments, stats = results['assessments'], results.get('stats', {})
+        if isinstance(assessments, Exception):
+            print(f"Error loading assessments: {assessments}")
+        else:
+            self.set_assessments(assessments)
+        if isinstance(stats, Exception):
+            print(f"Error loading dashboard stats: {stats}")
+            stats = None
+        self.set_dashboard_stats(stats)
+        if self.current_view == "dashboard":
+            self.show_dashboard(refresh=False)
+    
+    def open_search_result(self, result):
+        """Open the view a global search hit belongs to"""
+        if result['scope'] in ('assessments', 'questions') and result['parent_id']:
+            self.show_create_assessment_inline(result['parent_id'])
+        else:
+            # Announcements, materials and their comments all live in the classfeed
+            self.show_classfeed()
     
     def create_stat_card(self, title, value, color="#bb5862"):
         """Create statistics card matching the prototype"""
@@ -415,26 +473,21 @@ class AdminDashboard:
             on_click=on_click
         )
     
-    def show_dashboard(self):
+    def show_dashboard(self, refresh=True):
         """Show dashboard view matching the prototype"""
         self.current_view = "dashboard"
         self.update_nav_active("dashboard")
-        # Always refresh live stats when opening the dashboard view
-        try:
-            self.load_assessments()
-            self.load_dashboard_stats()
-        except Exception:
-            pass
         
         # Header with date
         refresh_btn = ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Refresh stats",
-                                    on_click=lambda e: (self.load_assessments(), self.load_dashboard_stats(), self.show_dashboard()))
+                                    on_click=lambda e: self.refresh_dashboard())
         header = ft.Container(
             content=ft.Row([
                 ft.Row([
                     ft.Icon(ft.Icons.HOME, size=28, color="#D4817A"),
                     ft.Text("Dashboard", size=24, weight=ft.FontWeight.BOLD, color="#D4817A")
                 ], spacing=10),
+                ft.Container(self.global_search.build(), width=460),
                 ft.Row([
                     ft.Text(
                         datetime.now().strftime("%B %d, %Y"),
@@ -444,16 +497,18 @@ class AdminDashboard:
                     refresh_btn
                 ], spacing=10)
             ],
-            alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            vertical_alignment=ft.CrossAxisAlignment.START),
             padding=ft.padding.only(bottom=30)
         )
         
         # Statistics cards
+        loading = self.stats_loading
         stats_row = ft.Row([
-            self.create_stat_card("Total Students", self.total_students),
-            self.create_stat_card("Active Assessment", self.active_assessments),
-            self.create_stat_card("Completion Rate", f"{self.completion_rate}%"),
-            self.create_stat_card("New Submissions", self.new_submissions)
+            self.create_stat_card("Total Students", "-" if loading else self.total_students),
+            self.create_stat_card("Active Assessment", "-" if loading else self.active_assessments),
+            self.create_stat_card("Completion Rate", "-" if loading else f"{self.completion_rate}%"),
+            self.create_stat_card("New Submissions", "-" if loading else self.new_submissions)
         ],
         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
         spacing=20)
@@ -486,6 +541,12 @@ class AdminDashboard:
                         ft.Icons.CAMPAIGN, 
                         "#efb6aa", 
                         lambda e: self.show_classfeed()
+                    ),
+                    self.create_action_button(
+                        "Import Students",
+                        ft.Icons.GROUP_ADD,
+                        "#efb6aa",
+                        lambda e: self.open_roster_import()
                     )
                 ], spacing=15)
             ]),
@@ -563,6 +624,9 @@ class AdminDashboard:
         
         self.main_content.content = dashboard_content
         self.page.update()
+        # Always refresh live stats when opening the dashboard view
+        if refresh:
+            self.refresh_dashboard()
     
     def handle_post_announcement(self, e):
         """Handle posting announcement - completely rebuilt method"""
@@ -804,6 +868,16 @@ class AdminDashboard:
         self.post_dialog.open = True
         self.page.update()
 
+    def open_roster_import(self):
+        """Open the bulk student import dialog (CSV/XLSX roster)"""
+        if self.roster_import is None:
+            self.roster_import = RosterImportDialog(self.page, self.db_manager, on_imported=self.on_roster_imported)
+        self.roster_import.open()
+
+    def on_roster_imported(self, report):
+        self.show_success(f"Created {report.created} student accounts")
+        self.refresh_dashboard()
+
     def next_to_create_assessment(self):
         """Navigate to Create Assessment view from modal"""
         if self.post_dialog:
@@ -1104,7 +1178,7 @@ class AdminDashboard:
         self.main_content.content = manage_content
         self.page.update()
     
-    def show_results(self):
+    def show_results(self, reload=True):
         """Show results view (embedded from ScoresPage)."""
         self.current_view = "results"
         self.update_nav_active("scores")
@@ -1130,7 +1204,25 @@ class AdminDashboard:
         except:
             # If main_content update fails, just continue
             pass
+        # Fetch fresh stats in the background; the list redraws when they arrive
+        if reload:
+            self.scores_page.load_assessments_async()
     
+    def show_gradebook_embedded(self, section: str = None):
+        """Show the section gradebook inside the dashboard; back returns to Scores"""
+        self.current_view = "gradebook"
+        self.update_nav_active("scores")
+        from pages.gradebook_page import GradebookPage
+        gradebook = GradebookPage(self.page, self.db_manager, section, on_back=lambda: self.show_results(reload=False))
+        self.main_content.content = ft.Container(
+            content=gradebook.build(),
+            padding=40,
+            bgcolor="#f4f1ec",
+            expand=True
+        )
+        self.page.update()
+        gradebook.load()
+
     def show_student_scores_embedded(self, assessment_id: int):
         """Show student scores list embedded within admin dashboard - NO VIEW CLEARING"""
         print(f"DEBUG: Embedding student scores for assessment {assessment_id}")
@@ -1140,10 +1232,39 @@ class AdminDashboard:
         from pages.student_scores_list_page import StudentScoresListPage
         student_scores_page = StudentScoresListPage(self.page, self.db_manager, assessment_id)
         student_scores_page.parent_dashboard = self
-        
-        # Get assessment details for title
-        assessment_details = self.db_manager.get_assessment_by_id(assessment_id)
-        assessment_title = assessment_details.get('title', f'Assessment {assessment_id}') if assessment_details else f'Assessment {assessment_id}'
+        self._render_student_scores(student_scores_page)
+
+        def on_loaded():
+            # Only redraw if the admin is still looking at this assessment
+            if self.current_view == "student_scores" and self._embedded_scores_page is student_scores_page:
+                self._render_student_scores(student_scores_page)
+
+        student_scores_page.load_data_async(on_loaded)
+
+    def show_question_grading_embedded(self, assessment_id: int):
+        """Grade one question across every submission; back returns to the student list"""
+        self.current_view = "question_grading"
+        from pages.question_grading_page import QuestionGradingPage
+        grading = QuestionGradingPage(self.page, self.db_manager, assessment_id,
+                                      on_back=lambda: self.show_student_scores_embedded(assessment_id))
+        self.main_content.content = ft.Container(
+            content=grading.build(),
+            padding=40,
+            bgcolor="#f4f1ec",
+            expand=True
+        )
+        self.page.update()
+        grading.load()
+
+    def _render_student_scores(self, student_scores_page):
+        """Draw the embedded student scores list (placeholders until its data has loaded)"""
+        self._embedded_scores_page = student_scores_page
+        assessment_id = student_scores_page.assessment_id
+        assessment_details = student_scores_page.assessment
+        if student_scores_page.loading:
+            assessment_title = "Loading..."
+        else:
+            assessment_title = assessment_details.get('title', f'Assessment {assessment_id}') if assessment_details else f'Assessment {assessment_id}'
         
         # Create back button header with assessment title
         header = ft.Container(
@@ -1156,7 +1277,19 @@ class AdminDashboard:
                         on_click=lambda e: self.show_results()
                     ),
                     ft.Text("Back to Scores", size=14, color="#D4817A"),
-                    ft.Container(expand=True)
+                    ft.Container(expand=True),
+                    ft.OutlinedButton(
+                        "Grade next ungraded",
+                        icon=ft.Icons.SKIP_NEXT,
+                        style=ft.ButtonStyle(color="#D4817A"),
+                        on_click=lambda e: self.show_submission_grading_embedded(assessment_id)
+                    ),
+                    ft.OutlinedButton(
+                        "Grade by question",
+                        icon=ft.Icons.RATE_REVIEW,
+                        style=ft.ButtonStyle(color="#D4817A"),
+                        on_click=lambda e: self.show_question_grading_embedded(assessment_id)
+                    )
                 ]),
                 ft.Container(height=10),  # Spacing
                 ft.Text(assessment_title, size=18, weight=ft.FontWeight.BOLD, color="#D4817A"),
@@ -1218,8 +1351,11 @@ class AdminDashboard:
     
     def load_assessments(self):
         """Load assessments from database"""
-        self.assessments = self.db_manager.get_assessments(role='admin')
-        
+        self.set_assessments(self.db_manager.get_assessments(role='admin'))
+
+    def set_assessments(self, assessments):
+        """Store loaded assessments and rebuild the management list"""
+        self.assessments = assessments
         self.assessments_list.controls.clear()
         for assessment in self.assessments:
             self.assessments_list.controls.append(
@@ -1283,49 +1419,45 @@ class AdminDashboard:
         self.page.data = None
         self.page.go("/")
     
-    def show_submission_grading_embedded(self, assessment_id: int, submission_id: int):
-        """Show submission grading embedded within admin dashboard - NO VIEW CLEARING"""
+    def show_submission_grading_embedded(self, assessment_id: int, submission_id: int = None):
+        """Show submission grading embedded within admin dashboard - NO VIEW CLEARING.
+
+        Without a submission id the oldest ungraded one is opened. Either way
+        Save & next moves through the assessment's grading queue in place.
+        """
         print(f"DEBUG: Embedding grading for submission {submission_id}")
         self.current_view = "grading"
         
-        # Create grading content
+        # Create grading content; the queue loads the submission in the background
         from pages.student_submission_grading_page import StudentSubmissionGradingPage
-        grading_page = StudentSubmissionGradingPage(self.page, self.db_manager, assessment_id, submission_id)
+        from database.grading_queue import GradingQueue
+        grading_page = StudentSubmissionGradingPage(self.page, self.db_manager, assessment_id, submission_id,
+                                                    queue=GradingQueue(self.db_manager, assessment_id))
         grading_page.parent_dashboard = self
         
-        # Get submission details for student name
-        submission_details = self.db_manager.get_submission_details(submission_id)
-        student_name = submission_details.get('student_name', 'Unknown Student') if submission_details else 'Unknown Student'
-        
-        # Create back button header with student name
+        # Back button header; who is being graded is shown by the grading page itself
         header = ft.Container(
-            content=ft.Column([
-                ft.Row([
-                    ft.IconButton(
-                        icon=ft.Icons.ARROW_BACK,
-                        icon_color="#D4817A",
-                        icon_size=24,
-                        on_click=lambda e: self.show_student_scores_embedded(assessment_id)
-                    ),
-                    ft.Text("Back to Students", size=14, color="#D4817A"),
-                    ft.Container(expand=True)
-                ]),
-                ft.Container(height=10),  # Spacing
-                ft.Text(f"Grading: {student_name}", size=18, weight=ft.FontWeight.BOLD, color="#D4817A"),
-                ft.Text(f"Submission ID: {submission_id}", size=14, color="#666666")
-            ], spacing=5),
+            content=ft.Row([
+                ft.IconButton(
+                    icon=ft.Icons.ARROW_BACK,
+                    icon_color="#D4817A",
+                    icon_size=24,
+                    on_click=lambda e: grading_page.leave_queue(
+                        lambda: self.show_student_scores_embedded(assessment_id))
+                ),
+                ft.Text("Back to Students", size=14, color="#D4817A"),
+                ft.Container(expand=True)
+            ]),
             padding=ft.padding.all(15),
             bgcolor=ft.Colors.WHITE,
-            border_radius=10,
-            margin=ft.margin.only(bottom=15)
+            border_radius=10
         )
         
         # Embed grading content - ONLY UPDATE CONTENT, NO VIEW CLEARING
         grading_content = ft.Column([
             header,
-            grading_page.create_assessment_info_header(),
-            grading_page.create_grading_interface()
-        ], spacing=15)
+            grading_page.build_queue_content()
+        ], spacing=15, expand=True)
         
         # Update main content only - this is the key to preventing transitions
         self.main_content.content = ft.Container(
@@ -1336,6 +1468,7 @@ class AdminDashboard:
         )
         # Only update the page, don't clear or manipulate views
         self.page.update()
+        grading_page.start_queue()
         print(f"DEBUG: Grading embedded successfully - NO TRANSITIONS")
     
     def get_view(self):
@@ -1195,49 +1195,45 @@ class AdminUserPage:
             print(f"   Username: '{user_data['username']}'")
             
             # Use direct SQL approach (more reliable)
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            
             try:
-                # Update user profile directly with SQL
-                cursor.execute('''
-                    UPDATE users 
-                    SET full_name = ?, email = ?, admin_id_number = ?, security_question = ?
-                    WHERE id = ?
-                ''', (full_name, user_data['email'], user_data['admin_id'], 
-                      user_data['recovery_question'], user_id))
+                with self.db_manager.transaction() as conn:
+                    cursor = conn.cursor()
+                    
+                    # Update user profile directly with SQL
+                    cursor.execute('''
+                        UPDATE users 
+                        SET full_name = ?, email = ?, admin_id_number = ?, security_question = ?
+                        WHERE id = ?
+                    ''', (full_name, user_data['email'], user_data['admin_id'], 
+                          user_data['recovery_question'], user_id))
                 
-                print(f"✅ Updated user profile for ID {user_id}")
+                    print(f"✅ Updated user profile for ID {user_id}")
                 
-                # Update password if provided
-                if user_data.get('password'):
-                    password_hash = self.db_manager.hash_password(user_data['password'])
-                    cursor.execute('UPDATE users SET password_hash = ? WHERE id = ?', 
-                                 (password_hash, user_id))
-                    print(f"✅ Updated password for user ID {user_id}")
+                    # Update password if provided
+                    if user_data.get('password'):
+                        password_hash = self.db_manager.hash_password(user_data['password'])
+                        cursor.execute('UPDATE users SET password_hash = ? WHERE id = ?', 
+                                     (password_hash, user_id))
+                        print(f"✅ Updated password for user ID {user_id}")
                 
-                # Update profile photo if provided
-                if user_data.get('profile_photo'):
-                    cursor.execute('UPDATE users SET profile_photo = ? WHERE id = ?', 
-                                 (user_data['profile_photo'], user_id))
-                    print(f"✅ Updated profile photo for user ID {user_id}")
+                    # Update profile photo if provided
+                    if user_data.get('profile_photo'):
+                        cursor.execute('UPDATE users SET profile_photo = ? WHERE id = ?', 
+                                     (user_data['profile_photo'], user_id))
+                        print(f"✅ Updated profile photo for user ID {user_id}")
                 
-                # Update security answer if provided
-                if user_data.get('security_answer'):
-                    security_answer_hash = self.db_manager.hash_password(user_data['security_answer'].lower().strip())
-                    cursor.execute('UPDATE users SET security_answer_hash = ? WHERE id = ?', 
-                                 (security_answer_hash, user_id))
-                    print(f"✅ Updated security answer for user ID {user_id}")
+                    # Update security answer if provided
+                    if user_data.get('security_answer'):
+                        security_answer_hash = self.db_manager.hash_password(user_data['security_answer'].lower().strip())
+                        cursor.execute('UPDATE users SET security_answer_hash = ? WHERE id = ?', 
+                                     (security_answer_hash, user_id))
+                        print(f"✅ Updated security answer for user ID {user_id}")
                 
-                conn.commit()
                 print("✅ All database updates committed successfully")
                 
             except Exception as e:
                 print(f"❌ Database update failed: {e}")
-                conn.rollback()
                 raise Exception(f"Database update failed: {e}")
-            finally:
-                conn.close()
             
             # Update page data with new information
             if not self.page.data:
@@ -2,6 +2,8 @@ import flet as ft
 from datetime import datetime, timedelta
 import json
 from database.database_manager import DatabaseManager
+from pages.auto_grade_dialog import AutoGradeDialog
+from pages.regrade_dialog import RegradeDialog
 
 class AssessmentManagementPage:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
@@ -12,6 +14,8 @@ class AssessmentManagementPage:
         self.draft_assessments = []
         self.active_assessments = []
         self.all_assessments = []
+        self.regrade_dialog = None
+        self.auto_grade_dialog = None
         
         # Initialize UI components
         self.init_ui()
@@ -410,6 +414,20 @@ class AssessmentManagementPage:
                     tooltip="Unpublish",
                     on_click=lambda e, aid=assessment['id']: self.unpublish_assessment(aid)
                 ),
+                ft.IconButton(
+                    ft.Icons.AUTORENEW,
+                    icon_color="#D4817A",
+                    icon_size=16,
+                    tooltip="Regrade",
+                    on_click=lambda e, a=assessment: self.open_regrade(a['id'], a.get('title', ''))
+                ),
+                ft.IconButton(
+                    ft.Icons.SPELLCHECK,
+                    icon_color="#D4817A",
+                    icon_size=16,
+                    tooltip="Auto-grade short answers",
+                    on_click=lambda e, a=assessment: self.open_auto_grade(a['id'], a.get('title', ''))
+                ),
                 ft.IconButton(
                     ft.Icons.DELETE,
                     icon_color="#ea4335",  # Red color
@@ -553,14 +571,11 @@ class AssessmentManagementPage:
         """Publish a draft assessment"""
         try:
             # Update assessment status to published
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE assessments SET status = 'published' WHERE id = ?",
-                (assessment_id,)
-            )
-            conn.commit()
-            conn.close()
+            with self.db_manager.transaction() as conn:
+                conn.execute(
+                    "UPDATE assessments SET status = 'published' WHERE id = ?",
+                    (assessment_id,)
+                )
             
             # Reload assessments and refresh UI
             self.load_assessments()
@@ -579,14 +594,11 @@ class AssessmentManagementPage:
         """Unpublish a published assessment"""
         try:
             # Update assessment status to draft
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE assessments SET status = 'draft' WHERE id = ?",
-                (assessment_id,)
-            )
-            conn.commit()
-            conn.close()
+            with self.db_manager.transaction() as conn:
+                conn.execute(
+                    "UPDATE assessments SET status = 'draft' WHERE id = ?",
+                    (assessment_id,)
+                )
             
             # Reload assessments and refresh UI
             self.load_assessments()
@@ -601,21 +613,40 @@ class AssessmentManagementPage:
                 ft.SnackBar(content=ft.Text(f"Error unpublishing assessment: {e}"), bgcolor=ft.Colors.RED)
             )
     
+    def open_regrade(self, assessment_id, title=""):
+        """Regrade every submission after the answer key was corrected"""
+        if self.regrade_dialog is None:
+            self.regrade_dialog = RegradeDialog(self.page, self.db_manager, on_regraded=self.on_regraded)
+        self.regrade_dialog.open(assessment_id, title)
+    
+    def on_regraded(self, report):
+        self.page.show_snackbar(
+            ft.SnackBar(content=ft.Text(f"Regraded: {report.answers_changed} answers and "
+                                        f"{report.submissions_updated} scores updated"), bgcolor=ft.Colors.GREEN)
+        )
+    
+    def open_auto_grade(self, assessment_id, title=""):
+        """Score short answers against their correct answer; unsure ones stay in the grading queue"""
+        if self.auto_grade_dialog is None:
+            self.auto_grade_dialog = AutoGradeDialog(self.page, self.db_manager, on_graded=self.on_auto_graded)
+        self.auto_grade_dialog.open(assessment_id, title)
+    
+    def on_auto_graded(self, report):
+        self.page.show_snackbar(
+            ft.SnackBar(content=ft.Text(f"Auto-graded {report.answers_checked} short answers; "
+                                        f"{len(report.review)} left for review"), bgcolor=ft.Colors.GREEN)
+        )
+    
     def delete_assessment(self, assessment_id):
         """Delete an assessment"""
         def confirm_delete(e):
             try:
                 # Delete from database
-                conn = self.db_manager.get_connection()
-                cursor = conn.cursor()
-                
-                # Delete questions first (foreign key constraint)
-                cursor.execute("DELETE FROM questions WHERE assessment_id = ?", (assessment_id,))
-                # Delete assessment
-                cursor.execute("DELETE FROM assessments WHERE id = ?", (assessment_id,))
-                
-                conn.commit()
-                conn.close()
+                with self.db_manager.transaction() as conn:
+                    # Delete questions first (foreign key constraint)
+                    conn.execute("DELETE FROM questions WHERE assessment_id = ?", (assessment_id,))
+                    # Delete assessment
+                    conn.execute("DELETE FROM assessments WHERE id = ?", (assessment_id,))
                 
                 # Reload assessments and refresh UI
                 self.load_assessments()
@@ -0,0 +1,173 @@
+import flet as ft
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.auto_grade import ACCEPT_AT, REJECT_BELOW, auto_grade_assessment
+
+
+class AutoGradeDialog:
+    """Admin dialog: auto-grade an assessment's short answers, preview the proposals, then apply"""
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, on_graded=None):
+        self.page = page
+        self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.on_graded = on_graded
+        self.assessment_id = None
+        self.report = None
+        self.dialog = None
+
+        self.question_checks = []
+        self.questions_column = ft.Column(spacing=0, scroll=ft.ScrollMode.AUTO)
+        self.accept_slider = self._threshold_slider(ACCEPT_AT)
+        self.reject_slider = self._threshold_slider(REJECT_BELOW)
+        self.accept_label = ft.Text("", size=12, color="#666")
+        self.reject_label = ft.Text("", size=12, color="#666")
+        self.overwrite_manual = ft.Checkbox(
+            label="Also regrade answers a teacher already graded",
+            value=False,
+            active_color="#D4817A",
+            on_change=lambda e: self._preview(),
+        )
+        self.report_text = ft.Text("", size=12, selectable=True, font_family="monospace")
+        self.progress = ft.ProgressRing(width=20, height=20, visible=False)
+        self.apply_button = ft.ElevatedButton(
+            "Apply",
+            icon=ft.Icons.SPELLCHECK,
+            style=ft.ButtonStyle(bgcolor="#D4817A", color=ft.Colors.WHITE,
+                                 shape=ft.RoundedRectangleBorder(radius=10)),
+            disabled=True,
+            on_click=self.on_apply,
+        )
+
+    def _threshold_slider(self, value):
+        return ft.Slider(min=0, max=1, divisions=20, value=value, active_color="#D4817A",
+                         inactive_color="#F5E6E8", expand=True,
+                         on_change=lambda e: self._update_labels(),
+                         on_change_end=lambda e: self._preview())
+
+    def _update_labels(self):
+        self.accept_label.value = f"Full points at {self.accept_slider.value:.0%} similarity or more"
+        self.reject_label.value = f"No points at {self.reject_slider.value:.0%} or less; review in between"
+        self.page.update()
+
+    def open(self, assessment_id: int, title: str = ""):
+        """Show the dialog for one assessment with every keyed short-answer question selected"""
+        self.assessment_id = assessment_id
+        self.report = None
+        self.question_checks = []
+        for number, question in enumerate(self.db_manager.get_questions(assessment_id), start=1):
+            if question['question_type'] != 'short_answer':
+                continue
+            key = (question['correct_answer'] or '').strip()
+            check = ft.Checkbox(
+                label=f"Q{number} (key: {key or 'none, graded by hand'}) {question['question_text'][:60]}",
+                value=bool(key),
+                disabled=not key,
+                active_color="#D4817A",
+                on_change=lambda e: self._preview(),
+            )
+            check.data = question['id']
+            self.question_checks.append(check)
+        self.questions_column.controls = self.question_checks or [
+            ft.Text("This assessment has no short-answer questions", size=12, color="#666")]
+        self.accept_slider.value = ACCEPT_AT
+        self.reject_slider.value = REJECT_BELOW
+        self.overwrite_manual.value = False
+        self.report_text.value = ""
+        self.apply_button.text = "Apply"
+        self.apply_button.disabled = True
+
+        content = ft.Column([
+            ft.Text("Short-answer questions", size=13, weight=ft.FontWeight.BOLD, color="#D4817A"),
+            ft.Container(
+                content=self.questions_column,
+                height=120,
+                padding=5,
+                border_radius=10,
+                border=ft.border.all(1, "#E8B4CB"),
+            ),
+            ft.Row([ft.Text("Accept", size=12, width=50), self.accept_slider]),
+            self.accept_label,
+            ft.Row([ft.Text("Reject", size=12, width=50), self.reject_slider]),
+            self.reject_label,
+            ft.Row([self.overwrite_manual, self.progress], spacing=10),
+            ft.Container(
+                content=ft.Column([self.report_text], scroll=ft.ScrollMode.AUTO),
+                height=200,
+                padding=10,
+                border_radius=10,
+                border=ft.border.all(1, "#E8B4CB"),
+            ),
+        ], spacing=8, width=600, tight=True)
+
+        self.dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(f"Auto-grade {title}".strip(), color="#D4817A", weight=ft.FontWeight.BOLD),
+            content=content,
+            actions=[
+                ft.TextButton("Close", on_click=self.close),
+                self.apply_button,
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        self.page.dialog = self.dialog
+        self.dialog.open = True
+        self._update_labels()
+        self._preview()
+
+    def close(self, e=None):
+        self.requests.cancel()
+        if self.dialog:
+            self.page.close(self.dialog)
+
+    def _selected_questions(self):
+        return [check.data for check in self.question_checks if check.value]
+
+    def _preview(self):
+        """Dry run with the current selection and thresholds; nothing is written"""
+        self.requests.run(self._run, True, key='auto_grade')
+
+    def on_apply(self, e):
+        if self.report and self.report.answers_changed:
+            self.requests.run(self._run, False, key='auto_grade')
+
+    async def _run(self, dry_run):
+        question_ids = self._selected_questions()
+        if not question_ids:
+            self.report = None
+            self.report_text.value = "Select at least one question with a correct answer"
+            self.apply_button.disabled = True
+            self.page.update()
+            return
+        self._set_busy(True)
+        try:
+            report = await self.async_db.call(auto_grade_assessment, self.db_manager, self.assessment_id,
+                                              question_ids, accept_at=self.accept_slider.value,
+                                              reject_below=self.reject_slider.value,
+                                              overwrite_manual=bool(self.overwrite_manual.value), dry_run=dry_run)
+        except ValueError as e:
+            self.report = None
+            self.report_text.value = f"Cannot auto-grade: {e}"
+            self.apply_button.disabled = True
+            return
+        finally:
+            self._set_busy(False)
+
+        self.report = report
+        self.report_text.value = report.summary(max_rows=200)
+        if dry_run:
+            self.apply_button.text = f"Apply to {report.answers_changed} answers"
+            self.apply_button.disabled = not report.answers_changed
+        else:
+            # Saved proposals match a new preview, so there is nothing left to apply
+            self.apply_button.text = "Apply"
+            self.apply_button.disabled = True
+            if self.on_graded:
+                self.on_graded(report)
+        self.page.update()
+
+    def _set_busy(self, busy):
+        self.progress.visible = busy
+        self.apply_button.disabled = busy or self.apply_button.disabled
+        self.page.update()
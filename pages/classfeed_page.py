@@ -5,14 +5,23 @@ from pages.create_announcement import show_create_announcement_dialog
 import json
 import os
 import shutil
+import threading
 
 class ClassfeedPage:
+    PAGE_SIZE = 20
+
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db_manager = db_manager
         self.user_data = page.data
+        # Newest-first keyset pages; the cursors are None once everything is loaded
         self.announcements = []
         self.materials = []
+        self.announcements_cursor = None
+        self.materials_cursor = None
+        self.announcement_column = None
+        self.material_column = None
+        self._page_lock = threading.Lock()
         
         # Initialize file picker for material uploads
         self.file_picker = ft.FilePicker(on_result=self.on_file_picked)
@@ -28,21 +37,70 @@ class ClassfeedPage:
     def load_announcements(self):
         """Load all announcements"""
         try:
-            self.announcements = self.db_manager.get_announcements()
+            result = self.db_manager.page_announcements(limit=self.PAGE_SIZE)
+            self.announcements, self.announcements_cursor = result.items, result.next_cursor
             print(f"📢 Loaded {len(self.announcements)} announcements")
         except Exception as e:
             print(f"❌ Error loading announcements: {e}")
-            self.announcements = []
+            self.announcements, self.announcements_cursor = [], None
     
     def load_materials(self):
         """Load all uploaded materials"""
         try:
             # Get materials from posts table where post_type is 'file'
-            self.materials = self.db_manager.get_materials()
+            result = self.db_manager.page_materials(limit=self.PAGE_SIZE)
+            self.materials, self.materials_cursor = result.items, result.next_cursor
             print(f"📁 Loaded {len(self.materials)} materials")
         except Exception as e:
             print(f"❌ Error loading materials: {e}")
-            self.materials = []
+            self.materials, self.materials_cursor = [], None
+
+    def load_more_announcements(self, e=None):
+        """Append the next page of announcements in place"""
+        self._load_more(self.db_manager.page_announcements, 'announcements', self.announcement_column,
+                        self.create_announcement_card, self.load_more_announcements)
+
+    def load_more_materials(self, e=None):
+        """Append the next page of materials in place"""
+        self._load_more(self.db_manager.page_materials, 'materials', self.material_column,
+                        self.create_material_card, self.load_more_materials)
+
+    def _load_more(self, fetch, name, column, create_card, on_more):
+        cursor = getattr(self, f"{name}_cursor")
+        if cursor is None or column is None:
+            return
+        # Scroll events arrive quickly; one page fetch at a time
+        if not self._page_lock.acquire(blocking=False):
+            return
+        try:
+            result = fetch(after=cursor, limit=self.PAGE_SIZE)
+            getattr(self, name).extend(result.items)
+            setattr(self, f"{name}_cursor", result.next_cursor)
+            column.controls.pop()  # the old "Load more" footer
+            column.controls.extend(create_card(item) for item in result.items)
+            column.controls.append(self._create_load_more_footer(result.next_cursor, on_more))
+            column.update()
+        except Exception as ex:
+            print(f"❌ Error loading more {name}: {ex}")
+        finally:
+            self._page_lock.release()
+
+    def _create_load_more_footer(self, cursor, on_click):
+        if cursor is None:
+            return ft.Container(height=0)
+        return ft.Container(
+            content=ft.TextButton("Load more", icon=ft.Icons.EXPAND_MORE, on_click=on_click),
+            alignment=ft.alignment.center
+        )
+
+    def _on_feed_scroll(self, e):
+        """Infinite scroll: near the end, load more announcements, then more materials"""
+        if not e.max_scroll_extent or e.pixels < e.max_scroll_extent - 200:
+            return
+        if self.announcements_cursor is not None:
+            self.load_more_announcements()
+        elif self.materials_cursor is not None:
+            self.load_more_materials()
     
     def format_date(self, date_str):
         """Format date string for display"""
@@ -959,11 +1017,13 @@ class ClassfeedPage:
         # Announcements section
         if self.announcements:
             announcement_cards = [self.create_announcement_card(announcement) for announcement in self.announcements]
+            announcement_cards.append(self._create_load_more_footer(self.announcements_cursor, self.load_more_announcements))
+            self.announcement_column = ft.Column(announcement_cards, spacing=0)
             announcements_section = ft.Container(
                 content=ft.Column([
                     ft.Text("Announcements", size=20, weight=ft.FontWeight.BOLD, color="#D4817A"),
                     ft.Container(height=10),
-                    ft.Column(announcement_cards, spacing=0)
+                    self.announcement_column
                 ], spacing=0),
                 margin=ft.margin.only(bottom=30)
             )
@@ -972,11 +1032,13 @@ class ClassfeedPage:
         # Materials section
         if self.materials:
             material_cards = [self.create_material_card(material) for material in self.materials]
+            material_cards.append(self._create_load_more_footer(self.materials_cursor, self.load_more_materials))
+            self.material_column = ft.Column(material_cards, spacing=0)
             materials_section = ft.Container(
                 content=ft.Column([
                     ft.Text("Uploaded Materials", size=20, weight=ft.FontWeight.BOLD, color="#D4817A"),
                     ft.Container(height=10),
-                    ft.Column(material_cards, spacing=0)
+                    self.material_column
                 ], spacing=0),
                 margin=ft.margin.only(bottom=30)
             )
@@ -1027,7 +1089,9 @@ class ClassfeedPage:
                 content=ft.Column(
                     content_sections,
                     spacing=0,
-                    scroll=ft.ScrollMode.AUTO
+                    scroll=ft.ScrollMode.AUTO,
+                    on_scroll=self._on_feed_scroll,
+                    on_scroll_interval=100
                 ),
                 height=500,
                 expand=True
@@ -1306,12 +1306,7 @@ class CreateAssessmentPage:
                         return
                 # For Answer Type questions, we allow blank answers (they can be anything)
         
-        conn = None
         try:
-            # Get a single connection for all operations to prevent database locking
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            
             # Use combined date-time fields with sensible defaults
             start_datetime = self.start_datetime_field.value or datetime.now().strftime('%Y-%m-%d %H:%M')
             end_datetime = self.end_datetime_field.value or datetime.now().strftime('%Y-%m-%d %H:%M')
@@ -1324,106 +1319,107 @@ class CreateAssessmentPage:
             if unit == "Hours":
                 duration_minutes *= 60
 
-            if self.is_editing:
-                # Update existing assessment
-                cursor.execute('''
-                    UPDATE assessments 
-                    SET title = ?, description = ?, start_time = ?, end_time = ?, duration_minutes = ?, status = ?
-                    WHERE id = ?
-                ''', (
-                    self.assessment_title.content.controls[1].value,
-                    description,
-                    start_datetime,
-                    end_datetime,
-                    duration_minutes,
-                    status,
-                    self.assessment_id
-                ))
+            # Single transaction for all operations to prevent database locking
+            with self.db_manager.transaction() as conn:
+                cursor = conn.cursor()
+
+                if self.is_editing:
+                    # Update existing assessment
+                    cursor.execute('''
+                        UPDATE assessments 
+                        SET title = ?, description = ?, start_time = ?, end_time = ?, duration_minutes = ?, status = ?
+                        WHERE id = ?
+                    ''', (
+                        self.assessment_title.content.controls[1].value,
+                        description,
+                        start_datetime,
+                        end_datetime,
+                        duration_minutes,
+                        status,
+                        self.assessment_id
+                    ))
                 
-                # Delete existing questions for this assessment
-                cursor.execute('DELETE FROM questions WHERE assessment_id = ?', (self.assessment_id,))
+                    # Delete existing questions for this assessment
+                    cursor.execute('DELETE FROM questions WHERE assessment_id = ?', (self.assessment_id,))
                 
-                assessment_id = self.assessment_id
-            else:
-                # Create new assessment
-                cursor.execute('''
-                    INSERT INTO assessments (title, description, created_by, start_time, end_time, duration_minutes, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    self.assessment_title.content.controls[1].value,
-                    description,
-                    self.user_data.get('id'),
-                    start_datetime,
-                    end_datetime,
-                    duration_minutes,
-                    status
-                ))
+                    assessment_id = self.assessment_id
+                else:
+                    # Create new assessment
+                    cursor.execute('''
+                        INSERT INTO assessments (title, description, created_by, start_time, end_time, duration_minutes, status)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        self.assessment_title.content.controls[1].value,
+                        description,
+                        self.user_data.get('id'),
+                        start_datetime,
+                        end_datetime,
+                        duration_minutes,
+                        status
+                    ))
                 
-                assessment_id = cursor.lastrowid
+                    assessment_id = cursor.lastrowid
             
-            # Save questions using the same connection
-            for i, question_data in enumerate(self.questions_data):
-                if question_data['question_type'] == 'Multiple Choices':
-                    # Clean and convert options list to JSON string
-                    if question_data.get('options'):
-                        # Ensure options are clean strings without extra quotes/brackets
-                        clean_options = []
-                        for opt in question_data['options']:
-                            if isinstance(opt, str) and opt.strip():
-                                # Remove any extra quotes or brackets and clean whitespace
-                                clean_opt = opt.strip().strip('"').strip("'").strip('[]').strip()
-                                if clean_opt:  # Only add non-empty options
-                                    clean_options.append(clean_opt)
-                        options_text = json.dumps(clean_options) if clean_options else None
-                        print(f"Saving clean options for question {i+1}: {clean_options}")
+                # Save questions using the same connection
+                for i, question_data in enumerate(self.questions_data):
+                    if question_data['question_type'] == 'Multiple Choices':
+                        # Clean and convert options list to JSON string
+                        if question_data.get('options'):
+                            # Ensure options are clean strings without extra quotes/brackets
+                            clean_options = []
+                            for opt in question_data['options']:
+                                if isinstance(opt, str) and opt.strip():
+                                    # Remove any extra quotes or brackets and clean whitespace
+                                    clean_opt = opt.strip().strip('"').strip("'").strip('[]').strip()
+                                    if clean_opt:  # Only add non-empty options
+                                        clean_options.append(clean_opt)
+                            options_text = json.dumps(clean_options) if clean_options else None
+                            print(f"Saving clean options for question {i+1}: {clean_options}")
+                        else:
+                            options_text = None
+                    
+                        ca_idx = question_data.get('correct_answer')
+                        correct_answer = (chr(65 + int(ca_idx)) if ca_idx is not None else None)  # Convert to A, B, C, D; allow None for drafts
+                        question_type_db = 'mcq'
                     else:
                         options_text = None
-                    
-                    ca_idx = question_data.get('correct_answer')
-                    correct_answer = (chr(65 + int(ca_idx)) if ca_idx is not None else None)  # Convert to A, B, C, D; allow None for drafts
-                    question_type_db = 'mcq'
-                else:
-                    options_text = None
-                    correct_answer = question_data.get('answer', '') or ''  # Allow empty answers for Answer Type
-                    question_type_db = 'short_answer'
+                        correct_answer = question_data.get('answer', '') or ''  # Allow empty answers for Answer Type
+                        question_type_db = 'short_answer'
                 
-                cursor.execute('''
-                    INSERT INTO questions (assessment_id, question_text, question_type, points, correct_answer, options, order_index)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    assessment_id,
-                    question_data['question_text'],
-                    question_type_db,
-                    int(question_data['score']) if question_data.get('score') else 1,
-                    correct_answer,
-                    options_text,
-                    i
-                ))
+                    cursor.execute('''
+                        INSERT INTO questions (assessment_id, question_text, question_type, points, correct_answer, options, order_index)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        assessment_id,
+                        question_data['question_text'],
+                        question_type_db,
+                        int(question_data['score']) if question_data.get('score') else 1,
+                        correct_answer,
+                        options_text,
+                        i
+                    ))
             
-            # If publishing, create post and assign to sections using the same connection
-            if status == 'published' and self.selected_sections:
-                cursor.execute('''
-                    INSERT INTO posts (title, description, post_type, created_by, assessment_id, file_path)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    self.assessment_title.content.controls[1].value,
-                    self.assessment_description.content.controls[1].value,
-                    "assessment",
-                    self.user_data.get('id'),
-                    assessment_id,
-                    None
-                ))
+                # If publishing, create post and assign to sections using the same connection
+                if status == 'published' and self.selected_sections:
+                    cursor.execute('''
+                        INSERT INTO posts (title, description, post_type, created_by, assessment_id, file_path)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        self.assessment_title.content.controls[1].value,
+                        self.assessment_description.content.controls[1].value,
+                        "assessment",
+                        self.user_data.get('id'),
+                        assessment_id,
+                        None
+                    ))
                 
-                post_id = cursor.lastrowid
+                    post_id = cursor.lastrowid
                 
-                # Assign to sections
-                for section in self.selected_sections:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO post_sections (post_id, section) VALUES (?, ?)
-                    ''', (post_id, section))
-            
-            # Commit all changes at once
-            conn.commit()
+                    # Assign to sections
+                    for section in self.selected_sections:
+                        cursor.execute('''
+                            INSERT OR IGNORE INTO post_sections (post_id, section) VALUES (?, ?)
+                        ''', (post_id, section))
             
             action = "published" if status == 'published' else "saved as draft"
             self._toast_success(f"Assessment {action} successfully!")
@@ -1435,13 +1431,8 @@ class CreateAssessmentPage:
             self.page.go("/admin")
             
         except Exception as ex:
-            if conn:
-                conn.rollback()  # Rollback on error
             self._toast_error(f"Error saving assessment: {str(ex)}")
             print(f"Database error details: {ex}")  # For debugging
-        finally:
-            if conn:
-                conn.close()  # Always close the connection
 
     def _toast_error(self, msg: str):
         sb = ft.SnackBar(content=ft.Text(msg, color=ft.Colors.WHITE), bgcolor=ft.Colors.RED_400)
@@ -0,0 +1,114 @@
+import asyncio
+
+import flet as ft
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.search_index import split_highlights
+
+
+class GlobalSearch:
+    """Search box for the dashboards: ranked, highlighted hits from DatabaseManager.search"""
+
+    # Wait for a pause in typing; each keystroke cancels the search still waiting
+    DEBOUNCE_SECONDS = 0.25
+
+    SCOPE_ICONS = {
+        'announcements': ft.Icons.CAMPAIGN,
+        'assessments': ft.Icons.ASSIGNMENT,
+        'materials': ft.Icons.FOLDER,
+        'questions': ft.Icons.QUIZ,
+        'comments': ft.Icons.COMMENT,
+    }
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, on_open, section=None, scopes=None,
+                 limit=10, hint_text="Search announcements, materials, assessments..."):
+        self.page = page
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.on_open = on_open
+        self.section = section
+        self.scopes = tuple(scopes) if scopes else None
+        self.limit = limit
+
+        self.search_field = ft.TextField(
+            hint_text=hint_text,
+            prefix_icon=ft.Icons.SEARCH,
+            border_radius=25,
+            border_color="#E8B4CB",
+            focused_border_color="#D4817A",
+            bgcolor=ft.Colors.WHITE,
+            text_size=14,
+            height=45,
+            content_padding=ft.padding.symmetric(horizontal=15, vertical=10),
+            on_change=self._on_change,
+            on_submit=self._on_change,
+        )
+        self.results_column = ft.Column(spacing=0, tight=True, scroll=ft.ScrollMode.AUTO)
+        self.results_panel = ft.Container(
+            content=self.results_column,
+            bgcolor=ft.Colors.WHITE,
+            border_radius=15,
+            border=ft.border.all(1, "#E8B4CB"),
+            padding=ft.padding.symmetric(vertical=5),
+            margin=ft.margin.only(top=5),
+            visible=False,
+        )
+
+    def build(self):
+        return ft.Column([self.search_field, self.results_panel], spacing=0)
+
+    def _on_change(self, e):
+        self.requests.run(self._search, self.search_field.value, key='search')
+
+    async def _search(self, text):
+        await asyncio.sleep(self.DEBOUNCE_SECONDS)
+        if not (text or '').strip():
+            self._show_results(None)
+            return
+        results = await self.async_db.search(text, scopes=self.scopes, section=self.section, limit=self.limit)
+        self._show_results(results)
+
+    def _show_results(self, results):
+        if results is None:
+            self.results_column.controls = []
+            self.results_panel.visible = False
+        elif not results:
+            self.results_column.controls = [
+                ft.Container(
+                    content=ft.Text("No matches", size=13, color=ft.Colors.GREY_600, italic=True),
+                    padding=ft.padding.symmetric(horizontal=15, vertical=10)
+                )
+            ]
+            self.results_panel.visible = True
+        else:
+            self.results_column.controls = [self._create_result_tile(result) for result in results]
+            self.results_panel.visible = True
+        self.page.update()
+
+    def _create_result_tile(self, result):
+        snippet = ft.Text(
+            spans=[
+                ft.TextSpan(text, ft.TextStyle(weight=ft.FontWeight.BOLD, color="#D4817A") if match else None)
+                for text, match in split_highlights(result['snippet'])
+            ],
+            size=12,
+            color=ft.Colors.GREY_700,
+            max_lines=2,
+            overflow=ft.TextOverflow.ELLIPSIS,
+        )
+        return ft.ListTile(
+            leading=ft.Icon(self.SCOPE_ICONS.get(result['scope'], ft.Icons.SEARCH), color="#D4817A"),
+            title=ft.Text(result['title'] or "Untitled", size=14, weight=ft.FontWeight.W_500,
+                          max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+            subtitle=snippet,
+            trailing=ft.Text(result['scope'].title(), size=11, color=ft.Colors.GREY_500),
+            dense=True,
+            on_click=lambda e, r=result: self._open_result(r),
+        )
+
+    def _open_result(self, result):
+        self.requests.cancel()
+        self.search_field.value = ""
+        self.results_column.controls = []
+        self.results_panel.visible = False
+        self.on_open(result)
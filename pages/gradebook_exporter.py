@@ -0,0 +1,93 @@
+import os
+import time
+
+import flet as ft
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.gradebook_export import FORMATS
+
+
+class GradebookExporter:
+    """Export menu, save-as dialog and progress bar for the exports in database/gradebook_export.py"""
+
+    # Progress arrives every few hundred rows; redraw at most this often
+    PROGRESS_INTERVAL = 0.2
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager):
+        self.page = page
+        self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.busy = False
+        self._pending = None
+        self._last_progress = 0.0
+
+        self.file_picker = ft.FilePicker(on_result=self._on_save_path)
+        self.page.overlay.append(self.file_picker)
+        self.progress_bar = ft.ProgressBar(width=220, color="#D4817A", bgcolor="#E8B4CB")
+        self.status_text = ft.Text("", size=12, color=ft.Colors.GREY_700)
+        self.status = ft.Row([self.progress_bar, self.status_text], spacing=10, visible=False)
+
+    def build(self):
+        """The progress row; place it once on the page, it stays hidden until an export starts"""
+        return self.status
+
+    def menu(self, items, icon_color="#D4817A", tooltip="Export"):
+        """Download button listing ``items``: (label, export function, key, default file name)"""
+        return ft.PopupMenuButton(
+            icon=ft.Icons.DOWNLOAD,
+            icon_color=icon_color,
+            tooltip=tooltip,
+            items=[
+                ft.PopupMenuItem(text=label, on_click=lambda e, item=(export, key, name): self.start(*item))
+                for label, export, key, name in items
+            ],
+        )
+
+    def start(self, export, key, file_name):
+        """Ask where to save, then run ``export(db, key, path, progress=...)`` in the background"""
+        if self.busy:
+            self._show_status("An export is already running", done=False)
+            return
+        self._pending = (export, key)
+        self.file_picker.save_file(dialog_title="Export", file_name=file_name,
+                                   allowed_extensions=[f.lstrip('.') for f in FORMATS])
+
+    def _on_save_path(self, e: ft.FilePickerResultEvent):
+        pending, self._pending = self._pending, None
+        if not e.path or pending is None:
+            return
+        path = e.path
+        if os.path.splitext(path)[1].lower() not in FORMATS:
+            path += FORMATS[0]
+        self.requests.run(self._run, *pending, path, key='export')
+
+    async def _run(self, export, key, path):
+        self.busy = True
+        self._on_progress(0, None, force=True)
+        try:
+            written = await self.async_db.call(export, self.db_manager, key, path, progress=self._on_progress)
+        except (OSError, ValueError) as ex:
+            self._show_status(f"Export failed: {ex}")
+            return
+        finally:
+            self.busy = False
+        self._show_status(f"Exported {written:,} rows to {os.path.basename(path)}")
+
+    def _on_progress(self, done, total, force=False):
+        # Runs on the export's worker thread
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.progress_bar.value = done / total if total else None
+        self.progress_bar.visible = True
+        self.status_text.value = f"Exporting... {done:,} of {total:,} rows" if total else f"Exporting... {done:,} rows"
+        self.status.visible = True
+        self.page.update()
+
+    def _show_status(self, message, done=True):
+        self.progress_bar.visible = not done and self.busy
+        self.status_text.value = message
+        self.status.visible = True
+        self.page.update()
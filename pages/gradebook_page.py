@@ -0,0 +1,199 @@
+import flet as ft
+import numpy as np
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+
+
+class GradebookPage:
+    """Section gradebook: every student against every assessment posted to the section"""
+
+    NAME_WIDTH = 220
+    CELL_WIDTH = 110
+    TOTAL_WIDTH = 120
+    ROW_HEIGHT = 40
+    # Rows are built in batches as the list scrolls, so a large section never builds every row at once
+    ROW_BATCH = 60
+    SORTS = ("name", "highest percentage", "lowest percentage", "most missing")
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, section: str = None, on_back=None):
+        self.page = page
+        self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.section = section
+        self.on_back = on_back
+        self.sections = None
+        self.matrix = None
+        self.totals = None
+        self.stats = None
+        self.order = np.arange(0)
+        self.rows_view = None
+        self.rendered = 0
+        self.sort = "name"
+        self.missing_only = False
+
+        self.section_dropdown = ft.Dropdown(
+            label="Section",
+            width=140,
+            border_color="#E8B4CB",
+            focused_border_color="#D4817A",
+            on_change=self._on_section_change,
+        )
+        self.sort_dropdown = ft.Dropdown(
+            label="Sort",
+            width=200,
+            value=self.sort,
+            options=[ft.dropdown.Option(s) for s in self.SORTS],
+            border_color="#E8B4CB",
+            focused_border_color="#D4817A",
+            on_change=self._on_sort_change,
+        )
+        self.missing_checkbox = ft.Checkbox(label="Only students with missing work", value=False,
+                                            active_color="#D4817A", on_change=self._on_missing_change)
+        self.summary_text = ft.Text("Loading gradebook...", size=13, color=ft.Colors.GREY_700)
+        self.table = ft.Container(expand=True)
+
+    def build(self) -> ft.Control:
+        header = ft.Row([
+            ft.IconButton(icon=ft.Icons.ARROW_BACK, icon_color="#D4817A", icon_size=24,
+                          on_click=lambda e: self.on_back() if self.on_back else None),
+            ft.Icon(ft.Icons.GRID_ON, size=28, color="#D4817A"),
+            ft.Text("Gradebook", size=24, weight=ft.FontWeight.BOLD, color="#D4817A"),
+        ], spacing=10)
+        return ft.Column([
+            header,
+            ft.Row([self.section_dropdown, self.sort_dropdown, self.missing_checkbox], spacing=15,
+                   vertical_alignment=ft.CrossAxisAlignment.CENTER),
+            self.summary_text,
+            self.table,
+        ], spacing=15, expand=True)
+
+    # ------------------------- Loading -------------------------
+    def load(self):
+        """Fetch the section list and the matrix in the background; the table redraws when they arrive"""
+        self.requests.run(self._load, self.section, key='gradebook')
+
+    async def _load(self, section):
+        if self.sections is None:
+            self.sections = await self.async_db.get_available_sections()
+            self.section_dropdown.options = [ft.dropdown.Option(s) for s in self.sections]
+        section = section or (self.sections[0] if self.sections else None)
+        if section is None:
+            self.summary_text.value = "No sections yet"
+            self.page.update()
+            return
+        self.section = self.section_dropdown.value = section
+        # Pivot and statistics run on the worker thread with the query
+        self.matrix, self.totals, self.stats = await self.async_db.call(self._compute, section)
+        self._apply_view()
+
+    def _compute(self, section):
+        matrix = self.db_manager.get_gradebook_matrix(section)
+        return matrix, matrix.student_totals(), matrix.column_stats()
+
+    def _on_section_change(self, e):
+        self.summary_text.value = "Loading gradebook..."
+        self.page.update()
+        self.requests.run(self._load, e.control.value, key='gradebook')
+
+    def _on_sort_change(self, e):
+        self.sort = e.control.value
+        self._apply_view()
+
+    def _on_missing_change(self, e):
+        self.missing_only = bool(e.control.value)
+        self._apply_view()
+
+    # ------------------------- Rendering -------------------------
+    def _apply_view(self):
+        """Recompute the row order (vectorized) and redraw the first batch of rows"""
+        if self.matrix is None:
+            return
+        totals = self.totals
+        order = np.arange(len(totals))
+        if self.sort == "highest percentage":
+            order = np.argsort(-totals['percentage'].to_numpy(), kind='stable')
+        elif self.sort == "lowest percentage":
+            order = np.argsort(totals['percentage'].to_numpy(), kind='stable')
+        elif self.sort == "most missing":
+            order = np.argsort(-totals['missing'].to_numpy(), kind='stable')
+        if self.missing_only:
+            order = order[totals['missing'].to_numpy()[order] > 0]
+        self.order = order
+
+        matrix = self.matrix
+        missing = int(matrix.missing.sum())
+        self.summary_text.value = (f"{len(matrix.students)} students, {len(matrix.assessments)} assessments, "
+                                   f"{missing} missing submissions")
+        self.rows_view = ft.ListView(spacing=0, item_extent=self.ROW_HEIGHT, expand=True,
+                                     on_scroll=self._on_rows_scroll, on_scroll_interval=100)
+        self.rendered = 0
+        self._render_more()
+        width = self.NAME_WIDTH + self.CELL_WIDTH * len(matrix.assessments) + self.TOTAL_WIDTH
+        self.table.content = ft.Row([
+            ft.Container(
+                content=ft.Column([self._create_header_row(), self._create_stats_row(), self.rows_view],
+                                  spacing=0, expand=True),
+                width=width,
+            )
+        ], scroll=ft.ScrollMode.AUTO, vertical_alignment=ft.CrossAxisAlignment.STRETCH, expand=True)
+        self.page.update()
+
+    def _render_more(self):
+        end = min(self.rendered + self.ROW_BATCH, len(self.order))
+        self.rows_view.controls.extend(self._create_student_row(i) for i in self.order[self.rendered:end])
+        self.rendered = end
+
+    def _on_rows_scroll(self, e):
+        if self.rendered < len(self.order) and e.max_scroll_extent and e.pixels >= e.max_scroll_extent - 400:
+            self._render_more()
+            self.rows_view.update()
+
+    def _cell(self, content, width, bgcolor=None):
+        return ft.Container(content=content, width=width, height=self.ROW_HEIGHT, bgcolor=bgcolor,
+                            alignment=ft.alignment.center_left, padding=ft.padding.symmetric(horizontal=8),
+                            border=ft.border.only(bottom=ft.BorderSide(1, "#F0E0E6")))
+
+    def _create_header_row(self):
+        cells = [self._cell(ft.Text("Student", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                            self.NAME_WIDTH)]
+        for title, points in zip(self.matrix.assessments['title'], self.matrix.assessments['total_points']):
+            cells.append(self._cell(ft.Text(f"{title} (/{points})", size=12, weight=ft.FontWeight.BOLD,
+                                            color=ft.Colors.WHITE, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS,
+                                            tooltip=title), self.CELL_WIDTH))
+        cells.append(self._cell(ft.Text("Overall", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                                self.TOTAL_WIDTH))
+        return ft.Container(content=ft.Row(cells, spacing=0), bgcolor="#D4817A",
+                            border_radius=ft.border_radius.only(top_left=10, top_right=10))
+
+    def _create_stats_row(self):
+        cells = [self._cell(ft.Text("Class average", size=12, italic=True, color=ft.Colors.GREY_700),
+                            self.NAME_WIDTH)]
+        for _, stat in self.stats.iterrows():
+            average = "-" if np.isnan(stat['mean']) else f"{stat['mean']:.1f}%"
+            cells.append(self._cell(ft.Text(f"{average}  ({int(stat['missing'])} missing)", size=11,
+                                            color=ft.Colors.GREY_700), self.CELL_WIDTH))
+        overall = self.totals['percentage'].mean() if len(self.totals) else 0
+        cells.append(self._cell(ft.Text(f"{overall:.1f}%", size=12, color=ft.Colors.GREY_700), self.TOTAL_WIDTH))
+        return ft.Container(content=ft.Row(cells, spacing=0), bgcolor="#FBEFF2")
+
+    def _create_student_row(self, index):
+        matrix = self.matrix
+        student = matrix.students.iloc[index]
+        cells = [self._cell(ft.Text(f"{student['student_name']}  ·  {student['student_number'] or ''}", size=12,
+                                    max_lines=1, overflow=ft.TextOverflow.ELLIPSIS), self.NAME_WIDTH)]
+        scores, max_scores, graded = matrix.scores[index], matrix.max_scores[index], matrix.graded[index]
+        for score, max_score, is_graded in zip(scores, max_scores, graded):
+            if np.isnan(score):
+                cells.append(self._cell(ft.Text("missing", size=11, color=ft.Colors.RED_400, italic=True),
+                                        self.CELL_WIDTH, bgcolor=ft.Colors.RED_50))
+            else:
+                cells.append(self._cell(ft.Text(f"{score:g}/{max_score:g}", size=12,
+                                                italic=not is_graded,
+                                                color=ft.Colors.GREY_800 if is_graded else ft.Colors.GREY_500,
+                                                tooltip=None if is_graded else "Waiting for grading"),
+                                        self.CELL_WIDTH))
+        total = self.totals.iloc[index]
+        cells.append(self._cell(ft.Text(f"{total['percentage']:.1f}%", size=12, weight=ft.FontWeight.W_500,
+                                        color="#D4817A"), self.TOTAL_WIDTH))
+        return ft.Row(cells, spacing=0)
@@ -0,0 +1,110 @@
+import flet as ft
+import numpy as np
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.item_analysis import DIFFICULTY_RANGE, LOW_DISCRIMINATION
+
+
+class ItemAnalysisView:
+    """Per-question difficulty, discrimination and MCQ distractors of one assessment"""
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, assessment_id: int):
+        self.page = page
+        self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.assessment_id = assessment_id
+        self.analysis = None
+        self.content = ft.Container(
+            content=ft.Row([
+                ft.ProgressRing(width=20, height=20, stroke_width=2, color="#D4817A"),
+                ft.Text("Analysing answers...", size=12, color=ft.Colors.GREY_600),
+            ], spacing=10, alignment=ft.MainAxisAlignment.CENTER),
+            padding=ft.padding.all(20),
+        )
+
+    def build(self) -> ft.Control:
+        return self.content
+
+    def load(self):
+        """Compute (or fetch the cached) analysis in the background; the view fills in when it lands"""
+        self.requests.run(self._load, key=f'item-analysis-{self.assessment_id}')
+
+    async def _load(self):
+        self.analysis = await self.async_db.get_item_analysis(self.assessment_id)
+        self.content.content = self._create_table()
+        self.page.update()
+
+    # ------------------------- Rendering -------------------------
+    def _create_table(self) -> ft.Control:
+        analysis = self.analysis
+        if analysis.submissions == 0 or analysis.items.empty:
+            return ft.Text("No submissions to analyse yet", size=12, color=ft.Colors.BLACK54)
+
+        flagged = analysis.flagged()
+        low, high = DIFFICULTY_RANGE
+        summary = ft.Text(
+            f"{analysis.submissions} submissions, {len(analysis.items)} questions, "
+            f"{int(flagged.sum())} worth reviewing (difficulty outside {low:.0%}-{high:.0%} "
+            f"or discrimination below {LOW_DISCRIMINATION})",
+            size=12, color=ft.Colors.GREY_700,
+        )
+        header_row = ft.Row([
+            ft.Text("#", size=12, weight=ft.FontWeight.BOLD, color="#D4817A", expand=1),
+            ft.Text("Question", size=12, weight=ft.FontWeight.BOLD, color="#D4817A", expand=5),
+            ft.Text("Answered", size=12, weight=ft.FontWeight.BOLD, color="#D4817A", expand=2),
+            ft.Text("Difficulty", size=12, weight=ft.FontWeight.BOLD, color="#D4817A", expand=2,
+                    tooltip="Share of the question's points earned"),
+            ft.Text("Discrimination", size=12, weight=ft.FontWeight.BOLD, color="#D4817A", expand=2,
+                    tooltip="Point-biserial correlation with the total score"),
+        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+
+        rows = []
+        for question_id, item in analysis.items.iterrows():
+            rows.append(self._create_item_row(item, bool(flagged[question_id])))
+            choices = analysis.choices(question_id)
+            if not choices.empty:
+                rows.append(self._create_choices_row(choices))
+
+        return ft.Column([
+            summary,
+            header_row,
+            ft.Divider(height=1, color="#D4817A"),
+            *rows,
+        ], spacing=8)
+
+    def _create_item_row(self, item, flagged: bool) -> ft.Control:
+        difficulty = "-" if np.isnan(item['difficulty']) else f"{item['difficulty']:.0%}"
+        discrimination = item['discrimination']
+        if np.isnan(discrimination):
+            discrimination_text, discrimination_color = "-", ft.Colors.GREY_500
+        else:
+            discrimination_text = f"{discrimination:.2f}"
+            discrimination_color = ft.Colors.RED if discrimination < LOW_DISCRIMINATION else ft.Colors.GREEN
+        return ft.Row([
+            ft.Row([
+                ft.Icon(ft.Icons.FLAG, size=14, color=ft.Colors.ORANGE) if flagged else ft.Container(width=14),
+                ft.Text(str(item['number']), size=11, color="#D4817A"),
+            ], spacing=2, expand=1),
+            ft.Text(item['question_text'], size=11, color="#D4817A", expand=5, max_lines=2,
+                    overflow=ft.TextOverflow.ELLIPSIS, tooltip=item['question_text']),
+            ft.Text(str(item['answered']), size=11, color="#D4817A", expand=2),
+            ft.Text(difficulty, size=11, color="#D4817A", weight=ft.FontWeight.BOLD, expand=2),
+            ft.Text(discrimination_text, size=11, color=discrimination_color, weight=ft.FontWeight.BOLD,
+                    expand=2),
+        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+
+    def _create_choices_row(self, choices) -> ft.Control:
+        """One chip per option: how many picked it and their mean score; the key is green"""
+        chips = []
+        for choice in choices.itertuples():
+            mean = "-" if choice.mean_score is None or np.isnan(choice.mean_score) else f"{choice.mean_score:g}"
+            chips.append(ft.Container(
+                content=ft.Text(f"{choice.choice}: {choice.share:.0%} (avg {mean})", size=10,
+                                color=ft.Colors.WHITE if choice.is_key else ft.Colors.GREY_800,
+                                tooltip=choice.option or None),
+                bgcolor=ft.Colors.GREEN if choice.is_key else "#F5E6E8",
+                border_radius=10,
+                padding=ft.padding.symmetric(horizontal=8, vertical=3),
+            ))
+        return ft.Container(content=ft.Row(chips, spacing=6, wrap=True), padding=ft.padding.only(left=30, bottom=4))
@@ -0,0 +1,366 @@
+import flet as ft
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.similarity import find_similar_answers
+
+
+class QuestionGradingPage:
+    """Grade one short-answer question for every student in a row, then move on to the next question.
+
+    Each question's answers come from one query (get_question_answers). Rows are
+    built in batches as the list scrolls. Edits are saved together, one
+    transaction per page of SAVE_BATCH answers, when grading moves past the
+    page, switches question or leaves. Keyboard: Enter in a score or feedback
+    field goes to the next student, Alt+Up/Down moves between students,
+    Alt+Left/Right between questions and Ctrl+S saves.
+
+    Answers that are near-duplicates of other students' answers to the same
+    question (database/similarity.py) are tagged with their cluster, and can
+    be shown on their own, cluster by cluster.
+    """
+
+    ROW_BATCH = 30
+    SAVE_BATCH = 25
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, assessment_id: int, on_back=None):
+        self.page = page
+        self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.assessment_id = assessment_id
+        self.on_back = on_back
+        self.questions = []
+        self.question_index = 0
+        self.answers = []
+        self.visible = []          # positions in self.answers shown with the current filter
+        self.rows_view = None
+        self.rendered = 0
+        self.score_fields = {}     # visible position -> score TextField
+        self.feedback_fields = {}  # visible position -> feedback TextField
+        self.status_texts = {}     # visible position -> status Text
+        self.total_texts = {}      # visible position -> submission total Text
+        self.pending = {}          # answer position -> (points_earned, feedback)
+        self.current = 0
+        self.review_only = False
+        self.similar_only = False
+        self.similar = {}          # answer_id -> (cluster number, SimilarityCluster) for the current question
+        self._previous_keyboard_handler = None
+
+        self.question_dropdown = ft.Dropdown(
+            label="Question",
+            width=320,
+            border_color="#E8B4CB",
+            focused_border_color="#D4817A",
+            on_change=lambda e: self.select_question(int(e.control.value)),
+        )
+        self.review_checkbox = ft.Checkbox(label="Only answers needing review", value=False,
+                                           active_color="#D4817A", on_change=self._on_review_change)
+        self.similar_checkbox = ft.Checkbox(label="Only similar answers", value=False,
+                                            active_color="#D4817A", on_change=self._on_similar_change)
+        self.question_text = ft.Text("", size=14, color=ft.Colors.BLACK87, selectable=True)
+        self.key_text = ft.Text("", size=12, color="#666")
+        self.summary_text = ft.Text("Loading questions...", size=13, color=ft.Colors.GREY_700)
+        self.table = ft.Container(expand=True)
+
+    def build(self) -> ft.Control:
+        header = ft.Row([
+            ft.IconButton(icon=ft.Icons.ARROW_BACK, icon_color="#D4817A", icon_size=24, on_click=self.close),
+            ft.Icon(ft.Icons.RATE_REVIEW, size=28, color="#D4817A"),
+            ft.Text("Grade by question", size=24, weight=ft.FontWeight.BOLD, color="#D4817A"),
+            ft.Container(expand=True),
+            ft.ElevatedButton(
+                "Save",
+                icon=ft.Icons.SAVE,
+                style=ft.ButtonStyle(bgcolor="#D4817A", color=ft.Colors.WHITE,
+                                     shape=ft.RoundedRectangleBorder(radius=10)),
+                on_click=lambda e: self.flush(),
+            ),
+        ], spacing=10)
+        controls = ft.Row([
+            ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, icon_color="#D4817A", tooltip="Previous question (Alt+Left)",
+                          on_click=lambda e: self.select_question(self.question_index - 1)),
+            self.question_dropdown,
+            ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, icon_color="#D4817A", tooltip="Next question (Alt+Right)",
+                          on_click=lambda e: self.select_question(self.question_index + 1)),
+            self.review_checkbox,
+            self.similar_checkbox,
+        ], spacing=10, vertical_alignment=ft.CrossAxisAlignment.CENTER)
+        question_card = ft.Container(
+            content=ft.Column([self.question_text, self.key_text], spacing=6),
+            padding=15,
+            bgcolor=ft.Colors.WHITE,
+            border_radius=10,
+            border=ft.border.all(1, "#E8B4CB"),
+        )
+        hint = ft.Text("Enter: next student  ·  Alt+Up/Down: previous/next student  ·  "
+                       "Alt+Left/Right: previous/next question  ·  Ctrl+S: save", size=11, color=ft.Colors.GREY_600)
+        self._previous_keyboard_handler = self.page.on_keyboard_event
+        self.page.on_keyboard_event = self._on_keyboard
+        return ft.Column([header, controls, question_card, self.summary_text, self.table, hint],
+                         spacing=12, expand=True)
+
+    # ------------------------- Loading -------------------------
+    def load(self):
+        """Fetch the short-answer questions, then the first question's answers, in the background"""
+        self.requests.run(self._load_questions, key='questions')
+
+    async def _load_questions(self):
+        questions = await self.async_db.get_questions(self.assessment_id)
+        self.questions = [(number, q) for number, q in enumerate(questions, start=1)
+                          if q['question_type'] == 'short_answer']
+        if not self.questions:
+            self.summary_text.value = "This assessment has no short-answer questions to grade"
+            self.page.update()
+            return
+        self.question_dropdown.options = [
+            ft.dropdown.Option(key=str(i), text=f"Q{number}: {q['question_text'][:40]}")
+            for i, (number, q) in enumerate(self.questions)]
+        await self._load_answers(0)
+
+    def select_question(self, index: int):
+        """Save pending edits and switch to another question"""
+        if not self.questions or not 0 <= index < len(self.questions):
+            return
+        if index == self.question_index and self.answers:
+            return
+        self.flush()
+        self.summary_text.value = "Loading answers..."
+        self.page.update()
+        self.requests.run(self._load_answers, index, key='answers')
+
+    async def _load_answers(self, index):
+        number, question = self.questions[index]
+        results = await self.async_db.gather(
+            return_exceptions=True,
+            answers=self.async_db.get_question_answers(question['id']),
+            similar=self.async_db.call(find_similar_answers, self.db_manager, self.assessment_id,
+                                       [question['id']]))
+        if isinstance(results['answers'], Exception):
+            raise results['answers']
+        if isinstance(results['similar'], Exception):
+            print(f"Error finding similar answers: {results['similar']}")
+            self.similar = {}
+        else:
+            self.similar = results['similar'].by_answer()
+        self.question_index = index
+        self.answers = results['answers']
+        self.pending = {}
+        self.question_dropdown.value = str(index)
+        self.question_text.value = f"Q{number}. {question['question_text']}"
+        self.key_text.value = (f"Expected answer: {question['correct_answer'] or '-'}    "
+                               f"Points: {question['points']}")
+        self._apply_view()
+
+    def _on_review_change(self, e):
+        self.flush()
+        self.review_only = bool(e.control.value)
+        self._apply_view()
+
+    def _on_similar_change(self, e):
+        self.flush()
+        self.similar_only = bool(e.control.value)
+        self._apply_view()
+
+    # ------------------------- Rendering -------------------------
+    def _apply_view(self):
+        self.visible = [i for i, answer in enumerate(self.answers)
+                        if (not self.review_only or answer['grade_source'] == 'review')
+                        and (not self.similar_only or answer['answer_id'] in self.similar)]
+        if self.similar_only:
+            # One cluster after another
+            self.visible.sort(key=lambda i: self.similar[self.answers[i]['answer_id']][0])
+        self.score_fields, self.feedback_fields, self.status_texts, self.total_texts = {}, {}, {}, {}
+        self.rows_view = ft.ListView(spacing=8, expand=True, on_scroll=self._on_rows_scroll, on_scroll_interval=100)
+        self.rendered = 0
+        self.current = 0
+        self._render_more()
+        self.table.content = self.rows_view if self.visible else ft.Container(
+            content=ft.Text("No answers to show", size=14, color=ft.Colors.GREY_600),
+            alignment=ft.alignment.center, padding=40)
+        self._update_summary()
+        self.page.update()
+
+    def _update_summary(self):
+        review = sum(1 for answer in self.answers if answer['grade_source'] == 'review')
+        manual = sum(1 for answer in self.answers if answer['grade_source'] == 'manual')
+        clusters = len({number for number, _ in self.similar.values()})
+        self.summary_text.value = (f"{len(self.answers)} answers: {manual} graded by hand, {review} need review"
+                                   + (f", {len(self.similar)} similar to another student's ({clusters} clusters)"
+                                      if self.similar else "")
+                                   + (f", {len(self.pending)} unsaved" if self.pending else ""))
+
+    def _render_more(self, through: int = -1):
+        end = min(max(self.rendered + self.ROW_BATCH, through + 1), len(self.visible))
+        self.rows_view.controls.extend(self._create_answer_row(position)
+                                       for position in range(self.rendered, end))
+        self.rendered = end
+
+    def _on_rows_scroll(self, e):
+        if self.rendered < len(self.visible) and e.max_scroll_extent and e.pixels >= e.max_scroll_extent - 400:
+            self._render_more()
+            self.rows_view.update()
+
+    def _status(self, answer):
+        if answer['grade_source'] == 'review':
+            return f"Needs review ({answer['auto_confidence'] or 0:.0%} confident)", ft.Colors.ORANGE
+        if answer['grade_source'] == 'auto':
+            return f"Auto-graded ({answer['auto_confidence'] or 0:.0%} confident)", ft.Colors.BLUE_GREY
+        if answer['grade_source'] == 'manual':
+            return "Graded", ft.Colors.GREEN
+        return "Not graded", ft.Colors.GREY_600
+
+    def _create_answer_row(self, position):
+        answer = self.answers[self.visible[position]]
+        max_points = self.questions[self.question_index][1]['points']
+        label, color = self._status(answer)
+        status = ft.Text(label, size=11, color=color, weight=ft.FontWeight.BOLD)
+        score = ft.TextField(
+            value=f"{answer['points_earned']:g}",
+            width=70,
+            height=40,
+            text_size=13,
+            text_align=ft.TextAlign.CENTER,
+            border_color="#D4817A",
+            on_focus=lambda e, p=position: self._on_focus(p),
+            on_change=lambda e, p=position: self._on_edit(p),
+            on_submit=lambda e, p=position: self.focus_answer(p + 1),
+        )
+        feedback = ft.TextField(
+            value=answer['feedback'] or "",
+            hint_text="Feedback",
+            expand=True,
+            height=40,
+            text_size=12,
+            border_color="#E8B4CB",
+            on_focus=lambda e, p=position: self._on_focus(p),
+            on_change=lambda e, p=position: self._on_edit(p),
+            on_submit=lambda e, p=position: self.focus_answer(p + 1),
+        )
+        total = ft.Text(f"Total {answer['score']:g}/{answer['max_score']:g}", size=12, color="#666")
+        similar = self.similar.get(answer['answer_id'])
+        similar_tag = ft.Container(
+            content=ft.Text(f"Similar #{similar[0]} · {len(similar[1].answers)} students, "
+                            f"up to {similar[1].similarity:.0%} alike", size=11, color=ft.Colors.WHITE),
+            bgcolor=ft.Colors.DEEP_ORANGE_300,
+            padding=ft.padding.symmetric(horizontal=8, vertical=2),
+            border_radius=8,
+            tooltip="Also answered by: " + ", ".join(
+                other.student_name or other.student_number or "?" for other in similar[1].answers
+                if other.answer_id != answer['answer_id']),
+        ) if similar else None
+        self.score_fields[position] = score
+        self.feedback_fields[position] = feedback
+        self.status_texts[position] = status
+        self.total_texts[position] = total
+        return ft.Container(
+            key=str(position),
+            content=ft.Column([
+                ft.Row([
+                    ft.Text(f"{answer['student_name']}  ·  {answer['student_number'] or ''}", size=13,
+                            weight=ft.FontWeight.BOLD, color="#D4817A"),
+                    status,
+                    *([similar_tag] if similar_tag else []),
+                    ft.Container(expand=True),
+                    total,
+                ], spacing=10),
+                ft.Text(answer['answer_text'] or "No answer provided", size=13, selectable=True,
+                        italic=not answer['answer_text']),
+                ft.Row([score, ft.Text(f"/ {max_points}", size=12, color="#666"), feedback], spacing=8),
+            ], spacing=6),
+            padding=12,
+            bgcolor=ft.Colors.WHITE,
+            border_radius=10,
+            border=ft.border.all(1, "#F0E0E6"),
+        )
+
+    # ------------------------- Editing -------------------------
+    def _on_focus(self, position):
+        # Leaving a page of answers saves it
+        if position // self.SAVE_BATCH != self.current // self.SAVE_BATCH:
+            self.flush()
+        self.current = position
+
+    def _on_edit(self, position):
+        self.pending[self.visible[position]] = (self.score_fields[position].value,
+                                                self.feedback_fields[position].value or "")
+        self.status_texts[position].value = "Unsaved"
+        self.status_texts[position].color = ft.Colors.PURPLE
+        self.status_texts[position].update()
+
+    def focus_answer(self, position):
+        """Move to another student's score field, building rows up to it if needed"""
+        if not 0 <= position < len(self.visible):
+            return
+        if position >= self.rendered:
+            self._render_more(through=position)
+            self.rows_view.update()
+        self.rows_view.scroll_to(key=str(position), duration=150)
+        self.score_fields[position].focus()
+
+    def _on_keyboard(self, e: ft.KeyboardEvent):
+        if self.table.page is None:
+            # Navigated away without close(); stop listening
+            self.page.on_keyboard_event = self._previous_keyboard_handler
+            return
+        if e.ctrl and e.key == "S":
+            self.flush()
+        elif e.alt and e.key == "Arrow Down":
+            self.focus_answer(self.current + 1)
+        elif e.alt and e.key == "Arrow Up":
+            self.focus_answer(self.current - 1)
+        elif e.alt and e.key == "Arrow Right":
+            self.select_question(self.question_index + 1)
+        elif e.alt and e.key == "Arrow Left":
+            self.select_question(self.question_index - 1)
+
+    def flush(self):
+        """Save every pending edit in one transaction and refresh the affected rows"""
+        if not self.pending:
+            return
+        max_points = float(self.questions[self.question_index][1]['points'] or 0)
+        grades = []
+        for index, (value, feedback) in self.pending.items():
+            try:
+                points = max(0.0, min(float(value or 0), max_points))
+            except ValueError:
+                self._notify(f"'{value}' is not a score; that answer was not saved", ft.Colors.RED)
+                continue
+            grades.append((points, feedback, self.answers[index]['answer_id']))
+        try:
+            totals = self.db_manager.save_question_grades(grades)
+        except Exception as ex:
+            self._notify(f"Error saving grades: {ex}", ft.Colors.RED)
+            return
+        saved = {answer_id: (points, feedback) for points, feedback, answer_id in grades}
+        totals = {submission_id: (score, is_graded) for submission_id, score, is_graded in totals}
+        for answer in self.answers:
+            if answer['answer_id'] in saved:
+                answer['points_earned'], answer['feedback'] = saved[answer['answer_id']]
+                answer['grade_source'] = 'manual'
+            if answer['submission_id'] in totals:
+                answer['score'], answer['is_graded'] = totals[answer['submission_id']]
+        for position in range(self.rendered):
+            answer = self.answers[self.visible[position]]
+            if answer['answer_id'] in saved:
+                label, color = self._status(answer)
+                self.status_texts[position].value, self.status_texts[position].color = label, color
+            if answer['submission_id'] in totals:
+                self.total_texts[position].value = f"Total {answer['score']:g}/{answer['max_score']:g}"
+        self.pending = {index: edit for index, edit in self.pending.items()
+                        if self.answers[index]['answer_id'] not in saved}
+        self._update_summary()
+        self.page.update()
+
+    def _notify(self, message, color):
+        snack = ft.SnackBar(content=ft.Text(message, color=ft.Colors.WHITE), bgcolor=color)
+        self.page.overlay.append(snack)
+        snack.open = True
+        self.page.update()
+
+    def close(self, e=None):
+        """Save, stop background loads and hand the keyboard back before leaving"""
+        self.flush()
+        self.requests.cancel()
+        self.page.on_keyboard_event = self._previous_keyboard_handler
+        if self.on_back:
+            self.on_back()
@@ -0,0 +1,147 @@
+import flet as ft
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.regrade import regrade_assessment
+
+
+class RegradeDialog:
+    """Admin dialog: regrade an assessment against its current key, preview the diff, then apply"""
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, on_regraded=None):
+        self.page = page
+        self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.on_regraded = on_regraded
+        self.assessment_id = None
+        self.report = None
+        self.dialog = None
+
+        self.question_checks = []
+        self.questions_column = ft.Column(spacing=0, scroll=ft.ScrollMode.AUTO)
+        self.overwrite_manual = ft.Checkbox(
+            label="Also rescore manually graded short answers",
+            value=False,
+            active_color="#D4817A",
+            on_change=lambda e: self._preview(),
+        )
+        self.report_text = ft.Text("", size=12, selectable=True, font_family="monospace")
+        self.progress = ft.ProgressRing(width=20, height=20, visible=False)
+        self.apply_button = ft.ElevatedButton(
+            "Apply",
+            icon=ft.Icons.AUTORENEW,
+            style=ft.ButtonStyle(bgcolor="#D4817A", color=ft.Colors.WHITE,
+                                 shape=ft.RoundedRectangleBorder(radius=10)),
+            disabled=True,
+            on_click=self.on_apply,
+        )
+
+    def open(self, assessment_id: int, title: str = ""):
+        """Show the dialog for one assessment with every question selected, and preview the regrade"""
+        self.assessment_id = assessment_id
+        self.report = None
+        self.question_checks = []
+        for number, question in enumerate(self.db_manager.get_questions(assessment_id), start=1):
+            kind = "MCQ" if question['question_type'] == 'mcq' else "Short answer"
+            check = ft.Checkbox(
+                label=f"Q{number} ({kind}, key: {question['correct_answer'] or '-'}) {question['question_text'][:60]}",
+                value=True,
+                active_color="#D4817A",
+                on_change=lambda e: self._preview(),
+            )
+            check.data = question['id']
+            self.question_checks.append(check)
+        self.questions_column.controls = self.question_checks
+        self.overwrite_manual.value = False
+        self.report_text.value = ""
+        self.apply_button.text = "Apply"
+        self.apply_button.disabled = True
+
+        content = ft.Column([
+            ft.Text("Questions to regrade", size=13, weight=ft.FontWeight.BOLD, color="#D4817A"),
+            ft.Container(
+                content=self.questions_column,
+                height=150,
+                padding=5,
+                border_radius=10,
+                border=ft.border.all(1, "#E8B4CB"),
+            ),
+            ft.Row([self.overwrite_manual, self.progress], spacing=10),
+            ft.Container(
+                content=ft.Column([self.report_text], scroll=ft.ScrollMode.AUTO),
+                height=220,
+                padding=10,
+                border_radius=10,
+                border=ft.border.all(1, "#E8B4CB"),
+            ),
+        ], spacing=12, width=600, tight=True)
+
+        self.dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(f"Regrade {title}".strip(), color="#D4817A", weight=ft.FontWeight.BOLD),
+            content=content,
+            actions=[
+                ft.TextButton("Close", on_click=self.close),
+                self.apply_button,
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        self.page.dialog = self.dialog
+        self.dialog.open = True
+        self.page.update()
+        self._preview()
+
+    def close(self, e=None):
+        self.requests.cancel()
+        if self.dialog:
+            self.page.close(self.dialog)
+
+    def _selected_questions(self):
+        return [check.data for check in self.question_checks if check.value]
+
+    def _preview(self):
+        """Dry run with the current selection; nothing is written"""
+        self.requests.run(self._run, True, key='regrade')
+
+    def on_apply(self, e):
+        if self.report and (self.report.answers_changed or self.report.changes):
+            self.requests.run(self._run, False, key='regrade')
+
+    async def _run(self, dry_run):
+        question_ids = self._selected_questions()
+        if not question_ids:
+            self.report = None
+            self.report_text.value = "Select at least one question"
+            self.apply_button.disabled = True
+            self.page.update()
+            return
+        self._set_busy(True)
+        try:
+            report = await self.async_db.call(regrade_assessment, self.db_manager, self.assessment_id,
+                                              question_ids, overwrite_manual=bool(self.overwrite_manual.value),
+                                              dry_run=dry_run)
+        except ValueError as e:
+            self.report = None
+            self.report_text.value = f"Cannot regrade: {e}"
+            self.apply_button.disabled = True
+            return
+        finally:
+            self._set_busy(False)
+
+        self.report = report
+        self.report_text.value = report.summary(max_rows=200)
+        if dry_run:
+            self.apply_button.text = f"Apply to {len(report.changes)} submissions"
+            self.apply_button.disabled = not (report.answers_changed or report.changes)
+        else:
+            # Everything now matches the key; a new preview would show no changes
+            self.apply_button.text = "Apply"
+            self.apply_button.disabled = True
+            if self.on_regraded:
+                self.on_regraded(report)
+        self.page.update()
+
+    def _set_busy(self, busy):
+        self.progress.visible = busy
+        self.apply_button.disabled = busy or self.apply_button.disabled
+        self.page.update()
@@ -0,0 +1,165 @@
+import flet as ft
+from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.roster_import import REQUIRED_COLUMNS, import_roster
+
+
+class RosterImportDialog:
+    """Admin dialog: pick a CSV/XLSX roster, review the dry run, then create the students"""
+
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, on_imported=None):
+        self.page = page
+        self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
+        self.on_imported = on_imported
+        self.roster_path = None
+        self.report = None
+        self.dialog = None
+
+        self.file_picker = ft.FilePicker(on_result=self.on_file_picked)
+        self.page.overlay.append(self.file_picker)
+        self.selected_file = ft.Text("No file selected", size=12, color=ft.Colors.GREY_600)
+        self.default_password = ft.TextField(
+            label="Default password (rows without one)",
+            password=True,
+            can_reveal_password=True,
+            border_radius=10,
+            border_color="#E8B4CB",
+            focused_border_color="#D4817A",
+            text_size=14,
+        )
+        questions = self.db_manager.get_security_questions()
+        self.default_question = ft.Dropdown(
+            label="Default security question",
+            options=[ft.dropdown.Option(q) for q in questions],
+            value=questions[0] if questions else None,
+            border_radius=10,
+            border_color="#E8B4CB",
+            focused_border_color="#D4817A",
+            text_size=14,
+        )
+        self.default_answer = ft.TextField(
+            label="Default security answer",
+            border_radius=10,
+            border_color="#E8B4CB",
+            focused_border_color="#D4817A",
+            text_size=14,
+        )
+        self.report_text = ft.Text("", size=12, selectable=True, font_family="monospace")
+        self.progress = ft.ProgressRing(width=20, height=20, visible=False)
+        self.import_button = ft.ElevatedButton(
+            "Import",
+            icon=ft.Icons.GROUP_ADD,
+            style=ft.ButtonStyle(bgcolor="#D4817A", color=ft.Colors.WHITE,
+                                 shape=ft.RoundedRectangleBorder(radius=10)),
+            disabled=True,
+            on_click=self.on_import,
+        )
+
+    def open(self):
+        """Show the dialog with nothing picked yet"""
+        self.roster_path = None
+        self.report = None
+        self.selected_file.value = "No file selected"
+        self.report_text.value = "Columns: " + ", ".join(REQUIRED_COLUMNS) + \
+            " (first_name/last_name may replace full_name)"
+        self.import_button.text = "Import"
+        self.import_button.disabled = True
+
+        content = ft.Column([
+            ft.Row([
+                ft.ElevatedButton(
+                    "Choose Roster",
+                    icon=ft.Icons.UPLOAD_FILE,
+                    on_click=lambda e: self.file_picker.pick_files(
+                        allow_multiple=False, allowed_extensions=["csv", "xlsx"]),
+                ),
+                self.selected_file,
+                self.progress,
+            ], spacing=10),
+            self.default_password,
+            self.default_question,
+            self.default_answer,
+            ft.Container(
+                content=ft.Column([self.report_text], scroll=ft.ScrollMode.AUTO),
+                height=220,
+                padding=10,
+                border_radius=10,
+                border=ft.border.all(1, "#E8B4CB"),
+            ),
+        ], spacing=12, width=560, tight=True)
+
+        self.dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Import Students", color="#D4817A", weight=ft.FontWeight.BOLD),
+            content=content,
+            actions=[
+                ft.TextButton("Re-check", on_click=lambda e: self._check()),
+                ft.TextButton("Close", on_click=self.close),
+                self.import_button,
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        self.page.dialog = self.dialog
+        self.dialog.open = True
+        self.page.update()
+
+    def close(self, e=None):
+        self.requests.cancel()
+        if self.dialog:
+            self.page.close(self.dialog)
+
+    def on_file_picked(self, e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        self.roster_path = e.files[0].path
+        self.selected_file.value = e.files[0].name
+        self._check()
+
+    def _defaults(self):
+        return {
+            'password': (self.default_password.value or '').strip(),
+            'security_question': self.default_question.value,
+            'security_answer': (self.default_answer.value or '').strip(),
+        }
+
+    def _check(self):
+        """Dry run: validate the roster against the database without writing"""
+        if self.roster_path:
+            self.requests.run(self._run, True, key='roster')
+
+    def on_import(self, e):
+        if self.report and self.report.valid_rows:
+            self.requests.run(self._run, False, key='roster')
+
+    async def _run(self, dry_run):
+        self._set_busy(True)
+        try:
+            report = await self.async_db.call(import_roster, self.db_manager, self.roster_path,
+                                              dry_run=dry_run, defaults=self._defaults())
+        except (OSError, ValueError) as e:
+            self.report = None
+            self.report_text.value = f"Cannot read roster: {e}"
+            self.import_button.disabled = True
+            return
+        finally:
+            self._set_busy(False)
+
+        self.report = report
+        self.report_text.value = report.summary(max_errors=200)
+        if dry_run:
+            self.import_button.text = f"Import {report.valid_rows} students"
+            self.import_button.disabled = report.valid_rows == 0
+        else:
+            # The same rows would now all clash; re-checking shows that
+            self.import_button.text = "Import"
+            self.import_button.disabled = True
+            if report.created and self.on_imported:
+                self.on_imported(report)
+        self.page.update()
+
+    def _set_busy(self, busy):
+        self.progress.visible = busy
+        self.import_button.disabled = busy or self.import_button.disabled
+        self.page.update()
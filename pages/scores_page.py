@@ -1,23 +1,44 @@
 import flet as ft
-import json
 from typing import List, Dict, Any, Optional
 from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.gradebook_export import (export_assessment_answers, export_assessment_scores, export_file_name,
+                                       export_section_gradebook)
+from database.grading import AnswerKey
+from pages.gradebook_exporter import GradebookExporter
+from pages.item_analysis_view import ItemAnalysisView
 from datetime import datetime
 
 class ScoresPage:
+    PAGE_SIZE = 20
+
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
         self.current_view = "assessments"  # assessments, students, grading
         self.current_assessment_id = None
         self.current_submission_id = None
         self.expanded_assessment_id = None
+        self.expanded_tab = "students"  # students, analysis
+        self.item_analysis = None
         self.search_query = ""
         self.sort_order = "newest first"
         self.user_data = page.data
         self.assessment = None
         self.student_scores = []
+        # Average/highest percentages of the open assessment (SQL score summary)
+        self.score_summary = {}
         self.submission_details = None
+        # Published assessments with stats, one keyset page at a time; None until the first page lands
+        self.assessments = None
+        self.next_cursor = None
+        self._loading_page = False
+        self.assessment_list = None
+        # Sections for the gradebook export menu; fetched with the first page of assessments
+        self.sections = None
+        self.exporter = GradebookExporter(page, db_manager)
         
         # Content container for seamless navigation
         self.main_content = None
@@ -137,6 +158,12 @@ class ScoresPage:
                             size=12,
                             color=ft.Colors.WHITE70,
                         ),
+                        ft.Text(
+                            f"average: {assessment['average_score']}    std dev: {assessment['stddev_score']}"
+                            if assessment.get('average_score') is not None else "average: -    std dev: -",
+                            size=12,
+                            color=ft.Colors.WHITE70,
+                        ),
                         ft.Text(
                             self._format_date(assessment['created_at']),
                             size=10,
@@ -176,6 +203,15 @@ class ScoresPage:
                             on_hover=lambda e: self._on_button_hover(e, "#B85450", "#A04440"),
                             # Removed animation to prevent UI issues
                         ),
+                        ft.Row([
+                            ft.IconButton(
+                                icon=ft.Icons.ANALYTICS,
+                                icon_color=ft.Colors.WHITE,
+                                tooltip="Item analysis",
+                                on_click=lambda e, aid=assessment_id: self._show_item_analysis(aid),
+                            ),
+                            self._create_assessment_export_menu(assessment),
+                        ], spacing=0, alignment=ft.MainAxisAlignment.CENTER),
                     ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
                 ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
             ]),
@@ -185,16 +221,71 @@ class ScoresPage:
             margin=ft.margin.only(bottom=5),
         )
         
-        # Students table (shown when expanded)
-        students_table = None
+        # Students table or item analysis (shown when expanded)
+        expanded_panel = None
         if is_expanded:
-            students_table = self._create_students_table(assessment_id)
+            expanded_panel = self._create_expanded_panel(assessment_id)
         
         return ft.Column([
             main_card,
-            students_table if students_table else ft.Container(),
+            expanded_panel if expanded_panel else ft.Container(),
         ], spacing=0)
 
+    def _create_expanded_panel(self, assessment_id: int) -> ft.Control:
+        """Students / Item analysis tabs under an expanded assessment card"""
+        def tab(label, name):
+            selected = self.expanded_tab == name
+            return ft.Container(
+                content=ft.Text(label, size=13, weight=ft.FontWeight.BOLD if selected else ft.FontWeight.NORMAL,
+                                color="#D4817A" if selected else ft.Colors.GREY_600),
+                padding=ft.padding.symmetric(horizontal=12, vertical=6),
+                border=ft.border.only(bottom=ft.BorderSide(2, "#D4817A" if selected else ft.Colors.TRANSPARENT)),
+                on_click=lambda e: self._select_expanded_tab(name),
+            )
+
+        tabs = ft.Row([tab("Students", "students"), tab("Item analysis", "analysis")], spacing=5)
+        if self.expanded_tab == "analysis":
+            if self.item_analysis is None or self.item_analysis.assessment_id != assessment_id:
+                self.item_analysis = ItemAnalysisView(self.page, self.db_manager, assessment_id)
+                self.item_analysis.load()
+            return ft.Container(
+                content=ft.Column([tabs, self.item_analysis.build()], spacing=10),
+                padding=ft.padding.all(15),
+                bgcolor="#F9F9F9",
+                border_radius=10,
+                margin=ft.margin.only(top=10)
+            )
+        return ft.Column([tabs, self._create_students_table(assessment_id)], spacing=0)
+
+    def _select_expanded_tab(self, name: str):
+        self.expanded_tab = name
+        self._refresh_content()
+
+    def _show_item_analysis(self, assessment_id: int):
+        """Expand the card on its item analysis tab; a second click collapses it"""
+        if self.expanded_assessment_id == assessment_id and self.expanded_tab == "analysis":
+            self.expanded_assessment_id = None
+        else:
+            self.expanded_assessment_id = assessment_id
+            self.expanded_tab = "analysis"
+        self._refresh_content()
+
+    def _create_assessment_export_menu(self, assessment: Dict[str, Any]) -> ft.Control:
+        """Score sheet and answer dump downloads for one assessment"""
+        title = assessment.get('title') or f"Assessment {assessment['id']}"
+        return self.exporter.menu([
+            ("Export score sheet", export_assessment_scores, assessment['id'], export_file_name(title, "scores")),
+            ("Export answers by question", export_assessment_answers, assessment['id'],
+             export_file_name(title, "answers")),
+        ], icon_color=ft.Colors.WHITE, tooltip="Export scores")
+
+    def _create_gradebook_export_menu(self) -> ft.Control:
+        """One section gradebook download per section"""
+        return self.exporter.menu([
+            (f"Gradebook: {section}", export_section_gradebook, section, export_file_name("Gradebook", section))
+            for section in self.sections or []
+        ], tooltip="Export section gradebook")
+
     def _create_students_table(self, assessment_id: int) -> ft.Control:
         """Create students table showing actual student scores, names, and sections"""
         submissions = self.get_student_submissions_with_details(assessment_id)
@@ -283,9 +374,6 @@ class ScoresPage:
     def get_student_submissions_with_details(self, assessment_id: int):
         """Get student submissions with complete details including scores and sections"""
         try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            
             # Query to get detailed student submissions
             query = """
             SELECT 
@@ -303,9 +391,8 @@ class ScoresPage:
             ORDER BY COALESCE(s.score, s.total_score, 0) DESC, u.full_name ASC
             """
             
-            cursor.execute(query, (assessment_id,))
-            results = cursor.fetchall()
-            conn.close()
+            with self.db_manager.connection() as conn:
+                results = conn.execute(query, (assessment_id,)).fetchall()
             
             # Convert to list of dictionaries
             submissions = []
@@ -339,19 +426,17 @@ class ScoresPage:
             # Get student scores
             self.student_scores = self.get_student_scores()
             print(f"Found {len(self.student_scores)} student submissions")
-            print(f"Student scores data: {self.student_scores}")
+            self.score_summary = self.db_manager.get_assessment_score_summary(self.current_assessment_id)
             
         except Exception as e:
             print(f"Error loading assessment data: {e}")
             self.assessment = None
             self.student_scores = []
+            self.score_summary = {}
     
     def get_student_scores(self):
         """Get student scores for the assessment"""
         try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            
             # Query to get student submissions with user details
             query = """
             SELECT 
@@ -369,12 +454,10 @@ class ScoresPage:
             """
             
             print(f"Executing query for assessment ID: {self.current_assessment_id}")
-            cursor.execute(query, (self.current_assessment_id,))
-            results = cursor.fetchall()
-            conn.close()
+            with self.db_manager.connection() as conn:
+                results = conn.execute(query, (self.current_assessment_id,)).fetchall()
             
             print(f"Query results: {len(results)} rows")
-            print(f"Raw results: {results}")
             
             # Convert to list of dictionaries
             student_scores = []
@@ -389,7 +472,6 @@ class ScoresPage:
                     'submission_id': row[6]
                 })
             
-            print(f"Processed student scores: {student_scores}")
             return student_scores
             
         except Exception as e:
@@ -486,14 +568,16 @@ class ScoresPage:
         
         if is_mcq:
             # Multiple choice question
-            options = json.loads(answer['options']) if answer['options'] else []
+            answer_key = AnswerKey.from_answers([answer])
+            options = answer_key.options[0]
+            student_choice = answer_key.choice_code(answer['question_id'], answer['student_answer'])
+            key_choice = answer_key.key_code(answer['question_id'])
             
             # Show options with student's selection highlighted
             option_controls = []
             for i, option in enumerate(options):
-                option_letter = chr(65 + i)  # A, B, C, D
-                is_selected = answer['student_answer'] == option_letter
-                is_correct = answer['correct_answer'] == option_letter
+                is_selected = i == student_choice
+                is_correct = i == key_choice
                 
                 if is_selected:
                     if is_correct:
@@ -626,12 +710,18 @@ class ScoresPage:
             # This should not happen in normal flow, but provides safety
             self.page.go(f"/admin/student-scores-list/{assessment_id}")
 
+    def _view_gradebook(self, e=None):
+        """Open the students x assessments gradebook for a section"""
+        if self.parent_dashboard:
+            self.parent_dashboard.show_gradebook_embedded()
+
     def _toggle_students_view(self, assessment_id: int):
         """Toggle the students view for an assessment"""
         if self.expanded_assessment_id == assessment_id:
             self.expanded_assessment_id = None
         else:
             self.expanded_assessment_id = assessment_id
+            self.expanded_tab = "students"
         self._refresh_content()
 
     def _view_submission(self, submission_id: int):
@@ -687,18 +777,71 @@ class ScoresPage:
         print(f"DEBUG: Search changed to: '{e.control.value}'")
         self.search_query = e.control.value
         print(f"DEBUG: self.search_query set to: '{self.search_query}'")
-        self._refresh_assessments()
+        self.load_assessments_async()
 
     def _on_sort_change(self, e):
         """Handle sort order change"""
         print(f"DEBUG: Sort changed to: '{e.control.value}'")
         self.sort_order = e.control.value
         print(f"DEBUG: self.sort_order set to: '{self.sort_order}'")
-        self._refresh_assessments()
+        self.load_assessments_async()
 
     def _refresh_assessments(self, e=None):
         """Refresh the assessments list"""
-        self._refresh_content()
+        self.load_assessments_async()
+
+    def load_assessments_async(self):
+        """Reload the first page of published assessments in the background; the list redraws when it arrives"""
+        self.requests.run(self._load_assessments_page, True, key='assessments')
+
+    def _load_more_assessments(self, e=None):
+        """Append the next page (the "Load more" button and infinite scroll)"""
+        if self.next_cursor is None or self._loading_page:
+            return
+        self.requests.run(self._load_assessments_page, False, key='assessments')
+
+    def _on_assessment_list_scroll(self, e):
+        """Infinite scroll: fetch the next page once the list nears its end"""
+        if e.max_scroll_extent and e.pixels >= e.max_scroll_extent - 200:
+            self._load_more_assessments()
+
+    async def _load_assessments_page(self, reset):
+        # Search and sort run in SQL; each page continues from the last one's cursor
+        self._loading_page = True
+        try:
+            page = await self.async_db.page_published_assessments_with_stats(
+                after=None if reset else self.next_cursor, limit=self.PAGE_SIZE,
+                sort=self.sort_order, search=self.search_query.strip() or None)
+        finally:
+            # Also when the keyed runner cancels this load (CancelledError is not an Exception)
+            self._loading_page = False
+        if self.sections is None:
+            self.sections = await self.async_db.get_available_sections()
+        self.next_cursor = page.next_cursor
+        appending = not reset and self.assessments is not None
+        self.assessments = self.assessments + page.items if appending else page.items
+        if self.current_view != "assessments":
+            return
+        if self.parent_dashboard and self.parent_dashboard.current_view != "results":
+            return
+        if not appending or self.assessment_list is None:
+            self._refresh_content()
+            return
+        # Appending keeps the list's scroll position, unlike a full redraw
+        controls = self.assessment_list.controls
+        controls.pop()  # the old "Load more" footer
+        controls.extend(self._create_assessment_card(a, self.expanded_assessment_id == a['id'])
+                        for a in page.items)
+        controls.append(self._create_list_footer())
+        self.assessment_list.update()
+
+    def _create_list_footer(self) -> ft.Control:
+        if self.next_cursor is None:
+            return ft.Container(height=10)
+        return ft.Container(
+            content=ft.TextButton("Load more", icon=ft.Icons.EXPAND_MORE, on_click=self._load_more_assessments),
+            alignment=ft.alignment.center
+        )
 
     def _refresh_content(self):
         """Refresh the page content using embedded pattern - NO VIEW CLEARING"""
@@ -709,7 +852,7 @@ class ScoresPage:
             if hasattr(self, 'parent_dashboard') and self.parent_dashboard:
                 # Use embedded refresh - update content only
                 print(f"Using embedded refresh through parent dashboard")
-                self.parent_dashboard.show_results()
+                self.parent_dashboard.show_results(reload=False)
             else:
                 # Fallback: direct content update without view clearing
                 print(f"Using direct content update")
@@ -744,29 +887,32 @@ class ScoresPage:
             ft.Icon(ft.Icons.STAR, size=28, color="#D4817A"),
             ft.Text("Scores", size=24, weight=ft.FontWeight.BOLD, color="#D4817A"),
             ft.Container(expand=True),
+            ft.TextButton("Gradebook", icon=ft.Icons.GRID_ON, style=ft.ButtonStyle(color="#D4817A"),
+                          on_click=self._view_gradebook),
+            self._create_gradebook_export_menu(),
             ft.Text(datetime.now().strftime("%B %d, %Y"), size=14, color="#D4817A"),
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+        header = ft.Column([header, self.exporter.build()], spacing=5)
 
-        # Get published assessments
-        assessments = self.db_manager.get_published_assessments_with_stats()
-        
-        # Apply search filter
-        if self.search_query:
-            assessments = [a for a in assessments if self.search_query.lower() in a['title'].lower()]
-
-        # Apply sorting
-        if self.sort_order == "newest first":
-            assessments.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        elif self.sort_order == "oldest first":
-            assessments.sort(key=lambda x: x.get('created_at', ''))
-        elif self.sort_order == "most students":
-            assessments.sort(key=lambda x: x.get('students_taken', 0), reverse=True)
-        elif self.sort_order == "least students":
-            assessments.sort(key=lambda x: x.get('students_taken', 0))
+        if self.assessments is None:
+            return ft.Column([
+                header,
+                ft.Container(height=20),
+                self._create_search_bar(),
+                ft.Container(height=20),
+                ft.Container(
+                    content=ft.Row([
+                        ft.ProgressRing(width=24, height=24, stroke_width=2, color="#D4817A"),
+                        ft.Text("Loading assessments...", size=14, color=ft.Colors.GREY_600)
+                    ], spacing=12, alignment=ft.MainAxisAlignment.CENTER),
+                    padding=ft.padding.all(40),
+                    alignment=ft.alignment.center
+                )
+            ], spacing=0, expand=True)
 
-        # Create assessment cards
+        # Loaded pages, already filtered and sorted by the query
         assessment_cards = []
-        for assessment in assessments:
+        for assessment in self.assessments:
             is_expanded = self.expanded_assessment_id == assessment['id']
             card = self._create_assessment_card(assessment, is_expanded)
             assessment_cards.append(card)
@@ -783,6 +929,9 @@ class ScoresPage:
                     alignment=ft.alignment.center
                 )
             )
+        assessment_cards.append(self._create_list_footer())
+        self.assessment_list = ft.Column(assessment_cards, spacing=15, scroll=ft.ScrollMode.AUTO, expand=True,
+                                         on_scroll=self._on_assessment_list_scroll, on_scroll_interval=100)
 
         # Create the main content container
         content = ft.Column([
@@ -792,7 +941,7 @@ class ScoresPage:
             ft.Container(height=20),
             ft.Text("List of Assessments", size=16, weight=ft.FontWeight.BOLD, color="#D4817A"),
             ft.Container(height=10),
-            ft.Column(assessment_cards, spacing=15, scroll=ft.ScrollMode.AUTO, expand=True)
+            self.assessment_list
         ], spacing=0, expand=True)
         
         return content
@@ -865,30 +1014,12 @@ class ScoresPage:
         ], spacing=0, expand=True)
     
     def _calculate_average_score(self):
-        """Calculate average score percentage"""
-        if not self.student_scores:
-            return 0
-        
-        total_percentage = 0
-        for student in self.student_scores:
-            if student['total_questions'] > 0:
-                percentage = (student['score'] / student['total_questions']) * 100
-                total_percentage += percentage
-        
-        return total_percentage / len(self.student_scores) if self.student_scores else 0
+        """Average score percentage over every submission, from the SQL score summary"""
+        return self.score_summary.get('average_percentage', 0)
     
     def _get_highest_score(self):
-        """Get highest score percentage"""
-        if not self.student_scores:
-            return 0
-        
-        highest = 0
-        for student in self.student_scores:
-            if student['total_questions'] > 0:
-                percentage = (student['score'] / student['total_questions']) * 100
-                highest = max(highest, percentage)
-        
-        return highest
+        """Highest score percentage over every submission, from the SQL score summary"""
+        return self.score_summary.get('highest_percentage', 0)
     
     def _create_detailed_students_table(self):
         """Create the detailed students scores table"""
@@ -1081,16 +1212,17 @@ class ScoresPage:
     def get_view(self):
         """Return the scores page view"""
         # Create fresh content every time to ensure proper display
-        main_content = ft.Container(
+        self.main_content = ft.Container(
             content=self.get_content_only(),
             padding=ft.padding.all(20),
             expand=True,
             bgcolor="#f4f1ec"
         )
+        self.load_assessments_async()
         
         return ft.View(
             "/admin-scores",
-            [main_content],
+            [self.main_content],
             padding=0,
             bgcolor="#f4f1ec"
         )
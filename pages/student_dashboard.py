@@ -2,15 +2,23 @@ import flet as ft
 from datetime import datetime, timedelta
 import json
 from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from pages.global_search import GlobalSearch
 
 class StudentDashboard:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager):
         self.page = page
         self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
         self.user_data = page.data
         self.assessments = []
         self.posts = []
         self.materials = []  # Add materials list
+        self.announcements = []
+        self.unread_announcements_count = 0
+        # Dashboard data arrives in the background; placeholders show until then
+        self.dashboard_loading = True
         self.pending_count = 0
         self.completed_count = 0
         self.current_view = "dashboard"
@@ -37,11 +45,14 @@ class StudentDashboard:
         self.page.overlay.append(self.date_picker)
         self._pending_upload_post_id = None
         self.selected_nav = 0
+        # Only what the student's section can see; '' (no section) still finds the all-sections posts
+        self.global_search = GlobalSearch(
+            page, db_manager, on_open=self.open_search_result,
+            section=(self.user_data or {}).get('section') or '',
+            scopes=('announcements', 'assessments', 'materials', 'comments')
+        )
         # Initialize UI components
         self.init_ui()
-        self.load_assessments()
-        self.load_announcements()  # Load announcements as well
-        self.load_materials()  # Load class materials
         # Shared state for calendar
         self._calendar_display_month = None
         self._calendar_display_year = None
@@ -251,6 +262,7 @@ class StudentDashboard:
                 self.show_user_content()
             elif index == 1:
                 self.show_dashboard()
+                self.refresh_dashboard()
             elif index == 2:
                 # Show posts content within the same page structure
                 self.show_posts_content()
@@ -340,9 +352,10 @@ class StudentDashboard:
         header = self._build_section_header(ft.Icons.DASHBOARD, "Dashboard")
         
         # Statistics cards row
+        loading = self.dashboard_loading
         stats_row = ft.Row([
-            self.create_stat_card_modern(str(self.pending_count), "Pending Assessment", "#D4817A"),
-            self.create_stat_card_modern(str(self.completed_count), "Completed Assessment", "#D4817A"),
+            self.create_stat_card_modern("-" if loading else str(self.pending_count), "Pending Assessment", "#D4817A"),
+            self.create_stat_card_modern("-" if loading else str(self.completed_count), "Completed Assessment", "#D4817A"),
         ], spacing=30)
         
         # Interactive calendar widget (replaces static card)
@@ -361,7 +374,9 @@ class StudentDashboard:
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN, spacing=30)
         
         # Announcements Section (from Admin/Teacher)
-        if self.announcements:
+        if loading:
+            announcements_content = self._build_loading_placeholder("Loading announcements...")
+        elif self.announcements:
             announcement_cards = []
             for i, announcement in enumerate(self.announcements[:3]):  # Show only 3 on dashboard
                 announcement_cards.append(
@@ -472,14 +487,10 @@ class StudentDashboard:
         )
         
         # Class Materials section (replaces Recent Posts)
-        # Refresh materials to get the latest uploaded materials from admin
-        try:
-            self.load_materials()
-        except Exception:
-            pass
-        
         recent_materials = (self.materials or [])[:3]  # Show latest 3 materials
-        if recent_materials:
+        if loading:
+            materials_body = self._build_loading_placeholder("Loading class materials...")
+        elif recent_materials:
             material_cards = [self.create_material_card_modern(m) for m in recent_materials]
             materials_body = ft.Column(material_cards, spacing=10)
         else:
@@ -521,6 +532,7 @@ class StudentDashboard:
         # Standardized layout: header + scrollable content
         dashboard_content = ft.Column([
             header,  # Fixed header at top
+            ft.Container(self.global_search.build(), margin=ft.margin.only(bottom=20)),
             ft.Container(
                 content=content_body,
                 expand=True,
@@ -531,6 +543,49 @@ class StudentDashboard:
         self.main_content.content = dashboard_content
         self.page.update()
 
+    def open_search_result(self, result):
+        """Open the tab a global search hit belongs to"""
+        if result['scope'] == 'assessments':
+            self.navigate_to(3)
+        else:
+            # Announcements, materials and their comments all live in the classfeed
+            self.navigate_to(2)
+
+    def _build_loading_placeholder(self, message):
+        """Spinner shown in a dashboard card while its data loads"""
+        return ft.Container(
+            content=ft.Row([
+                ft.ProgressRing(width=20, height=20, stroke_width=2, color="#D4817A"),
+                ft.Text(message, size=14, color="#9CA3AF")
+            ], spacing=12, alignment=ft.MainAxisAlignment.CENTER),
+            alignment=ft.alignment.center,
+            height=100
+        )
+
+    def refresh_dashboard(self):
+        """Reload assessments, announcements and materials in the background"""
+        self.requests.run(self._load_dashboard_data, key='dashboard')
+
+    async def _load_dashboard_data(self):
+        """Fetch the dashboard's three lists concurrently, then redraw if still on the dashboard"""
+        adb = self.async_db
+        results = await adb.gather(
+            assessments=adb.get_assessments(user_id=self.user_data['id'], role='student'),
+            announcements=adb.get_active_announcements_for_section((self.user_data or {}).get('section')),
+            materials=adb.get_materials(),
+            return_exceptions=True
+        )
+        for name, value in results.items():
+            if isinstance(value, Exception):
+                print(f"Error loading {name}: {value}")
+                results[name] = []
+        self.set_assessments(results['assessments'])
+        self.set_announcements(results['announcements'])
+        self.materials = results['materials']
+        self.dashboard_loading = False
+        if self.current_view == "dashboard":
+            self.show_dashboard()
+
     def _build_calendar_widget(self):
         import calendar as cal
         from datetime import datetime
@@ -2042,8 +2097,11 @@ class StudentDashboard:
     # Keep all other methods unchanged for functionality
     def take_exam(self, assessment_id):
         """Start taking an exam"""
-        # Find the assessment
+        # Find the assessment (the background dashboard load may not have landed yet)
         assessment = next((a for a in self.assessments if a['id'] == assessment_id), None)
+        if not assessment:
+            self.load_assessments()
+            assessment = next((a for a in self.assessments if a['id'] == assessment_id), None)
         if not assessment:
             return
         
@@ -2202,8 +2260,6 @@ class StudentDashboard:
     def get_student_completed_results(self):
         """Fetch current student's completed assessments with scores and submission info"""
         try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
             query = """
             SELECT 
                 a.id as assessment_id,
@@ -2218,9 +2274,8 @@ class StudentDashboard:
             WHERE s.student_id = ?
             ORDER BY s.submitted_at DESC
             """
-            cursor.execute(query, (self.user_data['id'],))
-            rows = cursor.fetchall()
-            conn.close()
+            with self.db_manager.connection() as conn:
+                rows = conn.execute(query, (self.user_data['id'],)).fetchall()
             results = []
             for row in rows:
                 results.append({
@@ -2478,8 +2533,8 @@ class StudentDashboard:
             })
         
         try:
-            # Submit to database
-            submission_id = self.db_manager.submit_assessment(
+            # Queue for the group-commit writer and wait until it is durable
+            submission_id = self.db_manager.submission_writer.submit_and_wait(
                 assessment_id=self.current_assessment['id'],
                 student_id=self.user_data['id'],
                 answers=answers_list
@@ -2510,7 +2565,11 @@ class StudentDashboard:
 
     def load_assessments(self):
         """Load assessments from database"""
-        self.assessments = self.db_manager.get_assessments(user_id=self.user_data['id'], role='student')
+        self.set_assessments(self.db_manager.get_assessments(user_id=self.user_data['id'], role='student'))
+
+    def set_assessments(self, assessments):
+        """Store loaded assessments and recompute the pending/completed counters"""
+        self.assessments = assessments
         # Recompute counters
         try:
             self.pending_count = len([a for a in (self.assessments or []) if not a.get('is_submitted', False)])
@@ -2534,14 +2593,18 @@ class StudentDashboard:
     def load_announcements(self):
         """Load active announcements from database"""
         try:
-            self.announcements = self.db_manager.get_active_announcements()
-            # For now, assume all announcements are unread (can be enhanced with read tracking)
-            self.unread_announcements_count = len(self.announcements)
+            self.set_announcements(self.db_manager.get_active_announcements_for_section(
+                (self.user_data or {}).get('section')))
         except Exception as ex:
             print(f"Error loading announcements: {ex}")
             self.announcements = []
             self.unread_announcements_count = 0
 
+    def set_announcements(self, announcements):
+        self.announcements = announcements
+        # For now, assume all announcements are unread (can be enhanced with read tracking)
+        self.unread_announcements_count = len(self.announcements)
+
     def load_materials(self):
         """Load class materials uploaded by admin"""
         try:
@@ -2742,8 +2805,9 @@ class StudentDashboard:
     
     def get_view(self):
         """Return the student dashboard view with modern design"""
-        # Show dashboard by default
+        # Show dashboard by default; its data loads in the background
         self.show_dashboard()
+        self.refresh_dashboard()
         
         return ft.View(
             "/student",
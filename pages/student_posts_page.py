@@ -256,7 +256,8 @@ class StudentPostsPage:
     def load_announcements(self):
         """Load active announcements only"""
         try:
-            self.announcements = self.db_manager.get_active_announcements()
+            self.announcements = self.db_manager.get_active_announcements_for_section(
+                (self.user_data or {}).get('section'))
         except Exception as e:
             print(f"Error loading announcements: {e}")
             self.announcements = []
@@ -1,5 +1,6 @@
 import flet as ft
 from typing import Dict, List, Optional
+from database.grading import AnswerKey, clean_answer, parse_options
 
 class StudentResultsPage:
     def __init__(self, page: ft.Page, db_manager, user_data: Dict, assessment_id: int):
@@ -11,6 +12,7 @@ class StudentResultsPage:
         self.results = None
         self.questions = []
         self.student_answers = {}
+        self.answer_key = AnswerKey([])
         
         # Load data
         self.load_assessment_data()
@@ -36,6 +38,7 @@ class StudentResultsPage:
 
             # Get questions and answers for this assessment
             self.questions = self.db_manager.get_questions(self.assessment_id)
+            self.answer_key = AnswerKey(self.questions)
             self.student_answers = self.db_manager.get_student_answers_with_grades(
                 assessment_id=self.assessment_id,
                 student_id=self.user_data['id']
@@ -49,32 +52,6 @@ class StudentResultsPage:
         print(f"Error: {message}")
         # You could also show a dialog or navigate back
     
-    def clean_student_answer(self, student_answer):
-        """Clean student answer by removing quotes, brackets, and extra formatting"""
-        if not student_answer:
-            return student_answer
-        
-        student_answer = str(student_answer).strip()
-        if student_answer.startswith('"') and student_answer.endswith('"'):
-            student_answer = student_answer[1:-1]
-        if student_answer.startswith("'") and student_answer.endswith("'"):
-            student_answer = student_answer[1:-1]
-        if student_answer.startswith('["') and student_answer.endswith('"]'):
-            student_answer = student_answer[2:-2]
-        if student_answer.startswith("['") and student_answer.endswith("']"):
-            student_answer = student_answer[2:-2]
-        # Handle cases like '["ert346546"' (incomplete bracket)
-        if student_answer.startswith('["'):
-            student_answer = student_answer[2:]
-        if student_answer.startswith("['"):
-            student_answer = student_answer[2:]
-        if student_answer.endswith('"'):
-            student_answer = student_answer[:-1]
-        if student_answer.endswith("'"):
-            student_answer = student_answer[:-1]
-        
-        return student_answer
-
     def create_results_view(self) -> ft.Container:
         """Create the main results view"""
         if not self.assessment or not self.results:
@@ -184,40 +161,7 @@ class StudentResultsPage:
         
         # Determine correctness and status
         if question_type == 'mcq':
-            # Clean student answer format
-            cleaned_student_answer = self.clean_student_answer(student_answer)
-            
-            # Check if student answer matches correct answer using same logic as grading page
-            is_correct = False
-            options = question.get('options', [])
-            if isinstance(options, str):
-                import json
-                try:
-                    options = json.loads(options)
-                except:
-                    options = []
-            
-            for idx, option in enumerate(options):
-                option_letter = chr(65 + idx)  # A, B, C, D
-                
-                # Check if this option is both selected and correct
-                is_selected = (
-                    cleaned_student_answer == option_letter or
-                    cleaned_student_answer == str(idx) or
-                    cleaned_student_answer == option or
-                    cleaned_student_answer == str(idx + 1)
-                )
-                
-                is_option_correct = (
-                    correct_answer == option_letter or
-                    correct_answer == str(idx) or
-                    correct_answer == option or
-                    correct_answer == str(idx + 1)
-                )
-                
-                if is_selected and is_option_correct:
-                    is_correct = True
-                    break
+            is_correct, _ = self.answer_key.grade(question.get('id'), student_answer)
             
             status_text = "Correct" if is_correct else "Incorrect"
             status_color = ft.Colors.WHITE
@@ -323,36 +267,20 @@ class StudentResultsPage:
 
     def create_mcq_result_display(self, question: Dict, student_answer: str, correct_answer: str) -> ft.Column:
         """Create MCQ result display matching grading page theme with proper highlighting"""
-        options = question.get('options', [])
-        if isinstance(options, str):
-            import json
-            try:
-                options = json.loads(options)
-            except:
-                options = []
+        options = parse_options(question.get('options'))
+        student_choice = self.answer_key.choice_code(question.get('id'), student_answer)
+        key_choice = self.answer_key.key_code(question.get('id'))
 
         # Clean student answer format
-        cleaned_student_answer = self.clean_student_answer(student_answer)
+        cleaned_student_answer = clean_answer(student_answer)
         
         option_displays = []
         for i, option in enumerate(options):
             option_letter = chr(65 + i)  # A, B, C, D
             
-            # Check multiple possible formats for student answer (same as grading page)
-            is_student_choice = (
-                cleaned_student_answer == option_letter or  # Letter format (A, B, C, D)
-                cleaned_student_answer == str(i) or         # Index format (0, 1, 2, 3)
-                cleaned_student_answer == option or         # Full option text
-                cleaned_student_answer == str(i + 1)       # 1-based index (1, 2, 3, 4)
-            )
-            
-            # Check multiple possible formats for correct answer (same as grading page)
-            is_correct_answer = (
-                correct_answer == option_letter or  # Letter format (A, B, C, D)
-                correct_answer == str(i) or         # Index format (0, 1, 2, 3)
-                correct_answer == option or         # Full option text
-                correct_answer == str(i + 1)       # 1-based index (1, 2, 3, 4)
-            )
+            # Letter, number or option text all resolve to the same choice code (same as grading page)
+            is_student_choice = i == student_choice
+            is_correct_answer = i == key_choice
             
             # Determine styling based on grading page theme (exact same logic)
             if is_student_choice and is_correct_answer:
@@ -422,7 +350,7 @@ class StudentResultsPage:
                     style=ft.TextStyle(italic=True)
                 ),
                 padding=ft.padding.all(10),
-                bgcolor="#F0F8F0" if cleaned_student_answer.upper() == correct_answer.upper() else "#FFF0F0",
+                bgcolor="#F0F8F0" if self.answer_key.grade(question.get('id'), student_answer)[0] else "#FFF0F0",
                 border_radius=8,
                 margin=ft.margin.only(top=10)
             )
@@ -1,109 +1,141 @@
 import flet as ft
 from datetime import datetime
 from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.gradebook_export import export_assessment_answers, export_assessment_scores, export_file_name
+from pages.gradebook_exporter import GradebookExporter
 
 class StudentScoresListPage:
+    # Flexible column definitions that adapt to container width: flex values that scale proportionally
+    COLUMN_FLEX = {
+        'rank': 1,      # Smallest column
+        'name': 3,      # Largest column for names
+        'student_no': 2.5,  # Medium column
+        'section': 2,    # Small column
+        'score': 2,     # Small column
+        'percentage': 2,  # Small column
+        'date': 2,          # Medium column
+        'status': 2,      # Small column
+        'view': 2,         # Small column
+    }
+    PAGE_SIZE = 50
+
     def __init__(self, page: ft.Page, db_manager: DatabaseManager, assessment_id: int):
         self.page = page
         self.db_manager = db_manager
+        self.async_db = AsyncDatabaseManager.shared(db_manager)
+        self.requests = self.async_db.page_requests(page)
         self.assessment_id = assessment_id
         self.assessment = None
+        # Loaded keyset pages of submissions, best score first; search runs in SQL
         self.student_scores = []
         self.filtered_student_scores = []
+        self.next_cursor = None
+        self.summary = {'total_students': 0, 'average_percentage': 0, 'highest_percentage': 0}
+        self.table_column = None
+        self._on_loaded = None
+        self._loading_page = False
         self.search_query = ""
         self.user_data = page.data
+        self.exporter = GradebookExporter(page, db_manager)
         
         # Reference to parent dashboard for embedded navigation
         self.parent_dashboard = None
+        self.main_content = None
         
-        # Load data
-        self.load_assessment_data()
+        # Data is loaded in the background (load_data_async); placeholders show until then
+        self.loading = True
         self.init_ui()
         
-    def load_assessment_data(self):
-        """Load assessment and student scores data"""
-        try:
-            print(f"Loading data for assessment ID: {self.assessment_id}")
-            
-            # Get assessment details
-            self.assessment = self.db_manager.get_assessment_by_id(self.assessment_id)
-            print(f" Assessment found: {self.assessment.get('title') if self.assessment else 'None'}")
-            
-            # Get student scores
-            self.student_scores = self.get_student_scores()
-            print(f"Found {len(self.student_scores)} student submissions")
-            
-        except Exception as e:
-            print(f"Error loading assessment data: {e}")
-            self.assessment = None
-            self.student_scores = []
-    
-    def get_student_scores(self):
-        """Get student scores for the assessment with grading status"""
+    def load_data_async(self, on_loaded=None):
+        """Fetch the assessment, its score summary and the first page of scores concurrently.
+
+        ``on_loaded()`` redraws the page; it is called again whenever a new search
+        replaces the loaded pages.
+        """
+        self._on_loaded = on_loaded
+        self.requests.run(self._load_data, key='scores')
+
+    async def _load_data(self):
+        adb = self.async_db
+        results = await adb.gather(
+            assessment=adb.get_assessment_by_id(self.assessment_id),
+            summary=adb.get_assessment_score_summary(self.assessment_id),
+            scores=self._fetch_page(None),
+            return_exceptions=True
+        )
+        assessment, summary, page = results['assessment'], results['summary'], results['scores']
+        if isinstance(assessment, Exception):
+            print(f"Error loading assessment data: {assessment}")
+            assessment = None
+        self.assessment = assessment
+        if isinstance(summary, Exception):
+            print(f"Error loading score summary: {summary}")
+        else:
+            self.summary = summary
+        if isinstance(page, Exception):
+            print(f"Error loading student scores: {page}")
+            self.student_scores, self.next_cursor = [], None
+        else:
+            self.student_scores, self.next_cursor = page.items, page.next_cursor
+        self.loading = False
+        self._filter_students()
+        self._redraw()
+
+    def _fetch_page(self, after):
+        return self.async_db.page_assessment_submissions(
+            self.assessment_id, after=after, limit=self.PAGE_SIZE, sort='score',
+            search=self.search_query.strip() or None)
+
+    def _redraw(self):
+        if self._on_loaded is not None:
+            self._on_loaded()
+
+    def _load_more(self, e=None):
+        """Append the next page (the "Load more" button and infinite scroll)"""
+        if self.next_cursor is None or self._loading_page:
+            return
+        self.requests.run(self._load_scores_page, False, key='scores')
+
+    def _on_table_scroll(self, e):
+        """Infinite scroll: fetch the next page once the table nears its end"""
+        if e.max_scroll_extent and e.pixels >= e.max_scroll_extent - 200:
+            self._load_more()
+
+    async def _load_scores_page(self, reset):
+        self._loading_page = True
         try:
-            print(f"DEBUG: Getting student scores for assessment_id: {self.assessment_id}")
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            
-            # First, let's check if the assessment exists
-            cursor.execute("SELECT id, title FROM assessments WHERE id = ?", (self.assessment_id,))
-            assessment_check = cursor.fetchone()
-            print(f"DEBUG: Assessment check result: {assessment_check}")
-            
-            # Check if there are any submissions for this assessment
-            cursor.execute("SELECT COUNT(*) FROM submissions WHERE assessment_id = ?", (self.assessment_id,))
-            submission_count = cursor.fetchone()[0]
-            print(f"DEBUG: Total submissions for assessment {self.assessment_id}: {submission_count}")
-            
-            # Query to get student submissions with user details and grading status
-            query = """
-            SELECT 
-                u.id as user_id,
-                u.full_name,
-                u.student_number,
-                u.section,
-                COALESCE(s.score, s.total_score, 0) as score,
-                COALESCE(s.max_score, 0) as max_score,
-                s.submitted_at,
-                s.id as submission_id,
-                s.is_graded
-            FROM submissions s
-            JOIN users u ON s.student_id = u.id
-            WHERE s.assessment_id = ?
-            ORDER BY COALESCE(s.score, s.total_score, 0) DESC, u.full_name ASC
-            """
-            
-            print(f"DEBUG: Executing query with assessment_id: {self.assessment_id}")
-            cursor.execute(query, (self.assessment_id,))
-            results = cursor.fetchall()
-            print(f"DEBUG: Query returned {len(results)} results")
-            print(f"DEBUG: Raw results: {results}")
-            conn.close()
-            
-            # Convert to list of dictionaries
-            student_scores = []
-            for row in results:
-                student_scores.append({
-                    'user_id': row[0],
-                    'full_name': row[1],
-                    'student_number': row[2] or 'N/A',
-                    'section': row[3] or 'N/A',
-                    'score': row[4] or 0,
-                    'max_score': row[5] or 0,
-                    'submitted_at': row[6],
-                    'submission_id': row[7],
-                    'is_graded': row[8] or 0
-                })
-            
-            print(f"DEBUG: Processed {len(student_scores)} student scores")
-            return student_scores
-            
-        except Exception as e:
-            print(f"Error getting student scores: {e}")
-            import traceback
-            print(f"DEBUG: Full traceback: {traceback.format_exc()}")
-            return []
-    
+            page = await self._fetch_page(None if reset else self.next_cursor)
+        finally:
+            # Also when the keyed runner cancels this load (CancelledError is not an Exception)
+            self._loading_page = False
+        self.next_cursor = page.next_cursor
+        if reset or self.table_column is None:
+            self.student_scores = page.items
+            self._filter_students()
+            self._redraw()
+            return
+        # Append rows in place so the table keeps its scroll position; ranks continue
+        first_rank = len(self.student_scores) + 1
+        self.student_scores = self.student_scores + page.items
+        self._filter_students()
+        controls = self.table_column.controls
+        controls.pop()  # the old "Load more" footer
+        controls.extend(self._create_student_row(i, student)
+                        for i, student in enumerate(page.items, first_rank))
+        controls.append(self._create_table_footer())
+        self.table_column.update()
+
+    def _build_loading_placeholder(self):
+        return ft.Container(
+            content=ft.Row([
+                ft.ProgressRing(width=24, height=24, stroke_width=2, color="#D4817A"),
+                ft.Text("Loading student scores...", size=14, color=ft.Colors.GREY_600)
+            ], spacing=12, alignment=ft.MainAxisAlignment.CENTER),
+            padding=ft.padding.all(40),
+            alignment=ft.alignment.center
+        )
+
     def init_ui(self):
         """Initialize UI components"""
         # Left sidebar navigation
@@ -290,6 +322,34 @@ class StudentScoresListPage:
             print(f"DEBUG: No parent dashboard found for submission navigation")
             self.page.go(f"/admin/student-scores/{self.assessment_id}/submission/{submission_id}")
     
+    def grade_next_ungraded(self, e=None):
+        """Open the oldest ungraded submission; Save & next then walks the grading queue"""
+        if self.parent_dashboard:
+            self.parent_dashboard.show_submission_grading_embedded(self.assessment_id)
+            return
+        from pages.student_submission_grading_page import StudentSubmissionGradingPage
+        from database.grading_queue import GradingQueue
+        grading = StudentSubmissionGradingPage(self.page, self.db_manager, self.assessment_id,
+                                               queue=GradingQueue(self.db_manager, self.assessment_id))
+        self.main_content.content = ft.Column([
+            ft.TextButton("Back to Students", icon=ft.Icons.ARROW_BACK, style=ft.ButtonStyle(color="#D4817A"),
+                          on_click=lambda e: grading.leave_queue(self._reload)),
+            grading.build_queue_content()
+        ], spacing=15, expand=True)
+        self.page.update()
+        grading.start_queue()
+    
+    def grade_by_question(self, e=None):
+        """Switch to grading one question for every student (QuestionGradingPage)"""
+        if self.parent_dashboard:
+            self.parent_dashboard.show_question_grading_embedded(self.assessment_id)
+            return
+        from pages.question_grading_page import QuestionGradingPage
+        grading = QuestionGradingPage(self.page, self.db_manager, self.assessment_id, on_back=self._reload)
+        self.main_content.content = grading.build()
+        self.page.update()
+        grading.load()
+    
     def create_search_field(self):
         """Create search field for filtering students"""
         return ft.Container(
@@ -309,20 +369,12 @@ class StudentScoresListPage:
     
     def _on_search_change(self, e):
         """Handle search query change"""
-        self.search_query = e.control.value.lower()
-        self._filter_students()
-        self.page.update()
+        self.search_query = e.control.value
+        self.requests.run(self._load_scores_page, True, key='scores')
     
     def _filter_students(self):
-        """Filter students based on search query"""
-        if not self.search_query:
-            self.filtered_student_scores = self.student_scores
-        else:
-            self.filtered_student_scores = [
-                student for student in self.student_scores
-                if (self.search_query in student['full_name'].lower() or 
-                    self.search_query in str(student['student_number']).lower())
-            ]
+        """Search is applied by the paginated query, so every loaded row matches"""
+        self.filtered_student_scores = self.student_scores
     
     def create_header(self):
         """Create page header with back button"""
@@ -337,17 +389,32 @@ class StudentScoresListPage:
                     ),
                     ft.Column([
                         ft.Text("Student Scores", size=24, weight=ft.FontWeight.BOLD, color="#D4817A"),
-                        ft.Text(f"Assessment: {self.assessment.get('title', 'Unknown') if self.assessment else 'Unknown'}", size=14, color=ft.Colors.GREY_600)
+                        ft.Text("Assessment: Loading..." if self.loading else
+                                f"Assessment: {self.assessment.get('title', 'Unknown') if self.assessment else 'Unknown'}", size=14, color=ft.Colors.GREY_600)
                     ], spacing=2, expand=True),
+                    ft.OutlinedButton(
+                        "Grade next ungraded",
+                        icon=ft.Icons.SKIP_NEXT,
+                        style=ft.ButtonStyle(color="#D4817A"),
+                        on_click=self.grade_next_ungraded
+                    ),
+                    ft.OutlinedButton(
+                        "Grade by question",
+                        icon=ft.Icons.RATE_REVIEW,
+                        style=ft.ButtonStyle(color="#D4817A"),
+                        on_click=self.grade_by_question
+                    ),
+                    self.create_export_menu(),
                     ft.Text(datetime.now().strftime("%B %d, %Y"), size=14, color="#D4817A")
                 ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                self.exporter.build(),
                 
                 # Assessment info cards
                 ft.Row([
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Total Students", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_700),
-                            ft.Text(str(len(self.student_scores)), size=20, weight=ft.FontWeight.BOLD, color="#D4817A")
+                            ft.Text("-" if self.loading else str(self.summary.get('total_students', 0)), size=20, weight=ft.FontWeight.BOLD, color="#D4817A")
                         ], spacing=2, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
                         padding=ft.padding.all(15),
                         bgcolor=ft.Colors.BLUE_50,
@@ -357,7 +424,7 @@ class StudentScoresListPage:
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Average Score", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_700),
-                            ft.Text(f"{self.calculate_average_score():.1f}%", size=20, weight=ft.FontWeight.BOLD, color="#D4817A")
+                            ft.Text("-" if self.loading else f"{self.calculate_average_score():.1f}%", size=20, weight=ft.FontWeight.BOLD, color="#D4817A")
                         ], spacing=2, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
                         padding=ft.padding.all(15),
                         bgcolor=ft.Colors.GREEN_50,
@@ -367,7 +434,7 @@ class StudentScoresListPage:
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Highest Score", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_700),
-                            ft.Text(f"{self.get_highest_score():.1f}%", size=20, weight=ft.FontWeight.BOLD, color="#D4817A")
+                            ft.Text("-" if self.loading else f"{self.get_highest_score():.1f}%", size=20, weight=ft.FontWeight.BOLD, color="#D4817A")
                         ], spacing=2, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
                         padding=ft.padding.all(15),
                         bgcolor=ft.Colors.ORANGE_50,
@@ -382,49 +449,29 @@ class StudentScoresListPage:
             margin=ft.margin.only(bottom=10)
         )
     
+    def create_export_menu(self):
+        """Score sheet and answer dump downloads for this assessment"""
+        title = (self.assessment or {}).get('title') or f"Assessment {self.assessment_id}"
+        return self.exporter.menu([
+            ("Export score sheet", export_assessment_scores, self.assessment_id, export_file_name(title, "scores")),
+            ("Export answers by question", export_assessment_answers, self.assessment_id,
+             export_file_name(title, "answers")),
+        ], tooltip="Export scores")
+
     def calculate_average_score(self):
-        """Calculate average score percentage"""
-        if not self.student_scores:
-            return 0
-        
-        total_percentage = 0
-        for student in self.student_scores:
-            if student['max_score'] > 0:
-                percentage = (student['score'] / student['max_score']) * 100
-                total_percentage += percentage
-        
-        return total_percentage / len(self.student_scores) if self.student_scores else 0
+        """Average score percentage over every submission (SQL score summary, not just loaded pages)"""
+        return self.summary.get('average_percentage', 0)
     
     def get_highest_score(self):
-        """Get highest score percentage"""
-        if not self.student_scores:
-            return 0
-        
-        highest = 0
-        for student in self.student_scores:
-            if student['max_score'] > 0:
-                percentage = (student['score'] / student['max_score']) * 100
-                highest = max(highest, percentage)
-        
-        return highest
+        """Highest score percentage over every submission"""
+        return self.summary.get('highest_percentage', 0)
     
     def create_students_table(self):
         """Create the main students scores table"""
-        # Use flexible column definitions that adapt to container width
-        # Define columns as flex values that will scale proportionally
-        COLUMN_FLEX = {
-            'rank': 1,      # Smallest column
-            'name': 3,      # Largest column for names
-            'student_no': 2.5,  # Medium column
-            'section': 2,    # Small column
-            'score': 2,     # Small column
-            'percentage': 2,  # Small column
-            'date': 2,          # Medium column
-            'status': 2,      # Small column
-            'view': 2,         # Small column
-        }
+        if self.loading:
+            return self._build_loading_placeholder()
         
-        print(f"DEBUG: Using flexible column layout with flex values: {COLUMN_FLEX}")
+        print(f"DEBUG: Using flexible column layout with flex values: {self.COLUMN_FLEX}")
         
         # Initialize filtered scores if not done
         if not hasattr(self, 'filtered_student_scores') or not self.filtered_student_scores:
@@ -449,63 +496,63 @@ class StudentScoresListPage:
             content=ft.Row([
                 ft.Container(
                     content=ft.Text("#", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['rank'],
+                    expand=self.COLUMN_FLEX['rank'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("Student Name", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['name'],
+                    expand=self.COLUMN_FLEX['name'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("Student No.", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['student_no'],
+                    expand=self.COLUMN_FLEX['student_no'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("Section", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['section'],
+                    expand=self.COLUMN_FLEX['section'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("Score", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['score'],
+                    expand=self.COLUMN_FLEX['score'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("%", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['percentage'],
+                    expand=self.COLUMN_FLEX['percentage'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("Date", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['date'],
+                    expand=self.COLUMN_FLEX['date'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("Status", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['status'],
+                    expand=self.COLUMN_FLEX['status'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
                 ),
                 ft.Container(
                     content=ft.Text("View", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
-                    expand=COLUMN_FLEX['view'],
+                    expand=self.COLUMN_FLEX['view'],
                     alignment=ft.alignment.center,
                     bgcolor="#D4817A",
                     padding=ft.padding.symmetric(vertical=12)
@@ -514,145 +561,24 @@ class StudentScoresListPage:
             border_radius=ft.border_radius.only(top_left=10, top_right=10)
         )
         
-        # Table rows
+        # Table rows; later pages are appended to the same column
         table_rows = [header_row]
-        for i, student in enumerate(self.filtered_student_scores, 1):
-            # Calculate percentage
-            percentage = (student['score'] / student['max_score'] * 100) if student['max_score'] > 0 else 0
-            
-            # Determine colors based on performance
-            if percentage >= 90:
-                score_color = ft.Colors.GREEN
-            elif percentage >= 80:
-                score_color = ft.Colors.LIGHT_GREEN
-            elif percentage >= 70:
-                score_color = ft.Colors.ORANGE
-            elif percentage >= 60:
-                score_color = ft.Colors.DEEP_ORANGE
-            else:
-                score_color = ft.Colors.RED
-            
-            # Row background - highlight top 3 performers
-            if i == 1:
-                row_bg = ft.Colors.YELLOW_50  # Gold for 1st place
-            elif i == 2:
-                row_bg = ft.Colors.GREY_100   # Silver for 2nd place
-            elif i == 3:
-                row_bg = ft.Colors.ORANGE_50  # Bronze for 3rd place
-            else:
-                row_bg = ft.Colors.WHITE if i % 2 == 0 else ft.Colors.GREY_50
-            
-            # Rank with trophy for top 3
-            rank_content = ft.Row([
-                ft.Icon(ft.Icons.EMOJI_EVENTS, color="#FFD700", size=16) if i == 1 
-                else ft.Icon(ft.Icons.EMOJI_EVENTS, color=ft.Colors.GREY, size=16) if i == 2
-                else ft.Icon(ft.Icons.EMOJI_EVENTS, color=ft.Colors.ORANGE, size=16) if i == 3
-                else ft.Container(width=16),
-                ft.Text(str(i), size=14, weight=ft.FontWeight.BOLD if i <= 3 else ft.FontWeight.NORMAL, color="#D4817A")
-            ], spacing=4, alignment=ft.MainAxisAlignment.CENTER)
-            
-            # Grading status
-            is_graded = student.get('is_graded', 0)
-            status_display = ft.Container(
-                content=ft.Text(
-                    "Graded" if is_graded else "Ungraded",
-                    size=12,
-                    color=ft.Colors.GREEN if is_graded else ft.Colors.ORANGE,
-                    weight=ft.FontWeight.BOLD
-                ),
-                bgcolor=ft.Colors.GREEN_50 if is_graded else ft.Colors.ORANGE_50,
-                border_radius=10,
-                padding=ft.padding.symmetric(horizontal=8, vertical=4)
-            )
-            
-            row = ft.Container(
-                content=ft.Row([
-                    ft.Container(
-                        content=rank_content, 
-                        expand=COLUMN_FLEX['rank'], 
-                        alignment=ft.alignment.center
-                    ),
-                    ft.Container(
-                        content=ft.Text(
-                            student['full_name'] or "Unknown Student", 
-                            size=13, 
-                            color=ft.Colors.BLACK87, 
-                            weight=ft.FontWeight.BOLD if i <= 3 else ft.FontWeight.W_500
-                        ),
-                        expand=COLUMN_FLEX['name'],
-                        alignment=ft.alignment.center_left,
-                        padding=ft.padding.only(left=10)
-                    ),
-                    ft.Container(
-                        content=ft.Text(
-                            str(student['student_number']) or 'N/A',
-                            size=12,
-                            color=ft.Colors.BLACK87
-                        ),
-                        expand=COLUMN_FLEX['student_no'],
-                        alignment=ft.alignment.center
-                    ),
-                    ft.Container(
-                        content=ft.Text(
-                            student['section'] or 'N/A',
-                            size=12,
-                            color=ft.Colors.BLACK87
-                        ),
-                        expand=COLUMN_FLEX['section'],
-                        alignment=ft.alignment.center
-                    ),
-                    ft.Container(
-                        content=ft.Text(
-                            f"{student['score']}/{student['max_score']}",
-                            size=12,
-                            color=score_color,
-                            weight=ft.FontWeight.BOLD
-                        ),
-                        expand=COLUMN_FLEX['score'],
-                        alignment=ft.alignment.center
-                    ),
-                    ft.Container(
-                        content=ft.Text(f"{percentage:.1f}%", size=12, color=score_color, weight=ft.FontWeight.BOLD),
-                        expand=COLUMN_FLEX['percentage'],
-                        alignment=ft.alignment.center
-                    ),
-                    ft.Container(
-                        content=ft.Text(self.format_date(student['submitted_at']), size=11, color=ft.Colors.BLACK87),
-                        expand=COLUMN_FLEX['date'],
-                        alignment=ft.alignment.center
-                    ),
-                    ft.Container(
-                        content=status_display,
-                        expand=COLUMN_FLEX['status'],
-                        alignment=ft.alignment.center
-                    ),
-                    ft.Container(
-                        content=ft.IconButton(
-                            icon=ft.Icons.VISIBILITY,
-                            icon_color="#D4817A",
-                            icon_size=18,
-                            tooltip="View Detailed Submission",
-                            on_click=lambda e, sid=student['submission_id']: self.view_submission_details(sid)
-                        ),
-                        expand=COLUMN_FLEX['view'],
-                        alignment=ft.alignment.center
-                    )
-                ], spacing=0),
-                bgcolor=row_bg,
-                padding=ft.padding.symmetric(vertical=12),
-                border=ft.border.only(bottom=ft.BorderSide(1, ft.Colors.GREY_200))
-            )
-            table_rows.append(row)
+        table_rows.extend(self._create_student_row(i, student)
+                          for i, student in enumerate(self.filtered_student_scores, 1))
+        table_rows.append(self._create_table_footer())
         
         # Create responsive table that adapts to container width
-        table_column = ft.Column(
+        self.table_column = ft.Column(
             controls=table_rows,
             spacing=0,
-            tight=True
+            tight=True,
+            scroll=ft.ScrollMode.AUTO,
+            on_scroll=self._on_table_scroll,
+            on_scroll_interval=100
         )
         
         return ft.Container(
-            content=table_column,
+            content=self.table_column,
             bgcolor=ft.Colors.WHITE,
             border_radius=15,
             border=ft.border.all(1, ft.Colors.GREY_300),
@@ -661,6 +587,144 @@ class StudentScoresListPage:
             padding=ft.padding.all(0)   # No container padding
         )
     
+    def _create_student_row(self, i, student):
+        """One table row; ``i`` is the student's rank in the current ordering"""
+        # Calculate percentage
+        percentage = (student['score'] / student['max_score'] * 100) if student['max_score'] > 0 else 0
+            
+        # Determine colors based on performance
+        if percentage >= 90:
+            score_color = ft.Colors.GREEN
+        elif percentage >= 80:
+            score_color = ft.Colors.LIGHT_GREEN
+        elif percentage >= 70:
+            score_color = ft.Colors.ORANGE
+        elif percentage >= 60:
+            score_color = ft.Colors.DEEP_ORANGE
+        else:
+            score_color = ft.Colors.RED
+            
+        # Row background - highlight top 3 performers
+        if i == 1:
+            row_bg = ft.Colors.YELLOW_50  # Gold for 1st place
+        elif i == 2:
+            row_bg = ft.Colors.GREY_100   # Silver for 2nd place
+        elif i == 3:
+            row_bg = ft.Colors.ORANGE_50  # Bronze for 3rd place
+        else:
+            row_bg = ft.Colors.WHITE if i % 2 == 0 else ft.Colors.GREY_50
+            
+        # Rank with trophy for top 3
+        rank_content = ft.Row([
+            ft.Icon(ft.Icons.EMOJI_EVENTS, color="#FFD700", size=16) if i == 1 
+            else ft.Icon(ft.Icons.EMOJI_EVENTS, color=ft.Colors.GREY, size=16) if i == 2
+            else ft.Icon(ft.Icons.EMOJI_EVENTS, color=ft.Colors.ORANGE, size=16) if i == 3
+            else ft.Container(width=16),
+            ft.Text(str(i), size=14, weight=ft.FontWeight.BOLD if i <= 3 else ft.FontWeight.NORMAL, color="#D4817A")
+        ], spacing=4, alignment=ft.MainAxisAlignment.CENTER)
+            
+        # Grading status
+        is_graded = student.get('is_graded', 0)
+        status_display = ft.Container(
+            content=ft.Text(
+                "Graded" if is_graded else "Ungraded",
+                size=12,
+                color=ft.Colors.GREEN if is_graded else ft.Colors.ORANGE,
+                weight=ft.FontWeight.BOLD
+            ),
+            bgcolor=ft.Colors.GREEN_50 if is_graded else ft.Colors.ORANGE_50,
+            border_radius=10,
+            padding=ft.padding.symmetric(horizontal=8, vertical=4)
+        )
+            
+        row = ft.Container(
+            content=ft.Row([
+                ft.Container(
+                    content=rank_content, 
+                    expand=self.COLUMN_FLEX['rank'], 
+                    alignment=ft.alignment.center
+                ),
+                ft.Container(
+                    content=ft.Text(
+                        student['full_name'] or "Unknown Student", 
+                        size=13, 
+                        color=ft.Colors.BLACK87, 
+                        weight=ft.FontWeight.BOLD if i <= 3 else ft.FontWeight.W_500
+                    ),
+                    expand=self.COLUMN_FLEX['name'],
+                    alignment=ft.alignment.center_left,
+                    padding=ft.padding.only(left=10)
+                ),
+                ft.Container(
+                    content=ft.Text(
+                        str(student['student_number']) or 'N/A',
+                        size=12,
+                        color=ft.Colors.BLACK87
+                    ),
+                    expand=self.COLUMN_FLEX['student_no'],
+                    alignment=ft.alignment.center
+                ),
+                ft.Container(
+                    content=ft.Text(
+                        student['section'] or 'N/A',
+                        size=12,
+                        color=ft.Colors.BLACK87
+                    ),
+                    expand=self.COLUMN_FLEX['section'],
+                    alignment=ft.alignment.center
+                ),
+                ft.Container(
+                    content=ft.Text(
+                        f"{student['score']}/{student['max_score']}",
+                        size=12,
+                        color=score_color,
+                        weight=ft.FontWeight.BOLD
+                    ),
+                    expand=self.COLUMN_FLEX['score'],
+                    alignment=ft.alignment.center
+                ),
+                ft.Container(
+                    content=ft.Text(f"{percentage:.1f}%", size=12, color=score_color, weight=ft.FontWeight.BOLD),
+                    expand=self.COLUMN_FLEX['percentage'],
+                    alignment=ft.alignment.center
+                ),
+                ft.Container(
+                    content=ft.Text(self.format_date(student['submitted_at']), size=11, color=ft.Colors.BLACK87),
+                    expand=self.COLUMN_FLEX['date'],
+                    alignment=ft.alignment.center
+                ),
+                ft.Container(
+                    content=status_display,
+                    expand=self.COLUMN_FLEX['status'],
+                    alignment=ft.alignment.center
+                ),
+                ft.Container(
+                    content=ft.IconButton(
+                        icon=ft.Icons.VISIBILITY,
+                        icon_color="#D4817A",
+                        icon_size=18,
+                        tooltip="View Detailed Submission",
+                        on_click=lambda e, sid=student['submission_id']: self.view_submission_details(sid)
+                    ),
+                    expand=self.COLUMN_FLEX['view'],
+                    alignment=ft.alignment.center
+                )
+            ], spacing=0),
+            bgcolor=row_bg,
+            padding=ft.padding.symmetric(vertical=12),
+            border=ft.border.only(bottom=ft.BorderSide(1, ft.Colors.GREY_200))
+        )
+        return row
+
+    def _create_table_footer(self):
+        if self.next_cursor is None:
+            return ft.Container(height=0)
+        return ft.Container(
+            content=ft.TextButton("Load more", icon=ft.Icons.EXPAND_MORE, on_click=self._load_more),
+            alignment=ft.alignment.center,
+            padding=ft.padding.symmetric(vertical=8)
+        )
+
     def format_date(self, date_str):
         """Format date string for display"""
         if not date_str:
@@ -682,6 +746,25 @@ class StudentScoresListPage:
                 return str(time_taken)
         return "N/A"
     
+    def _build_content(self):
+        return ft.Column([
+            self.create_header(),
+            self.create_search_field(),
+            self.create_students_table()
+        ], spacing=0, expand=True, scroll=ft.ScrollMode.AUTO)
+
+    def _reload(self):
+        """Show the placeholders again and reload the scores, e.g. after grading by question"""
+        self.loading = True
+        self._refresh_content()
+        self.load_data_async(self._refresh_content)
+
+    def _refresh_content(self):
+        """Redraw the page once the background load has landed"""
+        if self.main_content is not None:
+            self.main_content.content = self._build_content()
+            self.page.update()
+
     def build(self):
         """Build the complete page"""
         try:
@@ -689,23 +772,20 @@ class StudentScoresListPage:
             self._filter_students()
             
             # Main content area
-            main_content = ft.Container(
-                content=ft.Column([
-                    self.create_header(),
-                    self.create_search_field(),
-                    self.create_students_table()
-                ], spacing=0, expand=True, scroll=ft.ScrollMode.AUTO),
+            self.main_content = ft.Container(
+                content=self._build_content(),
                 padding=ft.padding.all(20),
                 expand=True,
                 bgcolor="#f4f1ec"
             )
+            self.load_data_async(self._refresh_content)
             
             return ft.View(
                 "/admin/student-scores-list",
                 [
                     ft.Row([
                         self.sidebar,
-                        main_content
+                        self.main_content
                     ], spacing=0, expand=True)
                 ],
                 padding=0,
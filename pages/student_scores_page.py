@@ -1,6 +1,7 @@
 import flet as ft
 from datetime import datetime
 from database.database_manager import DatabaseManager
+from database.grading import AnswerKey
 
 class StudentScoresPage:
     def __init__(self, page: ft.Page, db_manager: DatabaseManager, assessment_id: int):
@@ -9,6 +10,8 @@ class StudentScoresPage:
         self.assessment_id = assessment_id
         self.assessment = None
         self.student_scores = []
+        # Average/highest percentages (SQL score summary)
+        self.score_summary = {}
         self.current_view = "students"  # students, grading
         self.current_submission_id = None
         self.user_data = page.data  # Get user data from page
@@ -29,6 +32,7 @@ class StudentScoresPage:
             # Get student scores
             self.student_scores = self.get_student_scores()
             print(f"👥 Found {len(self.student_scores)} student submissions")
+            self.score_summary = self.db_manager.get_assessment_score_summary(self.assessment_id)
             
             if self.student_scores:
                 print("📊 Student scores preview:")
@@ -39,13 +43,11 @@ class StudentScoresPage:
             print(f"❌ Error loading assessment data: {e}")
             self.assessment = None
             self.student_scores = []
+            self.score_summary = {}
     
     def get_student_scores(self):
         """Get student scores for the assessment"""
         try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            
             # Query to get student submissions with user details
             query = """
             SELECT 
@@ -62,9 +64,8 @@ class StudentScoresPage:
             ORDER BY COALESCE(s.score, s.total_score, 0) DESC, u.full_name ASC
             """
             
-            cursor.execute(query, (self.assessment_id,))
-            results = cursor.fetchall()
-            conn.close()
+            with self.db_manager.connection() as conn:
+                results = conn.execute(query, (self.assessment_id,)).fetchall()
             
             # Convert to list of dictionaries
             student_scores = []
@@ -367,20 +368,16 @@ class StudentScoresPage:
         
         if is_mcq:
             # Multiple choice question
-            options = answer.get('options', [])
-            if isinstance(options, str):
-                import json
-                try:
-                    options = json.loads(options)
-                except:
-                    options = []
+            answer_key = AnswerKey.from_answers([answer])
+            options = answer_key.options[0]
+            student_choice = answer_key.choice_code(answer['question_id'], answer.get('student_answer'))
+            key_choice = answer_key.key_code(answer['question_id'])
             
             # Show options with student's selection highlighted
             option_controls = []
             for i, option in enumerate(options):
-                option_letter = chr(65 + i)  # A, B, C, D
-                is_selected = answer.get('student_answer') == option_letter
-                is_correct = answer.get('correct_answer') == option_letter
+                is_selected = i == student_choice
+                is_correct = i == key_choice
                 
                 if is_selected:
                     if is_correct:
@@ -587,30 +584,12 @@ class StudentScoresPage:
         )
     
     def calculate_average_score(self):
-        """Calculate average score percentage"""
-        if not self.student_scores:
-            return 0
-        
-        total_percentage = 0
-        for student in self.student_scores:
-            if student['total_questions'] > 0:
-                percentage = (student['score'] / student['total_questions']) * 100
-                total_percentage += percentage
-        
-        return total_percentage / len(self.student_scores) if self.student_scores else 0
+        """Average score percentage over every submission, from the SQL score summary"""
+        return self.score_summary.get('average_percentage', 0)
     
     def get_highest_score(self):
-        """Get highest score percentage"""
-        if not self.student_scores:
-            return 0
-        
-        highest = 0
-        for student in self.student_scores:
-            if student['total_questions'] > 0:
-                percentage = (student['score'] / student['total_questions']) * 100
-                highest = max(highest, percentage)
-        
-        return highest
+        """Highest score percentage over every submission, from the SQL score summary"""
+        return self.score_summary.get('highest_percentage', 0)
     
     def create_students_table(self):
         """Create the main students scores table"""
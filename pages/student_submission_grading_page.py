@@ -1,17 +1,31 @@
 import flet as ft
 from datetime import datetime
 from database.database_manager import DatabaseManager
+from database.async_manager import AsyncDatabaseManager
+from database.grading import AnswerKey, clean_answer, parse_options
+from database.grading_queue import GradingQueue
 
 class StudentSubmissionGradingPage:
-    def __init__(self, page: ft.Page, db_manager: DatabaseManager, assessment_id: int, submission_id: int):
+    def __init__(self, page: ft.Page, db_manager: DatabaseManager, assessment_id: int, submission_id: int = None,
+                 queue: GradingQueue = None):
         self.page = page
         self.db_manager = db_manager
         self.assessment_id = assessment_id
         self.submission_id = submission_id
         self.submission_details = None
         self.assessment_details = None
+        self.answer_key = AnswerKey([])
         self.parent_dashboard = None  # Reference to parent dashboard for embedded navigation
         
+        # Grading queue mode: submissions are loaded by the queue and swapped in place
+        self.queue = queue
+        self.requests = AsyncDatabaseManager.shared(db_manager).page_requests(page)
+        self.queue_content = None
+        self.queue_status = None
+        self._advancing = False
+        if queue is not None and queue.on_save_failed is None:
+            queue.on_save_failed = self.on_save_failed
+        
         # Store references to input fields for score collection
         self.score_inputs = {}  # {answer_index: TextField}
         self.feedback_inputs = {}  # {answer_index: TextField}
@@ -20,9 +34,10 @@ class StudentSubmissionGradingPage:
         # Get user data from page session
         self.user_data = self.page.data if hasattr(self.page, 'data') else None
         
-        # Load data
-        self.load_submission_data()
-        self.load_assessment_data()
+        # Load data (the queue loads its own, in the background)
+        if self.queue is None:
+            self.load_submission_data()
+            self.load_assessment_data()
         self.init_ui()
         
     def load_submission_data(self):
@@ -31,6 +46,8 @@ class StudentSubmissionGradingPage:
             print(f"Loading submission data for ID: {self.submission_id}")
             self.submission_details = self.db_manager.get_submission_details(self.submission_id)
             print(f"Submission found: {self.submission_details.get('student_name') if self.submission_details else 'None'}")
+            # Every MCQ score and highlight on this page comes from one compiled key
+            self.answer_key = AnswerKey.from_answers(self.submission_details['answers'] if self.submission_details else [])
             
             # Also load assessment details
             self.assessment_details = self.db_manager.get_assessment_by_id(self.assessment_id)
@@ -221,6 +238,65 @@ class StudentSubmissionGradingPage:
         self.page.views.append(scores_list_page.build())
         self.page.update()
     
+    def collect_grades(self):
+        """(earned, possible, answers) from the answer key and the score and feedback inputs"""
+        # Get answers from submission details
+        answers = self.submission_details.get('answers', [])
+        if isinstance(answers, str):
+            import json
+            answers = json.loads(answers)
+        
+        total_earned_score = 0
+        total_possible_score = 0
+        updated_answers = []
+        
+        # Process each answer
+        for i, answer in enumerate(answers):
+            question_num = i + 1
+            question_type = answer.get('question_type', 'mcq')
+            max_points = answer.get('points', 1)
+            
+            if question_type == 'mcq':
+                # Auto-grade MCQ questions against the compiled answer key
+                student_answer = answer.get('student_answer', '')
+                correct_answer = answer.get('correct_answer', '')
+                is_correct, earned_score = self.answer_key.grade(answer.get('question_id'), student_answer)
+                
+                answer['points_earned'] = earned_score
+                answer['is_graded'] = True
+                
+                print(f"DEBUG: MCQ Question {question_num}: {earned_score}/{max_points} points (auto-graded) - Student: '{student_answer}', Correct: '{correct_answer}', Match: {is_correct}")
+            else:
+                # Manual grading for answer-type questions
+                earned_score = 0
+                
+                # Get score from input field if available
+                if question_num in self.score_inputs:
+                    try:
+                        score_value = self.score_inputs[question_num].value or "0"
+                        earned_score = float(score_value)
+                        earned_score = max(0, min(earned_score, max_points))  # Clamp between 0 and max
+                    except ValueError:
+                        print(f"DEBUG: Invalid score value for question {question_num}: {score_value}")
+                        earned_score = 0
+                
+                # Get feedback from input field if available
+                feedback = ""
+                if question_num in self.feedback_inputs:
+                    feedback = self.feedback_inputs[question_num].value or ""
+                
+                answer['points_earned'] = earned_score
+                answer['feedback'] = feedback
+                answer['is_graded'] = True
+                
+                print(f"DEBUG: Answer Question {question_num}: {earned_score}/{max_points} points (manual)")
+            
+            total_earned_score += earned_score
+            total_possible_score += max_points
+            updated_answers.append(answer)
+        
+        return total_earned_score, total_possible_score, updated_answers
+    
     def finalize_grade(self, e=None):
         """Collect scores from interface and finalize the grade for current submission"""
         if not self.submission_id or not self.submission_details:
@@ -235,101 +311,9 @@ class StudentSubmissionGradingPage:
             return
         
         try:
-            # Get answers from submission details
-            answers = self.submission_details.get('answers', [])
-            if isinstance(answers, str):
-                import json
-                answers = json.loads(answers)
-            
-            total_earned_score = 0
-            total_possible_score = 0
-            updated_answers = []
-            
-            # Process each answer
-            for i, answer in enumerate(answers):
-                question_num = i + 1
-                question_type = answer.get('question_type', 'mcq')
-                max_points = answer.get('points', 1)
-                
-                if question_type == 'mcq':
-                    # Auto-grade MCQ questions using enhanced comparison logic
-                    student_answer = answer.get('student_answer', '')
-                    correct_answer = answer.get('correct_answer', '')
-                    
-                    # Clean student answer format
-                    student_answer = self.clean_student_answer(student_answer)
-                    
-                    # Check if student answer matches correct answer in any format
-                    is_correct = False
-                    options = answer.get('options', [])
-                    if isinstance(options, str):
-                        import json
-                        try:
-                            options = json.loads(options)
-                        except:
-                            options = []
-                    
-                    for idx, option in enumerate(options):
-                        option_letter = chr(65 + idx)  # A, B, C, D
-                        
-                        # Check if this option is both selected and correct
-                        is_selected = (
-                            student_answer == option_letter or
-                            student_answer == str(idx) or
-                            student_answer == option or
-                            student_answer == str(idx + 1)
-                        )
-                        
-                        is_option_correct = (
-                            correct_answer == option_letter or
-                            correct_answer == str(idx) or
-                            correct_answer == option or
-                            correct_answer == str(idx + 1)
-                        )
-                        
-                        if is_selected and is_option_correct:
-                            is_correct = True
-                            break
-                    
-                    earned_score = max_points if is_correct else 0
-                    
-                    answer['points_earned'] = earned_score
-                    answer['is_graded'] = True
-                    
-                    print(f"DEBUG: MCQ Question {question_num}: {earned_score}/{max_points} points (auto-graded) - Student: '{student_answer}', Correct: '{correct_answer}', Match: {is_correct}")
-                else:
-                    # Manual grading for answer-type questions
-                    earned_score = 0
-                    
-                    # Get score from input field if available
-                    if question_num in self.score_inputs:
-                        try:
-                            score_value = self.score_inputs[question_num].value or "0"
-                            earned_score = float(score_value)
-                            earned_score = max(0, min(earned_score, max_points))  # Clamp between 0 and max
-                        except ValueError:
-                            print(f"DEBUG: Invalid score value for question {question_num}: {score_value}")
-                            earned_score = 0
-                    
-                    # Get feedback from input field if available
-                    feedback = ""
-                    if question_num in self.feedback_inputs:
-                        feedback = self.feedback_inputs[question_num].value or ""
-                    
-                    answer['points_earned'] = earned_score
-                    answer['feedback'] = feedback
-                    answer['is_graded'] = True
-                    
-                    print(f"DEBUG: Answer Question {question_num}: {earned_score}/{max_points} points (manual)")
-                
-                total_earned_score += earned_score
-                total_possible_score += max_points
-                updated_answers.append(answer)
+            total_earned_score, total_possible_score, updated_answers = self.collect_grades()
             
             print(f"DEBUG: Final scores - Earned: {total_earned_score}, Possible: {total_possible_score}")
-            print(f"DEBUG: Updated answers summary:")
-            for i, ans in enumerate(updated_answers):
-                print(f"  Question {i+1}: {ans.get('points_earned', 0)}/{ans.get('points', 1)} points, graded: {ans.get('is_graded', False)}")
             
             # Update submission in database
             success = self.db_manager.update_submission_grade(
@@ -408,45 +392,7 @@ class StudentSubmissionGradingPage:
                 question_type = answer.get('question_type', 'mcq')
                 if question_type == 'mcq':
                     # Auto-calculate MCQ score - only count if correct
-                    student_answer = answer.get('student_answer', '')
-                    correct_answer = answer.get('correct_answer', '')
-                    
-                    # Clean student answer format
-                    student_answer = self.clean_student_answer(student_answer)
-                    
-                    # Check if student answer matches correct answer in any format
-                    is_correct = False
-                    options = answer.get('options', [])
-                    if isinstance(options, str):
-                        import json
-                        try:
-                            options = json.loads(options)
-                        except:
-                            options = []
-                    
-                    for i, option in enumerate(options):
-                        option_letter = chr(65 + i)  # A, B, C, D
-                        
-                        # Check if this option is both selected and correct
-                        is_selected = (
-                            student_answer == option_letter or
-                            student_answer == str(i) or
-                            student_answer == option or
-                            student_answer == str(i + 1)
-                        )
-                        
-                        is_option_correct = (
-                            correct_answer == option_letter or
-                            correct_answer == str(i) or
-                            correct_answer == option or
-                            correct_answer == str(i + 1)
-                        )
-                        
-                        if is_selected and is_option_correct:
-                            is_correct = True
-                            break
-                    
-                    earned_points = max_points if is_correct else 0
+                    _, earned_points = self.answer_key.grade(answer.get('question_id'), answer.get('student_answer', ''))
                     current_earned_score += earned_points
                 else:
                     # For answer-type questions, get score from input field or existing data
@@ -569,45 +515,7 @@ class StudentSubmissionGradingPage:
                     question_type = ans.get('question_type', 'mcq')
                     if question_type == 'mcq':
                         # Auto-calculate MCQ score
-                        student_ans = ans.get('student_answer', '')
-                        correct_ans = ans.get('correct_answer', '')
-                        
-                        # Clean student answer format
-                        student_ans = self.clean_student_answer(student_ans)
-                        
-                        # Check if student answer matches correct answer in any format
-                        is_correct = False
-                        options = ans.get('options', [])
-                        if isinstance(options, str):
-                            import json
-                            try:
-                                options = json.loads(options)
-                            except:
-                                options = []
-                        
-                        for idx, option in enumerate(options):
-                            option_letter = chr(65 + idx)  # A, B, C, D
-                            
-                            # Check if this option is both selected and correct
-                            is_selected = (
-                                student_ans == option_letter or
-                                student_ans == str(idx) or
-                                student_ans == option or
-                                student_ans == str(idx + 1)
-                            )
-                            
-                            is_option_correct = (
-                                correct_ans == option_letter or
-                                correct_ans == str(idx) or
-                                correct_ans == option or
-                                correct_ans == str(idx + 1)
-                            )
-                            
-                            if is_selected and is_option_correct:
-                                is_correct = True
-                                break
-                        
-                        earned_points = max_points if is_correct else 0
+                        _, earned_points = self.answer_key.grade(ans.get('question_id'), ans.get('student_answer', ''))
                         total_earned_score += earned_points
                     else:
                         # Use graded score for answer-type questions
@@ -672,32 +580,6 @@ class StudentSubmissionGradingPage:
             error_snack.open = True
             self.page.update()
 
-    def clean_student_answer(self, student_answer):
-        """Clean student answer by removing quotes, brackets, and extra formatting"""
-        if not student_answer:
-            return student_answer
-        
-        student_answer = student_answer.strip()
-        if student_answer.startswith('"') and student_answer.endswith('"'):
-            student_answer = student_answer[1:-1]
-        if student_answer.startswith("'") and student_answer.endswith("'"):
-            student_answer = student_answer[1:-1]
-        if student_answer.startswith('["') and student_answer.endswith('"]'):
-            student_answer = student_answer[2:-2]
-        if student_answer.startswith("['") and student_answer.endswith("']"):
-            student_answer = student_answer[2:-2]
-        # Handle cases like '["ert346546"' (incomplete bracket)
-        if student_answer.startswith('["'):
-            student_answer = student_answer[2:]
-        if student_answer.startswith("['"):
-            student_answer = student_answer[2:]
-        if student_answer.endswith('"'):
-            student_answer = student_answer[:-1]
-        if student_answer.endswith("'"):
-            student_answer = student_answer[:-1]
-        
-        return student_answer
-
     def update_score_display(self):
         """Update the score display in the header when scores change"""
         if not hasattr(self, 'score_display_container') or not self.score_display_container:
@@ -725,45 +607,7 @@ class StudentSubmissionGradingPage:
                 question_type = answer.get('question_type', 'mcq')
                 if question_type == 'mcq':
                     # Auto-calculate MCQ score - only count if correct
-                    student_answer = answer.get('student_answer', '')
-                    correct_answer = answer.get('correct_answer', '')
-                    
-                    # Clean student answer format
-                    student_answer = self.clean_student_answer(student_answer)
-                    
-                    # Check if student answer matches correct answer in any format
-                    is_correct = False
-                    options = answer.get('options', [])
-                    if isinstance(options, str):
-                        import json
-                        try:
-                            options = json.loads(options)
-                        except:
-                            options = []
-                    
-                    for idx, option in enumerate(options):
-                        option_letter = chr(65 + idx)  # A, B, C, D
-                        
-                        # Check if this option is both selected and correct
-                        is_selected = (
-                            student_answer == option_letter or
-                            student_answer == str(idx) or
-                            student_answer == option or
-                            student_answer == str(idx + 1)
-                        )
-                        
-                        is_option_correct = (
-                            correct_answer == option_letter or
-                            correct_answer == str(idx) or
-                            correct_answer == option or
-                            correct_answer == str(idx + 1)
-                        )
-                        
-                        if is_selected and is_option_correct:
-                            is_correct = True
-                            break
-                    
-                    earned_points = max_points if is_correct else 0
+                    _, earned_points = self.answer_key.grade(answer.get('question_id'), answer.get('student_answer', ''))
                     current_earned_score += earned_points
                 else:
                     # For answer-type questions, get score from input field
@@ -877,45 +721,24 @@ class StudentSubmissionGradingPage:
         
         if is_mcq:
             # Multiple choice question
-            options = answer.get('options', [])
-            if isinstance(options, str):
-                import json
-                try:
-                    options = json.loads(options)
-                except:
-                    options = []
+            options = parse_options(answer.get('options'))
             
             # Show options with student's selection highlighted
             option_controls = []
             student_answer = answer.get('student_answer', '')
             correct_answer = answer.get('correct_answer', '')
+            student_choice = self.answer_key.choice_code(answer.get('question_id'), student_answer)
+            key_choice = self.answer_key.key_code(answer.get('question_id'))
             
             # Clean student answer - remove quotes, brackets, and extra formatting
-            student_answer = self.clean_student_answer(student_answer)
-            
-            print(f"DEBUG MCQ - Original student answer: '{answer.get('student_answer', '')}', Cleaned: '{student_answer}', Correct answer: '{correct_answer}'")
-            print(f"DEBUG MCQ - Options: {options}")
+            student_answer = clean_answer(student_answer)
             
             for i, option in enumerate(options):
                 option_letter = chr(65 + i)  # A, B, C, D
                 
-                # Check multiple possible formats for student answer
-                is_selected = (
-                    student_answer == option_letter or  # Letter format (A, B, C, D)
-                    student_answer == str(i) or         # Index format (0, 1, 2, 3)
-                    student_answer == option or         # Full option text
-                    student_answer == str(i + 1)       # 1-based index (1, 2, 3, 4)
-                )
-                
-                # Check multiple possible formats for correct answer
-                is_correct = (
-                    correct_answer == option_letter or  # Letter format (A, B, C, D)
-                    correct_answer == str(i) or         # Index format (0, 1, 2, 3)
-                    correct_answer == option or         # Full option text
-                    correct_answer == str(i + 1)       # 1-based index (1, 2, 3, 4)
-                )
-                
-                print(f"DEBUG MCQ - Option {option_letter} ({option}): selected={is_selected}, correct={is_correct}")
+                # Letter, number or option text all resolve to the same choice code
+                is_selected = i == student_choice
+                is_correct = i == key_choice
                 
                 # Determine colors and icons based on selection and correctness
                 if is_selected and is_correct:
@@ -973,7 +796,7 @@ class StudentSubmissionGradingPage:
             question_content.extend(option_controls)
             
             # Show answer summary
-            is_correct_answer = student_answer == correct_answer
+            is_correct_answer, _ = self.answer_key.grade(answer.get('question_id'), answer.get('student_answer', ''))
             question_content.append(
                 ft.Container(
                     content=ft.Row([
@@ -1029,6 +852,13 @@ class StudentSubmissionGradingPage:
             max_points = answer.get('points', 1)
             # Determine if graded based on whether points_earned is not None or has feedback
             is_graded = (current_score is not None) or bool(answer.get('feedback', '').strip())
+            # Auto-grading proposals it was unsure of wait for a teacher (database/auto_grade.py)
+            grade_source = answer.get('grade_source')
+            if grade_source == 'review':
+                is_graded = False
+            status_label = "Pending Review" if not is_graded else "Graded"
+            if grade_source in ('auto', 'review') and answer.get('auto_confidence') is not None:
+                status_label += f" (auto-graded, {answer['auto_confidence']:.0%} confident)"
             
             # Status indicator - store reference for updates
             status_container = ft.Container(
@@ -1039,7 +869,7 @@ class StudentSubmissionGradingPage:
                         size=16
                     ),
                     ft.Text(
-                        "Pending Review" if not is_graded else "Graded",
+                        status_label,
                         size=12,
                         color=ft.Colors.ORANGE if not is_graded else ft.Colors.GREEN,
                         weight=ft.FontWeight.BOLD
@@ -1234,8 +1064,9 @@ class StudentSubmissionGradingPage:
                                 shape=ft.RoundedRectangleBorder(radius=25)
                             )
                         ),
+                        *([self.create_save_and_next_button()] if self.queue else []),
                         ft.Container(expand=True)
-                    ]),
+                    ], spacing=15),
                     ft.Container(height=10),
                     ft.Text(
                         "Click to save all scores and update the submission status",
@@ -1263,6 +1094,133 @@ class StudentSubmissionGradingPage:
             bgcolor="#f4f1ec"
         )
     
+    # ------------------------- Grading queue -------------------------
+    def create_save_and_next_button(self):
+        return ft.ElevatedButton(
+            content=ft.Row([
+                ft.Icon(ft.Icons.SKIP_NEXT, color=ft.Colors.WHITE),
+                ft.Text("Save & next", color=ft.Colors.WHITE, size=16, weight=ft.FontWeight.BOLD)
+            ], spacing=8),
+            bgcolor="#8BC34A",
+            color=ft.Colors.WHITE,
+            width=200,
+            height=50,
+            on_click=self.save_and_next,
+            style=ft.ButtonStyle(
+                shape=ft.RoundedRectangleBorder(radius=25)
+            )
+        )
+    
+    def create_queue_bar(self):
+        """Who is being graded, plus the queue's progress and its Skip / Save & next buttons"""
+        current = self.queue.current
+        if self.submission_details:
+            title = f"Grading: {self.submission_details.get('student_name', 'Unknown Student')}"
+            subtitle = f"Submission ID: {self.submission_id}"
+        elif current is None and self.queue.assessment is not None:
+            title, subtitle = "All caught up", "No ungraded submissions left for this assessment"
+        else:
+            title, subtitle = "Loading...", ""
+        self.queue_status = ft.Text(self.queue.status(), size=12, color="#666666")
+        return ft.Container(
+            content=ft.Row([
+                ft.Column([
+                    ft.Text(title, size=18, weight=ft.FontWeight.BOLD, color="#D4817A"),
+                    ft.Text(subtitle, size=14, color="#666666"),
+                    self.queue_status
+                ], spacing=5, expand=True),
+                ft.TextButton("Skip", icon=ft.Icons.REDO, style=ft.ButtonStyle(color="#D4817A"),
+                              disabled=not self.submission_details, on_click=self.skip),
+                ft.ElevatedButton(
+                    "Save & next",
+                    icon=ft.Icons.SKIP_NEXT,
+                    style=ft.ButtonStyle(bgcolor="#D4817A", color=ft.Colors.WHITE,
+                                         shape=ft.RoundedRectangleBorder(radius=10)),
+                    disabled=not self.submission_details,
+                    on_click=self.save_and_next
+                )
+            ]),
+            padding=ft.padding.all(15),
+            bgcolor=ft.Colors.WHITE,
+            border_radius=10
+        )
+    
+    def build_queue_content(self):
+        """The part of the page that is swapped in place as the queue moves on"""
+        self.queue_content = ft.Column(self._queue_controls(), spacing=15, expand=True)
+        return self.queue_content
+    
+    def _queue_controls(self):
+        if not self.submission_details:
+            return [self.create_queue_bar()]
+        return [self.create_queue_bar(), self.create_assessment_info_header(), self.create_grading_interface()]
+    
+    def start_queue(self):
+        """Open the submission this page was created for (or the oldest ungraded one) through the queue"""
+        self.requests.run(self._start_queue)
+    
+    async def _start_queue(self):
+        details = await self.queue.start(self.submission_id)
+        self.assessment_details = self.queue.assessment
+        self._show_submission(details)
+    
+    def save_and_next(self, e=None):
+        """Hand the current grade to the queue's writer and switch to the next ungraded submission"""
+        if self.queue and self.submission_details and not self._advancing:
+            self._advancing = True
+            self.requests.run(self._advance, True)
+    
+    def skip(self, e=None):
+        """Leave the current submission ungraded and move on"""
+        if self.queue and self.submission_details and not self._advancing:
+            self._advancing = True
+            self.requests.run(self._advance, False)
+    
+    async def _advance(self, save):
+        try:
+            if save:
+                details = await self.queue.save_and_next(*self.collect_grades())
+            else:
+                details = await self.queue.next()
+            self._show_submission(details)
+        finally:
+            self._advancing = False
+    
+    def _show_submission(self, details):
+        """Swap the queue's next submission into the page without rebuilding the rest of it"""
+        self.submission_details = details
+        self.submission_id = self.queue.current['submission_id'] if details else None
+        self.answer_key = AnswerKey.from_answers(details['answers'] if details else [])
+        self.score_inputs = {}
+        self.feedback_inputs = {}
+        self.question_status_containers = {}
+        if self.queue_content is not None:
+            self.queue_content.controls = self._queue_controls()
+            self.page.update()
+    
+    def on_save_failed(self, entry):
+        """Queue callback: a grade did not save; its submission comes round again at the end"""
+        error_snack = ft.SnackBar(
+            content=ft.Text(f"Could not save the grade for {entry['full_name']}; it is back in the queue",
+                            color=ft.Colors.WHITE),
+            bgcolor=ft.Colors.RED
+        )
+        self.page.overlay.append(error_snack)
+        error_snack.open = True
+        if self.queue_status is not None:
+            self.queue_status.value = self.queue.status()
+        self.page.update()
+    
+    def leave_queue(self, then):
+        """Stop prefetching, wait for grades still being written, then call ``then()``"""
+        self.requests.cancel()
+        self.queue.close()
+        self.requests.run(self._leave_queue, then)
+    
+    async def _leave_queue(self, then):
+        await self.queue.drain()
+        then()
+    
     def build(self):
         """Build the complete page"""
         try: